@@ -4,8 +4,10 @@ Alerting System - Sistema de alertas inteligentes
 
 import asyncio
 import logging
+import threading
 import time
-from typing import Dict, Any, List, Optional, Callable
+from collections import deque
+from typing import Dict, Any, List, Optional, Callable, Set
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from enum import Enum
@@ -56,10 +58,49 @@ class AlertRule:
     cooldown_seconds: int = 300  # 5 minutos
     enabled: bool = True
     labels: Dict[str, str] = None
+    depends_on: List[str] = None  # Métricas que lee la condición (None: evaluar siempre)
+    windows: Dict[str, int] = None  # Métrica -> segundos de ventana para deltas de contadores
     
     def __post_init__(self):
         if self.labels is None:
             self.labels = {}
+        if self.windows is None:
+            self.windows = {}
+
+class CounterWindow:
+    """Muestras (monotonic, valor) de un contador para calcular deltas sobre una ventana deslizante"""
+    
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+        self.samples = deque()
+    
+    def add(self, value: float, now: Optional[float] = None):
+        """Registrar nuevo valor del contador"""
+        now = time.monotonic() if now is None else now
+        if self.samples and value < self.samples[-1][1]:
+            self.samples.clear()  # El contador se reinició
+        self.samples.append((now, value))
+        self._prune(now)
+    
+    def _prune(self, now: float):
+        """Descartar muestras antiguas conservando una anterior al inicio de la ventana"""
+        cutoff = now - self.seconds
+        while len(self.samples) > 1 and self.samples[1][0] <= cutoff:
+            self.samples.popleft()
+    
+    def delta(self, seconds: Optional[int] = None, now: Optional[float] = None) -> float:
+        """Incremento del contador en los últimos ``seconds`` segundos"""
+        if not self.samples:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        self._prune(now)
+        cutoff = now - min(seconds or self.seconds, self.seconds)
+        base = self.samples[0][1]
+        for timestamp, value in self.samples:
+            if timestamp > cutoff:
+                break
+            base = value
+        return self.samples[-1][1] - base
 
 class AlertingSystem:
     """Sistema de alertas inteligentes"""
@@ -72,6 +113,20 @@ class AlertingSystem:
         self.notifiers: List[Callable] = []
         self.logger = logging.getLogger("AlertingSystem")
         
+        # Evaluación dirigida por cambios: solo se evalúan las reglas cuyas métricas cambiaron
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+        self.rules_by_metric: Dict[str, List[AlertRule]] = {}
+        self.unindexed_rules: List[AlertRule] = []  # Sin depends_on: se evalúan en cada check
+        self.windowed_rules: List[AlertRule] = []  # Su valor cambia con el tiempo, no solo con las métricas
+        self.windows: Dict[str, CounterWindow] = {}
+        self.watched_metrics: Set[str] = set()  # Métricas que interesan al listener del collector
+        self._deferred: Set[str] = set()  # Reglas con cambios pendientes que estaban en cooldown
+        self._pending: Set[str] = set()  # Reglas marcadas por el listener del collector
+        self._pending_lock = threading.Lock()
+        self._evaluation_scheduled = False
+        self._evaluated_once = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
         # Inicializar reglas por defecto
         self._init_default_rules()
     
@@ -85,7 +140,8 @@ class AlertingSystem:
             severity=AlertSeverity.CRITICAL,
             title="🚨 Bot Stopped",
             message_template="Trading bot has stopped running",
-            cooldown_seconds=60
+            cooldown_seconds=60,
+            depends_on=["bot_status"]
         ))
         
         # Regla: WebSocket desconectado
@@ -95,7 +151,8 @@ class AlertingSystem:
             severity=AlertSeverity.WARNING,
             title="⚠️ WebSocket Disconnected",
             message_template="WebSocket connection lost",
-            cooldown_seconds=300
+            cooldown_seconds=300,
+            depends_on=["websocket_connected"]
         ))
         
         # Regla: Alta pérdida de dinero
@@ -105,17 +162,20 @@ class AlertingSystem:
             severity=AlertSeverity.CRITICAL,
             title="💰 High Loss Alert",
             message_template="Trading PnL is ${pnl:.2f} (below -$1000 threshold)",
-            cooldown_seconds=600
+            cooldown_seconds=600,
+            depends_on=["trading_pnl_total"]
         ))
         
-        # Regla: Muchos errores de API
+        # Regla: Muchos errores de API (tasa sobre los últimos 5 minutos)
         self.add_rule(AlertRule(
             name="high_api_errors",
-            condition=lambda metrics: self._get_error_rate(metrics) > 0.1,  # 10% error rate
+            condition=lambda metrics: self._get_error_rate(metrics, window=300) > 0.1,  # 10% error rate
             severity=AlertSeverity.WARNING,
             title="🔌 High API Error Rate",
             message_template="API error rate is {error_rate:.1%} (above 10% threshold)",
-            cooldown_seconds=300
+            cooldown_seconds=300,
+            depends_on=["api_requests_total", "api_requests_failed"],
+            windows={"api_requests_total": 300, "api_requests_failed": 300}
         ))
         
         # Regla: Sin señales por mucho tiempo
@@ -125,7 +185,8 @@ class AlertingSystem:
             severity=AlertSeverity.WARNING,
             title="📊 No Signals Generated",
             message_template="No trading signals generated for {age_minutes:.1f} minutes",
-            cooldown_seconds=600
+            cooldown_seconds=600,
+            depends_on=["bot_uptime_seconds", "trading_signals_total"]
         ))
         
         # Regla: Uso alto de memoria
@@ -135,7 +196,8 @@ class AlertingSystem:
             severity=AlertSeverity.WARNING,
             title="💾 High Memory Usage",
             message_template="Bot memory usage is {memory_mb:.1f} MB (above 500MB threshold)",
-            cooldown_seconds=300
+            cooldown_seconds=300,
+            depends_on=["bot_memory_usage_bytes"]
         ))
         
         # Regla: Uso alto de CPU
@@ -145,29 +207,38 @@ class AlertingSystem:
             severity=AlertSeverity.WARNING,
             title="⚡ High CPU Usage",
             message_template="Bot CPU usage is {cpu_percent:.1f}% (above 80% threshold)",
-            cooldown_seconds=300
+            cooldown_seconds=300,
+            depends_on=["bot_cpu_usage_percent"]
         ))
         
         # Regla: Circuit breaker abierto
+        breaker_metrics = [
+            f"circuit_breaker_open_{name}"
+            for name in ["bot_startup", "signal_generation", "paper_trader_startup"]
+        ]
         self.add_rule(AlertRule(
             name="circuit_breaker_open",
             condition=lambda metrics: any(
-                metrics.get(f"circuit_breaker_open_{name}", {}).get("value", 0) 
-                for name in ["bot_startup", "signal_generation", "paper_trader_startup"]
+                metrics.get(name, {}).get("value", 0) for name in breaker_metrics
             ),
             severity=AlertSeverity.CRITICAL,
             title="🔒 Circuit Breaker Open",
             message_template="Circuit breaker is open, blocking operations",
-            cooldown_seconds=60
+            cooldown_seconds=60,
+            depends_on=breaker_metrics
         ))
         
         self.logger.info(f"Initialized {len(self.rules)} alert rules")
     
-    def _get_error_rate(self, metrics: Dict[str, Any]) -> float:
-        """Calcular tasa de errores de API"""
+    def _get_error_rate(self, metrics: Dict[str, Any], window: Optional[int] = None) -> float:
+        """Calcular tasa de errores de API (sobre los últimos ``window`` segundos si hay ventana)"""
         try:
-            total_requests = metrics.get("api_requests_total", {}).get("value", 0)
-            failed_requests = metrics.get("api_requests_failed", {}).get("value", 0)
+            if window and "api_requests_total" in self.windows:
+                total_requests = self.windowed_delta("api_requests_total", window)
+                failed_requests = self.windowed_delta("api_requests_failed", window)
+            else:
+                total_requests = metrics.get("api_requests_total", {}).get("value", 0)
+                failed_requests = metrics.get("api_requests_failed", {}).get("value", 0)
             
             if total_requests == 0:
                 return 0.0
@@ -198,6 +269,25 @@ class AlertingSystem:
     def add_rule(self, rule: AlertRule):
         """Agregar regla de alerta"""
         self.rules.append(rule)
+        
+        # Indexar por métrica para evaluar solo las reglas afectadas por un cambio
+        if rule.depends_on is None:
+            self.unindexed_rules.append(rule)
+        else:
+            for metric_name in rule.depends_on:
+                self.rules_by_metric.setdefault(metric_name, []).append(rule)
+                self.watched_metrics.add(metric_name)
+        
+        if rule.windows:
+            self.windowed_rules.append(rule)
+            for metric_name, seconds in rule.windows.items():
+                self.watched_metrics.add(metric_name)
+                window = self.windows.get(metric_name)
+                if window is None:
+                    self.windows[metric_name] = CounterWindow(seconds)
+                elif seconds > window.seconds:
+                    window.seconds = seconds
+        
         self.logger.info(f"Added alert rule: {rule.name}")
     
     def add_notifier(self, notifier: Callable):
@@ -205,22 +295,119 @@ class AlertingSystem:
         self.notifiers.append(notifier)
         self.logger.info("Added alert notifier")
     
-    async def check_alerts(self, metrics: Dict[str, Any]):
-        """Verificar reglas de alerta"""
+    def windowed_delta(self, metric_name: str, seconds: int) -> float:
+        """Incremento de un contador en los últimos ``seconds`` segundos"""
+        window = self.windows.get(metric_name)
+        return window.delta(seconds) if window else 0.0
+    
+    def attach(self, metrics_collector):
+        """Evaluar las reglas dependientes en cuanto el collector actualiza una métrica"""
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass  # Se captura en el primer check_alerts
+        # El collector solo agrega y notifica las métricas de las que depende alguna regla
+        metrics_collector.add_listener(self._on_metric_update, self.watched_metrics)
+        self.logger.info("Alerting system attached to metrics collector")
+    
+    def _on_metric_update(self, name: str, metric):
+        """Listener del collector: marcar reglas dependientes y programar una evaluación"""
+        rules = self.rules_by_metric.get(name)
+        if rules is None and name not in self.windows:
+            return
+        
+        with self._pending_lock:
+            if not self._update_metric(name, {"value": metric.value, "labels": metric.labels}):
+                return
+            self._pending.update(rule.name for rule in rules or ())
+            if self._evaluation_scheduled or self._loop is None:
+                return
+            self._evaluation_scheduled = True
+        
+        # Una sola evaluación por vuelta del loop aunque lleguen muchas actualizaciones
+        try:
+            self._loop.call_soon_threadsafe(self._schedule_evaluation)
+        except RuntimeError:
+            self._evaluation_scheduled = False  # Loop cerrado
+    
+    def _schedule_evaluation(self):
+        """Crear la tarea de evaluación en el loop"""
+        self._loop.create_task(self._evaluate_pending())
+    
+    async def _evaluate_pending(self):
+        """Evaluar las reglas marcadas por el listener"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, set()
+            self._evaluation_scheduled = False
+        if pending:
+            await self._evaluate_rules([rule for rule in self.rules if rule.name in pending])
+    
+    def _update_metric(self, name: str, entry: Dict[str, Any]) -> bool:
+        """Guardar el nuevo valor de una métrica; True si cambió"""
+        previous = self.metrics.get(name)
+        if previous is not None and previous.get("value") == entry.get("value"):
+            return False
+        self.metrics[name] = entry
+        window = self.windows.get(name)
+        if window is not None:
+            try:
+                window.add(float(entry.get("value", 0)))
+            except (TypeError, ValueError):
+                pass
+        return True
+    
+    async def check_alerts(self, metrics: Optional[Dict[str, Any]] = None):
+        """Verificar reglas de alerta afectadas por cambios en ``metrics``"""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        
+        if metrics is None:
+            changed = set()
+        else:
+            with self._pending_lock:
+                changed = {name for name, entry in metrics.items() if self._update_metric(name, entry)}
+                # Las métricas que desaparecen vuelven a su valor por defecto en las condiciones
+                removed = [name for name in self.metrics if name not in metrics]
+                for name in removed:
+                    del self.metrics[name]
+                changed.update(removed)
+        
+        if not self._evaluated_once:
+            # Primera evaluación: todas las reglas (las métricas ausentes también pueden disparar)
+            self._evaluated_once = True
+            await self._evaluate_rules(self.rules)
+            return
+        
+        selected = {rule.name for name in changed for rule in self.rules_by_metric.get(name, ())}
+        selected.update(rule.name for rule in self.unindexed_rules)
+        selected.update(rule.name for rule in self.windowed_rules)
+        selected.update(self._deferred)
+        if selected:
+            await self._evaluate_rules([rule for rule in self.rules if rule.name in selected])
+    
+    async def _evaluate_rules(self, rules: List[AlertRule]):
+        """Evaluar reglas contra el estado actual de métricas"""
         current_time = datetime.now(timezone.utc)
+        metrics = self.metrics
         
-        for rule in self.rules:
+        for rule in rules:
             if not rule.enabled:
                 continue
             
-            # Verificar cooldown
+            # Verificar cooldown tras el último cambio de estado (el cambio queda pendiente hasta que termine)
             last_check = self.last_rule_check.get(rule.name)
             if last_check and (current_time - last_check).total_seconds() < rule.cooldown_seconds:
+                self._deferred.add(rule.name)
                 continue
+            self._deferred.discard(rule.name)
             
             try:
                 # Evaluar condición
-                if rule.condition(metrics):
+                firing = bool(rule.condition(metrics))
+                if firing == (rule.name in self.active_alerts):
+                    continue
+                
+                if firing:
                     await self._trigger_alert(rule, metrics, current_time)
                 else:
                     await self._resolve_alert(rule.name, current_time)
@@ -247,7 +434,7 @@ class AlertingSystem:
                 message = message.replace("{pnl}", f"{pnl:.2f}")
             
             if "{error_rate}" in message:
-                error_rate = self._get_error_rate(metrics)
+                error_rate = self._get_error_rate(metrics, window=rule.windows.get("api_requests_total"))
                 message = message.replace("{error_rate}", f"{error_rate:.1%}")
             
             if "{age_minutes}" in message:
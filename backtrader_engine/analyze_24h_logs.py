@@ -5,98 +5,90 @@ Extracts and analyzes logs for comprehensive testing report
 """
 
 import json
-import re
 import logging
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
 
+from log_analytics import LogAnalytics
+from event_log import EventLogReader, EventKind, decode
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class TestAnalyzer:
-    def __init__(self, log_dir="logs"):
+    def __init__(self, log_dir="logs", max_workers=None):
         self.log_dir = Path(log_dir)
+        self.analytics = LogAnalytics(log_dir, max_workers=max_workers)
         self.data = {
-            'signals': [],
-            'trades': [],
-            'risk_rejections': [],
-            'errors': [],
+            'signals': {},
+            'trades': {},
+            'risk_rejections': {},
+            'errors': {},
             'strategies': defaultdict(lambda: {'signals': 0, 'confidence': []}),
             'symbols': defaultdict(lambda: {'buy': 0, 'sell': 0}),
             'timeline': []
         }
         
     def load_logs(self):
-        """Load and parse log files"""
+        """Load and parse log files (only data appended since the last run is parsed)"""
         logger.info("Loading logs...")
         
-        log_files = list(self.log_dir.glob("*.log"))
-        for log_file in log_files:
-            self._parse_log_file(log_file)
-    
-    def _parse_log_file(self, log_file):
-        """Parse individual log file"""
-        try:
-            with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    self._parse_line(line)
-        except Exception as e:
-            logger.error(f"Error parsing {log_file}: {e}")
-    
-    def _parse_line(self, line):
-        """Parse a single log line"""
-        try:
-            # Signal generation
-            if 'BUY signal' in line or 'SELL signal' in line:
-                match = re.search(r'(\w+)\s+signal.*symbol[:\s]+(\w+).*confidence[:\s]+([\d.]+)', line)
-                if match:
-                    signal_type, symbol, confidence = match.groups()
-                    self.data['signals'].append({
-                        'type': signal_type,
-                        'symbol': symbol,
-                        'confidence': float(confidence),
-                        'timestamp': self._extract_timestamp(line)
-                    })
-                    self.data['symbols'][symbol][signal_type.lower()] += 1
-            
-            # Strategy signals
-            if 'Strategy' in line and ('signal' in line or 'Signal' in line):
-                match = re.search(r'(\w+Strategy).*signal', line, re.IGNORECASE)
-                if match:
-                    strategy = match.group(1)
-                    self.data['strategies'][strategy]['signals'] += 1
-            
-            # Risk management rejections
-            if 'Risk Manager' in line and ('reject' in line.lower() or 'reason' in line.lower()):
-                self.data['risk_rejections'].append({
-                    'timestamp': self._extract_timestamp(line),
-                    'reason': line.strip()
-                })
-            
-            # Errors
-            if 'ERROR' in line or 'Exception' in line:
-                self.data['errors'].append({
-                    'timestamp': self._extract_timestamp(line),
-                    'message': line.strip()
-                })
-            
-            # Trades executed
-            if 'order' in line.lower() and ('executed' in line.lower() or 'opened' in line.lower()):
-                self.data['trades'].append({
-                    'timestamp': self._extract_timestamp(line),
-                    'details': line.strip()
-                })
-        
-        except Exception as e:
-            logger.debug(f"Error parsing line: {e}")
+        tables = self.analytics.load("*.log")
+        
+        # Event tables are columnar: column name -> list of values
+        self.data['errors'] = tables['errors']
+        
+        events_path = self.log_dir / "events.bin"
+        if events_path.exists():
+            # Typed events written by the bot: no text scraping needed
+            self._load_events(EventLogReader(events_path))
+            return
+        
+        self.data['signals'] = tables['signals']
+        self.data['trades'] = tables['trades']
+        self.data['risk_rejections'] = tables['risk_rejections']
+        
+        for strategy in tables['strategy_signals']['strategy']:
+            self.data['strategies'][strategy]['signals'] += 1
+        for signal_type, symbol in zip(tables['signals']['type'], tables['signals']['symbol']):
+            self.data['symbols'][symbol][signal_type.lower()] += 1
     
-    def _extract_timestamp(self, line):
-        """Extract timestamp from log line"""
-        match = re.search(r'\[(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})\]', line)
-        if match:
-            return match.group(1)
-        return "N/A"
+    def _load_events(self, reader):
+        """Fill signal, trade and rejection tables from the binary event log"""
+        signals = reader.select(EventKind.SIGNAL)
+        fills = reader.select(EventKind.FILL)
+        rejections = reader.select(EventKind.REJECTION)
+        
+        def timestamps(events):
+            return [datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S') for ts in events['ts'].tolist()]
+        
+        sides = {1: 'BUY', -1: 'SELL'}
+        signal_types = [sides.get(side, 'HOLD') for side in signals['side'].tolist()]
+        symbols = decode(signals['symbol'])
+        strategies = decode(signals['strategy'])
+        confidences = signals['value'].tolist()
+        self.data['signals'] = {
+            'type': signal_types,
+            'symbol': symbols,
+            'confidence': confidences,
+            'timestamp': timestamps(signals)
+        }
+        self.data['trades'] = {
+            'timestamp': timestamps(fills),
+            'details': [f"{symbol} {sides.get(side, '')} {qty} @ {price}" for symbol, side, qty, price
+                        in zip(decode(fills['symbol']), fills['side'].tolist(), fills['qty'].tolist(), fills['price'].tolist())]
+        }
+        self.data['risk_rejections'] = {
+            'timestamp': timestamps(rejections),
+            'reason': decode(rejections['detail'])
+        }
+        
+        for signal_type, symbol, strategy, confidence in zip(signal_types, symbols, strategies, confidences):
+            if signal_type != 'HOLD':
+                self.data['symbols'][symbol][signal_type.lower()] += 1
+            self.data['strategies'][strategy]['signals'] += 1
+            self.data['strategies'][strategy]['confidence'].append(confidence)
     
     def generate_report(self):
         """Generate analysis report"""
@@ -109,17 +101,22 @@ class TestAnalyzer:
         # Test Execution Summary
         report.append("EXECUTION SUMMARY")
         report.append("-" * 80)
-        report.append(f"Total Signals Generated: {len(self.data['signals'])}")
-        report.append(f"Total Trades Executed: {len(self.data['trades'])}")
-        report.append(f"Risk Manager Rejections: {len(self.data['risk_rejections'])}")
-        report.append(f"Errors/Exceptions: {len(self.data['errors'])}")
+        signal_count = len(self.data['signals'].get('type', []))
+        trade_count = len(self.data['trades'].get('details', []))
+        rejections = self.data['risk_rejections'].get('reason', [])
+        errors = self.data['errors'].get('message', [])
+        report.append(f"Total Signals Generated: {signal_count}")
+        report.append(f"Total Trades Executed: {trade_count}")
+        report.append(f"Risk Manager Rejections: {len(rejections)}")
+        report.append(f"Errors/Exceptions: {len(errors)}")
         report.append("")
         
         # Signal Distribution by Type
         report.append("SIGNAL DISTRIBUTION")
         report.append("-" * 80)
-        buy_count = sum(1 for s in self.data['signals'] if s['type'] == 'BUY')
-        sell_count = sum(1 for s in self.data['signals'] if s['type'] == 'SELL')
+        signal_types = self.data['signals'].get('type', [])
+        buy_count = signal_types.count('BUY')
+        sell_count = signal_types.count('SELL')
         report.append(f"BUY Signals: {buy_count}")
         report.append(f"SELL Signals: {sell_count}")
         report.append("")
@@ -148,23 +145,23 @@ class TestAnalyzer:
             report.append("")
         
         # Risk Management Analysis
-        if self.data['risk_rejections']:
+        if rejections:
             report.append("RISK MANAGEMENT ANALYSIS")
             report.append("-" * 80)
-            report.append(f"Total Rejections: {len(self.data['risk_rejections'])}")
+            report.append(f"Total Rejections: {len(rejections)}")
             report.append("Rejection Reasons:")
-            for rejection in self.data['risk_rejections'][:10]:  # Show first 10
-                report.append(f"  - {rejection['reason'][:100]}")
+            for reason in rejections[:10]:  # Show first 10
+                report.append(f"  - {reason[:100]}")
             report.append("")
         
         # Errors
-        if self.data['errors']:
+        if errors:
             report.append("ERRORS/EXCEPTIONS")
             report.append("-" * 80)
-            report.append(f"Total Errors: {len(self.data['errors'])}")
+            report.append(f"Total Errors: {len(errors)}")
             report.append("Sample Errors (first 5):")
-            for error in self.data['errors'][:5]:
-                report.append(f"  - {error['message'][:100]}")
+            for message in errors[:5]:
+                report.append(f"  - {message[:100]}")
             report.append("")
         
         # Recommendations
@@ -174,15 +171,15 @@ class TestAnalyzer:
         if buy_count == 0 or sell_count == 0:
             report.append("- Strategies not generating balanced signals. Review signal generation logic.")
         
-        if len(self.data['risk_rejections']) > len(self.data['trades']):
+        if len(rejections) > trade_count:
             report.append("- High rejection rate. Review risk limits configuration.")
         
-        if len(self.data['errors']) > 10:
+        if len(errors) > 10:
             report.append("- Multiple errors detected. Check error logs for patterns.")
         else:
             report.append("- System stability appears good with minimal errors.")
         
-        if len(self.data['signals']) > 50:
+        if signal_count > 50:
             report.append("- Healthy signal generation observed across strategies.")
         
         report.append("")
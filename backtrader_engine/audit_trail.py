@@ -5,12 +5,17 @@ Audit Trail - Sistema de auditoría y trazabilidad
 import asyncio
 import logging
 import json
+import gzip
 import hashlib
 import hmac
+import itertools
+import os
+import shutil
 import time
+from bisect import bisect_right
 from typing import Dict, Any, List, Optional, Union
 from datetime import datetime, timezone, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field, fields
 from enum import Enum
 from pathlib import Path
 import threading
@@ -53,6 +58,37 @@ class AuditEvent:
     previous_state: Optional[Dict[str, Any]] = None
     new_state: Optional[Dict[str, Any]] = None
 
+@dataclass
+class AuditSegment:
+    """Segmento del audit log con su resumen e índice temporal disperso"""
+    name: str
+    sealed: bool = False
+    compressed: bool = False
+    min_ts: Optional[float] = None
+    max_ts: Optional[float] = None
+    count: int = 0
+    size: int = 0  # bytes sin comprimir
+    event_types: Dict[str, int] = field(default_factory=dict)
+    severities: Dict[str, int] = field(default_factory=dict)
+    index: List[List[float]] = field(default_factory=list)  # [timestamp, offset] cada N eventos
+    last_signature: str = ""  # Cabeza de la cadena HMAC al cierre del segmento
+
+    def summary(self) -> Dict[str, Any]:
+        """Resumen sin el índice disperso (para el manifiesto)"""
+        data = dict(vars(self))
+        data.pop("index")
+        return data
+
+    def overlaps(self, start_ts: Optional[float], end_ts: Optional[float]) -> bool:
+        """Comprobar si el segmento puede contener eventos del rango"""
+        if self.count == 0:
+            return False
+        if start_ts is not None and self.max_ts < start_ts:
+            return False
+        if end_ts is not None and self.min_ts > end_ts:
+            return False
+        return True
+
 class AuditTrail:
     """Sistema de auditoría y trazabilidad"""
     
@@ -60,6 +96,18 @@ class AuditTrail:
         self.audit_file = Path(audit_file)
         self.audit_file.parent.mkdir(parents=True, exist_ok=True)
         
+        # Segmentos: logs/audit_trail/audit_<inicio>.jsonl (activo) -> .jsonl.gz (sellado)
+        self.segment_dir = self.audit_file.with_suffix("")
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_file = self.segment_dir / "index.json"
+        self.segments: List[AuditSegment] = []
+        self.active_segment: Optional[AuditSegment] = None
+        self.segment_lock = threading.RLock()
+        self._segment_handle = None
+        self._chain_head = ""  # Última firma de la cadena HMAC
+        self._last_fsync = 0.0
+        self._event_seq = itertools.count()
+        
         self.logger = logging.getLogger("AuditTrail")
         self.event_queue = queue.Queue()
         self.running = False
@@ -73,7 +121,10 @@ class AuditTrail:
             "encryption_enabled": True,
             "signature_key": "audit_trail_secret_key",  # En producción usar clave segura
             "batch_size": 100,
-            "flush_interval": 30  # segundos
+            "flush_interval": 30,  # segundos
+            "fsync_policy": "batch",  # batch | interval | none
+            "fsync_interval": 1.0,  # segundos (política interval)
+            "index_interval": 256  # eventos entre entradas del índice disperso
         }
         
         # Estadísticas de auditoría
@@ -86,6 +137,8 @@ class AuditTrail:
             "file_size": 0
         }
         
+        self._load_segments()
+        
         self.logger.info("AuditTrail initialized")
     
     def start(self):
@@ -100,51 +153,98 @@ class AuditTrail:
         """Detener sistema de auditoría"""
         if self.running:
             self.running = False
+            self.event_queue.put(None)  # Despertar al worker
             if self.worker_thread:
                 self.worker_thread.join(timeout=5)
+            self._close_segment_handle()
             self.logger.info("Audit trail stopped")
     
     def _worker_loop(self):
-        """Loop del worker de auditoría"""
+        """Loop del worker de auditoría: bloquea en la cola y agrupa escrituras"""
         batch = []
-        last_flush = time.time()
+        deadline = None
         
-        while self.running:
+        while True:
             try:
-                # Procesar eventos en lotes
-                while not self.event_queue.empty():
-                    event = self.event_queue.get_nowait()
+                # Sin lote pendiente se bloquea sin timeout: cero CPU en reposo
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    event = self.event_queue.get(timeout=timeout)
+                except queue.Empty:
+                    event = False
+                
+                if event is None and not self.running:
+                    break
+                if event:
                     batch.append(event)
+                    if deadline is None:
+                        deadline = time.monotonic() + self.audit_config["flush_interval"]
                     
-                    # Flush si se alcanza el tamaño del lote
-                    if len(batch) >= self.audit_config["batch_size"]:
-                        self._flush_batch(batch)
-                        batch = []
-                        last_flush = time.time()
+                    # Lo que ya está en cola entra en el mismo commit
+                    while len(batch) < self.audit_config["batch_size"]:
+                        try:
+                            event = self.event_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if event is None:
+                            break
+                        batch.append(event)
                 
-                # Flush periódico
-                if time.time() - last_flush > self.audit_config["flush_interval"]:
-                    if batch:
-                        self._flush_batch(batch)
-                        batch = []
-                    last_flush = time.time()
+                if batch and (len(batch) >= self.audit_config["batch_size"] or time.monotonic() >= deadline):
+                    self._flush_batch(batch)
+                    batch = []
+                    deadline = None
                 
-                time.sleep(0.1)
+                if not self.running:
+                    break
             except Exception as e:
                 self.logger.error(f"Error in audit worker loop: {e}")
                 time.sleep(1)
         
         # Flush final
+        while True:
+            try:
+                event = self.event_queue.get_nowait()
+            except queue.Empty:
+                break
+            if event:
+                batch.append(event)
+        if batch:
+            self._flush_batch(batch)
+    
+    def flush(self):
+        """Escribir de inmediato los eventos pendientes en cola (sin worker activo)"""
+        batch = []
+        while True:
+            try:
+                event = self.event_queue.get_nowait()
+            except queue.Empty:
+                break
+            if event:
+                batch.append(event)
         if batch:
             self._flush_batch(batch)
     
     def _flush_batch(self, batch: List[AuditEvent]):
-        """Escribir lote de eventos a archivo"""
+        """Firmar, serializar y escribir el lote con una única escritura por segmento"""
         try:
-            with open(self.audit_file, "a", encoding="utf-8") as f:
+            with self.segment_lock:
+                chunks = []
                 for event in batch:
-                    event_json = json.dumps(asdict(event), default=str, ensure_ascii=False)
-                    f.write(event_json + "\n")
+                    ts = event.timestamp.timestamp()
+                    if self._should_rotate(ts):
+                        self._write_chunks(chunks)
+                        chunks = []
+                        self._rotate_segment(ts)
+                    
+                    line = self._sign_and_serialize(event)
+                    self._index_event(self.active_segment, event, ts)
+                    self.active_segment.size += len(line)
+                    chunks.append(line)
+                
+                self._write_chunks(chunks)
+                self.active_segment.last_signature = self._chain_head
+                self._write_segment_index(self.active_segment)
             
             # Actualizar estadísticas
             self.stats["total_events"] += len(batch)
@@ -164,13 +264,302 @@ class AuditTrail:
                 # Último evento
                 self.stats["last_event_time"] = event.timestamp.isoformat()
             
-            # Actualizar tamaño del archivo
-            self.stats["file_size"] = self.audit_file.stat().st_size
-            
             self.logger.debug(f"Flushed {len(batch)} audit events")
         except Exception as e:
             self.logger.error(f"Error flushing audit batch: {e}")
     
+    def _sign_and_serialize(self, event: AuditEvent) -> bytes:
+        """Encadenar la firma HMAC con la anterior y serializar el evento"""
+        data = self._event_to_dict(event)
+        data.pop("signature")
+        payload = json.dumps(data, sort_keys=True, ensure_ascii=False)
+        
+        event.signature = self._generate_signature(payload, self._chain_head)
+        self._chain_head = event.signature
+        return (payload[:-1] + f', "signature": "{event.signature}"}}\n').encode("utf-8")
+    
+    def _write_chunks(self, chunks: List[bytes]):
+        """Group commit: una escritura con buffer y fsync según la política"""
+        if not chunks:
+            return
+        if self._segment_handle is None:
+            self._segment_handle = open(self._segment_path(self.active_segment), "ab")
+        
+        self._segment_handle.write(b"".join(chunks))
+        self._segment_handle.flush()
+        
+        policy = self.audit_config["fsync_policy"]
+        now = time.monotonic()
+        if policy == "batch" or (policy == "interval" and now - self._last_fsync >= self.audit_config["fsync_interval"]):
+            os.fsync(self._segment_handle.fileno())
+            self._last_fsync = now
+    
+    def _close_segment_handle(self):
+        """Cerrar el fichero del segmento activo"""
+        with self.segment_lock:
+            if self._segment_handle is not None:
+                if self.audit_config["fsync_policy"] != "none":
+                    os.fsync(self._segment_handle.fileno())
+                self._segment_handle.close()
+                self._segment_handle = None
+    
+    # --- Almacenamiento segmentado ---
+    
+    def _segment_path(self, segment: AuditSegment) -> Path:
+        """Ruta del fichero de datos de un segmento"""
+        suffix = ".jsonl.gz" if segment.compressed else ".jsonl"
+        return self.segment_dir / f"{segment.name}{suffix}"
+    
+    def _segment_index_path(self, segment: AuditSegment) -> Path:
+        """Ruta del índice de un segmento"""
+        return self.segment_dir / f"{segment.name}.idx.json"
+    
+    def _should_rotate(self, ts: float) -> bool:
+        """Rotar por tamaño o al cambiar de día (UTC)"""
+        segment = self.active_segment
+        if segment is None:
+            return True
+        if segment.size >= self.audit_config["max_file_size"]:
+            return True
+        if segment.min_ts is not None:
+            start_day = datetime.fromtimestamp(segment.min_ts, timezone.utc).date()
+            return datetime.fromtimestamp(ts, timezone.utc).date() != start_day
+        return False
+    
+    def _rotate_segment(self, ts: float):
+        """Sellar el segmento activo y abrir uno nuevo"""
+        self._close_segment_handle()
+        if self.active_segment is not None:
+            if self.active_segment.count:
+                self._seal_segment(self.active_segment)
+            else:
+                self._remove_segment_files(self.active_segment)
+                self.segments.remove(self.active_segment)
+        
+        name = f"audit_{datetime.fromtimestamp(ts, timezone.utc).strftime('%Y%m%d_%H%M%S_%f')}"
+        self.active_segment = AuditSegment(name=name)
+        self.segments.append(self.active_segment)
+    
+    def _seal_segment(self, segment: AuditSegment):
+        """Comprimir un segmento lleno y registrarlo en el manifiesto"""
+        source = self._segment_path(segment)
+        segment.sealed = True
+        if self.audit_config["compression_enabled"] and not segment.compressed:
+            segment.compressed = True
+            target = self._segment_path(segment)
+            tmp = target.with_name(target.name + ".tmp")
+            with open(source, "rb") as src, gzip.open(tmp, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp, target)
+            source.unlink()
+        
+        self._write_segment_index(segment)
+        self._write_manifest()
+        self.logger.info(f"Sealed audit segment {segment.name} ({segment.count} events)")
+    
+    def _index_event(self, segment: AuditSegment, event: AuditEvent, ts: float):
+        """Actualizar resumen e índice disperso del segmento"""
+        if segment.count % self.audit_config["index_interval"] == 0:
+            segment.index.append([ts, segment.size])
+        segment.count += 1
+        segment.min_ts = ts if segment.min_ts is None else min(segment.min_ts, ts)
+        segment.max_ts = ts if segment.max_ts is None else max(segment.max_ts, ts)
+        
+        event_type = event.event_type.value
+        segment.event_types[event_type] = segment.event_types.get(event_type, 0) + 1
+        severity = event.severity.value
+        segment.severities[severity] = segment.severities.get(severity, 0) + 1
+    
+    def _write_segment_index(self, segment: AuditSegment):
+        """Persistir el índice del segmento de forma atómica"""
+        self._write_json_atomic(self._segment_index_path(segment), dict(vars(segment)))
+    
+    def _write_manifest(self):
+        """Persistir los resúmenes de los segmentos sellados"""
+        summaries = [s.summary() for s in self.segments if s.sealed]
+        self._write_json_atomic(self.manifest_file, {"segments": summaries})
+    
+    def _write_json_atomic(self, path: Path, data: Dict[str, Any]):
+        """Escribir JSON vía fichero temporal + rename"""
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    
+    def _load_index(self, segment: AuditSegment) -> AuditSegment:
+        """Cargar el índice disperso de un segmento sellado bajo demanda"""
+        if segment.index or segment.count == 0 or not segment.sealed:
+            return segment
+        try:
+            with open(self._segment_index_path(segment), "r", encoding="utf-8") as f:
+                segment.index = json.load(f).get("index", [])
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Audit segment index unavailable for {segment.name}: {e}")
+        return segment
+    
+    def _load_segments(self):
+        """Cargar el manifiesto y recuperar el segmento activo"""
+        try:
+            sealed = {}
+            if self.manifest_file.exists():
+                with open(self.manifest_file, "r", encoding="utf-8") as f:
+                    for summary in json.load(f).get("segments", []):
+                        sealed[summary["name"]] = AuditSegment(**summary)
+            
+            # Índices de segmentos sellados que no llegaron al manifiesto
+            for index_path in self.segment_dir.glob("audit_*.idx.json"):
+                name = index_path.name[:-len(".idx.json")]
+                if name in sealed:
+                    continue
+                with open(index_path, "r", encoding="utf-8") as f:
+                    segment = AuditSegment(**json.load(f))
+                if segment.sealed and self._segment_path(segment).exists():
+                    segment.index = []  # Se carga bajo demanda
+                    sealed[name] = segment
+            
+            self.segments = sorted(sealed.values(), key=lambda s: s.name)
+            
+            # Segmento activo; se pone al día si su índice quedó atrasado
+            for path in sorted(self.segment_dir.glob("audit_*.jsonl")):
+                name = path.name[:-len(".jsonl")]
+                if name in sealed:
+                    continue
+                segment = AuditSegment(name=name)
+                index_path = self._segment_index_path(segment)
+                if index_path.exists():
+                    with open(index_path, "r", encoding="utf-8") as f:
+                        segment = AuditSegment(**json.load(f))
+                self._scan_segment(segment, path)
+                if self.active_segment is not None:
+                    # Solo puede haber un activo: sellar los anteriores
+                    self.segments.append(self.active_segment)
+                    self._seal_segment(self.active_segment)
+                self.active_segment = segment
+            if self.active_segment is not None:
+                self.segments.append(self.active_segment)
+            
+            chained = [s for s in self.segments if not s.name.endswith("_legacy")]
+            self._chain_head = chained[-1].last_signature if chained else ""
+            
+            # Fichero único del formato anterior: se importa como segmento sellado
+            if self.audit_file.is_file():
+                self._import_legacy_file()
+            
+            self.stats["file_size"] = self._storage_size()
+        except Exception as e:
+            self.logger.error(f"Error loading audit segments: {e}")
+    
+    def _scan_segment(self, segment: AuditSegment, path: Path):
+        """Indexar eventos escritos tras el último índice persistido (p.ej. tras un crash)"""
+        with open(path, "rb") as f:
+            f.seek(segment.size)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Línea incompleta al final
+                try:
+                    event = self._event_from_dict(json.loads(line))
+                    self._index_event(segment, event, event.timestamp.timestamp())
+                    segment.last_signature = event.signature
+                except Exception as e:
+                    self.logger.warning(f"Error indexing audit event: {e}")
+                segment.size += len(line)
+            
+            # Descartar una línea final incompleta
+            if f.tell() > segment.size:
+                f.close()
+                os.truncate(path, segment.size)
+    
+    def _import_legacy_file(self):
+        """Convertir logs/audit_trail.jsonl en un segmento sellado"""
+        name = f"audit_{datetime.fromtimestamp(self.audit_file.stat().st_mtime, timezone.utc).strftime('%Y%m%d_%H%M%S_%f')}_legacy"
+        segment = AuditSegment(name=name)
+        path = self._segment_path(segment)
+        os.replace(self.audit_file, path)
+        self._scan_segment(segment, path)
+        
+        self.segments.insert(0, segment)
+        self._seal_segment(segment)
+        self.logger.info(f"Imported legacy audit file into segment {name}")
+    
+    def _remove_segment_files(self, segment: AuditSegment):
+        """Eliminar datos e índice de un segmento"""
+        for path in (self._segment_path(segment), self._segment_index_path(segment)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def _storage_size(self) -> int:
+        """Tamaño en disco de todos los segmentos"""
+        total = 0
+        for segment in self.segments:
+            try:
+                total += self._segment_path(segment).stat().st_size
+            except OSError:
+                pass
+        return total
+    
+    def _event_to_dict(self, event: AuditEvent) -> Dict[str, Any]:
+        """Serializar evento con timestamp ISO y valores de enums"""
+        # Copia superficial: asdict() haría deepcopy de details/estados en cada evento
+        data = {f.name: getattr(event, f.name) for f in fields(event)}
+        data["timestamp"] = event.timestamp.isoformat()
+        data["event_type"] = event.event_type.value
+        data["severity"] = event.severity.value
+        return data
+    
+    def _event_from_dict(self, data: Dict[str, Any]) -> AuditEvent:
+        """Reconstruir evento (acepta también el formato anterior serializado con str())"""
+        data = dict(data)
+        timestamp = data["timestamp"]
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        data["timestamp"] = timestamp
+        data["event_type"] = AuditEventType(str(data["event_type"]).split(".")[-1].lower()) \
+            if not isinstance(data["event_type"], AuditEventType) else data["event_type"]
+        data["severity"] = AuditSeverity(str(data["severity"]).split(".")[-1].lower()) \
+            if not isinstance(data["severity"], AuditSeverity) else data["severity"]
+        return AuditEvent(**data)
+    
+    @staticmethod
+    def _to_timestamp(value: Optional[datetime]) -> Optional[float]:
+        """Convertir datetime a epoch (naive se interpreta como UTC)"""
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    
+    def _read_segment(self, segment: AuditSegment, start_ts: Optional[float], end_ts: Optional[float]):
+        """Leer eventos de un segmento usando el índice disperso para saltar al inicio del rango"""
+        offset = 0
+        if start_ts is not None:
+            index = self._load_index(segment).index
+            position = bisect_right([entry[0] for entry in index], start_ts) - 1
+            if position > 0:
+                offset = int(index[position][1])
+        
+        path = self._segment_path(segment)
+        opener = gzip.open if segment.compressed else open
+        with opener(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    event = self._event_from_dict(json.loads(line))
+                except Exception as e:
+                    self.logger.warning(f"Error parsing audit event: {e}")
+                    continue
+                ts = event.timestamp.timestamp()
+                if start_ts is not None and ts < start_ts:
+                    continue
+                if end_ts is not None and ts > end_ts:
+                    break  # Eventos escritos en orden de llegada
+                yield event
+    
     def log_event(self, 
                   event_type: AuditEventType,
                   action: str,
@@ -201,7 +590,7 @@ class AuditTrail:
             details=details,
             ip_address=ip_address,
             user_agent=user_agent,
-            signature=self._generate_signature(event_id, action, resource),
+            signature="",  # Se firma en el worker, encadenada con el evento anterior
             previous_state=previous_state,
             new_state=new_state
         )
@@ -215,24 +604,43 @@ class AuditTrail:
     def _generate_event_id(self) -> str:
         """Generar ID único del evento"""
         timestamp = int(time.time() * 1000000)  # microsegundos
-        random_part = hashlib.md5(f"{timestamp}{id(self)}".encode()).hexdigest()[:8]
-        return f"audit_{timestamp}_{random_part}"
+        return f"audit_{timestamp}_{next(self._event_seq) & 0xffffffff:08x}"
     
-    def _generate_signature(self, event_id: str, action: str, resource: str) -> str:
-        """Generar firma del evento"""
-        message = f"{event_id}:{action}:{resource}"
+    def _generate_signature(self, payload: str, previous_signature: str = "") -> str:
+        """Generar firma del evento encadenada con la firma anterior"""
         signature = hmac.new(
             self.audit_config["signature_key"].encode(),
-            message.encode(),
+            f"{previous_signature}:{payload}".encode(),
             hashlib.sha256
         ).hexdigest()
         return signature
     
-    def verify_signature(self, event: AuditEvent) -> bool:
-        """Verificar firma del evento"""
-        expected_signature = self._generate_signature(event.event_id, event.action, event.resource)
+    def verify_signature(self, event: AuditEvent, previous_signature: str = "") -> bool:
+        """Verificar firma del evento dada la firma del evento anterior en la cadena"""
+        data = self._event_to_dict(event)
+        data.pop("signature")
+        payload = json.dumps(data, sort_keys=True, ensure_ascii=False)
+        expected_signature = self._generate_signature(payload, previous_signature)
         return hmac.compare_digest(event.signature, expected_signature)
     
+    def verify_chain(self) -> bool:
+        """Verificar la cadena HMAC completa; un evento alterado, borrado o reordenado la rompe"""
+        previous_signature = ""
+        try:
+            with self.segment_lock:
+                for segment in self.segments:
+                    if segment.name.endswith("_legacy"):
+                        continue  # Formato anterior, sin cadena
+                    for event in self._read_segment(segment, None, None):
+                        if not self.verify_signature(event, previous_signature):
+                            self.logger.error(f"Audit chain broken at event {event.event_id}")
+                            return False
+                        previous_signature = event.signature
+            return True
+        except Exception as e:
+            self.logger.error(f"Error verifying audit chain: {e}")
+            return False
+    
     def query_events(self, 
                      start_time: Optional[datetime] = None,
                      end_time: Optional[datetime] = None,
@@ -241,21 +649,25 @@ class AuditTrail:
                      user_id: Optional[str] = None,
                      resource: Optional[str] = None,
                      limit: int = 1000) -> List[AuditEvent]:
-        """Consultar eventos de auditoría"""
+        """Consultar eventos de auditoría (más recientes primero)"""
         events = []
+        start_ts = self._to_timestamp(start_time)
+        end_ts = self._to_timestamp(end_time)
         
         try:
-            with open(self.audit_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        event_data = json.loads(line.strip())
-                        event = AuditEvent(**event_data)
-                        
+            with self.segment_lock:
+                candidates = [
+                    s for s in self.segments
+                    if s.overlaps(start_ts, end_ts)
+                    and (event_type is None or s.event_types.get(event_type.value))
+                    and (severity is None or s.severities.get(severity.value))
+                ]
+                
+                # Del segmento más reciente al más antiguo, hasta completar el límite
+                for segment in reversed(candidates):
+                    matches = []
+                    for event in self._read_segment(segment, start_ts, end_ts):
                         # Aplicar filtros
-                        if start_time and event.timestamp < start_time:
-                            continue
-                        if end_time and event.timestamp > end_time:
-                            continue
                         if event_type and event.event_type != event_type:
                             continue
                         if severity and event.severity != severity:
@@ -264,25 +676,21 @@ class AuditTrail:
                             continue
                         if resource and resource not in event.resource:
                             continue
-                        
-                        events.append(event)
-                        
-                        if len(events) >= limit:
-                            break
-                    except Exception as e:
-                        self.logger.warning(f"Error parsing audit event: {e}")
-                        continue
-        except FileNotFoundError:
-            self.logger.warning("Audit file not found")
+                        matches.append(event)
+                    
+                    events.extend(matches)
+                    if len(events) >= limit:
+                        break
         except Exception as e:
             self.logger.error(f"Error querying audit events: {e}")
         
         # Ordenar por timestamp descendente
         events.sort(key=lambda x: x.timestamp, reverse=True)
-        return events
+        return events[:limit]
     
     def get_audit_statistics(self) -> Dict[str, Any]:
         """Obtener estadísticas de auditoría"""
+        self.stats["file_size"] = self._storage_size()
         return {
             "total_events": self.stats["total_events"],
             "events_by_type": self.stats["events_by_type"],
@@ -291,36 +699,31 @@ class AuditTrail:
             "last_event_time": self.stats["last_event_time"],
             "file_size": self.stats["file_size"],
             "file_size_mb": round(self.stats["file_size"] / (1024 * 1024), 2),
+            "segments": len(self.segments),
             "retention_days": self.audit_config["retention_days"],
             "compression_enabled": self.audit_config["compression_enabled"],
             "encryption_enabled": self.audit_config["encryption_enabled"]
         }
     
     def cleanup_old_events(self):
-        """Limpiar eventos antiguos"""
+        """Limpiar eventos antiguos eliminando segmentos sellados completos"""
         try:
             cutoff_date = datetime.now(timezone.utc) - timedelta(days=self.audit_config["retention_days"])
+            cutoff_ts = cutoff_date.timestamp()
             
-            # Leer todos los eventos
-            events = []
-            with open(self.audit_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        event_data = json.loads(line.strip())
-                        event = AuditEvent(**event_data)
-                        if event.timestamp >= cutoff_date:
-                            events.append(event)
-                    except Exception as e:
-                        self.logger.warning(f"Error parsing audit event during cleanup: {e}")
-                        continue
-            
-            # Escribir eventos filtrados
-            with open(self.audit_file, "w", encoding="utf-8") as f:
-                for event in events:
-                    event_json = json.dumps(asdict(event), default=str, ensure_ascii=False)
-                    f.write(event_json + "\n")
+            with self.segment_lock:
+                expired = [
+                    s for s in self.segments
+                    if s.sealed and s.max_ts is not None and s.max_ts < cutoff_ts
+                ]
+                for segment in expired:
+                    self._remove_segment_files(segment)
+                    self.segments.remove(segment)
+                if expired:
+                    self._write_manifest()
             
-            self.logger.info(f"Cleaned up audit events older than {cutoff_date}")
+            self.stats["file_size"] = self._storage_size()
+            self.logger.info(f"Cleaned up {len(expired)} audit segments older than {cutoff_date}")
         except Exception as e:
             self.logger.error(f"Error cleaning up audit events: {e}")
     
@@ -13,11 +13,17 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from dataclasses import dataclass, asdict
+from concurrent.futures import ProcessPoolExecutor
 import threading
 import hashlib
 import tarfile
 from enum import Enum
 
+from backup_store import (
+    CHUNK_SIZE, chunk_path, store_files, restore_file, restore_destination, verify_chunks, file_checksum,
+    manifest_chunks, load_manifest, write_json_atomic, iter_chunk_files
+)
+
 logger = logging.getLogger(__name__)
 
 class BackupType(Enum):
@@ -60,18 +66,35 @@ class BackupManager:
                  backup_dir: str = "backups",
                  max_backups: int = 30,
                  compression: bool = True,
-                 encryption_key: Optional[str] = None):
+                 encryption_key: Optional[str] = None,
+                 max_workers: Optional[int] = None):
         
         self.backup_dir = Path(backup_dir)
         self.max_backups = max_backups
         self.compression = compression
         self.encryption_key = encryption_key
-        self.lock = threading.Lock()
+        self.lock = threading.RLock()
         self.logger = logging.getLogger("BackupManager")
         
         # Crear directorio de backups
         self.backup_dir.mkdir(exist_ok=True)
         
+        # Almacén direccionado por contenido: chunks deduplicados + un manifiesto por backup
+        self.store_dir = self.backup_dir / "store"
+        self.chunks_dir = self.store_dir / "chunks"
+        self.manifests_dir = self.store_dir / "manifests"
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        self.chunks_dir.mkdir(exist_ok=True)
+        
+        # Caché path -> (tamaño, mtime, chunks) para saltar archivos sin cambios sin leerlos
+        self.file_cache_file = self.store_dir / "file_cache.json"
+        self.file_cache: Dict[str, Dict[str, Any]] = self._load_file_cache()
+        
+        # Hash y compresión en procesos aparte para no bloquear el event loop
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._active_writes = 0
+        
         # Archivo de índice de backups
         self.index_file = self.backup_dir / "backup_index.json"
         self.backups: Dict[str, BackupInfo] = {}
@@ -82,6 +105,7 @@ class BackupManager:
         # Configuración de archivos a respaldar
         self.backup_paths = {
             "state": "logs/bot_state.json",
+            "state_journal": "logs/bot_state.json.journal",
             "configs": "configs/",
             "logs": "logs/",
             "scripts": "scripts/",
@@ -129,19 +153,44 @@ class BackupManager:
         except Exception as e:
             self.logger.error(f"Error saving backup index: {e}")
     
+    def _load_file_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Cargar caché de archivos ya guardados en el almacén"""
+        try:
+            if self.file_cache_file.exists():
+                with open(self.file_cache_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Error loading backup file cache: {e}")
+        return {}
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Pool de procesos para trocear, hashear y comprimir"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+    
+    def close(self):
+        """Cerrar el pool de procesos"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
     def _generate_backup_id(self, backup_type: BackupType) -> str:
         """Generar ID único para backup"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"{backup_type.value}_{timestamp}"
+        backup_id = f"{backup_type.value}_{timestamp}"
+        
+        # Los backups incrementales tardan milisegundos: evitar colisiones dentro del mismo segundo
+        suffix = 1
+        while backup_id in self.backups or (self.manifests_dir / f"{backup_id}.json").exists():
+            backup_id = f"{backup_type.value}_{timestamp}_{suffix}"
+            suffix += 1
+        return backup_id
     
-    def _calculate_checksum(self, file_path: Path) -> str:
+    def _calculate_checksum(self, file_path: Path, algorithm: str = "md5") -> str:
         """Calcular checksum de archivo"""
         try:
-            hash_md5 = hashlib.md5()
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+            return file_checksum(str(file_path), algorithm)
         except Exception as e:
             self.logger.error(f"Error calculating checksum: {e}")
             return ""
@@ -178,18 +227,19 @@ class BackupManager:
             # Determinar archivos a respaldar
             files_to_backup = self._get_files_to_backup(backup_type, include_logs)
             
-            # Crear archivo de backup
-            backup_file = self.backup_dir / f"{backup_id}.tar"
-            if self.compression:
-                backup_file = self.backup_dir / f"{backup_id}.tar.gz"
-            
-            # Crear backup
-            await self._create_backup_file(backup_file, files_to_backup, backup_info)
+            # Crear manifiesto (los chunks nuevos se guardan en el almacén)
+            manifest_file = self.manifests_dir / f"{backup_id}.json"
+            self._active_writes += 1
+            try:
+                payload = await self._create_backup_manifest(manifest_file, files_to_backup, backup_info)
+            finally:
+                self._active_writes -= 1
             
-            # Actualizar información
-            backup_info.file_path = str(backup_file)
-            backup_info.size_bytes = self._get_file_size(backup_file)
-            backup_info.checksum = self._calculate_checksum(backup_file)
+            # Actualizar información (tamaño = bytes nuevos en disco tras deduplicar)
+            backup_info.file_path = str(manifest_file)
+            backup_info.size_bytes = backup_info.metadata["new_bytes"] + len(payload)
+            backup_info.checksum = hashlib.sha256(payload).hexdigest()
+            backup_info.metadata["checksum_algorithm"] = "sha256"
             backup_info.status = BackupStatus.COMPLETED
             
             # Guardar en índice
@@ -259,47 +309,126 @@ class BackupManager:
         
         return files
     
-    async def _create_backup_file(self, backup_file: Path, files: List[Path], backup_info: BackupInfo):
-        """Crear archivo de backup"""
+    def _expand_files(self, paths: List[Path]) -> List[Path]:
+        """Expandir directorios a la lista de archivos que contienen (sin duplicados)"""
+        files = {}
+        for path in paths:
+            if path.is_dir():
+                files.update((p, None) for p in path.rglob("*") if p.is_file() and not p.is_symlink())
+            elif path.is_file():
+                files[path] = None
+        return list(files)
+    
+    def _chunks_exist(self, chunks: List[str], compression: bool) -> bool:
+        """Verificar que los chunks de un archivo siguen en el almacén"""
+        chunks_dir = str(self.chunks_dir)
+        return all(os.path.exists(chunk_path(chunks_dir, digest, compression)) for digest in chunks)
+    
+    def _batch_files(self, files: List[tuple]) -> List[List[tuple]]:
+        """Agrupar archivos en lotes de tamaño parecido para el pool de procesos"""
+        total = sum(stat.st_size for _, _, stat in files)
+        target = max(total // (self.max_workers * 4), 8 * CHUNK_SIZE)
+        batches, batch, batch_size = [], [], 0
+        for item in sorted(files, key=lambda item: item[2].st_size, reverse=True):
+            batch.append(item)
+            batch_size += item[2].st_size
+            if batch_size >= target or len(batch) >= 256:
+                batches.append(batch)
+                batch, batch_size = [], 0
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    async def _create_backup_manifest(self, manifest_file: Path, files: List[Path],
+                                      backup_info: BackupInfo) -> bytes:
+        """Guardar en el almacén los archivos nuevos o modificados y escribir el manifiesto"""
         try:
-            # Crear archivo tar
-            mode = "w:gz" if self.compression else "w"
+            loop = asyncio.get_running_loop()
+            project_root = Path.cwd()
+            entries: Dict[str, Dict[str, Any]] = {}
+            to_store = []
+            reused = 0
             
-            with tarfile.open(backup_file, mode) as tar:
-                # Agregar archivos
-                for file_path in files:
-                    if file_path.exists():
-                        arcname = file_path.relative_to(Path.cwd())
-                        tar.add(file_path, arcname=arcname)
-                        self.logger.debug(f"Added to backup: {arcname}")
-                
-                # Agregar metadatos
-                metadata = {
-                    "backup_id": backup_info.id,
-                    "backup_type": backup_info.type.value,
-                    "created_at": backup_info.created_at.isoformat(),
-                    "description": backup_info.description,
-                    "files_count": len(files),
-                    "compression": self.compression
-                }
-                
-                # Crear archivo temporal con metadatos
-                import tempfile
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as tmp:
-                    json.dump(metadata, tmp, indent=2)
-                    tmp_path = tmp.name
-                
-                tar.add(tmp_path, arcname="backup_metadata.json")
-                os.unlink(tmp_path)  # Eliminar archivo temporal
+            # Archivos con el mismo tamaño y mtime que en el último backup se reutilizan sin leerlos
+            for file_path in self._expand_files(files):
+                try:
+                    stat = file_path.stat()
+                except OSError:
+                    continue
+                arcname = str(file_path.relative_to(project_root))
+                cached = self.file_cache.get(arcname)
+                if (cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns
+                        and cached["compression"] == self.compression
+                        and self._chunks_exist(cached["chunks"], self.compression)):
+                    entries[arcname] = dict(cached, path=arcname, mode=stat.st_mode & 0o777)
+                    reused += 1
+                else:
+                    to_store.append((arcname, file_path, stat))
+            
+            # Trocear, hashear y comprimir el resto en el pool de procesos
+            new_bytes = 0
+            if to_store:
+                executor = self._get_executor()
+                batches = self._batch_files(to_store)
+                results = await asyncio.gather(*(
+                    loop.run_in_executor(
+                        executor, store_files, [str(file_path) for _, file_path, _ in batch],
+                        str(self.chunks_dir), CHUNK_SIZE, self.compression
+                    )
+                    for batch in batches
+                ))
+                for batch, batch_results in zip(batches, results):
+                    for (arcname, _, stat), result in zip(batch, batch_results):
+                        if "error" in result:
+                            self.logger.warning(f"Skipping {arcname}: {result['error']}")
+                            continue
+                        new_bytes += result["new_bytes"]
+                        entries[arcname] = {
+                            "path": arcname,
+                            "size": result["size"],
+                            "mtime_ns": stat.st_mtime_ns,
+                            "mode": stat.st_mode & 0o777,
+                            "sha256": result["sha256"],
+                            "chunks": result["chunks"],
+                            "compression": self.compression
+                        }
             
-            self.logger.info(f"Backup file created: {backup_file}")
+            manifest = {
+                "backup_id": backup_info.id,
+                "backup_type": backup_info.type.value,
+                "created_at": backup_info.created_at.isoformat(),
+                "description": backup_info.description,
+                "compression": self.compression,
+                "chunk_size": CHUNK_SIZE,
+                "files": sorted(entries.values(), key=lambda entry: entry["path"])
+            }
+            payload = await loop.run_in_executor(None, write_json_atomic, manifest_file, manifest)
+            
+            # Actualizar caché para el siguiente backup
+            for arcname, entry in entries.items():
+                self.file_cache[arcname] = {key: value for key, value in entry.items() if key not in ("path", "mode")}
+            await loop.run_in_executor(None, write_json_atomic, self.file_cache_file, dict(self.file_cache))
+            
+            backup_info.metadata.update({
+                "files_count": len(entries),
+                "reused_files": reused,
+                "stored_files": len(entries) - reused,  # Nuevos o modificados
+                "logical_bytes": sum(entry["size"] for entry in entries.values()),
+                "new_bytes": new_bytes
+            })
+            self.logger.info(
+                f"Backup manifest created: {manifest_file} ({len(entries)} files, {reused} unchanged, "
+                f"{new_bytes} new bytes)"
+            )
+            return payload
             
         except Exception as e:
-            self.logger.error(f"Error creating backup file: {e}")
+            self.logger.error(f"Error creating backup manifest: {e}")
             raise
     
-    async def restore_backup(self, backup_id: str, target_dir: Optional[Path] = None) -> bool:
-        """Restaurar backup"""
+    async def restore_backup(self, backup_id: str, target_dir: Optional[Path] = None,
+                             paths: Optional[List[str]] = None, safety_backup: bool = True) -> bool:
+        """Restaurar backup (solo ``paths`` si se indica: archivos o directorios relativos al proyecto)"""
         try:
             if backup_id not in self.backups:
                 raise ValueError(f"Backup {backup_id} not found")
@@ -313,8 +442,12 @@ class BackupManager:
             if not backup_file.exists():
                 raise ValueError(f"Backup file not found: {backup_file}")
             
-            # Verificar checksum
-            current_checksum = self._calculate_checksum(backup_file)
+            loop = asyncio.get_running_loop()
+            
+            # Verificar checksum del archivo completo (manifiesto: además cada chunk se verifica al reconstruir
+            # su archivo; los tar anteriores al almacén no guardan checksums por miembro)
+            algorithm = backup_info.metadata.get("checksum_algorithm", "md5")
+            current_checksum = await loop.run_in_executor(None, self._calculate_checksum, backup_file, algorithm)
             if current_checksum != backup_info.checksum:
                 self.logger.warning(f"Checksum mismatch for backup {backup_id}")
                 backup_info.status = BackupStatus.CORRUPTED
@@ -327,51 +460,199 @@ class BackupManager:
             if target_dir is None:
                 target_dir = Path.cwd()
             
-            # Crear backup de seguridad antes de restaurar
-            safety_backup_id = await self.create_backup(
-                BackupType.FULL, 
-                f"Safety backup before restoring {backup_id}"
-            )
-            self.logger.info(f"Created safety backup: {safety_backup_id}")
+            # Crear backup de seguridad antes de restaurar (incremental: solo guarda lo que cambió)
+            if safety_backup:
+                safety_backup_id = await self.create_backup(
+                    BackupType.FULL, 
+                    f"Safety backup before restoring {backup_id}"
+                )
+                self.logger.info(f"Created safety backup: {safety_backup_id}")
             
-            # Extraer backup
-            await self._extract_backup(backup_file, target_dir)
+            # Extraer backup (manifiesto del almacén o tar de versiones anteriores)
+            start_time = time.perf_counter()
+            if backup_file.suffix == '.json':
+                restored = await self._restore_manifest(backup_file, Path(target_dir), paths)
+            else:
+                restored = await loop.run_in_executor(
+                    None, self._extract_backup, backup_file, Path(target_dir), paths
+                )
             
-            self.logger.info(f"Backup restored successfully: {backup_id}")
+            self.logger.info(
+                f"Backup restored successfully: {backup_id} ({restored} files in "
+                f"{time.perf_counter() - start_time:.2f}s)"
+            )
             return True
             
         except Exception as e:
             self.logger.error(f"Error restoring backup {backup_id}: {e}")
             return False
     
-    async def _extract_backup(self, backup_file: Path, target_dir: Path):
-        """Extraer archivos del backup"""
+    @staticmethod
+    def _path_selected(path: str, paths: Optional[List[str]]) -> bool:
+        """Comprobar si ``path`` es uno de ``paths`` o está dentro de uno de sus directorios"""
+        if not paths:
+            return True
+        for selected in paths:
+            selected = selected.rstrip("/")
+            if path == selected or path.startswith(selected + "/"):
+                return True
+        return False
+    
+    def _extract_backup(self, backup_file: Path, target_dir: Path, paths: Optional[List[str]] = None) -> int:
+        """Extraer archivos de un backup tar en streaming (formato anterior al almacén)"""
         try:
-            # Determinar modo de apertura
-            if backup_file.suffix == '.gz':
-                mode = "r:gz"
+            # Determinar modo de apertura (lectura secuencial, miembro a miembro)
+            if backup_file.name.endswith('.gz'):
+                mode = "r|gz"
             else:
-                mode = "r"
+                mode = "r|"
             
+            extracted = 0
             with tarfile.open(backup_file, mode) as tar:
-                # Extraer todos los archivos
-                tar.extractall(target_dir)
-                
-                # Leer metadatos
-                try:
-                    metadata_file = tar.extractfile("backup_metadata.json")
-                    if metadata_file:
-                        metadata = json.load(metadata_file)
-                        self.logger.info(f"Restored backup from {metadata.get('created_at', 'unknown')}")
-                except:
-                    pass  # Metadatos no críticos
+                for member in tar:
+                    if member.name == "backup_metadata.json":
+                        # Leer metadatos
+                        try:
+                            metadata = json.load(tar.extractfile(member))
+                            self.logger.info(f"Restored backup from {metadata.get('created_at', 'unknown')}")
+                        except Exception:
+                            pass  # Metadatos no críticos
+                        continue
+                    
+                    if self._path_selected(member.name, paths):
+                        # Filtro 'data': rechaza rutas absolutas, '..', enlaces fuera de target_dir y archivos especiales
+                        tar.extract(member, target_dir, filter='data')
+                        extracted += 1
             
             self.logger.info(f"Backup extracted to: {target_dir}")
+            return extracted
             
         except Exception as e:
             self.logger.error(f"Error extracting backup: {e}")
             raise
     
+    async def _restore_manifest(self, manifest_file: Path, target_dir: Path,
+                                paths: Optional[List[str]] = None) -> int:
+        """Reconstruir en paralelo los archivos de un manifiesto a partir de sus chunks"""
+        loop = asyncio.get_running_loop()
+        manifest = await loop.run_in_executor(None, load_manifest, manifest_file)
+        entries = [entry for entry in manifest["files"] if self._path_selected(entry["path"], paths)]
+        
+        # Un manifiesto con alguna ruta fuera de target_dir no restaura nada
+        for entry in entries:
+            restore_destination(str(target_dir), entry["path"])
+        
+        # Cada archivo es independiente: se reconstruyen a la vez (E/S, zlib y hashlib liberan el GIL)
+        await asyncio.gather(*(
+            loop.run_in_executor(
+                None, restore_file, entry, str(self.chunks_dir), str(target_dir), manifest["compression"]
+            )
+            for entry in entries
+        ))
+        
+        self.logger.info(f"Restored {len(entries)} files from {manifest_file.name} to {target_dir}")
+        return len(entries)
+    
+    async def verify_backups(self, backup_ids: Optional[List[str]] = None) -> Dict[str, bool]:
+        """Verificar la integridad de los backups sin restaurarlos (hash en el pool de procesos)"""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        selected = [
+            backup for backup in self.backups.values()
+            if (backup_ids is None or backup.id in backup_ids) and backup.status == BackupStatus.COMPLETED
+        ]
+        
+        results: Dict[str, bool] = {}
+        chunk_owners: Dict[tuple, List[str]] = {}
+        legacy = []
+        
+        for backup in selected:
+            backup_file = Path(backup.file_path)
+            if not backup_file.exists():
+                results[backup.id] = False
+                continue
+            
+            algorithm = backup.metadata.get("checksum_algorithm", "md5")
+            if backup_file.suffix != '.json':
+                legacy.append((backup, loop.run_in_executor(executor, file_checksum, str(backup_file), algorithm)))
+                continue
+            
+            # Manifiesto: su checksum y después cada chunk una sola vez aunque lo compartan varios backups
+            checksum = await loop.run_in_executor(None, file_checksum, str(backup_file), algorithm)
+            if checksum != backup.checksum:
+                results[backup.id] = False
+                continue
+            manifest = await loop.run_in_executor(None, load_manifest, backup_file)
+            for entry in manifest["files"]:
+                compression = entry.get("compression", manifest["compression"])
+                for digest in entry["chunks"]:
+                    chunk_owners.setdefault((digest, compression), []).append(backup.id)
+            results[backup.id] = True
+        
+        chunks = list(chunk_owners)
+        batch_count = max(1, min(len(chunks), self.max_workers * 4))
+        bad_batches = await asyncio.gather(*(
+            loop.run_in_executor(executor, verify_chunks, chunks[i::batch_count], str(self.chunks_dir))
+            for i in range(batch_count) if chunks[i::batch_count]
+        ))
+        bad_chunks = {digest for batch in bad_batches for digest in batch}
+        for (digest, _), owners in chunk_owners.items():
+            if digest in bad_chunks:
+                for backup_id in owners:
+                    results[backup_id] = False
+        
+        for backup, future in legacy:
+            try:
+                results[backup.id] = await future == backup.checksum
+            except OSError:
+                results[backup.id] = False
+        
+        # Marcar backups corruptos para que no se usen en una recuperación
+        verified_at = datetime.now(timezone.utc).isoformat()
+        with self.lock:
+            for backup in selected:
+                backup.metadata["verified_at"] = verified_at
+                if not results.get(backup.id, False):
+                    backup.status = BackupStatus.CORRUPTED
+                    self.logger.warning(f"Backup failed verification: {backup.id}")
+            self._save_backup_index()
+        
+        self.logger.info(
+            f"Verified {len(results)} backups ({len(chunks)} chunks): "
+            f"{sum(results.values())} ok, {len(results) - sum(results.values())} corrupted"
+        )
+        return results
+    
+    def _remove_backup_file(self, backup_info: BackupInfo):
+        """Eliminar el manifiesto o tar de un backup"""
+        backup_file = Path(backup_info.file_path)
+        if backup_file.exists():
+            backup_file.unlink()
+            self.logger.debug(f"Removed backup file: {backup_file}")
+    
+    def _collect_garbage(self):
+        """Eliminar chunks que ya no referencia ningún manifiesto"""
+        if self._active_writes:
+            return  # Un backup en curso puede estar escribiendo chunks aún sin manifiesto
+        
+        try:
+            referenced = set()
+            for backup in self.backups.values():
+                manifest_file = Path(backup.file_path)
+                if manifest_file.suffix == '.json' and manifest_file.exists():
+                    referenced |= manifest_chunks(load_manifest(manifest_file))
+            
+            removed = 0
+            for chunk_file in iter_chunk_files(self.chunks_dir):
+                if chunk_file.name.split('.')[0] not in referenced:
+                    chunk_file.unlink()
+                    removed += 1
+            
+            if removed:
+                self.logger.info(f"Removed {removed} unreferenced backup chunks")
+        except Exception as e:
+            self.logger.error(f"Error collecting backup chunks: {e}")
+    
     def _cleanup_old_backups(self):
         """Limpiar backups antiguos"""
         try:
@@ -389,15 +670,13 @@ class BackupManager:
                     
                     for backup_id, backup_info in backups_to_remove:
                         # Eliminar archivo
-                        backup_file = Path(backup_info.file_path)
-                        if backup_file.exists():
-                            backup_file.unlink()
-                            self.logger.debug(f"Removed old backup file: {backup_file}")
+                        self._remove_backup_file(backup_info)
                         
                         # Eliminar del índice
                         del self.backups[backup_id]
                     
                     self._save_backup_index()
+                    self._collect_garbage()
                     self.logger.info(f"Cleaned up {len(backups_to_remove)} old backups")
         
         except Exception as e:
@@ -420,14 +699,13 @@ class BackupManager:
             backup_info = self.backups[backup_id]
             
             # Eliminar archivo
-            backup_file = Path(backup_info.file_path)
-            if backup_file.exists():
-                backup_file.unlink()
+            self._remove_backup_file(backup_info)
             
-            # Eliminar del índice
+            # Eliminar del índice y los chunks que solo usaba este backup
             with self.lock:
                 del self.backups[backup_id]
                 self._save_backup_index()
+                self._collect_garbage()
             
             self.logger.info(f"Backup deleted: {backup_id}")
             return True
@@ -0,0 +1,147 @@
+"""
+Backup Store - Almacén de backups direccionado por contenido
+Los archivos se parten en chunks identificados por su SHA-256; cada chunk se guarda una sola vez
+y cada backup es un manifiesto que lista los chunks de sus archivos
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, Any, List, Iterable, Set, Tuple
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB: los logs que solo crecen por el final reutilizan sus chunks previos
+COMPRESS_LEVEL = 6
+
+def chunk_path(chunks_dir: str, digest: str, compression: bool) -> str:
+    """Ruta de un chunk: chunks/<2 primeros hex>/<hash>[.gz]"""
+    return os.path.join(chunks_dir, digest[:2], digest + (".gz" if compression else ""))
+
+def write_chunk(chunks_dir: str, digest: str, data: bytes, compression: bool) -> int:
+    """Guardar chunk si no existe; devuelve los bytes escritos en disco"""
+    path = chunk_path(chunks_dir, digest, compression)
+    if os.path.exists(path):
+        return 0
+
+    payload = gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0) if compression else data
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)  # Atómico: nunca queda un chunk a medio escribir
+    return len(payload)
+
+def read_chunk(chunks_dir: str, digest: str, compression: bool) -> bytes:
+    """Leer chunk descomprimido"""
+    with open(chunk_path(chunks_dir, digest, compression), "rb") as f:
+        payload = f.read()
+    return gzip.decompress(payload) if compression else payload
+
+def store_files(paths: List[str], chunks_dir: str, chunk_size: int = CHUNK_SIZE,
+                compression: bool = True) -> List[Dict[str, Any]]:
+    """Trocear, hashear y guardar archivos (se ejecuta en un proceso del pool)"""
+    results = []
+    for path in paths:
+        try:
+            file_hash = hashlib.sha256()
+            chunks, size, new_bytes = [], 0, 0
+            with open(path, "rb") as f:
+                while True:
+                    data = f.read(chunk_size)
+                    if not data:
+                        break
+                    digest = hashlib.sha256(data).hexdigest()
+                    file_hash.update(data)
+                    new_bytes += write_chunk(chunks_dir, digest, data, compression)
+                    chunks.append(digest)
+                    size += len(data)
+            results.append({
+                "path": path,
+                "size": size,
+                "sha256": file_hash.hexdigest(),
+                "chunks": chunks,
+                "new_bytes": new_bytes
+            })
+        except OSError as e:
+            results.append({"path": path, "error": str(e)})
+    return results
+
+def restore_destination(target_dir: str, relative_path: str) -> str:
+    """Ruta de destino de una entrada del manifiesto; rechaza rutas absolutas o que salgan de target_dir"""
+    root = os.path.realpath(target_dir)
+    destination = os.path.realpath(os.path.join(root, relative_path))
+    if os.path.isabs(relative_path) or os.path.commonpath([root, destination]) != root or destination == root:
+        raise ValueError(f"Refusing to restore outside {target_dir}: {relative_path}")
+    return destination
+
+def restore_file(entry: Dict[str, Any], chunks_dir: str, target_dir: str, compression: bool) -> int:
+    """Reconstruir un archivo chunk a chunk verificando su hash antes de reemplazar el destino"""
+    destination = restore_destination(target_dir, entry["path"])
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    tmp_path = f"{destination}.restore.tmp"
+    compression = entry.get("compression", compression)
+
+    file_hash = hashlib.sha256()
+    try:
+        with open(tmp_path, "wb") as f:
+            for digest in entry["chunks"]:
+                data = read_chunk(chunks_dir, digest, compression)
+                file_hash.update(data)
+                f.write(data)
+        if file_hash.hexdigest() != entry["sha256"]:
+            raise ValueError(f"Checksum mismatch restoring {entry['path']}")
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    os.replace(tmp_path, destination)
+    os.chmod(destination, entry.get("mode", 0o644))
+    os.utime(destination, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+    return entry["size"]
+
+def verify_chunks(chunks: List[Tuple[str, bool]], chunks_dir: str) -> List[str]:
+    """Comprobar que cada chunk existe y su contenido coincide con su hash (se ejecuta en el pool)"""
+    bad = []
+    for digest, compression in chunks:
+        try:
+            if hashlib.sha256(read_chunk(chunks_dir, digest, compression)).hexdigest() != digest:
+                bad.append(digest)
+        except (OSError, EOFError, zlib.error):
+            bad.append(digest)
+    return bad
+
+def file_checksum(path: str, algorithm: str = "md5") -> str:
+    """Checksum de un archivo leído en bloques (se puede ejecutar en el pool)"""
+    file_hash = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+def manifest_chunks(manifest: Dict[str, Any]) -> Set[str]:
+    """Chunks referenciados por un manifiesto"""
+    return {digest for entry in manifest.get("files", []) for digest in entry["chunks"]}
+
+def load_manifest(path: Path) -> Dict[str, Any]:
+    """Leer manifiesto de backup"""
+    with open(path, "r") as f:
+        return json.load(f)
+
+def write_json_atomic(path: Path, data: Any) -> bytes:
+    """Escribir JSON de forma atómica; devuelve los bytes escritos"""
+    payload = json.dumps(data, indent=2).encode("utf-8")
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return payload
+
+def iter_chunk_files(chunks_dir: Path) -> Iterable[Path]:
+    """Todos los chunks guardados"""
+    if chunks_dir.exists():
+        for subdir in chunks_dir.iterdir():
+            if subdir.is_dir():
+                yield from subdir.iterdir()
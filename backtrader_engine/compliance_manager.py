@@ -7,9 +7,12 @@ import logging
 import time
 import json
 import hashlib
-from typing import Dict, Any, List, Optional
+import os
+import subprocess
+from importlib import metadata
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from datetime import datetime, timezone, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
 import sys
 from pathlib import Path
@@ -72,15 +75,62 @@ class ComplianceReport:
     checks: List[ComplianceCheck]
     recommendations: List[str]
 
+class ComplianceContext:
+    """Entradas de una pasada de compliance: cada una se carga una sola vez y la comparten todos los checks"""
+    
+    def __init__(self, loaders: Dict[str, Callable[[], Any]]):
+        self._loaders = loaders
+        self._values: Dict[str, Any] = {}
+    
+    def get(self, name: str) -> Any:
+        if name not in self._values:
+            self._values[name] = self._loaders[name]()
+        return self._values[name]
+    
+    def fingerprint(self, inputs: Tuple[str, ...]) -> Tuple[Any, ...]:
+        """Valores de las entradas declaradas por un check"""
+        return tuple(self.get(name) for name in inputs)
+
+def _package_version(name: str) -> Optional[str]:
+    """Versión instalada de un paquete; None si no está instalado"""
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+def _file_stat(path: str) -> Optional[Tuple[int, int]]:
+    """(tamaño, mtime_ns) de un archivo o directorio; None si no existe"""
+    try:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+    except OSError:
+        return None
+
 class ComplianceManager:
     """Gestor de compliance y documentación"""
     
+    # Timeout por defecto de cada check (segundos)
+    DEFAULT_CHECK_TIMEOUT = 10.0
+    
     def __init__(self):
         self.logger = logging.getLogger("ComplianceManager")
         self.rules: Dict[str, ComplianceRule] = {}
         self.checks: List[ComplianceCheck] = []
         self.reports: List[ComplianceReport] = []
         
+        # Registro de checks: nombre -> función, entradas declaradas y timeout
+        self.check_registry: Dict[str, Dict[str, Any]] = {}
+        # Entradas que pueden declarar los checks (se evalúan una vez por pasada)
+        self.check_inputs: Dict[str, Callable[[], Any]] = {}
+        # Último resultado por (regla, check) junto con la huella de sus entradas
+        self._check_cache: Dict[Tuple[str, str], Tuple[Tuple[Any, ...], ComplianceCheck]] = {}
+        
+        # Archivos que leen los checks
+        self.state_file = "logs/bot_state.json"
+        self.regulatory_docs_dir = "docs/compliance/regulatory"
+        self.alert_config_path = str(Path(__file__).parent / "configs" / "alert_config.json")
+        self.health_checker_path = str(Path(__file__).parent / "health_checker.py")
+        
         # Configuración de compliance
         self.compliance_config = {
             "regulatory_frameworks": ["MiFID II", "GDPR", "SOX", "Basel III"],
@@ -95,6 +145,7 @@ class ComplianceManager:
         
         # Inicializar reglas de compliance
         self._initialize_compliance_rules()
+        self._initialize_check_registry()
         
         self.logger.info("ComplianceManager initialized")
     
@@ -352,8 +403,63 @@ class ComplianceManager:
         self.rules[rule.id] = rule
         self.logger.debug(f"Added compliance rule: {rule.id}")
     
-    async def run_compliance_check(self, rule_id: Optional[str] = None) -> List[ComplianceCheck]:
-        """Ejecutar verificación de compliance"""
+    def _initialize_check_registry(self):
+        """Registrar entradas y checks de compliance"""
+        self.register_input("config", lambda: json.dumps(self.compliance_config, sort_keys=True, default=str))
+        self.register_input("state_file", lambda: (_file_stat(self.state_file), _file_stat(f"{self.state_file}.journal")))
+        self.register_input("regulatory_docs", lambda: _file_stat(self.regulatory_docs_dir))
+        self.register_input("git_index", lambda: _file_stat(".git/index"))
+        self.register_input("alert_config", lambda: _file_stat(self.alert_config_path))
+        self.register_input("health_checker", lambda: (_file_stat(self.health_checker_path), _package_version("psutil")))
+        
+        # Checks que leen configuración, estado, archivos o el entorno
+        self.register_check("verify_trade_reporting_enabled", self._check_trade_reporting_enabled, inputs=("alert_config",))
+        self.register_check("verify_trade_data_capture", self._check_trade_data_capture, inputs=("state_file",))
+        self.register_check("verify_regulatory_reporting", self._check_regulatory_reporting, inputs=("regulatory_docs",))
+        self.register_check("verify_position_limits", self._check_position_limits, inputs=("config",))
+        self.register_check("verify_stop_loss_orders", self._check_stop_loss_orders, inputs=("config",))
+        self.register_check("verify_risk_monitoring", self._check_risk_monitoring, inputs=("health_checker",))
+        self.register_check("verify_api_key_encryption", self._check_api_key_encryption, inputs=("git_index",))
+        
+        # Checks sin entradas: su resultado solo depende del código
+        for check_func in (
+            self._check_api_key_access_controls, self._check_api_key_rotation,
+            self._check_data_encryption_in_transit, self._check_data_encryption_at_rest,
+            self._check_encryption_key_management, self._check_data_retention_policies,
+            self._check_data_purge_mechanisms, self._check_data_retention_audit,
+            self._check_data_anonymization, self._check_data_access_logging,
+            self._check_data_sharing_controls, self._check_audit_logging,
+            self._check_log_tamper_protection, self._check_log_retention,
+            self._check_user_authentication, self._check_user_authorization,
+            self._check_access_logging, self._check_position_size_limits,
+            self._check_concentration_limits, self._check_risk_limit_monitoring,
+            self._check_automatic_stop_loss, self._check_stop_loss_levels,
+            self._check_stop_loss_monitoring, self._check_system_health_monitoring,
+            self._check_performance_metrics, self._check_alert_configuration,
+            self._check_regular_backups, self._check_backup_integrity,
+            self._check_recovery_procedures
+        ):
+            self.register_check("verify_" + check_func.__name__[len("_check_"):], check_func)
+    
+    def register_input(self, name: str, loader: Callable[[], Any]):
+        """Registrar una entrada de checks; su valor es la huella que decide si un resultado sigue vigente"""
+        self.check_inputs[name] = loader
+    
+    def register_check(self, check_name: str, check_func: Callable, inputs: Tuple[str, ...] = (),
+                       timeout: Optional[float] = None):
+        """Registrar un check con las entradas de las que depende
+        
+        Los checks con entradas reciben el contexto de la pasada como segundo argumento; mientras
+        sus entradas no cambien se reutiliza el último resultado COMPLIANT (los demás se re-ejecutan).
+        """
+        self.check_registry[check_name] = {
+            "func": check_func,
+            "inputs": tuple(inputs),
+            "timeout": self.DEFAULT_CHECK_TIMEOUT if timeout is None else timeout
+        }
+    
+    async def run_compliance_check(self, rule_id: Optional[str] = None, force: bool = False) -> List[ComplianceCheck]:
+        """Ejecutar verificación de compliance (checks en paralelo; ``force`` ignora los resultados vigentes)"""
         self.logger.info("Running compliance check...")
         
         checks = []
@@ -369,23 +475,13 @@ class ComplianceManager:
         else:
             rules_to_check = [rule for rule in self.rules.values() if rule.enabled]
         
-        # Ejecutar verificaciones
-        for rule in rules_to_check:
-            self.logger.info(f"Checking compliance rule: {rule.id}")
-            
-            for check_name in rule.checks:
-                try:
-                    check_result = await self._execute_compliance_check(rule, check_name)
-                    checks.append(check_result)
-                except Exception as e:
-                    self.logger.error(f"Compliance check failed: {check_name} - {e}")
-                    checks.append(ComplianceCheck(
-                        rule_id=rule.id,
-                        status=ComplianceStatus.CRITICAL,
-                        message=f"Check failed: {e}",
-                        details={"error": str(e)},
-                        timestamp=datetime.now(timezone.utc)
-                    ))
+        # Ejecutar verificaciones en paralelo con un contexto compartido
+        context = ComplianceContext(self.check_inputs)
+        checks = list(await asyncio.gather(*(
+            self._run_check(rule, check_name, context, force)
+            for rule in rules_to_check
+            for check_name in rule.checks
+        )))
         
         # Guardar verificaciones
         self.checks.extend(checks)
@@ -393,82 +489,49 @@ class ComplianceManager:
         self.logger.info(f"Compliance check completed: {len(checks)} checks")
         return checks
     
-    async def _execute_compliance_check(self, rule: ComplianceRule, check_name: str) -> ComplianceCheck:
+    async def _run_check(self, rule: ComplianceRule, check_name: str,
+                         context: ComplianceContext, force: bool = False) -> ComplianceCheck:
+        """Ejecutar un check con timeout, reutilizando el resultado anterior si sus entradas no cambiaron"""
+        entry = self.check_registry.get(check_name)
+        key = (rule.id, check_name)
+        try:
+            fingerprint = context.fingerprint(entry["inputs"]) if entry else ()
+            cached = self._check_cache.get(key)
+            if not force and cached and cached[0] == fingerprint:
+                return replace(cached[1], timestamp=datetime.now(timezone.utc))
+            
+            timeout = entry["timeout"] if entry else self.DEFAULT_CHECK_TIMEOUT
+            result = await asyncio.wait_for(self._execute_compliance_check(rule, check_name, context), timeout=timeout)
+            # Un fallo puede ser transitorio: solo se reutilizan los resultados conformes
+            if entry and result.status == ComplianceStatus.COMPLIANT:
+                self._check_cache[key] = (fingerprint, result)
+            else:
+                self._check_cache.pop(key, None)
+            return result
+        except asyncio.TimeoutError:
+            self.logger.error(f"Compliance check timed out: {check_name}")
+            return ComplianceCheck(
+                rule_id=rule.id,
+                status=ComplianceStatus.UNKNOWN,
+                message=f"Check timed out: {check_name}",
+                details={"check_name": check_name},
+                timestamp=datetime.now(timezone.utc)
+            )
+        except Exception as e:
+            self.logger.error(f"Compliance check failed: {check_name} - {e}")
+            return ComplianceCheck(
+                rule_id=rule.id,
+                status=ComplianceStatus.CRITICAL,
+                message=f"Check failed: {e}",
+                details={"error": str(e)},
+                timestamp=datetime.now(timezone.utc)
+            )
+    
+    async def _execute_compliance_check(self, rule: ComplianceRule, check_name: str,
+                                        context: Optional[ComplianceContext] = None) -> ComplianceCheck:
         """Ejecutar verificación específica de compliance"""
-        
-        if check_name == "verify_trade_reporting_enabled":
-            return await self._check_trade_reporting_enabled(rule)
-        elif check_name == "verify_trade_data_capture":
-            return await self._check_trade_data_capture(rule)
-        elif check_name == "verify_regulatory_reporting":
-            return await self._check_regulatory_reporting(rule)
-        elif check_name == "verify_position_limits":
-            return await self._check_position_limits(rule)
-        elif check_name == "verify_stop_loss_orders":
-            return await self._check_stop_loss_orders(rule)
-        elif check_name == "verify_risk_monitoring":
-            return await self._check_risk_monitoring(rule)
-        elif check_name == "verify_api_key_encryption":
-            return await self._check_api_key_encryption(rule)
-        elif check_name == "verify_api_key_access_controls":
-            return await self._check_api_key_access_controls(rule)
-        elif check_name == "verify_api_key_rotation":
-            return await self._check_api_key_rotation(rule)
-        elif check_name == "verify_data_encryption_in_transit":
-            return await self._check_data_encryption_in_transit(rule)
-        elif check_name == "verify_data_encryption_at_rest":
-            return await self._check_data_encryption_at_rest(rule)
-        elif check_name == "verify_encryption_key_management":
-            return await self._check_encryption_key_management(rule)
-        elif check_name == "verify_data_retention_policies":
-            return await self._check_data_retention_policies(rule)
-        elif check_name == "verify_data_purge_mechanisms":
-            return await self._check_data_purge_mechanisms(rule)
-        elif check_name == "verify_data_retention_audit":
-            return await self._check_data_retention_audit(rule)
-        elif check_name == "verify_data_anonymization":
-            return await self._check_data_anonymization(rule)
-        elif check_name == "verify_data_access_logging":
-            return await self._check_data_access_logging(rule)
-        elif check_name == "verify_data_sharing_controls":
-            return await self._check_data_sharing_controls(rule)
-        elif check_name == "verify_audit_logging":
-            return await self._check_audit_logging(rule)
-        elif check_name == "verify_log_tamper_protection":
-            return await self._check_log_tamper_protection(rule)
-        elif check_name == "verify_log_retention":
-            return await self._check_log_retention(rule)
-        elif check_name == "verify_user_authentication":
-            return await self._check_user_authentication(rule)
-        elif check_name == "verify_user_authorization":
-            return await self._check_user_authorization(rule)
-        elif check_name == "verify_access_logging":
-            return await self._check_access_logging(rule)
-        elif check_name == "verify_position_size_limits":
-            return await self._check_position_size_limits(rule)
-        elif check_name == "verify_concentration_limits":
-            return await self._check_concentration_limits(rule)
-        elif check_name == "verify_risk_limit_monitoring":
-            return await self._check_risk_limit_monitoring(rule)
-        elif check_name == "verify_automatic_stop_loss":
-            return await self._check_automatic_stop_loss(rule)
-        elif check_name == "verify_stop_loss_levels":
-            return await self._check_stop_loss_levels(rule)
-        elif check_name == "verify_stop_loss_monitoring":
-            return await self._check_stop_loss_monitoring(rule)
-        elif check_name == "verify_system_health_monitoring":
-            return await self._check_system_health_monitoring(rule)
-        elif check_name == "verify_performance_metrics":
-            return await self._check_performance_metrics(rule)
-        elif check_name == "verify_alert_configuration":
-            return await self._check_alert_configuration(rule)
-        elif check_name == "verify_regular_backups":
-            return await self._check_regular_backups(rule)
-        elif check_name == "verify_backup_integrity":
-            return await self._check_backup_integrity(rule)
-        elif check_name == "verify_recovery_procedures":
-            return await self._check_recovery_procedures(rule)
-        else:
+        entry = self.check_registry.get(check_name)
+        if entry is None:
             return ComplianceCheck(
                 rule_id=rule.id,
                 status=ComplianceStatus.UNKNOWN,
@@ -476,16 +539,25 @@ class ComplianceManager:
                 details={"check_name": check_name},
                 timestamp=datetime.now(timezone.utc)
             )
+        
+        if entry["inputs"]:
+            return await entry["func"](rule, context or ComplianceContext(self.check_inputs))
+        return await entry["func"](rule)
     
     # Implementación de verificaciones específicas
-    async def _check_trade_reporting_enabled(self, rule: ComplianceRule) -> ComplianceCheck:
+    async def _check_trade_reporting_enabled(self, rule: ComplianceRule, context: ComplianceContext) -> ComplianceCheck:
         """Verificar que el reporte de trades está habilitado"""
         try:
-            # Verificar que el sistema de reporte está configurado
+            # Verificar que el sistema de reporte está configurado (misma configuración que usa el bot)
             from alert_manager import AlertManager
-            alert_manager = AlertManager()
+            with open(self.alert_config_path, 'r') as f:
+                alert_config = json.load(f)
+            alert_manager = AlertManager({
+                **alert_config.get('alerts', {}),
+                'telegram': alert_config.get('telegram', {})
+            })
             
-            if alert_manager and hasattr(alert_manager, 'telegram_notifier'):
+            if alert_manager.telegram_notifier is not None:
                 return ComplianceCheck(
                     rule_id=rule.id,
                     status=ComplianceStatus.COMPLIANT,
@@ -511,27 +583,30 @@ class ComplianceManager:
                 timestamp=datetime.now(timezone.utc)
             )
     
-    async def _check_trade_data_capture(self, rule: ComplianceRule) -> ComplianceCheck:
+    async def _check_trade_data_capture(self, rule: ComplianceRule, context: ComplianceContext) -> ComplianceCheck:
         """Verificar que los datos de trades se capturan"""
         try:
-            # Verificar que el state manager está funcionando
-            from state_manager import StateManager
-            state_manager = StateManager("logs/bot_state.json")
+            # Verificar que el estado persistido existe y no está vacío (sin releer el journal entero)
+            state_stat, journal_stat = context.get("state_file")
             
-            if state_manager:
+            if state_stat and state_stat[0] > 0:
                 return ComplianceCheck(
                     rule_id=rule.id,
                     status=ComplianceStatus.COMPLIANT,
                     message="Trade data capture is enabled",
-                    details={"data_capture_enabled": True},
+                    details={
+                        "data_capture_enabled": True,
+                        "state_file_bytes": state_stat[0] if state_stat else 0,
+                        "journal_bytes": journal_stat[0] if journal_stat else 0
+                    },
                     timestamp=datetime.now(timezone.utc)
                 )
             else:
                 return ComplianceCheck(
                     rule_id=rule.id,
                     status=ComplianceStatus.NON_COMPLIANT,
-                    message="Trade data capture is not enabled",
-                    details={"data_capture_enabled": False},
+                    message="Trade data capture is not enabled: state file missing or empty",
+                    details={"data_capture_enabled": False, "state_file": self.state_file},
                     timestamp=datetime.now(timezone.utc),
                     remediation="Enable state persistence for trade data capture"
                 )
@@ -544,12 +619,11 @@ class ComplianceManager:
                 timestamp=datetime.now(timezone.utc)
             )
     
-    async def _check_regulatory_reporting(self, rule: ComplianceRule) -> ComplianceCheck:
+    async def _check_regulatory_reporting(self, rule: ComplianceRule, context: ComplianceContext) -> ComplianceCheck:
         """Verificar reporte regulatorio"""
         try:
             # Verificar que hay documentación de reporte regulatorio
-            regulatory_docs = Path("docs/compliance/regulatory")
-            if regulatory_docs.exists():
+            if context.get("regulatory_docs") is not None:
                 return ComplianceCheck(
                     rule_id=rule.id,
                     status=ComplianceStatus.COMPLIANT,
@@ -575,7 +649,7 @@ class ComplianceManager:
                 timestamp=datetime.now(timezone.utc)
             )
     
-    async def _check_position_limits(self, rule: ComplianceRule) -> ComplianceRule:
+    async def _check_position_limits(self, rule: ComplianceRule, context: ComplianceContext) -> ComplianceCheck:
         """Verificar límites de posición"""
         try:
             # Verificar que hay límites de posición configurados
@@ -598,7 +672,7 @@ class ComplianceManager:
                 timestamp=datetime.now(timezone.utc)
             )
     
-    async def _check_stop_loss_orders(self, rule: ComplianceRule) -> ComplianceCheck:
+    async def _check_stop_loss_orders(self, rule: ComplianceRule, context: ComplianceContext) -> ComplianceCheck:
         """Verificar órdenes de stop loss"""
         try:
             # Verificar que hay configuración de stop loss
@@ -621,7 +695,7 @@ class ComplianceManager:
                 timestamp=datetime.now(timezone.utc)
             )
     
-    async def _check_risk_monitoring(self, rule: ComplianceRule) -> ComplianceCheck:
+    async def _check_risk_monitoring(self, rule: ComplianceRule, context: ComplianceContext) -> ComplianceCheck:
         """Verificar monitoreo de riesgo"""
         try:
             # Verificar que hay sistema de monitoreo
@@ -655,12 +729,13 @@ class ComplianceManager:
             )
     
     # Implementar el resto de las verificaciones...
-    async def _check_api_key_encryption(self, rule: ComplianceRule) -> ComplianceCheck:
+    async def _check_api_key_encryption(self, rule: ComplianceRule, context: ComplianceContext) -> ComplianceCheck:
         """Verificar encriptación de API keys"""
         try:
-            # Verificar que .env no está en git
-            import subprocess
-            result = subprocess.run(['git', 'ls-files', '.env'], capture_output=True, text=True)
+            # Verificar que .env no está en git (el subproceso no bloquea el event loop)
+            result = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: subprocess.run(['git', 'ls-files', '.env'], capture_output=True, text=True)
+            )
             
             if '.env' not in result.stdout:
                 return ComplianceCheck(
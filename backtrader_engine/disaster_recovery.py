@@ -173,12 +173,10 @@ class DisasterRecovery:
                 if not Path(dir_path).exists():
                     missing_dirs.append(dir_path)
             
-            # Verificar integridad de archivos
-            corrupted_files = []
-            for file_path in self.critical_files:
-                if Path(file_path).exists():
-                    if not self._validate_file_integrity(Path(file_path)):
-                        corrupted_files.append(file_path)
+            # Verificar integridad de archivos (en paralelo, fuera del event loop)
+            corrupted_files = await self._find_corrupted_files(
+                [f for f in self.critical_files if Path(f).exists()]
+            )
             
             # Determinar tipo de desastre
             if len(missing_dirs) > 2 or len(missing_critical) > 3:
@@ -200,6 +198,15 @@ class DisasterRecovery:
             self.logger.error(f"Error detecting disaster: {e}")
             return DisasterType.COMPLETE_FAILURE
     
+    async def _find_corrupted_files(self, file_paths: List[str]) -> List[str]:
+        """Validar varios archivos a la vez en el executor"""
+        loop = asyncio.get_running_loop()
+        valid = await asyncio.gather(*(
+            loop.run_in_executor(None, self._validate_file_integrity, Path(file_path))
+            for file_path in file_paths
+        ))
+        return [file_path for file_path, ok in zip(file_paths, valid) if not ok]
+    
     def _validate_file_integrity(self, file_path: Path) -> bool:
         """Validar integridad de archivo"""
         try:
@@ -383,8 +390,12 @@ class DisasterRecovery:
             if Path("logs/bot_state.json").exists():
                 shutil.copy2("logs/bot_state.json", "logs/bot_state.json.backup")
             
-            # Restaurar desde backup
-            await self.backup_manager.restore_backup(backup.id)
+            # Restaurar desde backup solo el estado y su journal
+            restored = await self.backup_manager.restore_backup(
+                backup.id, paths=["logs/bot_state.json", "logs/bot_state.json.journal"]
+            )
+            if not restored:
+                raise Exception(f"Could not restore state from backup {backup.id}")
             
             self.logger.info("State file restored successfully")
             
@@ -396,7 +407,9 @@ class DisasterRecovery:
         """Restaurar configuración"""
         try:
             # Restaurar archivos de configuración
-            await self.backup_manager.restore_backup(backup.id)
+            restored = await self.backup_manager.restore_backup(backup.id, paths=["configs/"])
+            if not restored:
+                raise Exception(f"Could not restore configuration from backup {backup.id}")
             
             self.logger.info("Configuration restored successfully")
             
@@ -408,7 +421,9 @@ class DisasterRecovery:
         """Restaurar backup completo"""
         try:
             # Restaurar backup completo
-            await self.backup_manager.restore_backup(backup.id)
+            restored = await self.backup_manager.restore_backup(backup.id)
+            if not restored:
+                raise Exception(f"Could not restore backup {backup.id}")
             
             self.logger.info("Full backup restored successfully")
             
@@ -480,10 +495,9 @@ class DisasterRecovery:
                 return False
             
             # Verificar integridad de archivos críticos
-            for file_path in self.critical_files:
-                if not self._validate_file_integrity(Path(file_path)):
-                    self.logger.error(f"File integrity check failed: {file_path}")
-                    return False
+            for file_path in await self._find_corrupted_files(self.critical_files):
+                self.logger.error(f"File integrity check failed: {file_path}")
+                return False
             
             self.logger.info("Recovery validation successful")
             return True
@@ -492,6 +506,25 @@ class DisasterRecovery:
             self.logger.error(f"Recovery validation error: {e}")
             return False
     
+    async def verify_backups(self) -> Dict[str, bool]:
+        """Verificar la integridad de todos los backups retenidos (modo solo verificación)"""
+        try:
+            start_time = time.perf_counter()
+            results = await self.backup_manager.verify_backups()
+            corrupted = [backup_id for backup_id, ok in results.items() if not ok]
+            
+            if corrupted:
+                self.logger.error(f"❌ Corrupted backups: {', '.join(corrupted)}")
+            self.logger.info(
+                f"Backup verification completed in {time.perf_counter() - start_time:.1f}s "
+                f"({len(results) - len(corrupted)}/{len(results)} ok)"
+            )
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"Error verifying backups: {e}")
+            return {}
+    
     def get_recovery_status(self) -> Dict[str, Any]:
         """Obtener estado de recuperación"""
         return {
@@ -113,6 +113,7 @@ class CircuitBreaker:
             self.state = CircuitBreakerState.OPEN
             self.logger.warning(f"Circuit breaker {self.name} opened due to {self.failure_count} failures")
 
+@dataclass
 class RetryConfig:
     """Configuración de retry"""
     max_retries: int = 3
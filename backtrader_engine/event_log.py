@@ -0,0 +1,272 @@
+"""
+Event Log - Registro binario append-only de eventos tipados del paper trading
+Señales, rechazos, órdenes, fills, posiciones y balance se guardan como registros de tamaño
+fijo (dtype estructurado de NumPy) escritos por un hilo en lotes; los lectores abren el archivo
+con memmap y acceden a cada campo como una columna sin copiar ni parsear texto
+"""
+
+import logging
+import os
+import queue
+import struct
+import threading
+from datetime import datetime
+from enum import IntEnum
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class EventKind(IntEnum):
+    """Tipos de evento"""
+    SIGNAL = 1
+    REJECTION = 2
+    ORDER = 3
+    FILL = 4
+    POSITION = 5
+    BALANCE = 6
+
+# Registro de tamaño fijo; el significado de value depende del tipo: confianza (señal/rechazo),
+# cantidad ejecutada (orden), comisión (fill), PnL no realizado (posición) o balance
+EVENT_DTYPE = np.dtype([
+    ('ts', '<f8'),
+    ('kind', 'u1'),
+    ('side', 'i1'),       # 1 compra/long, -1 venta/short, 0 sin lado
+    ('symbol', 'S16'),
+    ('strategy', 'S32'),
+    ('price', '<f8'),
+    ('qty', '<f8'),
+    ('value', '<f8'),
+    ('ref', 'S32'),       # order_id / trade_id
+    ('detail', 'S96'),    # motivo del rechazo / estado de la orden
+])
+
+MAGIC = b'VSTEVT01'
+HEADER = struct.Struct('<8sI4x')  # magic, tamaño de registro
+
+def _side(value: Optional[str]) -> int:
+    side = (value or '').upper()
+    if side in ('BUY', 'LONG'):
+        return 1
+    if side in ('SELL', 'SHORT'):
+        return -1
+    return 0
+
+def _text(value: Optional[str], size: int) -> bytes:
+    return (value or '').encode('utf-8')[:size]
+
+def _get(obj, key: str, default=None):
+    return obj.get(key, default) if isinstance(obj, dict) else getattr(obj, key, default)
+
+class EventLog:
+    """Escritor no bloqueante del log de eventos"""
+
+    def __init__(self, path: str = "logs/events.bin", batch_size: int = 1000):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.logger = logging.getLogger("EventLog")
+
+        self.write_queue: queue.Queue = queue.Queue()
+        self.running = False
+        self.worker_thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._file = None
+
+    def start(self):
+        """Iniciar el hilo escritor"""
+        with self._start_lock:
+            if not self.running:
+                self.running = True
+                self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
+                self.worker_thread.start()
+                self.logger.info(f"Event log started: {self.path}")
+
+    def stop(self):
+        """Detener el hilo escritor tras vaciar la cola"""
+        if self.running:
+            self.running = False
+            self.write_queue.put(None)
+            if self.worker_thread:
+                self.worker_thread.join(timeout=5)
+            self._drain()
+            self._close()
+            self.logger.info("Event log stopped")
+
+    def flush(self):
+        """Esperar a que todo lo encolado esté escrito"""
+        if self.running:
+            done = threading.Event()
+            self.write_queue.put(done)
+            done.wait(timeout=10)
+        else:
+            self._drain()
+
+    def _open(self):
+        """Abrir el archivo en modo append, escribiendo la cabecera si es nuevo"""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'ab')
+            if self._file.tell() == 0:
+                self._file.write(HEADER.pack(MAGIC, EVENT_DTYPE.itemsize))
+        return self._file
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _worker_loop(self):
+        """Bloquear en la cola y escribir lotes de registros"""
+        while True:
+            item = self.write_queue.get()
+            batch, markers = [], []
+            while item is not None:
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.write_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self._write_batch(batch)
+            for marker in markers:
+                marker.set()
+
+            if item is None and not self.running:
+                break
+
+    def _drain(self):
+        """Escribir lo que quede en la cola (worker parado)"""
+        batch = []
+        while True:
+            try:
+                item = self.write_queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is not None:
+                batch.append(item)
+        self._write_batch(batch)
+
+    def _write_batch(self, batch: List[tuple]):
+        """Escribir un lote como un único bloque de registros"""
+        if not batch:
+            return
+        try:
+            f = self._open()
+            f.write(np.array(batch, dtype=EVENT_DTYPE).tobytes())
+            f.flush()
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Error writing {len(batch)} events: {e}")
+
+    def record(self, kind: EventKind, symbol: str = '', side: Optional[str] = None, strategy: str = '',
+               price: float = 0.0, qty: float = 0.0, value: float = 0.0, ref: str = '', detail: str = '',
+               timestamp: Optional[float] = None):
+        """Encolar un evento sin bloquear al llamador (no-op hasta que el bot llama a start())"""
+        if not self.running:
+            return
+        self.write_queue.put((
+            timestamp if timestamp is not None else datetime.now().timestamp(), int(kind), _side(side),
+            _text(symbol, 16), _text(strategy, 32), price or 0.0, qty or 0.0, value or 0.0,
+            _text(ref, 32), _text(detail, 96)
+        ))
+
+    def record_signal(self, signal):
+        """Señal generada (TradingSignal o dict)"""
+        self.record(EventKind.SIGNAL, _get(signal, 'symbol'), _get(signal, 'signal_type'),
+                    _get(signal, 'strategy', ''), _get(signal, 'price'), value=_get(signal, 'confidence'),
+                    timestamp=_get(signal, 'timestamp'))
+
+    def record_rejection(self, signal_data: Dict[str, Any], reason: str):
+        """Señal rechazada por el risk manager"""
+        self.record(EventKind.REJECTION, signal_data.get('symbol'), signal_data.get('signal_type'),
+                    signal_data.get('strategy', ''), signal_data.get('price'),
+                    value=signal_data.get('confidence'), detail=reason)
+
+    def record_order(self, order):
+        """Cambio de estado de una orden (PaperOrder o dict)"""
+        self.record(EventKind.ORDER, _get(order, 'symbol'), _get(order, 'side'), _get(order, 'strategy', ''),
+                    _get(order, 'avg_price') or _get(order, 'price'), _get(order, 'qty'),
+                    _get(order, 'filled_qty'), _get(order, 'order_id'), _get(order, 'status'),
+                    timestamp=_get(order, 'filled_time') or _get(order, 'created_time') or None)
+
+    def record_fill(self, trade):
+        """Ejecución (PaperTrade o dict)"""
+        self.record(EventKind.FILL, _get(trade, 'symbol'), _get(trade, 'side'), _get(trade, 'strategy', ''),
+                    _get(trade, 'price'), _get(trade, 'qty'), _get(trade, 'commission', 0.0),
+                    _get(trade, 'trade_id'), _get(trade, 'order_id'), timestamp=_get(trade, 'timestamp'))
+
+    def record_position(self, symbol: str, position=None):
+        """Posición tras un fill; sin posición se registra tamaño 0 (cerrada)"""
+        if position is None:
+            self.record(EventKind.POSITION, symbol)
+        else:
+            self.record(EventKind.POSITION, symbol, _get(position, 'side'), price=_get(position, 'entry_price'),
+                        qty=_get(position, 'size'), value=_get(position, 'unrealized_pnl'))
+
+    def record_balance(self, balance: float):
+        """Balance de la cuenta"""
+        self.record(EventKind.BALANCE, value=balance)
+
+class EventLogReader:
+    """Acceso de solo lectura al log de eventos mediante memmap (sin copias)"""
+
+    def __init__(self, path: Union[str, Path] = "logs/events.bin"):
+        self.path = Path(path)
+
+    def events(self) -> np.ndarray:
+        """
+        Todos los registros completos como array estructurado mapeado en memoria.
+
+        Un registro que el escritor aún no terminó de escribir se ignora. Las columnas
+        (``events()['price']``) son vistas del archivo, no copias.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return np.empty(0, dtype=EVENT_DTYPE)
+
+        count = (size - HEADER.size) // EVENT_DTYPE.itemsize
+        if count <= 0:
+            return np.empty(0, dtype=EVENT_DTYPE)
+
+        with open(self.path, 'rb') as f:
+            magic, itemsize = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or itemsize != EVENT_DTYPE.itemsize:
+            raise ValueError(f"Unsupported event log format: {self.path}")
+
+        return np.memmap(self.path, dtype=EVENT_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+
+    def select(self, kind: Optional[EventKind] = None, start_time: Optional[float] = None,
+               end_time: Optional[float] = None, symbol: Optional[str] = None) -> np.ndarray:
+        """Registros filtrados por tipo, rango de tiempo (epoch) y símbolo"""
+        events = self.events()
+        mask = np.ones(len(events), dtype=bool)
+        if kind is not None:
+            mask &= events['kind'] == int(kind)
+        if start_time is not None:
+            mask &= events['ts'] >= start_time
+        if end_time is not None:
+            mask &= events['ts'] <= end_time
+        if symbol:
+            mask &= events['symbol'] == symbol.encode('utf-8')
+        return events[mask]
+
+    def counts(self) -> Dict[str, int]:
+        """Número de eventos por tipo"""
+        counts = np.bincount(self.events()['kind'], minlength=max(EventKind) + 1)
+        return {kind.name.lower(): int(counts[kind]) for kind in EventKind}
+
+def decode(column: np.ndarray) -> List[str]:
+    """Columna de texto (bytes de ancho fijo) a lista de str"""
+    return np.char.decode(column, 'utf-8', errors='replace').tolist()
+
+# Instancia global del log de eventos (inactiva hasta start(): importar o simular órdenes no escribe)
+global_event_log = EventLog()
@@ -5,5 +5,6 @@ Exchanges module for trading bot integration
 from .bybit_client import BybitClient
 from .bybit_websocket import BybitWebSocket
 from .bybit_paper_trader import BybitPaperTrader
+from .sharded_paper_trader import ShardedPaperTrader
 
-__all__ = ['BybitClient', 'BybitWebSocket', 'BybitPaperTrader']
+__all__ = ['BybitClient', 'BybitWebSocket', 'BybitPaperTrader', 'ShardedPaperTrader']
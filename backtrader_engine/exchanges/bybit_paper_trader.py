@@ -22,6 +22,8 @@ from indicators_realtime import RealtimeIndicators
 from alert_manager import AlertManager
 from risk_manager import RiskManager
 from error_handler import global_error_handler, with_error_handling, ErrorCategory
+from latency_tracer import global_latency_tracer, current_trace
+from event_log import global_event_log
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +41,7 @@ class PaperOrder:
     created_time: float = 0.0
     filled_time: Optional[float] = None
     avg_price: Optional[float] = None
+    strategy: str = ''
 
 @dataclass
 class PaperPosition:
@@ -64,6 +67,7 @@ class PaperTrade:
     price: float
     timestamp: float
     commission: float = 0.0
+    strategy: str = ''
 
 class BybitPaperTrader:
     """Paper trading engine that simulates real trading with Bybit"""
@@ -183,7 +187,8 @@ class BybitPaperTrader:
             qty=order.qty,
             price=execution_price,
             timestamp=time.time(),
-            commission=commission
+            commission=commission,
+            strategy=order.strategy
         )
         
         # Update order
@@ -203,9 +208,12 @@ class BybitPaperTrader:
         
         # Update position
         self._update_position_from_trade(trade)
+        self.risk_manager.on_fill(order.symbol, order.side, order.qty, execution_price)
         
         # Update balance
         self.balance -= commission
+        global_event_log.record_position(order.symbol, self.positions.get(order.symbol))
+        global_event_log.record_balance(self.balance)
         
         logger.info(f"Executed market order: {order.symbol} {order.side} {order.qty} @ {execution_price}")
         
@@ -294,7 +302,7 @@ class BybitPaperTrader:
         self._update_position_pnl(symbol)
     
     def create_order(self, symbol: str, side: str, order_type: str, 
-                    qty: float, price: Optional[float] = None) -> PaperOrder:
+                    qty: float, price: Optional[float] = None, strategy: str = '') -> PaperOrder:
         """
         Create paper trading order
         
@@ -304,6 +312,7 @@ class BybitPaperTrader:
             order_type: 'Market' or 'Limit'
             qty: Order quantity
             price: Order price (required for Limit orders)
+            strategy: Strategy that originated the order (for the trade ledger)
             
         Returns:
             Created paper order
@@ -317,7 +326,8 @@ class BybitPaperTrader:
             order_type=order_type,
             qty=qty,
             price=price,
-            created_time=time.time()
+            created_time=time.time(),
+            strategy=strategy
         )
         
         self.orders[order_id] = order
@@ -354,6 +364,32 @@ class BybitPaperTrader:
         logger.info(f"Cancelled paper order: {order_id}")
         return True
     
+    def restore_positions(self, positions: Dict[str, Dict[str, Any]]):
+        """Restore open positions from persisted state and rebuild the portfolio risk aggregates"""
+        for symbol, data in positions.items():
+            size = float(data.get('size', 0.0))
+            if size <= 0:
+                continue
+            entry_price = float(data.get('entry_price', 0.0))
+            self.positions[symbol] = PaperPosition(
+                symbol=symbol,
+                side=data.get('side', 'Buy'),
+                size=size,
+                entry_price=entry_price,
+                mark_price=float(data.get('mark_price') or entry_price),
+                unrealized_pnl=float(data.get('unrealized_pnl', 0.0)),
+                leverage=float(data.get('leverage', 1.0))
+            )
+        
+        # Exposure, margin and VaR start from the restored positions instead of zero
+        self.risk_manager.sync_positions(self.positions)
+        logger.info(f"Restored {len(self.positions)} positions from state")
+    
+    @property
+    def connected(self) -> bool:
+        """Whether the market data stream is connected"""
+        return bool(self.websocket and self.websocket.public_connected)
+    
     def get_positions(self) -> Dict[str, PaperPosition]:
         """Get current positions"""
         return self.positions.copy()
@@ -416,6 +452,13 @@ class BybitPaperTrader:
     
     async def _handle_ticker_update(self, data: Dict):
         """Handle ticker updates from WebSocket"""
+        # Latency trace (sampled), started from the WebSocket receive timestamp
+        trace = global_latency_tracer.start(data['_recv_ns']) if '_recv_ns' in data else None
+        if trace:
+            trace.marks.append(('decode', data['_decoded_ns']))
+            trace.mark('dispatch')
+        token = current_trace.set(trace)
+        
         try:
             topic = data.get('topic', '')
             if 'tickers' in topic:
@@ -428,9 +471,14 @@ class BybitPaperTrader:
                 if symbol and real_price > 0:
                     self.current_prices[symbol] = real_price
                     self._update_position_pnl(symbol)
+                    self.risk_manager.on_mark_price(symbol, real_price)
+                    if trace:
+                        trace.mark('ticker_update')
                     
                     # Update indicators with new data
                     self.indicators.update_data(symbol, real_price, volume)
+                    if trace:
+                        trace.mark('indicators')
                     
                     # Update signal engine
                     self.signal_engine.update_market_data(symbol, real_price, volume)
@@ -440,6 +488,9 @@ class BybitPaperTrader:
                     
         except Exception as e:
             logger.error(f"Error handling ticker update: {e}")
+        finally:
+            current_trace.reset(token)
+            global_latency_tracer.finish(trace, 'no_signal')
     
     async def _handle_orderbook_update(self, data: Dict):
         """Handle order book updates from WebSocket"""
@@ -457,6 +508,7 @@ class BybitPaperTrader:
     
     def _notify_order_callbacks(self, order: PaperOrder):
         """Notify order callbacks"""
+        global_event_log.record_order(order)
         for callback in self.order_callbacks:
             try:
                 callback(order)
@@ -465,6 +517,7 @@ class BybitPaperTrader:
     
     def _notify_trade_callbacks(self, trade: PaperTrade):
         """Notify trade callbacks"""
+        global_event_log.record_fill(trade)
         for callback in self.trade_callbacks:
             try:
                 callback(trade)
@@ -613,6 +666,10 @@ class BybitPaperTrader:
     
     def _on_signal_received(self, signal: TradingSignal):
         """Handle signal received from signal engine"""
+        trace = current_trace.get()
+        if trace:
+            trace.mark('signal_generation')
+        
         try:
             logger.info(f"Processing signal: {signal.symbol} {signal.signal_type} @ {signal.price}")
             
@@ -644,9 +701,12 @@ class BybitPaperTrader:
                 current_positions=self.positions,
                 market_data=market_data
             )
+            if trace:
+                trace.mark('risk_validation')
             
             if not is_valid:
                 logger.warning(f"Signal rejected by risk manager: {reason}")
+                global_latency_tracer.finish(trace, 'rejected')
                 self.alert_manager.signal_rejected(signal.symbol, reason, signal.confidence)
                 return
             
@@ -669,8 +729,12 @@ class BybitPaperTrader:
                 symbol=signal.symbol,
                 side=side,
                 order_type='Market',
-                qty=qty
+                qty=qty,
+                strategy=signal.strategy
             )
+            if trace:
+                trace.mark('order_creation')
+                global_latency_tracer.finish(trace, 'order')
             
             logger.info(f"Order created from signal: {order.order_id} - {signal.symbol} {side} {qty}")
             
@@ -127,7 +127,12 @@ class BybitWebSocket:
         try:
             async for message in self.public_ws:
                 try:
+                    # Marcas monotónicas para el trazado de latencia tick-to-order
+                    received_ns = time.perf_counter_ns()
                     data = json.loads(message)
+                    if isinstance(data, dict):
+                        data['_recv_ns'] = received_ns
+                        data['_decoded_ns'] = time.perf_counter_ns()
                     await self._handle_public_message(data)
                 except json.JSONDecodeError as e:
                     logger.error(f"Failed to parse public message: {e}")
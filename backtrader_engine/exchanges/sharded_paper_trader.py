@@ -0,0 +1,470 @@
+"""
+Sharded Paper Trading Engine - Symbols partitioned across worker processes
+
+Each worker process owns the market data of its symbols: WebSocket subscriptions, ticker
+parsing, indicator buffers and signal generation. The coordinator (the bot's own process)
+keeps the single copy of balance, positions, orders and portfolio-level risk; workers send
+it fixed-size price and signal messages through single-producer/single-consumer ring buffers
+in shared memory, so the hot path needs no pickling, pipes or locks.
+"""
+
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Any, Deque, Tuple
+
+import numpy as np
+
+from .bybit_paper_trader import BybitPaperTrader
+from .bybit_websocket import BybitWebSocket
+from signal_engine import SignalEngine, TradingSignal
+from indicators_realtime import RealtimeIndicators
+from error_handler import with_error_handling, ErrorCategory
+from event_log import global_event_log
+
+logger = logging.getLogger(__name__)
+
+# Message kinds
+MSG_PRICE = 1
+MSG_SIGNAL = 2
+MSG_STATUS = 3  # Worker market data connection: side 1 connected, 0 disconnected
+
+# Fixed-size message; for signals the indicator fields carry what risk validation needs
+SHARD_MSG_DTYPE = np.dtype([
+    ('kind', 'u1'),
+    ('side', 'i1'),        # 1 BUY, -1 SELL, 0 HOLD
+    ('symbol', 'S16'),
+    ('strategy', 'S32'),
+    ('ts', '<f8'),
+    ('price', '<f8'),
+    ('volume', '<f8'),
+    ('confidence', '<f8'),
+    ('atr', '<f8'),
+    ('volume_ratio', '<f8'),
+    ('adx', '<f8'),
+    ('rsi', '<f8'),
+])
+
+SIGNAL_SIDES = {'BUY': 1, 'SELL': -1}
+SIDE_SIGNALS = {1: 'BUY', -1: 'SELL', 0: 'HOLD'}
+
+def _encode(value: Optional[str], size: int) -> bytes:
+    return (value or '').encode('utf-8')[:size]
+
+def price_message(symbol: str, price: float, volume: float, timestamp: float) -> tuple:
+    """Ring message for a ticker update"""
+    return (MSG_PRICE, 0, _encode(symbol, 16), b'', timestamp, price, volume, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+def signal_message(signal: TradingSignal) -> tuple:
+    """Ring message for a validated signal"""
+    indicators = signal.indicators or {}
+    return (MSG_SIGNAL, SIGNAL_SIDES.get(signal.signal_type, 0), _encode(signal.symbol, 16),
+            _encode(signal.strategy, 32), signal.timestamp, signal.price, 0.0, signal.confidence,
+            float(indicators.get('atr', 0.0)), float(indicators.get('volume_ratio', 1.0)),
+            float(indicators.get('adx', 25.0)), float(indicators.get('rsi', 50.0)))
+
+def status_message(connected: bool, timestamp: float) -> tuple:
+    """Ring message for a change of the worker's market data connection"""
+    return (MSG_STATUS, int(connected), b'', b'', timestamp, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+def partition_symbols(symbols: List[str], shards: int) -> List[List[str]]:
+    """Deterministic round-robin partition (shard sizes differ by at most one symbol)"""
+    shards = max(1, min(shards, len(symbols)))
+    return [symbols[shard::shards] for shard in range(shards)]
+
+class ShmRing:
+    """
+    Single-producer/single-consumer ring of SHARD_MSG_DTYPE records in shared memory.
+
+    The producer only writes ``head`` and the consumer only writes ``tail`` (on separate
+    cache lines); a record is written before ``head`` is advanced, so the consumer never
+    sees a slot that is still being filled.
+    """
+
+    HEADER_BYTES = 128
+    HEAD = 0
+    TAIL = 8  # uint64 index: 64 bytes after head
+
+    def __init__(self, capacity: int = 4096, name: Optional[str] = None):
+        self.capacity = capacity
+        self.owner = name is None
+        size = self.HEADER_BYTES + capacity * SHARD_MSG_DTYPE.itemsize
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self._counters = np.ndarray((self.HEADER_BYTES // 8,), dtype='<u8', buffer=self.shm.buf)
+        self._records = np.ndarray((capacity,), dtype=SHARD_MSG_DTYPE, buffer=self.shm.buf,
+                                   offset=self.HEADER_BYTES)
+        if self.owner:
+            self._counters[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __len__(self) -> int:
+        return int(self._counters[self.HEAD]) - int(self._counters[self.TAIL])
+
+    def put(self, message: tuple) -> bool:
+        """Append a message; False if the ring is full"""
+        head = int(self._counters[self.HEAD])
+        if head - int(self._counters[self.TAIL]) >= self.capacity:
+            return False
+        self._records[head % self.capacity] = message
+        self._counters[self.HEAD] = head + 1
+        return True
+
+    def get_batch(self, max_items: Optional[int] = None) -> np.ndarray:
+        """Copy out and release the pending messages (oldest first)"""
+        tail = int(self._counters[self.TAIL])
+        count = int(self._counters[self.HEAD]) - tail
+        if max_items:
+            count = min(count, max_items)
+        if count <= 0:
+            return np.empty(0, dtype=SHARD_MSG_DTYPE)
+
+        start = tail % self.capacity
+        end = start + count
+        if end <= self.capacity:
+            batch = self._records[start:end].copy()
+        else:
+            batch = np.concatenate((self._records[start:], self._records[:end - self.capacity]))
+        self._counters[self.TAIL] = tail + count
+        return batch
+
+    def close(self):
+        """Detach (and free the segment if this side created it)"""
+        self._counters = self._records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+@dataclass
+class ShardSpec:
+    """Everything a worker process needs (picklable for the spawn start method)"""
+    shard_id: int
+    symbols: List[str]
+    ring_name: str
+    ring_capacity: int
+    testnet: bool = True
+    signal_config: Dict[str, Any] = field(default_factory=dict)
+    strategies: List[Tuple[str, Any, Dict[str, Any]]] = field(default_factory=list)
+    signal_throttle: float = 300
+    log_level: int = logging.INFO
+
+class ShardWorker:
+    """Market data, indicators and signal generation for one partition of the symbols"""
+
+    def __init__(self, spec: ShardSpec):
+        self.spec = spec
+        self.ring = ShmRing(spec.ring_capacity, name=spec.ring_name)
+
+        # Public market data only: orders and positions live in the coordinator
+        self.websocket = BybitWebSocket(testnet=spec.testnet)
+        self.signal_engine = SignalEngine(spec.signal_config)
+        self.indicators = RealtimeIndicators(buffer_size=200)
+        for name, strategy_class, params in spec.strategies:
+            self.signal_engine.register_strategy(name, strategy_class, params)
+
+        self.last_signal_time: Dict[str, float] = {}
+        self.signal_throttle = spec.signal_throttle
+        self.backlog: Deque[tuple] = deque()  # Signals waiting for room in the ring
+        self.dropped_prices = 0
+        self.reported_connected: Optional[bool] = None
+
+    def publish(self, message: tuple, droppable: bool = False) -> bool:
+        """Send a message to the coordinator; prices are dropped (not queued) when the ring is full"""
+        if not self.backlog and self.ring.put(message):
+            return True
+        if droppable:
+            self.dropped_prices += 1
+        else:
+            self.backlog.append(message)
+        return False
+
+    def report_status(self):
+        """Tell the coordinator when the market data connection goes up or down"""
+        connected = bool(self.websocket.public_connected)
+        if connected != self.reported_connected:
+            self.reported_connected = connected
+            self.publish(status_message(connected, time.time()))
+
+    def flush_backlog(self):
+        """Retry queued signals once the coordinator has made room"""
+        while self.backlog and self.ring.put(self.backlog[0]):
+            self.backlog.popleft()
+
+    def process_tick(self, symbol: str, price: float, volume: float):
+        """Forward the price and run indicators and strategies for the symbol"""
+        now = time.time()
+        self.publish(price_message(symbol, price, volume, now), droppable=True)
+
+        self.indicators.update_data(symbol, price, volume)
+        self.signal_engine.update_market_data(symbol, price, volume)
+
+        last_signal = self.last_signal_time.get(symbol)
+        if last_signal is not None and now - last_signal < self.signal_throttle:
+            return
+
+        for signal in self.signal_engine.generate_signals(symbol):
+            self.last_signal_time[symbol] = now
+            self.publish(signal_message(signal))
+
+    async def _handle_ticker_update(self, data: Dict):
+        """Parse a ticker message (same price selection as BybitPaperTrader)"""
+        try:
+            ticker_data = data.get('data', {})
+            symbol = ticker_data.get('symbol', '')
+            real_price = float(ticker_data.get('indexPrice', ticker_data.get('lastPrice', 0)))
+            volume = float(ticker_data.get('volume24h', 0))
+            if symbol and real_price > 0:
+                self.process_tick(symbol, real_price, volume)
+        except Exception as e:
+            logger.error(f"Error handling ticker update: {e}")
+
+    async def run(self, stop_event):
+        """Subscribe to the shard's symbols and run until the coordinator sets stop_event"""
+        self.websocket.add_ticker_callback(self._handle_ticker_update)
+        await self.websocket.start()
+        for symbol in self.spec.symbols:
+            await self.websocket.subscribe_ticker(symbol)
+        logger.info(f"Shard {self.spec.shard_id} started for symbols: {self.spec.symbols}")
+
+        try:
+            while not stop_event.is_set():
+                self.report_status()
+                self.flush_backlog()
+                await asyncio.sleep(0.1)
+        finally:
+            await self.websocket.stop()
+            self.report_status()
+            self.flush_backlog()
+            self.ring.close()
+            logger.info(f"Shard {self.spec.shard_id} stopped (dropped prices: {self.dropped_prices})")
+
+def run_shard(spec: ShardSpec, stop_event):
+    """Worker process entry point"""
+    logging.basicConfig(
+        level=spec.log_level,
+        format=f"%(asctime)s - shard-{spec.shard_id} - %(name)s - %(levelname)s - %(message)s"
+    )
+    # The event log is never started here: signals are recorded once, by the coordinator
+    try:
+        asyncio.run(ShardWorker(spec).run(stop_event))
+    except KeyboardInterrupt:
+        pass
+
+class ShardedPaperTrader(BybitPaperTrader):
+    """Paper trader that runs market data and signal generation in one worker process per shard"""
+
+    def __init__(self, api_key: str, api_secret: str, initial_balance: float = 10000.0,
+                 testnet: bool = True, commission_rate: float = 0.0006, signal_config: Dict = None,
+                 shards: Optional[int] = None, ring_capacity: int = 4096, poll_interval: float = 0.005):
+        """
+        Initialize sharded paper trader
+
+        Args:
+            shards: Number of worker processes (default: one per CPU, leaving one for the coordinator)
+            ring_capacity: Messages per worker ring buffer
+            poll_interval: Coordinator sleep when every ring is empty (seconds)
+        """
+        super().__init__(api_key, api_secret, initial_balance, testnet, commission_rate, signal_config)
+        self.shards = shards or max(1, (os.cpu_count() or 2) - 1)
+        self.ring_capacity = ring_capacity
+        self.poll_interval = poll_interval
+        self.batch_size = 1000
+
+        self.strategies: List[Tuple[str, Any, Dict[str, Any]]] = []
+        self.shard_specs: List[ShardSpec] = []
+        self.rings: List[ShmRing] = []
+        self.processes: List[Any] = []
+        self.shard_connected: List[bool] = []  # Market data connection reported by each worker
+        self.worker_restarts = 0
+        self.messages_processed = 0
+
+        self._context = mp.get_context('spawn')
+        self._stop_event = None
+        self._consumer_task: Optional[asyncio.Task] = None
+
+    def register_strategy(self, name: str, strategy_class, params: Dict[str, Any]):
+        """Register a strategy (forwarded to every worker when it starts)"""
+        self.strategies.append((name, strategy_class, params))
+        super().register_strategy(name, strategy_class, params)
+
+    @with_error_handling(circuit_breaker_name="paper_trader_startup", category=ErrorCategory.SYSTEM)
+    async def start(self, symbols: List[str] = None):
+        """Start one worker process per shard and the coordinator loops"""
+        if self.running:
+            logger.warning("Paper trader already running")
+            return
+
+        self.running = True
+        symbols = symbols or ['ETHUSDT']
+        self._stop_event = self._context.Event()
+
+        for shard_id, shard_symbols in enumerate(partition_symbols(symbols, self.shards)):
+            ring = ShmRing(self.ring_capacity)
+            self.rings.append(ring)
+            self.shard_specs.append(ShardSpec(
+                shard_id=shard_id,
+                symbols=shard_symbols,
+                ring_name=ring.name,
+                ring_capacity=self.ring_capacity,
+                testnet=self.testnet,
+                signal_config=self.signal_config,
+                strategies=list(self.strategies),
+                signal_throttle=self.signal_throttle,
+                log_level=logging.getLogger().level
+            ))
+            self.processes.append(None)
+            self.shard_connected.append(False)
+            self._spawn(shard_id)
+
+        self._consumer_task = asyncio.create_task(self._consume_shards())
+        asyncio.create_task(self._process_order_queue())
+
+        logger.info(f"Sharded paper trader started: {len(self.shard_specs)} workers for symbols {symbols}")
+
+    def _spawn(self, shard_id: int):
+        process = self._context.Process(
+            target=run_shard,
+            args=(self.shard_specs[shard_id], self._stop_event),
+            name=f"shard-{shard_id}",
+            daemon=True
+        )
+        process.start()
+        self.processes[shard_id] = process
+
+    async def stop(self):
+        """Stop workers, apply their last messages and free the rings"""
+        if not self.running:
+            return
+
+        self.running = False
+        self._stop_event.set()
+
+        loop = asyncio.get_running_loop()
+        for process in self.processes:
+            await loop.run_in_executor(None, process.join, 5)
+            if process.is_alive():
+                logger.warning(f"Worker {process.name} did not stop, terminating")
+                process.terminate()
+
+        if self._consumer_task:
+            self._consumer_task.cancel()
+            await asyncio.gather(self._consumer_task, return_exceptions=True)
+            self._consumer_task = None
+
+        self.drain_shards()
+        for ring in self.rings:
+            ring.close()
+        self.rings.clear()
+        self.shard_specs.clear()
+        self.processes.clear()
+        self.shard_connected.clear()
+        logger.info("Sharded paper trader stopped")
+
+    @property
+    def connected(self) -> bool:
+        """Market data is connected when every worker reports its stream connected"""
+        return bool(self.shard_connected) and all(self.shard_connected)
+
+    async def _consume_shards(self):
+        """Apply worker messages; this loop is the only writer of balance and positions"""
+        last_check = time.monotonic()
+        while self.running:
+            try:
+                if self.drain_shards():
+                    await asyncio.sleep(0)
+                else:
+                    await asyncio.sleep(self.poll_interval)
+
+                if time.monotonic() - last_check >= 1.0:
+                    last_check = time.monotonic()
+                    self._check_workers()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error consuming shard messages: {e}")
+                await asyncio.sleep(1)
+
+    def drain_shards(self) -> int:
+        """Apply the pending messages of every ring; returns how many were applied"""
+        processed = 0
+        for shard_id, ring in enumerate(self.rings):
+            for message in ring.get_batch(self.batch_size).tolist():
+                try:
+                    self._apply_message(message, shard_id)
+                except Exception as e:
+                    logger.error(f"Error applying shard message: {e}")
+                processed += 1
+        self.messages_processed += processed
+        return processed
+
+    def _apply_message(self, message: tuple, shard_id: int = 0):
+        kind, side, symbol, strategy, ts, price, volume, confidence, atr, volume_ratio, adx, rsi = message
+        symbol = symbol.decode('utf-8')
+
+        if kind == MSG_STATUS:
+            if shard_id < len(self.shard_connected):
+                self.shard_connected[shard_id] = bool(side)
+        elif kind == MSG_PRICE:
+            self.current_prices[symbol] = price
+            self._update_position_pnl(symbol)
+            self.risk_manager.on_mark_price(symbol, price)
+        elif kind == MSG_SIGNAL:
+            self._on_shard_signal(TradingSignal(
+                symbol=symbol,
+                signal_type=SIDE_SIGNALS.get(side, 'HOLD'),
+                confidence=confidence,
+                timestamp=ts,
+                strategy=strategy.decode('utf-8'),
+                price=price,
+                indicators={'atr': atr, 'volume_ratio': volume_ratio, 'adx': adx, 'rsi': rsi}
+            ))
+
+    def _on_shard_signal(self, signal: TradingSignal):
+        """Same handling a signal gets in BybitPaperTrader, with the portfolio state owned here"""
+        logger.info(f"Signal generated: {signal.symbol} {signal.signal_type} @ {signal.price} (confidence: {signal.confidence:.2f})")
+        global_event_log.record_signal(signal)
+        self._on_signal_received(signal)
+
+        self.alert_manager.signal_generated(
+            symbol=signal.symbol,
+            signal_type=signal.signal_type,
+            price=signal.price,
+            confidence=signal.confidence,
+            strategy=signal.strategy
+        )
+        self.last_signal_time[signal.symbol] = time.time()
+        self._notify_signal_callbacks(signal)
+
+    def _check_workers(self):
+        """Restart workers that died (their ring, and so the message order, is kept)"""
+        for shard_id, process in enumerate(self.processes):
+            if self.running and process is not None and not process.is_alive():
+                self.worker_restarts += 1
+                logger.error(f"Worker {process.name} exited with code {process.exitcode}, restarting")
+                self.shard_connected[shard_id] = False
+                self._spawn(shard_id)
+
+    def get_shard_status(self) -> Dict[str, Any]:
+        """Workers, their symbols and pending messages"""
+        return {
+            'workers': [
+                {
+                    'shard': spec.shard_id,
+                    'symbols': spec.symbols,
+                    'alive': bool(process and process.is_alive()),
+                    'connected': connected,
+                    'pending_messages': len(ring)
+                }
+                for spec, process, ring, connected in zip(self.shard_specs, self.processes, self.rings,
+                                                          self.shard_connected)
+            ],
+            'messages_processed': self.messages_processed,
+            'worker_restarts': self.worker_restarts
+        }
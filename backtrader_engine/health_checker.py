@@ -4,6 +4,7 @@ Health Checker - Sistema de monitoreo de salud del bot
 
 import asyncio
 import logging
+import threading
 import time
 import psutil
 from typing import Dict, Any, List, Optional
@@ -33,51 +34,128 @@ class HealthCheck:
 class HealthChecker:
     """Sistema de health checks"""
     
+    # TTL y timeout por defecto (segundos)
+    DEFAULT_TTL = 30.0
+    DEFAULT_TIMEOUT = 5.0
+    
     def __init__(self):
         self.checks: List[callable] = []
+        self.check_options: Dict[str, Dict[str, float]] = {}
         self.last_results: Dict[str, HealthCheck] = {}
         self.logger = logging.getLogger("HealthChecker")
         
+        # Caché por check: nombre de función -> (instante monotónico, resultado)
+        self._cache: Dict[str, tuple] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.results_ready = threading.Event()  # Se activa tras el primer pase completo
+        
+        # Primera lectura de CPU: las siguientes con interval=None no bloquean
+        psutil.cpu_percent(interval=None)
+        
         # Registrar checks básicos
-        self.register_check(self._check_system_resources)
-        self.register_check(self._check_memory_usage)
-        self.register_check(self._check_disk_space)
-        self.register_check(self._check_network_connectivity)
+        self.register_check(self._check_system_resources, ttl=15)
+        self.register_check(self._check_memory_usage, ttl=15)
+        self.register_check(self._check_disk_space, ttl=300)
+        self.register_check(self._check_network_connectivity, ttl=60, timeout=10)
     
-    def register_check(self, check_func: callable):
-        """Registrar un health check"""
+    def register_check(self, check_func: callable, ttl: float = None, timeout: float = None):
+        """Registrar un health check con su TTL de caché y timeout"""
         self.checks.append(check_func)
+        self.check_options[check_func.__name__] = {
+            "ttl": self.DEFAULT_TTL if ttl is None else ttl,
+            "timeout": self.DEFAULT_TIMEOUT if timeout is None else timeout
+        }
         self.logger.info(f"Registered health check: {check_func.__name__}")
     
-    async def run_all_checks(self) -> Dict[str, HealthCheck]:
-        """Ejecutar todos los health checks"""
+    async def run_all_checks(self, force: bool = False) -> Dict[str, HealthCheck]:
+        """Ejecutar todos los health checks en paralelo (los resultados vigentes se reutilizan)"""
+        checks = await asyncio.gather(*(self._run_check(check_func, force) for check_func in self.checks))
+        
         results = {}
+        for result in checks:
+            results[result.name] = result
+            self.last_results[result.name] = result
+        self.results_ready.set()
+        return results
+    
+    async def _run_check(self, check_func: callable, force: bool = False) -> HealthCheck:
+        """Ejecutar un check con timeout, usando la caché mientras su TTL siga vigente"""
+        key = check_func.__name__
+        options = self.check_options.get(key, {"ttl": self.DEFAULT_TTL, "timeout": self.DEFAULT_TIMEOUT})
+        
+        cached = self._cache.get(key)
+        if not force and cached and time.monotonic() - cached[0] < options["ttl"]:
+            return cached[1]
+        
+        # Llamadas concurrentes comparten la misma ejecución
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._execute_check(check_func, options["timeout"]))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(inflight)
+    
+    async def _execute_check(self, check_func: callable, timeout: float) -> HealthCheck:
+        """Ejecutar el check y guardar el resultado en caché"""
+        start_time = time.time()
+        try:
+            result = await asyncio.wait_for(check_func(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"Health check {check_func.__name__} timed out after {timeout}s")
+            result = HealthCheck(
+                name=check_func.__name__,
+                status=HealthStatus.UNKNOWN,
+                message=f"Check timed out after {timeout}s",
+                timestamp=datetime.now(timezone.utc)
+            )
+        except Exception as e:
+            self.logger.error(f"Health check {check_func.__name__} failed: {e}")
+            result = HealthCheck(
+                name=check_func.__name__,
+                status=HealthStatus.UNKNOWN,
+                message=f"Check failed: {e}",
+                timestamp=datetime.now(timezone.utc)
+            )
         
-        for check_func in self.checks:
+        result.response_time_ms = (time.time() - start_time) * 1000
+        self._cache[check_func.__name__] = (time.monotonic(), result)
+        return result
+    
+    async def _run_blocking(self, func: callable, *args):
+        """Ejecutar una sonda bloqueante en el executor de hilos"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    def start_background_refresh(self, interval: float = 10.0):
+        """Mantener los resultados frescos desde una tarea en segundo plano"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self.refresh_forever(interval))
+    
+    async def stop_background_refresh(self):
+        """Detener el refresco en segundo plano"""
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
             try:
-                start_time = time.time()
-                result = await check_func()
-                response_time = (time.time() - start_time) * 1000
-                result.response_time_ms = response_time
-                results[result.name] = result
-                self.last_results[result.name] = result
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        self._refresh_task = None
+    
+    async def refresh_forever(self, interval: float = 10.0):
+        """Loop de refresco: cada check se re-ejecuta solo cuando vence su TTL"""
+        self.logger.info(f"Health check background refresh started (every {interval}s)")
+        while True:
+            try:
+                await self.run_all_checks()
             except Exception as e:
-                self.logger.error(f"Health check {check_func.__name__} failed: {e}")
-                result = HealthCheck(
-                    name=check_func.__name__,
-                    status=HealthStatus.UNKNOWN,
-                    message=f"Check failed: {e}",
-                    timestamp=datetime.now(timezone.utc)
-                )
-                results[result.name] = result
-                self.last_results[result.name] = result
-        
-        return results
+                self.logger.error(f"Error refreshing health checks: {e}")
+            await asyncio.sleep(interval)
     
     async def _check_system_resources(self) -> HealthCheck:
         """Check system CPU and memory usage"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # Uso medio desde la lectura anterior; no bloquea el event loop
+            cpu_percent = psutil.cpu_percent(interval=None)
             memory = psutil.virtual_memory()
             
             status = HealthStatus.HEALTHY
@@ -148,7 +226,7 @@ class HealthChecker:
     async def _check_disk_space(self) -> HealthCheck:
         """Check disk space"""
         try:
-            disk_usage = psutil.disk_usage('/')
+            disk_usage = await self._run_blocking(psutil.disk_usage, '/')
             free_gb = disk_usage.free / (1024**3)
             total_gb = disk_usage.total / (1024**3)
             used_percent = (disk_usage.used / disk_usage.total) * 100
@@ -189,7 +267,7 @@ class HealthChecker:
             
             # Test DNS resolution
             start_time = time.time()
-            socket.gethostbyname('google.com')
+            await self._run_blocking(socket.gethostbyname, 'google.com')
             dns_time = (time.time() - start_time) * 1000
             
             status = HealthStatus.HEALTHY
@@ -264,10 +342,10 @@ class TradingBotHealthChecker(HealthChecker):
         self.bot_instance = bot_instance
         
         # Registrar checks específicos del bot
-        self.register_check(self._check_bot_running)
-        self.register_check(self._check_websocket_connection)
-        self.register_check(self._check_recent_signals)
-        self.register_check(self._check_state_persistence)
+        self.register_check(self._check_bot_running, ttl=10)
+        self.register_check(self._check_websocket_connection, ttl=10)
+        self.register_check(self._check_recent_signals, ttl=60)
+        self.register_check(self._check_state_persistence, ttl=60)
     
     async def _check_bot_running(self) -> HealthCheck:
         """Check if bot is running"""
@@ -321,8 +399,9 @@ class TradingBotHealthChecker(HealthChecker):
                 )
             
             paper_trader = self.bot_instance.paper_trader
-            if hasattr(paper_trader, 'websocket') and paper_trader.websocket:
-                if paper_trader.websocket.connected:
+            if paper_trader is not None:
+                # Con sharding, ``connected`` agrega el estado que reporta cada worker
+                if paper_trader.connected:
                     return HealthCheck(
                         name="websocket_connection",
                         status=HealthStatus.HEALTHY,
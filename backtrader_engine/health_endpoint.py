@@ -4,6 +4,7 @@ Health Check Endpoint - API endpoint para health checks
 
 import json
 import asyncio
+import threading
 from typing import Dict, Any
 from datetime import datetime, timezone
 from pathlib import Path
@@ -21,12 +22,42 @@ class HealthEndpoint:
     def __init__(self, bot_instance=None):
         self.bot_instance = bot_instance
         self.health_checker = TradingBotHealthChecker(bot_instance)
+        self._refresh_thread = None
+    
+    def start(self, refresh_interval: float = 10.0):
+        """Arrancar el refresco en segundo plano (requiere event loop en marcha)"""
+        self.health_checker.start_background_refresh(refresh_interval)
+    
+    def start_in_thread(self, refresh_interval: float = 10.0):
+        """Arrancar el refresco en un hilo con su propio event loop (llamadores sin loop persistente, como el dashboard)"""
+        if self._refresh_thread is None or not self._refresh_thread.is_alive():
+            self._refresh_thread = threading.Thread(
+                target=asyncio.run, args=(self.health_checker.refresh_forever(refresh_interval),),
+                name="health-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+    
+    async def stop(self):
+        """Detener el refresco en segundo plano"""
+        await self.health_checker.stop_background_refresh()
+    
+    async def _ensure_results(self):
+        """Los checks solo se ejecutan al leer si todavía no hay resultados; después los mantiene el refresco"""
+        if self.health_checker.last_results:
+            return
+        
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            # El primer pase corre en el hilo de refresco: esperarlo sin bloquear este loop
+            timeout = max(options["timeout"] for options in self.health_checker.check_options.values())
+            await asyncio.to_thread(self.health_checker.results_ready.wait, timeout + 1)
+        else:
+            await self.health_checker.run_all_checks()
     
     async def get_health_status(self) -> Dict[str, Any]:
-        """Obtener estado de salud completo"""
+        """Obtener estado de salud completo (últimos resultados, sin esperar a los checks)"""
         try:
-            # Run all health checks
-            health_results = await self.health_checker.run_all_checks()
+            await self._ensure_results()
+            health_results = dict(self.health_checker.last_results)
             overall_status = self.health_checker.get_overall_status()
             summary = self.health_checker.get_status_summary()
             
@@ -57,6 +88,7 @@ class HealthEndpoint:
     async def get_quick_health(self) -> Dict[str, Any]:
         """Obtener health check rápido (solo estado general)"""
         try:
+            await self._ensure_results()
             overall_status = self.health_checker.get_overall_status()
             summary = self.health_checker.get_status_summary()
             
@@ -77,17 +109,24 @@ class HealthEndpoint:
                 "overall_status": "unknown"
             }
 
+# Endpoint compartido entre llamadas del dashboard: conserva la caché de resultados
+_dashboard_endpoint = None
+
 # Función para usar desde el dashboard
 async def get_bot_health_status() -> Dict[str, Any]:
     """Función helper para obtener estado de salud del bot"""
+    global _dashboard_endpoint
     try:
         # Intentar importar el bot si está disponible
         from paper_trading_main import VSTRUTradingBot
         
-        # Crear endpoint
-        endpoint = HealthEndpoint()
+        # Crear endpoint; el dashboard abre un loop nuevo por llamada, así que el refresco vive en su propio hilo
+        if _dashboard_endpoint is None:
+            _dashboard_endpoint = HealthEndpoint()
+        endpoint = _dashboard_endpoint
+        endpoint.start_in_thread()
         
-        # Obtener estado rápido
+        # Obtener estado rápido (resultados en caché, mantenidos por el refresco)
         return await endpoint.get_quick_health()
         
     except ImportError:
@@ -0,0 +1,85 @@
+"""
+Latency Tracer - Trazas de latencia tick-to-order del pipeline en vivo
+Marcas con time.perf_counter_ns() viajan con el mensaje y terminan en histogramas por etapa
+"""
+
+import contextvars
+import logging
+import os
+import random
+import time
+from typing import List, Optional, Tuple
+
+from metrics_collector import global_metrics_collector
+
+logger = logging.getLogger(__name__)
+
+# Buckets en segundos: de 50µs a 1s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Traza del tick en curso; los callbacks síncronos (señal -> orden) la heredan
+current_trace: contextvars.ContextVar = contextvars.ContextVar("latency_trace", default=None)
+
+class LatencyTrace:
+    """Marcas monotónicas (ns) de un tick a lo largo del pipeline"""
+
+    __slots__ = ("start_ns", "marks", "finished")
+
+    def __init__(self, start_ns: int):
+        self.start_ns = start_ns
+        self.marks: List[Tuple[str, int]] = []
+        self.finished = False
+
+    def mark(self, stage: str):
+        """Cerrar la etapa ``stage`` en el instante actual"""
+        if not self.finished:
+            self.marks.append((stage, time.perf_counter_ns()))
+
+class LatencyTracer:
+    """Muestreo de trazas y exportación de latencias al metrics collector"""
+
+    def __init__(self, sample_rate: float = 0.1, metrics_collector=None):
+        self.sample_rate = sample_rate
+        self.metrics_collector = metrics_collector or global_metrics_collector
+
+        registry = self.metrics_collector.registry
+        self.stage_histogram = registry.histogram(
+            "pipeline_stage_latency_seconds", "Latency of each live pipeline stage",
+            ("stage",), buckets=LATENCY_BUCKETS
+        )
+        self.total_histogram = registry.histogram(
+            "tick_to_order_latency_seconds", "Latency from WebSocket frame to pipeline outcome",
+            ("outcome",), buckets=LATENCY_BUCKETS
+        )
+        self._stage_children = {}
+
+    def start(self, start_ns: Optional[int] = None) -> Optional[LatencyTrace]:
+        """Iniciar traza si el tick entra en la muestra (None si no)"""
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return None
+        return LatencyTrace(start_ns if start_ns is not None else time.perf_counter_ns())
+
+    def set_sample_rate(self, sample_rate: float):
+        """Ajustar la fracción de ticks trazados (0 desactiva)"""
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        logger.info(f"Latency trace sample rate set to {self.sample_rate}")
+
+    def finish(self, trace: Optional[LatencyTrace], outcome: str):
+        """Cerrar la traza y observar la latencia de cada etapa y la total"""
+        if trace is None or trace.finished:
+            return
+        trace.finished = True
+
+        previous = trace.start_ns
+        for stage, timestamp in trace.marks:
+            child = self._stage_children.get(stage)
+            if child is None:
+                child = self._stage_children[stage] = self.stage_histogram.labels(stage)
+            child.observe((timestamp - previous) / 1e9)
+            previous = timestamp
+
+        end = trace.marks[-1][1] if trace.marks else time.perf_counter_ns()
+        self.total_histogram.labels(outcome).observe((end - trace.start_ns) / 1e9)
+
+# Instancia global del tracer (LATENCY_TRACE_SAMPLE_RATE=0 lo desactiva)
+global_latency_tracer = LatencyTracer(sample_rate=float(os.getenv("LATENCY_TRACE_SAMPLE_RATE", "0.1")))
@@ -0,0 +1,242 @@
+"""
+Log Analytics - Extracción de eventos de los logs para los reportes de test 24h/72h
+Los archivos se parten en rangos de bytes alineados a líneas que se procesan en un pool de
+procesos; cada línea pasa por filtros de subcadena antes de cualquier regex y los eventos se
+guardan en tablas columnares cacheadas por archivo (tamaño/mtime), de modo que un nuevo
+reporte solo procesa lo añadido al log
+"""
+
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tamaño de cada rango de bytes; por debajo de PARALLEL_BYTES se procesa en el propio proceso
+RANGE_BYTES = 16 * 1024 * 1024
+PARALLEL_BYTES = 32 * 1024 * 1024
+
+# Los matches empiezan siempre al inicio de una palabra: \b evita reintentar desde cada carácter
+SIGNAL_RE = re.compile(r'\b(\w+)\s+signal.*symbol[:\s]+(\w+).*confidence[:\s]+([\d.]+)')
+STRATEGY_RE = re.compile(r'\b(\w+Strategy).*signal', re.IGNORECASE)
+TIMESTAMP_RE = re.compile(r'\[(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})\]')
+
+# Tablas de eventos: nombre -> columnas
+EVENT_COLUMNS = {
+    'signals': ('type', 'symbol', 'confidence', 'timestamp'),
+    'strategy_signals': ('strategy',),
+    'trades': ('timestamp', 'details'),
+    'risk_rejections': ('timestamp', 'reason'),
+    'errors': ('timestamp', 'message'),
+}
+
+def empty_tables() -> Dict[str, Dict[str, list]]:
+    return {name: {column: [] for column in columns} for name, columns in EVENT_COLUMNS.items()}
+
+def extend_tables(tables: Dict[str, Dict[str, list]], other: Dict[str, Dict[str, list]]):
+    """Añadir las filas de ``other`` al final de ``tables``"""
+    for name, columns in other.items():
+        for column, values in columns.items():
+            tables[name][column].extend(values)
+
+def _timestamp(line: str) -> str:
+    match = TIMESTAMP_RE.search(line)
+    return match.group(1) if match else "N/A"
+
+def parse_text(text: str) -> Dict[str, Dict[str, list]]:
+    """Extraer eventos de un bloque de líneas"""
+    tables = empty_tables()
+    signals = tables['signals']
+    strategy_signals = tables['strategy_signals']['strategy']
+    trades = tables['trades']
+    rejections = tables['risk_rejections']
+    errors = tables['errors']
+
+    # Un solo lower() para todo el bloque en lugar de uno por línea
+    for line, lower in zip(text.split('\n'), text.lower().split('\n')):
+        # Filtro rápido: la mayoría de líneas no contiene ninguna palabra clave
+        has_signal = 'signal' in lower
+        has_order = 'order' in lower
+        is_error = 'ERROR' in line or 'Exception' in line
+        is_risk = 'Risk Manager' in line
+        if not (has_signal or has_order or is_error or is_risk):
+            continue
+
+        if has_signal:
+            # Señales generadas
+            if 'BUY signal' in line or 'SELL signal' in line:
+                match = SIGNAL_RE.search(line)
+                if match:
+                    signal_type, symbol, confidence = match.groups()
+                    try:
+                        confidence = float(confidence)
+                    except ValueError:
+                        continue  # Línea malformada (p.ej. "1.2.3"): se descarta entera
+                    signals['type'].append(signal_type)
+                    signals['symbol'].append(symbol)
+                    signals['confidence'].append(confidence)
+                    signals['timestamp'].append(_timestamp(line))
+
+            # Señales por estrategia
+            if 'Strategy' in line and ('signal' in line or 'Signal' in line):
+                match = STRATEGY_RE.search(line)
+                if match:
+                    strategy_signals.append(match.group(1))
+
+        # Rechazos del risk manager
+        if is_risk and ('reject' in lower or 'reason' in lower):
+            rejections['timestamp'].append(_timestamp(line))
+            rejections['reason'].append(line.strip())
+
+        # Errores
+        if is_error:
+            errors['timestamp'].append(_timestamp(line))
+            errors['message'].append(line.strip())
+
+        # Trades ejecutados
+        if has_order and ('executed' in lower or 'opened' in lower):
+            trades['timestamp'].append(_timestamp(line))
+            trades['details'].append(line.strip())
+
+    return tables
+
+def parse_range(path: str, start: int, end: int) -> Dict[str, Dict[str, list]]:
+    """Procesar las líneas completas de [start, end) (se ejecuta en un proceso del pool)"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return parse_text(data.decode('utf-8', errors='ignore'))
+
+def split_ranges(path: str, start: int, end: int, range_bytes: int = RANGE_BYTES) -> List[Tuple[int, int]]:
+    """Partir [start, end) en rangos que empiezan y acaban en límites de línea"""
+    ranges = []
+    with open(path, 'rb') as f:
+        while start < end:
+            boundary = start + range_bytes
+            if boundary >= end:
+                ranges.append((start, end))
+                break
+            f.seek(boundary)
+            # Avanzar hasta el final de la línea en curso
+            while True:
+                block = f.read(64 * 1024)
+                newline = block.find(b'\n')
+                if newline >= 0:
+                    boundary = f.tell() - len(block) + newline + 1
+                    break
+                if not block:
+                    boundary = end
+                    break
+            boundary = min(boundary, end)
+            ranges.append((start, boundary))
+            start = boundary
+    return ranges
+
+def complete_lines_end(path: str, start: int, size: int) -> int:
+    """Offset tras el último salto de línea de [start, size); la última línea puede estar escribiéndose"""
+    with open(path, 'rb') as f:
+        position = size
+        while position > start:
+            step = min(64 * 1024, position - start)
+            f.seek(position - step)
+            block = f.read(step)
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                return position - step + newline + 1
+            position -= step
+    return start
+
+class LogAnalytics:
+    """Motor de análisis de logs con caché incremental por archivo"""
+
+    def __init__(self, log_dir: str = "logs", cache_file: Optional[str] = None, max_workers: Optional[int] = None):
+        self.log_dir = Path(log_dir)
+        self.cache_file = Path(cache_file) if cache_file else self.log_dir / ".log_analytics_cache.json"
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache: Dict[str, Dict[str, Any]] = self._load_cache()
+
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        tmp_path = self.cache_file.with_name(self.cache_file.name + ".tmp")
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.cache, f)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            logger.error(f"Error saving log analytics cache: {e}")
+
+    def load(self, pattern: str = "*.log") -> Dict[str, Dict[str, list]]:
+        """Tablas de eventos de todos los logs (en el orden de glob, como el análisis original)"""
+        log_files = [str(path) for path in self.log_dir.glob(pattern)]
+        pending: Dict[str, Tuple[int, int]] = {}
+        changed = False
+
+        for path in log_files:
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                logger.error(f"Error reading {path}: {e}")
+                continue
+
+            entry = self.cache.get(path)
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                continue  # Sin cambios
+
+            if not entry or entry["inode"] != stat.st_ino or stat.st_size < entry["offset"]:
+                # Archivo nuevo, rotado o truncado: procesarlo entero
+                entry = self.cache[path] = {"offset": 0, "tables": empty_tables()}
+            entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, inode=stat.st_ino)
+
+            end = complete_lines_end(path, entry["offset"], stat.st_size)
+            if end > entry["offset"]:
+                pending[path] = (entry["offset"], end)
+            changed = True
+
+        if pending:
+            self._parse_pending(pending)
+
+        # Olvidar archivos que ya no existen
+        for path in set(self.cache) - set(log_files):
+            del self.cache[path]
+            changed = True
+
+        if changed:
+            self._save_cache()
+
+        tables = empty_tables()
+        for path in log_files:
+            entry = self.cache.get(path)
+            if entry:
+                extend_tables(tables, entry["tables"])
+                if entry["offset"] < entry["size"]:
+                    # Última línea sin salto de línea: se incluye en el resultado pero no en la caché
+                    extend_tables(tables, parse_range(path, entry["offset"], entry["size"]))
+        return tables
+
+    def _parse_pending(self, pending: Dict[str, Tuple[int, int]]):
+        """Procesar los bytes nuevos de cada archivo, en paralelo si el volumen lo justifica"""
+        jobs = [(path, start, end) for path, (first, last) in pending.items()
+                for start, end in split_ranges(path, first, last)]
+        total = sum(end - start for _, start, end in jobs)
+
+        if total >= PARALLEL_BYTES and len(jobs) > 1 and self.max_workers > 1:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(jobs))) as executor:
+                results = list(executor.map(parse_range, *zip(*jobs)))
+        else:
+            results = [parse_range(path, start, end) for path, start, end in jobs]
+
+        # Los resultados llegan en el orden de los rangos: se añaden tal cual
+        for (path, _, end), tables in zip(jobs, results):
+            entry = self.cache[path]
+            extend_tables(entry["tables"], tables)
+            entry["offset"] = end
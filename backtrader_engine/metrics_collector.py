@@ -4,12 +4,14 @@ Metrics Collector - Sistema de métricas para Prometheus
 
 import time
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple, Sequence, Callable, Container
 from datetime import datetime, timezone
 from dataclasses import dataclass
 from enum import Enum
+from bisect import bisect_left
+import itertools
 import threading
-from collections import defaultdict, deque
+from collections import deque
 
 logger = logging.getLogger(__name__)
 
@@ -30,15 +32,340 @@ class Metric:
     timestamp: float
     help_text: str = ""
 
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+class _ThreadCells:
+    """Celdas por hilo: cada hilo solo escribe la suya, así que no hace falta lock al actualizar"""
+    
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+        self._lock = threading.Lock()
+    
+    def cell(self) -> List[float]:
+        """Celda del hilo actual"""
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0.0] * self._size
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+            return cell
+    
+    def totals(self) -> List[float]:
+        """Sumar las celdas de todos los hilos"""
+        with self._lock:
+            cells = list(self._cells)
+        return [sum(values) for values in zip(*cells)] if cells else [0.0] * self._size
+
+class CounterChild:
+    """Serie de un contador con labels ya resueltos"""
+    
+    def __init__(self, family: "MetricFamily"):
+        self._family = family
+        self._cells = _ThreadCells(1)
+        self.version = 0  # Cambia en cada actualización (caché de exposición)
+    
+    def inc(self, amount: float = 1.0):
+        """Incrementar contador"""
+        try:
+            self._cells._local.cell[0] += amount
+        except AttributeError:
+            self._cells.cell()[0] += amount
+        self._family.touch(self)
+    
+    def get(self) -> float:
+        """Valor actual"""
+        return self._cells.totals()[0]
+
+class GaugeChild:
+    """Serie de un gauge con labels ya resueltos"""
+    
+    def __init__(self, family: "MetricFamily"):
+        self._family = family
+        self._value = 0.0
+        self._lock = threading.Lock()
+        self.version = 0
+    
+    def set(self, value: float):
+        """Establecer valor (una asignación: atómica)"""
+        self._value = value
+        self._family.touch(self)
+    
+    def inc(self, amount: float = 1.0):
+        """Incrementar gauge"""
+        with self._lock:
+            self._value += amount
+        self._family.touch(self)
+    
+    def dec(self, amount: float = 1.0):
+        """Decrementar gauge"""
+        self.inc(-amount)
+    
+    def get(self) -> float:
+        """Valor actual"""
+        return self._value
+
+class HistogramChild:
+    """Serie de un histograma con buckets fijos"""
+    
+    def __init__(self, family: "MetricFamily"):
+        self._family = family
+        self._bounds = family.buckets
+        # Celda: [contadores por bucket..., +Inf, suma]
+        self._cells = _ThreadCells(len(self._bounds) + 2)
+        self.last = 0.0
+        self.version = 0
+    
+    def observe(self, value: float):
+        """Observar valor"""
+        try:
+            cell = self._cells._local.cell
+        except AttributeError:
+            cell = self._cells.cell()
+        cell[bisect_left(self._bounds, value)] += 1
+        cell[-1] += value
+        self.last = value
+        self._family.touch(self)
+    
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """Buckets acumulados, suma y número de observaciones"""
+        totals = self._cells.totals()
+        cumulative, running = [], 0.0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-1], running
+    
+    def get(self) -> float:
+        """Última observación (compatibilidad con get_metric)"""
+        return self.last
+
+class SummaryChild:
+    """Serie de un summary con cuantiles sobre una ventana de observaciones"""
+    
+    def __init__(self, family: "MetricFamily"):
+        self._family = family
+        self._window = deque(maxlen=family.max_samples)  # append es thread-safe
+        self._cells = _ThreadCells(2)  # [número, suma]
+        self.last = 0.0
+        self.version = 0
+    
+    def observe(self, value: float):
+        """Observar valor"""
+        self._window.append(value)
+        cell = self._cells.cell()
+        cell[0] += 1
+        cell[1] += value
+        self.last = value
+        self._family.touch(self)
+    
+    def snapshot(self) -> Tuple[Dict[float, float], float, float]:
+        """Cuantiles de la ventana, suma y número de observaciones"""
+        samples = sorted(self._window)
+        quantiles = {}
+        for q in self._family.quantiles:
+            quantiles[q] = samples[min(len(samples) - 1, int(q * len(samples)))] if samples else float("nan")
+        count, total = self._cells.totals()
+        return quantiles, total, count
+    
+    def get(self) -> float:
+        """Última observación (compatibilidad con get_metric)"""
+        return self.last
+
+_CHILD_TYPES = {
+    MetricType.COUNTER: CounterChild,
+    MetricType.GAUGE: GaugeChild,
+    MetricType.HISTOGRAM: HistogramChild,
+    MetricType.SUMMARY: SummaryChild,
+}
+
+class MetricFamily:
+    """Métrica con nombre y labels fijos; cada combinación de valores es una serie"""
+    
+    def __init__(self, name: str, metric_type: MetricType, help_text: str = "",
+                 labelnames: Sequence[str] = (), default_labels: Dict[str, str] = None,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 quantiles: Sequence[float] = DEFAULT_QUANTILES, max_samples: int = 1000):
+        self.name = name
+        self.metric_type = metric_type
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.default_labels = dict(default_labels or {})
+        self.buckets = tuple(sorted(b for b in buckets if b != float("inf")))
+        self.quantiles = tuple(quantiles)
+        self.max_samples = max_samples
+        self.children: Dict[Tuple[str, ...], Any] = {}
+        self.last_child = None
+        self.version = 0  # Cambia con cualquier actualización de sus series
+        self._versions = itertools.count(1)  # next() es atómico: ninguna actualización pierde su versión
+        self._lock = threading.Lock()
+    
+    def touch(self, child):
+        """Marcar una actualización de la serie con una versión nueva (familia y serie)"""
+        version = next(self._versions)
+        child.version = version
+        self.version = version
+        self.last_child = child
+    
+    def labels(self, *values: str, **labels: str):
+        """Obtener (o crear) la serie para unos valores de labels; guardar el resultado evita la búsqueda"""
+        if labels:
+            if tuple(labels) == self.labelnames:
+                # Caso habitual: todos los labels, en orden
+                child = self.children.get(tuple(labels.values()))
+                if child is not None:
+                    return child
+            unknown = set(labels) - set(self.labelnames)
+            if unknown:
+                raise ValueError(f"Unknown labels for {self.name}: {sorted(unknown)}")
+            values = tuple(str(labels.get(name, self.default_labels.get(name, ""))) for name in self.labelnames)
+        elif len(values) != len(self.labelnames):
+            values = tuple(str(self.default_labels.get(name, "")) for name in self.labelnames)
+        
+        child = self.children.get(values)
+        if child is None:
+            with self._lock:
+                child = self.children.get(values)
+                if child is None:
+                    child = _CHILD_TYPES[self.metric_type](self)
+                    self.children[values] = child
+                    self.version = next(self._versions)
+        return child
+    
+    def series(self) -> List[Tuple[Dict[str, str], Any]]:
+        """Todas las series como (labels, child)"""
+        return [(dict(zip(self.labelnames, values)), child) for values, child in list(self.children.items())]
+
+class MetricsRegistry:
+    """Registro de familias de métricas"""
+    
+    def __init__(self):
+        self.families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, name: str, metric_type: MetricType, help_text: str = "",
+                 labelnames: Sequence[str] = (), **kwargs) -> MetricFamily:
+        """Registrar una familia (idempotente si el tipo coincide)"""
+        with self._lock:
+            family = self.families.get(name)
+            if family is None:
+                family = MetricFamily(name, metric_type, help_text, labelnames, **kwargs)
+                self.families[name] = family
+            elif family.metric_type != metric_type:
+                raise ValueError(f"Metric {name} already registered as {family.metric_type.value}")
+            return family
+    
+    def counter(self, name: str, help_text: str = "", labelnames: Sequence[str] = (), **kwargs) -> MetricFamily:
+        return self.register(name, MetricType.COUNTER, help_text, labelnames, **kwargs)
+    
+    def gauge(self, name: str, help_text: str = "", labelnames: Sequence[str] = (), **kwargs) -> MetricFamily:
+        return self.register(name, MetricType.GAUGE, help_text, labelnames, **kwargs)
+    
+    def histogram(self, name: str, help_text: str = "", labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs) -> MetricFamily:
+        return self.register(name, MetricType.HISTOGRAM, help_text, labelnames, buckets=buckets, **kwargs)
+    
+    def summary(self, name: str, help_text: str = "", labelnames: Sequence[str] = (),
+                quantiles: Sequence[float] = DEFAULT_QUANTILES, **kwargs) -> MetricFamily:
+        return self.register(name, MetricType.SUMMARY, help_text, labelnames, quantiles=quantiles, **kwargs)
+    
+    def get(self, name: str) -> Optional[MetricFamily]:
+        return self.families.get(name)
+    
+    def export_text(self) -> str:
+        """Exposición en formato de texto Prometheus, una línea por serie"""
+        lines = []
+        for family in list(self.families.values()):
+            lines.extend(render_family(family))
+        return "\n".join(lines) + "\n"
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str], extra: Tuple[str, str] = None) -> str:
+    items = list(labels.items())
+    if extra:
+        items.append(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(str(v))}"' for k, v in items) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value))
+
+def openmetrics_name(family: MetricFamily) -> str:
+    """Nombre de familia OpenMetrics (los contadores van sin el sufijo _total)"""
+    if family.metric_type == MetricType.COUNTER and family.name.endswith("_total"):
+        return family.name[:-len("_total")]
+    return family.name
+
+def render_series(family: MetricFamily, labels: Dict[str, str], child, openmetrics: bool = False) -> List[str]:
+    """Líneas de exposición de una serie"""
+    name = family.name
+    if family.metric_type == MetricType.HISTOGRAM:
+        cumulative, total, count = child.snapshot()
+        lines = [
+            f"{name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {_format_value(cumulative[i])}"
+            for i, bound in enumerate(family.buckets + (float("inf"),))
+        ]
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {_format_value(count)}")
+        return lines
+    if family.metric_type == MetricType.SUMMARY:
+        quantiles, total, count = child.snapshot()
+        lines = [
+            f"{name}{_format_labels(labels, ('quantile', str(q)))} {_format_value(v)}"
+            for q, v in quantiles.items()
+        ]
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {_format_value(count)}")
+        return lines
+    if openmetrics and family.metric_type == MetricType.COUNTER:
+        name = openmetrics_name(family) + "_total"
+    return [f"{name}{_format_labels(labels)} {_format_value(child.get())}"]
+
+def render_header(family: MetricFamily, openmetrics: bool = False) -> List[str]:
+    """Líneas HELP/TYPE de una familia"""
+    name = openmetrics_name(family) if openmetrics else family.name
+    lines = []
+    if family.help_text:
+        lines.append(f"# HELP {name} {family.help_text}")
+    lines.append(f"# TYPE {name} {family.metric_type.value}")
+    return lines
+
+def render_family(family: MetricFamily, openmetrics: bool = False) -> List[str]:
+    """Líneas HELP/TYPE y todas las series de una familia"""
+    lines = render_header(family, openmetrics)
+    for labels, child in family.series():
+        lines.extend(render_series(family, labels, child, openmetrics))
+    return lines
+
+def snapshot_series(family: MetricFamily, child) -> Dict[str, Any]:
+    """Valores de una serie como diccionario (snapshot JSON)"""
+    if family.metric_type == MetricType.HISTOGRAM:
+        cumulative, total, count = child.snapshot()
+        bounds = [_format_value(b) for b in family.buckets + (float("inf"),)]
+        return {"buckets": dict(zip(bounds, cumulative)), "sum": total, "count": count}
+    if family.metric_type == MetricType.SUMMARY:
+        quantiles, total, count = child.snapshot()
+        return {"quantiles": {str(q): (v if v == v else None) for q, v in quantiles.items()}, "sum": total, "count": count}
+    return {"value": child.get()}
+
 class MetricsCollector:
     """Recolector de métricas para el bot de trading"""
     
     def __init__(self):
-        self.metrics: Dict[str, Metric] = {}
-        self.counters: Dict[str, float] = defaultdict(float)
-        self.gauges: Dict[str, float] = defaultdict(float)
-        self.histograms: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
+        self.registry = MetricsRegistry()
         self.lock = threading.Lock()
+        self.listeners: List[Tuple[Callable[[str, Metric], None], Optional[Container[str]]]] = []
         self.logger = logging.getLogger("MetricsCollector")
         
         # Métricas del bot
@@ -77,86 +404,123 @@ class MetricsCollector:
         self.logger.info("Metrics collector initialized")
     
     def _create_metric(self, name: str, value: float, labels: Dict[str, str], metric_type: MetricType, help_text: str = ""):
-        """Crear una nueva métrica"""
-        with self.lock:
-            self.metrics[name] = Metric(
-                name=name,
-                value=value,
-                labels=labels,
-                metric_type=metric_type,
-                timestamp=time.time(),
-                help_text=help_text
-            )
+        """Crear una nueva métrica; los labels iniciales fijan los nombres de label y sus valores por defecto"""
+        family = self.registry.register(name, metric_type, help_text, tuple(labels), default_labels=labels)
+        child = family.labels(**labels)
+        if metric_type == MetricType.COUNTER:
+            if value:
+                child.inc(value)
+        elif metric_type == MetricType.GAUGE:
+            child.set(value)
+        return family
+    
+    def _family(self, name: str, metric_type: MetricType, labels: Optional[Dict[str, str]]) -> MetricFamily:
+        """Familia registrada o una nueva creada al vuelo"""
+        family = self.registry.families.get(name)
+        if family is None:
+            family = self.registry.register(name, metric_type, "", tuple(labels or {}))
+        elif family.metric_type != metric_type:
+            raise ValueError(f"Metric {name} is a {family.metric_type.value}, not a {metric_type.value}")
+        return family
+    
+    def counter(self, name: str, labels: Dict[str, str] = None) -> CounterChild:
+        """Serie de contador pre-resuelta para rutas calientes"""
+        family = self._family(name, MetricType.COUNTER, labels)
+        return family.labels(**labels) if labels else family.labels()
+    
+    def gauge(self, name: str, labels: Dict[str, str] = None) -> GaugeChild:
+        """Serie de gauge pre-resuelta para rutas calientes"""
+        family = self._family(name, MetricType.GAUGE, labels)
+        return family.labels(**labels) if labels else family.labels()
+    
+    def histogram(self, name: str, labels: Dict[str, str] = None) -> HistogramChild:
+        """Serie de histograma pre-resuelta para rutas calientes"""
+        return self._family(name, MetricType.HISTOGRAM, labels).labels(**(labels or {}))
     
     def increment_counter(self, name: str, value: float = 1.0, labels: Dict[str, str] = None):
         """Incrementar contador"""
-        with self.lock:
-            key = f"{name}_{self._labels_to_key(labels or {})}"
-            self.counters[key] += value
-            self._update_metric(name, self.counters[key], labels or {})
+        self.counter(name, labels).inc(value)
+        if self.listeners:
+            self._notify_listeners(name)
     
     def set_gauge(self, name: str, value: float, labels: Dict[str, str] = None):
         """Establecer valor de gauge"""
-        with self.lock:
-            key = f"{name}_{self._labels_to_key(labels or {})}"
-            self.gauges[key] = value
-            self._update_metric(name, value, labels or {})
+        self.gauge(name, labels).set(value)
+        if self.listeners:
+            self._notify_listeners(name)
     
     def observe_histogram(self, name: str, value: float, labels: Dict[str, str] = None):
         """Observar valor en histograma"""
-        with self.lock:
-            key = f"{name}_{self._labels_to_key(labels or {})}"
-            self.histograms[key].append(value)
-            self._update_metric(name, value, labels or {})
-    
-    def _update_metric(self, name: str, value: float, labels: Dict[str, str]):
-        """Actualizar métrica existente"""
-        if name in self.metrics:
-            self.metrics[name].value = value
-            self.metrics[name].labels.update(labels)
-            self.metrics[name].timestamp = time.time()
-    
-    def _labels_to_key(self, labels: Dict[str, str]) -> str:
-        """Convertir labels a clave"""
-        if not labels:
-            return ""
-        return "_".join([f"{k}={v}" for k, v in sorted(labels.items())])
+        self.histogram(name, labels).observe(value)
+        if self.listeners:
+            self._notify_listeners(name)
+    
+    def add_listener(self, listener: Callable[[str, Metric], None], metrics: Optional[Container[str]] = None):
+        """
+        Registrar callback(nombre, métrica agregada) para cambios vía la API del collector.
+
+        ``metrics`` son los nombres que interesan al listener (p.ej. un set que el listener sigue
+        ampliando); las demás escrituras no lo notifican ni pagan la agregación. None: todas.
+        """
+        self.listeners.append((listener, metrics))
+    
+    def _notify_listeners(self, name: str):
+        """Notificar a los listeners interesados el nuevo valor agregado de una métrica"""
+        listeners = [listener for listener, metrics in self.listeners if metrics is None or name in metrics]
+        if not listeners:
+            return
+        metric = self._aggregate_metric(self.registry.families[name])
+        for listener in listeners:
+            try:
+                listener(name, metric)
+            except Exception as e:
+                self.logger.error(f"Error in metrics listener: {e}")
+    
+    def _to_metric(self, family: MetricFamily, labels: Dict[str, str], value: float) -> Metric:
+        return Metric(
+            name=family.name,
+            value=value,
+            labels=labels,
+            metric_type=family.metric_type,
+            timestamp=time.time(),
+            help_text=family.help_text
+        )
     
     def get_metric(self, name: str, labels: Dict[str, str] = None) -> Optional[Metric]:
-        """Obtener métrica específica"""
-        with self.lock:
-            if name in self.metrics:
-                metric = self.metrics[name]
-                if labels:
-                    metric.labels.update(labels)
-                return metric
+        """Obtener métrica específica (sin labels: la última serie actualizada)"""
+        family = self.registry.families.get(name)
+        if family is None:
             return None
+        if labels:
+            child = family.labels(**labels)
+        else:
+            child = family.last_child or family.labels()
+        series_labels = next((l for l, c in family.series() if c is child), dict(labels or {}))
+        return self._to_metric(family, series_labels, child.get())
     
     def get_all_metrics(self) -> Dict[str, Metric]:
-        """Obtener todas las métricas"""
-        with self.lock:
-            return self.metrics.copy()
+        """Obtener todas las métricas, un valor por nombre (contadores sumados sobre todas sus series)"""
+        return {name: self._aggregate_metric(family) for name, family in list(self.registry.families.items())}
+    
+    def _aggregate_metric(self, family: MetricFamily) -> Metric:
+        """Un valor por familia: suma de series para contadores, última serie actualizada para el resto"""
+        if family.metric_type == MetricType.COUNTER:
+            series = family.series()
+            labels = series[0][0] if len(series) == 1 else {}
+            return self._to_metric(family, labels, sum(child.get() for _, child in series))
+        return self.get_metric(family.name)
+    
+    def get_all_series(self) -> List[Metric]:
+        """Obtener todas las series de todas las métricas"""
+        return [
+            self._to_metric(family, labels, child.get())
+            for family in list(self.registry.families.values())
+            for labels, child in family.series()
+        ]
     
     def export_prometheus_format(self) -> str:
         """Exportar métricas en formato Prometheus"""
-        with self.lock:
-            lines = []
-            
-            # Agregar comentarios de ayuda
-            for name, metric in self.metrics.items():
-                if metric.help_text:
-                    lines.append(f"# HELP {name} {metric.help_text}")
-                lines.append(f"# TYPE {name} {metric.metric_type.value}")
-            
-            # Agregar métricas
-            for name, metric in self.metrics.items():
-                labels_str = ""
-                if metric.labels:
-                    labels_str = "{" + ",".join([f'{k}="{v}"' for k, v in metric.labels.items()]) + "}"
-                
-                lines.append(f"{name}{labels_str} {metric.value} {int(metric.timestamp * 1000)}")
-            
-            return "\n".join(lines)
+        return self.registry.export_text()
     
     # Métodos específicos para el bot de trading
     def record_signal(self, strategy: str = "vstru"):
@@ -175,10 +539,7 @@ class MetricsCollector:
                 self.increment_counter("trading_trades_losses")
         
         # Actualizar PnL total
-        current_pnl = self.get_metric("trading_pnl_total")
-        if current_pnl:
-            new_pnl = current_pnl.value + pnl
-            self.set_gauge("trading_pnl_total", new_pnl)
+        self.gauge("trading_pnl_total").inc(pnl)
         
         self.logger.debug(f"Trade recorded: PnL={pnl}, is_win={is_win}")
     
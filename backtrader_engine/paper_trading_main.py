@@ -25,22 +25,18 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-# Import trading engine
-from exchanges.bybit_paper_trader import BybitPaperTrader
-from signal_engine import TradingSignal
-from alert_manager import AlertManager
-from state_manager import StateManager
-from error_handler import global_error_handler, with_error_handling, ErrorCategory
-from health_checker import TradingBotHealthChecker
-from metrics_collector import global_metrics_collector
-from alerting_system import global_alerting_system
-from prometheus_server import start_prometheus_server
-from backup_manager import global_backup_manager
-from disaster_recovery import global_disaster_recovery
-from compliance_manager import global_compliance_manager
-from documentation_generator import global_documentation_generator
-from audit_trail import global_audit_trail
-from regulatory_reporter import global_regulatory_reporter
+from service_container import ServiceContainer, Service, startup_profiler
+
+# Import trading engine (hot path only; the other subsystems are imported on first use)
+with startup_profiler.measure("trading_core", "import"):
+    from exchanges.bybit_paper_trader import BybitPaperTrader
+    from exchanges.sharded_paper_trader import ShardedPaperTrader
+    from signal_engine import TradingSignal
+    from state_manager import StateManager
+    from error_handler import global_error_handler, with_error_handling, ErrorCategory
+    from trade_ledger import global_trade_ledger
+    from event_log import global_event_log
+    from task_supervisor import TaskSupervisor, BLOCKING_THREAD
 
 class VSTRUTradingBot:
     """
@@ -53,6 +49,18 @@ class VSTRUTradingBot:
     - Confidence: 0.75 (high enough to pass risk checks)
     """
     
+    # Subsystems outside the trading hot path, built by self.services on first access
+    alert_manager = Service()
+    health_checker = Service()
+    metrics_collector = Service()
+    alerting_system = Service()
+    backup_manager = Service()
+    disaster_recovery = Service()
+    compliance_manager = Service()
+    documentation_generator = Service()
+    audit_trail = Service()
+    regulatory_reporter = Service()
+    
     def __init__(self, config_path='configs/bybit_x_config.json'):
         self.config_path = config_path
         self.config = self._load_config()
@@ -66,45 +74,53 @@ class VSTRUTradingBot:
         self.signal_interval = 900  # 15 minutes in seconds
         self.symbols = ['ETHUSDT', 'BTCUSDT', 'SOLUSDT']
         
-        # Initialize AlertManager with Telegram
-        self.alert_manager = self._init_alert_manager()
+        # Lazily constructed subsystems (see the Service attributes above)
+        self.services = ServiceContainer(startup_profiler)
+        self._register_services()
         
-        # Initialize StateManager for persistence
-        self.state_manager = StateManager("logs/bot_state.json")
-        self._load_previous_state()
+        # Initialize StateManager for persistence (the previous state is needed before trading)
+        with startup_profiler.measure("state_manager", "init"):
+            self.state_manager = StateManager("logs/bot_state.json")
+            self._load_previous_state()
         
         # Initialize Error Handler
         self.error_handler = global_error_handler
-        
-        # Initialize Health Checker
-        self.health_checker = TradingBotHealthChecker(self)
-        
-        # Initialize Metrics and Alerting
-        self.metrics_collector = global_metrics_collector
-        self.alerting_system = global_alerting_system
         self.prometheus_server = None
         
-        # Initialize Backup and Disaster Recovery
-        self.backup_manager = global_backup_manager
-        self.disaster_recovery = global_disaster_recovery
-        
-        # Initialize Compliance and Documentation
-        self.compliance_manager = global_compliance_manager
-        self.documentation_generator = global_documentation_generator
-        self.audit_trail = global_audit_trail
-        self.regulatory_reporter = global_regulatory_reporter
+        # Periodic jobs and long-running tasks (metrics are attached once the collector is built)
+        self.supervisor = TaskSupervisor()
         
-        # Connect alerting system to AlertManager
-        if self.alert_manager:
-            self.alerting_system.add_notifier(self._send_alert_notification)
+        # Trade ledger and event log are written from the paper trader callbacks
+        self.trade_ledger = global_trade_ledger
+        self.event_log = global_event_log
         
         logger.info("VSTRUTradingBot initialized")
         logger.info(f"Symbols: {self.symbols}")
         logger.info(f"Signal interval: {self.signal_interval}s (15 minutes)")
     
+    def _register_services(self):
+        """Register the subsystems that are imported and built on first access"""
+        self.services.register('alert_manager', self._init_alert_manager)
+        self.services.register('health_checker', 'health_checker:TradingBotHealthChecker', self)
+        self.services.register('metrics_collector', 'metrics_collector:global_metrics_collector')
+        self.services.register('alerting_system', self._init_alerting_system)
+        self.services.register('backup_manager', 'backup_manager:global_backup_manager')
+        self.services.register('disaster_recovery', 'disaster_recovery:global_disaster_recovery')
+        self.services.register('compliance_manager', 'compliance_manager:global_compliance_manager')
+        self.services.register('documentation_generator', 'documentation_generator:global_documentation_generator')
+        self.services.register('audit_trail', 'audit_trail:global_audit_trail')
+        self.services.register('regulatory_reporter', 'regulatory_reporter:global_regulatory_reporter')
+    
+    def _init_alerting_system(self):
+        """Alerting system connected to the AlertManager notifications"""
+        from alerting_system import global_alerting_system
+        global_alerting_system.add_notifier(self._send_alert_notification)
+        return global_alerting_system
+    
     def _init_alert_manager(self):
         """Initialize AlertManager with Telegram notifications"""
         try:
+            from alert_manager import AlertManager
             alert_config_path = Path(__file__).parent / 'configs' / 'alert_config.json'
             with open(alert_config_path, 'r') as f:
                 alert_config = json.load(f)
@@ -195,7 +211,9 @@ class VSTRUTradingBot:
             logger.info(f"Testnet: {testnet}")
             logger.info(f"Commission: {commission_rate * 100}%")
             
-            self.paper_trader = BybitPaperTrader(
+            # Optional: market data and signals in worker processes, portfolio state in this one
+            shard_workers = self.config.get('sharding', {}).get('workers', 0)
+            trader_args = dict(
                 api_key=api_key,
                 api_secret=api_secret,
                 initial_balance=10000.0,
@@ -203,6 +221,16 @@ class VSTRUTradingBot:
                 commission_rate=commission_rate,
                 signal_config=self.config
             )
+            if shard_workers:
+                logger.info(f"Symbol sharding: {shard_workers} worker processes")
+                self.paper_trader = ShardedPaperTrader(shards=shard_workers, **trader_args)
+            else:
+                self.paper_trader = BybitPaperTrader(**trader_args)
+            
+            # Positions from the previous session (also seeds the portfolio risk aggregates)
+            previous_positions = self.state_manager.current_state.positions
+            if previous_positions:
+                self.paper_trader.restore_positions(previous_positions)
             
             # Subscribe to symbols
             symbols = self.config.get('symbols', self.symbols)
@@ -211,8 +239,18 @@ class VSTRUTradingBot:
             # Connect state manager to paper trader
             self.paper_trader.add_state_callback(self._on_state_change)
             
+            # Record every fill and order update in the trade ledger (queued, written by its own thread)
+            self.trade_ledger.start()
+            self.paper_trader.add_trade_callback(self.trade_ledger.record_trade)
+            self.paper_trader.add_order_callback(self.trade_ledger.record_order)
+            
+            # Typed events (signals, rejections, orders, fills, positions, balance) for analytics
+            self.event_log.start()
+            
             # Start paper trader with symbols (it will subscribe automatically)
-            await self.paper_trader.start(symbols=symbols)
+            with startup_profiler.measure("paper_trader", "start"):
+                await self.paper_trader.start(symbols=symbols)
+            startup_profiler.mark("paper_trader_started")
             
             logger.info("Bot started successfully")
             logger.info("VSTRU Strategy active - Signals every 15 minutes")
@@ -222,53 +260,35 @@ class VSTRUTradingBot:
             self.state_manager.current_state.start_time = datetime.now(timezone.utc).isoformat()
             self.state_manager.save_state(force=True)
             
-            # Create startup backup
-            try:
-                backup_id = await self.backup_manager.create_backup(
-                    BackupType.STATE_ONLY,
-                    f"Startup backup - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-                )
-                logger.info(f"Startup backup created: {backup_id}")
-            except Exception as e:
-                logger.error(f"Failed to create startup backup: {e}")
-            
-            # Run disaster recovery check
-            try:
-                await self.disaster_recovery.run_disaster_recovery_check()
-            except Exception as e:
-                logger.error(f"Disaster recovery check failed: {e}")
-            
-            # Send Telegram notification
-            if self.alert_manager:
-                config_info = f"Symbols: {', '.join(self.symbols)} | Signal interval: 15min"
-                self.alert_manager.bot_started(config_info)
+            # Start VSTRU signals first: restart-to-first-signal is on the recovery path
+            self.supervisor.add_task("vstru_initial_signals", self._vstru_initial_signals)
             
-            # Start VSTRU signal generation loop in parallel
-            vstru_task = asyncio.create_task(self._vstru_signal_loop())
-            logger.info("VSTRU signal loop task created")
-            
-            # Start health check loop in parallel
-            health_task = asyncio.create_task(self._health_check_loop())
-            logger.info("Health check loop task created")
+            # Startup backup, DR check and notification run alongside the signals
+            self.supervisor.add_task("startup_maintenance", self._startup_maintenance)
+            self.supervisor.start()
+            logger.info("VSTRU signal task created")
             
             # Start Prometheus server
-            self.prometheus_server, prometheus_runner = await start_prometheus_server()
+            from prometheus_server import start_prometheus_server
+            with startup_profiler.measure("prometheus_server", "start"):
+                self.prometheus_server, prometheus_runner = await start_prometheus_server()
             logger.info("Prometheus server started")
             
-            # Start metrics and alerting loop
-            monitoring_task = asyncio.create_task(self._monitoring_loop())
-            logger.info("Monitoring loop task created")
+            # Evaluate alert rules as soon as their metrics change
+            self.alerting_system.attach(self.metrics_collector)
+            self.supervisor.metrics_collector = self.metrics_collector
             
-        # Start backup automation loop
-        backup_task = asyncio.create_task(self._backup_automation_loop())
-        logger.info("Backup automation loop task created")
-        
-        # Start compliance and documentation loop
-        compliance_task = asyncio.create_task(self._compliance_documentation_loop())
-        logger.info("Compliance and documentation loop task created")
+            # Periodic jobs: jittered, never overlapping, psutil sampling off the event loop
+            self.supervisor.add_task("health_refresh", lambda: self.health_checker.refresh_forever(10.0))
+            self.supervisor.add_job("health_check", self._run_health_check, interval=300)
+            self.supervisor.add_job("bot_metrics", self._update_bot_metrics, interval=30, blocking=BLOCKING_THREAD)
+            self.supervisor.add_job("alerts", self._check_alerts, interval=30)
+            self.supervisor.add_job("backup_automation", self._run_backup_automation, interval=21600)
+            self.supervisor.add_job("compliance_documentation", self._run_compliance_documentation, interval=86400)
+            logger.info("Health, monitoring, backup and compliance jobs scheduled")
             
-            # Keep running indefinitely
-            await vstru_task
+            # Keep running until stop()
+            await self.supervisor.join()
             
         except Exception as e:
             logger.error(f"Error starting bot: {e}")
@@ -276,13 +296,46 @@ class VSTRUTradingBot:
             traceback.print_exc()
             raise
     
-    async def _vstru_signal_loop(self):
-        """Main loop for VSTRU signal generation"""
-        logger.info("Starting VSTRU signal generation loop...")
+    async def _startup_maintenance(self):
+        """Startup backup, disaster recovery check and start notification"""
+        from backup_manager import BackupType
+        
+        # Create startup backup
+        try:
+            backup_id = await self.backup_manager.create_backup(
+                BackupType.STATE_ONLY,
+                f"Startup backup - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+            )
+            logger.info(f"Startup backup created: {backup_id}")
+        except Exception as e:
+            logger.error(f"Failed to create startup backup: {e}")
+        
+        # Run disaster recovery check
+        try:
+            await self.disaster_recovery.run_disaster_recovery_check()
+        except Exception as e:
+            logger.error(f"Disaster recovery check failed: {e}")
+        
+        # Send Telegram notification
+        if self.alert_manager:
+            config_info = f"Symbols: {', '.join(self.symbols)} | Signal interval: 15min"
+            self.alert_manager.bot_started(config_info)
+    
+    async def _wait_for_prices(self, timeout: float = 5.0):
+        """Wait until every symbol has a price (at most ``timeout`` seconds)"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.paper_trader and all(symbol in self.paper_trader.current_prices for symbol in self.symbols):
+                return
+            await asyncio.sleep(0.1)
+    
+    async def _vstru_initial_signals(self):
+        """Initial VSTRU signals, then schedule the periodic signal check"""
+        logger.info("Starting VSTRU signal generation...")
         
         # Wait for price data to be available
         logger.info("Waiting for price data from WebSocket...")
-        await asyncio.sleep(5)
+        await self._wait_for_prices(timeout=5)
         
         # Generate initial signals immediately for testing
         logger.info("Generating INITIAL test signals...")
@@ -293,124 +346,77 @@ class VSTRUTradingBot:
         
         logger.info(f"Initial signals generated. Next signals in {self.signal_interval} seconds (15 minutes)")
         
-        while self.running:
-            try:
-                current_time = time.time()
-                
-                for symbol in self.symbols:
-                    # Check if it's time to generate signal
-                    last_signal = self.last_signal_time.get(symbol, 0)
-                    time_since_last = current_time - last_signal
-                    
-                    if time_since_last >= self.signal_interval:
-                        await self._generate_vstru_signal(symbol)
-                        self.last_signal_time[symbol] = current_time
-                
-                # Wait 10 seconds before next check
-                await asyncio.sleep(10)
-                
-            except Exception as e:
-                logger.error(f"Error in VSTRU loop: {e}")
-                import traceback
-                traceback.print_exc()
+        # Check every 10 seconds whether a symbol is due for its next signal
+        self.supervisor.add_job("vstru_signals", self._vstru_signal_tick, interval=10, jitter=0)
     
-    async def _health_check_loop(self):
-        """Health check loop - runs every 5 minutes"""
-        while self.running:
-            try:
-                await asyncio.sleep(300)  # 5 minutes
-                
-                if not self.running:
-                    break
-                
-                # Run health checks
-                health_results = await self.health_checker.run_all_checks()
-                overall_status = self.health_checker.get_overall_status()
-                
-                # Log health status
-                if overall_status.value == "critical":
-                    logger.critical(f"HEALTH CHECK CRITICAL: {len([r for r in health_results.values() if r.status.value == 'critical'])} critical issues")
-                elif overall_status.value == "warning":
-                    logger.warning(f"HEALTH CHECK WARNING: {len([r for r in health_results.values() if r.status.value == 'warning'])} warnings")
-                else:
-                    logger.info(f"Health check OK: {overall_status.value}")
-                
-                # Send alert if critical
-                if overall_status.value == "critical" and self.alert_manager:
-                    critical_issues = [r for r in health_results.values() if r.status.value == "critical"]
-                    alert_msg = f"🚨 CRITICAL HEALTH ISSUES DETECTED:\n"
-                    for issue in critical_issues:
-                        alert_msg += f"• {issue.name}: {issue.message}\n"
-                    self.alert_manager.send_alert("system_error", alert_msg)
-                
-            except Exception as e:
-                logger.error(f"Error in health check loop: {e}")
-                import traceback
-                traceback.print_exc()
+    async def _vstru_signal_tick(self):
+        """Generate the VSTRU signals that are due"""
+        current_time = time.time()
+        
+        for symbol in self.symbols:
+            # Check if it's time to generate signal
+            last_signal = self.last_signal_time.get(symbol, 0)
+            time_since_last = current_time - last_signal
+            
+            if time_since_last >= self.signal_interval:
+                await self._generate_vstru_signal(symbol)
+                self.last_signal_time[symbol] = current_time
     
-    async def _monitoring_loop(self):
-        """Loop de monitoreo - métricas y alertas cada 30 segundos"""
-        while self.running:
-            try:
-                await asyncio.sleep(30)  # 30 segundos
-                
-                if not self.running:
-                    break
-                
-                # Actualizar métricas del bot
-                self._update_bot_metrics()
-                
-                # Verificar alertas
-                await self._check_alerts()
-                
-            except Exception as e:
-                logger.error(f"Error in monitoring loop: {e}")
-                import traceback
-                traceback.print_exc()
+    async def _run_health_check(self):
+        """Health check job - runs every 5 minutes"""
+        # Run health checks
+        health_results = await self.health_checker.run_all_checks()
+        overall_status = self.health_checker.get_overall_status()
+        
+        # Log health status
+        if overall_status.value == "critical":
+            logger.critical(f"HEALTH CHECK CRITICAL: {len([r for r in health_results.values() if r.status.value == 'critical'])} critical issues")
+        elif overall_status.value == "warning":
+            logger.warning(f"HEALTH CHECK WARNING: {len([r for r in health_results.values() if r.status.value == 'warning'])} warnings")
+        else:
+            logger.info(f"Health check OK: {overall_status.value}")
+        
+        # Send alert if critical
+        if overall_status.value == "critical" and self.alert_manager:
+            critical_issues = [r for r in health_results.values() if r.status.value == "critical"]
+            alert_msg = f"🚨 CRITICAL HEALTH ISSUES DETECTED:\n"
+            for issue in critical_issues:
+                alert_msg += f"• {issue.name}: {issue.message}\n"
+            self.alert_manager.send_alert("system_error", alert_msg)
     
-    async def _compliance_documentation_loop(self):
-        """Loop de compliance y documentación - cada 24 horas"""
-        while self.running:
-            try:
-                await asyncio.sleep(86400)  # 24 horas
-                
-                if not self.running:
-                    break
-                
-                # Ejecutar verificaciones de compliance
-                try:
-                    compliance_checks = await self.compliance_manager.run_compliance_check()
-                    logger.info(f"Compliance checks completed: {len(compliance_checks)} checks")
-                except Exception as e:
-                    logger.error(f"Compliance checks failed: {e}")
-                
-                # Generar documentación automática
-                try:
-                    docs_result = await self.documentation_generator.generate_all_documentation()
-                    logger.info("Documentation generated successfully")
-                except Exception as e:
-                    logger.error(f"Documentation generation failed: {e}")
-                
-                # Generar reportes regulatorios
-                try:
-                    from datetime import datetime, timedelta
-                    end_time = datetime.now()
-                    start_time = end_time - timedelta(days=1)
-                    
-                    # Reporte de trades
-                    trade_report = await self.regulatory_reporter.generate_trade_report(
-                        framework=self.regulatory_reporter.RegulatoryFramework.MIFID_II,
-                        start_time=start_time,
-                        end_time=end_time
-                    )
-                    logger.info(f"Trade report generated: {trade_report.report_id}")
-                except Exception as e:
-                    logger.error(f"Regulatory reporting failed: {e}")
-                
-            except Exception as e:
-                logger.error(f"Error in compliance and documentation loop: {e}")
-                import traceback
-                traceback.print_exc()
+    async def _run_compliance_documentation(self):
+        """Job de compliance y documentación - cada 24 horas"""
+        # Ejecutar verificaciones de compliance
+        try:
+            compliance_checks = await self.compliance_manager.run_compliance_check()
+            logger.info(f"Compliance checks completed: {len(compliance_checks)} checks")
+        except Exception as e:
+            logger.error(f"Compliance checks failed: {e}")
+        
+        # Generar documentación automática
+        try:
+            docs_result = await self.documentation_generator.generate_all_documentation()
+            logger.info("Documentation generated successfully")
+        except Exception as e:
+            logger.error(f"Documentation generation failed: {e}")
+        
+        # Generar reportes regulatorios
+        try:
+            from datetime import datetime, timedelta
+            from regulatory_reporter import RegulatoryFramework
+            end_time = datetime.now()
+            start_time = end_time - timedelta(days=1)
+            
+            # Reportes de trades y transacciones (un solo recorrido del ledger)
+            reports = await self.regulatory_reporter.generate_ledger_reports(
+                framework=RegulatoryFramework.MIFID_II,
+                start_time=start_time,
+                end_time=end_time
+            )
+            for report in reports:
+                logger.info(f"Regulatory report generated: {report.report_id}")
+        except Exception as e:
+            logger.error(f"Regulatory reporting failed: {e}")
     
     def _update_bot_metrics(self):
         """Actualizar métricas del bot"""
@@ -433,16 +439,19 @@ class VSTRUTradingBot:
             )
             
             # Métricas de WebSocket
-            if self.paper_trader and hasattr(self.paper_trader, 'websocket'):
-                websocket_connected = self.paper_trader.websocket.connected if self.paper_trader.websocket else False
-                self.metrics_collector.update_websocket_status(websocket_connected)
+            if self.paper_trader:
+                self.metrics_collector.update_websocket_status(self.paper_trader.connected)
             
             # Métricas de trading
             if self.paper_trader:
                 self.metrics_collector.update_balance(self.paper_trader.balance)
             
-            # Métricas de señales
-            self.metrics_collector.set_gauge("trading_signals_total", self.signal_counter)
+            # Métricas de señales: es un contador, así que solo se suma lo que falte
+            # (p.ej. señales de ejecuciones anteriores restauradas del estado)
+            signals = self.metrics_collector.counter("trading_signals_total", {"strategy": "vstru"})
+            missing = self.signal_counter - signals.get()
+            if missing > 0:
+                signals.inc(missing)
             
         except Exception as e:
             logger.error(f"Error updating metrics: {e}")
@@ -460,35 +469,27 @@ class VSTRUTradingBot:
         except Exception as e:
             logger.error(f"Error checking alerts: {e}")
     
-    async def _backup_automation_loop(self):
-        """Loop de automatización de backups - cada 6 horas"""
-        while self.running:
-            try:
-                await asyncio.sleep(21600)  # 6 horas
-                
-                if not self.running:
-                    break
-                
-                # Crear backup automático
-                try:
-                    backup_id = await self.backup_manager.create_backup(
-                        BackupType.FULL,
-                        f"Automatic backup - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-                    )
-                    logger.info(f"Automatic backup created: {backup_id}")
-                except Exception as e:
-                    logger.error(f"Failed to create automatic backup: {e}")
-                
-                # Ejecutar disaster recovery check
-                try:
-                    await self.disaster_recovery.run_disaster_recovery_check()
-                except Exception as e:
-                    logger.error(f"Disaster recovery check failed: {e}")
-                
-            except Exception as e:
-                logger.error(f"Error in backup automation loop: {e}")
-                import traceback
-                traceback.print_exc()
+    async def _run_backup_automation(self):
+        """Job de automatización de backups - cada 6 horas"""
+        # Crear backup automático
+        try:
+            from backup_manager import BackupType
+            backup_id = await self.backup_manager.create_backup(
+                BackupType.FULL,
+                f"Automatic backup - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+            )
+            logger.info(f"Automatic backup created: {backup_id}")
+        except Exception as e:
+            logger.error(f"Failed to create automatic backup: {e}")
+        
+        # Verificar integridad de todos los backups retenidos
+        await self.disaster_recovery.verify_backups()
+        
+        # Ejecutar disaster recovery check
+        try:
+            await self.disaster_recovery.run_disaster_recovery_check()
+        except Exception as e:
+            logger.error(f"Disaster recovery check failed: {e}")
     
     async def _send_alert_notification(self, alert):
         """Enviar notificación de alerta a través del AlertManager"""
@@ -567,6 +568,10 @@ class VSTRUTradingBot:
             else:
                 logger.error("Paper trader doesn't have _on_signal_received method")
             
+            if "first_signal" not in startup_profiler.marks:
+                startup_profiler.mark("first_signal")
+                logger.info(startup_profiler.report())
+            
         except Exception as e:
             logger.error(f"Error generating VSTRU signal: {e}")
             import traceback
@@ -576,6 +581,7 @@ class VSTRUTradingBot:
         """Stop the bot"""
         logger.info("Stopping VSTRU bot...")
         self.running = False
+        await self.supervisor.stop()
         
         # Save final state before stopping
         self.state_manager.emergency_save()
@@ -590,6 +596,13 @@ class VSTRUTradingBot:
         if self.paper_trader:
             await self.paper_trader.stop()
         
+        # Only close the subsystems that were actually built
+        backup_manager = self.services.peek('backup_manager')
+        if backup_manager:
+            backup_manager.close()
+        self.trade_ledger.stop()
+        self.event_log.stop()
+        
         if self.start_time:
             runtime = time.time() - self.start_time
             hours = runtime / 3600
@@ -0,0 +1,411 @@
+"""
+Portfolio Risk Engine - Estado de riesgo de portfolio incremental
+
+Mantiene como agregados acumulados (actualizados en cada fill y en cada
+cambio de mark price):
+- Exposición bruta/neta por símbolo y por sector
+- Uso de margen y apalancamiento
+- Covarianza móvil de retornos y VaR paramétrico/histórico
+
+Los checks pre-trade usan solo estos agregados, por lo que su coste es O(1)
+independientemente del número de posiciones abiertas.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PortfolioRiskLimits:
+    """Límites de riesgo a nivel de portfolio (fracciones del equity)"""
+    max_gross_leverage: float = 3.0  # Exposición bruta / equity
+    max_net_leverage: float = 2.0  # |Exposición neta| / equity
+    max_symbol_exposure: float = 0.5  # Exposición bruta por símbolo / equity
+    max_sector_exposure: float = 1.5  # Exposición bruta por sector / equity
+    max_margin_usage: float = 0.9  # Margen usado / equity
+    max_var: float = 0.05  # VaR paramétrico / equity
+
+
+@dataclass
+class SymbolExposure:
+    """Estado de exposición de un símbolo"""
+    symbol: str
+    sector: str
+    qty: float = 0.0  # Cantidad con signo (+ long, - short)
+    mark_price: float = 0.0
+    leverage: float = 1.0
+    notional: float = 0.0  # qty * mark_price (con signo)
+    index: int = -1  # Columna en la matriz de covarianza
+
+
+@dataclass
+class _ReturnWindow:
+    """Ventana circular de retornos con sumas acumuladas para la covarianza"""
+    size: int
+    n_symbols: int = 0
+    buffer: np.ndarray = field(default=None)
+    count: int = 0
+    head: int = 0
+    sum_r: np.ndarray = field(default=None)
+    sum_rr: np.ndarray = field(default=None)
+
+    def __post_init__(self):
+        self.buffer = np.zeros((self.size, self.n_symbols))
+        self.sum_r = np.zeros(self.n_symbols)
+        self.sum_rr = np.zeros((self.n_symbols, self.n_symbols))
+
+    def add_symbol(self):
+        """Añadir una columna (retornos previos a cero)"""
+        self.n_symbols += 1
+        self.buffer = np.pad(self.buffer, ((0, 0), (0, 1)))
+        self.sum_r = np.pad(self.sum_r, (0, 1))
+        self.sum_rr = np.pad(self.sum_rr, ((0, 1), (0, 1)))
+
+    def push(self, returns: np.ndarray):
+        """Añadir un vector de retornos, expulsando el más antiguo si está llena"""
+        if self.count == self.size:
+            old = self.buffer[self.head]
+            self.sum_r -= old
+            self.sum_rr -= np.outer(old, old)
+        else:
+            self.count += 1
+
+        self.buffer[self.head] = returns
+        self.sum_r += returns
+        self.sum_rr += np.outer(returns, returns)
+        self.head = (self.head + 1) % self.size
+
+        # Recalcular desde cero una vez por vuelta para evitar deriva numérica
+        if self.head == 0:
+            samples = self.buffer[:self.count]
+            self.sum_r = samples.sum(axis=0)
+            self.sum_rr = samples.T @ samples
+
+    def covariance(self) -> np.ndarray:
+        """Covarianza muestral de la ventana"""
+        m = self.count
+        if m < 2:
+            return np.zeros((self.n_symbols, self.n_symbols))
+        return (self.sum_rr - np.outer(self.sum_r, self.sum_r) / m) / (m - 1)
+
+    def samples(self) -> np.ndarray:
+        """Retornos de la ventana (sin orden cronológico)"""
+        return self.buffer[:self.count]
+
+
+class PortfolioRiskEngine:
+    """Motor de riesgo de portfolio con agregados incrementales"""
+
+    def __init__(self, config: Dict[str, Any] = None):
+        config = config or {}
+        self.config = config
+        self.limits = PortfolioRiskLimits(**config.get('limits', {}))
+
+        self.sectors: Dict[str, str] = config.get('sectors', {})
+        self.default_sector = config.get('default_sector', 'crypto')
+        self.var_confidence = config.get('var_confidence', 0.99)
+        self.var_horizon = config.get('var_horizon', 1)  # En intervalos de retorno
+        self.var_min_samples = config.get('var_min_samples', 30)
+        self.return_interval = config.get('return_interval', 60.0)  # Segundos
+        self._z = NormalDist().inv_cdf(self.var_confidence) * math.sqrt(self.var_horizon)
+
+        # Estado por símbolo
+        self.exposures: Dict[str, SymbolExposure] = {}
+        self._symbols: List[str] = []  # Orden de columnas de la covarianza
+
+        # Agregados acumulados
+        self.gross_exposure = 0.0
+        self.net_exposure = 0.0
+        self.margin_used = 0.0
+        self.sector_gross: Dict[str, float] = {}
+        self.sector_net: Dict[str, float] = {}
+
+        # Covarianza móvil y VaR
+        self.returns = _ReturnWindow(size=config.get('var_window', 500))
+        self._cov = np.zeros((0, 0))
+        self._exposure_vec = np.zeros(0)
+        self._cov_exposure = np.zeros(0)  # Σ·e, para actualizar la varianza en O(1)
+        self._portfolio_variance = 0.0
+        self._historical_var: Optional[float] = None
+        self._last_sample_prices: Dict[str, float] = {}
+        self._last_sample_time: Optional[float] = None
+
+        logger.info("PortfolioRiskEngine initialized")
+
+    # ------------------------------------------------------------------
+    # Actualizaciones de estado
+    # ------------------------------------------------------------------
+
+    def on_fill(self, symbol: str, side: str, qty: float, price: float,
+                leverage: float = 1.0):
+        """Aplicar un fill a la exposición del símbolo"""
+        exposure = self._get_or_create(symbol)
+        if (leverage or 1.0) != exposure.leverage:
+            # El margen acumulado depende del apalancamiento: re-aplicar el nocional
+            self._set_notional(exposure, 0.0)
+            exposure.leverage = leverage or 1.0
+        exposure.mark_price = price
+        exposure.qty += self._side_sign(side) * qty
+        if abs(exposure.qty) < 1e-12:
+            exposure.qty = 0.0
+        self._set_notional(exposure, exposure.qty * price)
+
+    def on_mark_price(self, symbol: str, price: float, timestamp: float = None):
+        """Actualizar el mark price de un símbolo y muestrear retornos"""
+        if price <= 0:
+            return
+
+        exposure = self._get_or_create(symbol)
+        exposure.mark_price = price
+        if exposure.qty:
+            self._set_notional(exposure, exposure.qty * price)
+
+        now = timestamp if timestamp is not None else time.time()
+        if self._last_sample_time is None:
+            self._last_sample_time = now
+            self._last_sample_prices[symbol] = price
+        elif now - self._last_sample_time >= self.return_interval:
+            self._sample_returns()
+            self._last_sample_time = now
+        elif symbol not in self._last_sample_prices:
+            self._last_sample_prices[symbol] = price
+
+    def sync_positions(self, positions: Dict[str, Any]):
+        """Reconstruir la exposición a partir de posiciones (arranque/recovery)"""
+        for exposure in self.exposures.values():
+            exposure.qty = 0.0
+            self._set_notional(exposure, 0.0)
+
+        for symbol, position in positions.items():
+            if hasattr(position, 'size'):
+                size, side = position.size, position.side
+                price = position.mark_price or position.entry_price
+                leverage = getattr(position, 'leverage', 1.0)
+            else:
+                size, side = position.get('size', 0.0), position.get('side', '')
+                price = position.get('mark_price') or position.get('entry_price', 0.0)
+                leverage = position.get('leverage', 1.0)
+            self.on_fill(symbol, side, size, price, leverage)
+
+    def _get_or_create(self, symbol: str) -> SymbolExposure:
+        exposure = self.exposures.get(symbol)
+        if exposure is None:
+            sector = self.sectors.get(symbol, self.default_sector)
+            exposure = SymbolExposure(symbol=symbol, sector=sector, index=len(self._symbols))
+            self.exposures[symbol] = exposure
+            self._symbols.append(symbol)
+            self.sector_gross.setdefault(sector, 0.0)
+            self.sector_net.setdefault(sector, 0.0)
+
+            self.returns.add_symbol()
+            self._cov = np.pad(self._cov, ((0, 1), (0, 1)))
+            self._exposure_vec = np.pad(self._exposure_vec, (0, 1))
+            self._cov_exposure = np.pad(self._cov_exposure, (0, 1))
+        return exposure
+
+    def _set_notional(self, exposure: SymbolExposure, notional: float):
+        """Actualizar los agregados con el delta de nocional de un símbolo"""
+        old = exposure.notional
+        delta = notional - old
+        if delta == 0:
+            return
+
+        self.gross_exposure += abs(notional) - abs(old)
+        self.net_exposure += delta
+        self.sector_gross[exposure.sector] += abs(notional) - abs(old)
+        self.sector_net[exposure.sector] += delta
+        self.margin_used += (abs(notional) - abs(old)) / exposure.leverage
+        exposure.notional = notional
+
+        k = exposure.index
+        self._portfolio_variance += 2 * delta * self._cov_exposure[k] + delta * delta * self._cov[k, k]
+        self._cov_exposure += self._cov[:, k] * delta
+        self._exposure_vec[k] = notional
+        self._historical_var = None
+
+    def _sample_returns(self):
+        """Cerrar un intervalo de retornos y actualizar la covarianza móvil"""
+        returns = np.zeros(len(self._symbols))
+        for symbol, exposure in self.exposures.items():
+            last = self._last_sample_prices.get(symbol)
+            if last and exposure.mark_price > 0:
+                returns[exposure.index] = math.log(exposure.mark_price / last)
+            self._last_sample_prices[symbol] = exposure.mark_price
+
+        self.returns.push(returns)
+        self._cov = self.returns.covariance()
+        self._cov_exposure = self._cov @ self._exposure_vec
+        self._portfolio_variance = float(self._exposure_vec @ self._cov_exposure)
+        self._historical_var = None
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def var_ready(self) -> bool:
+        """Hay suficientes muestras para estimar VaR"""
+        return self.returns.count >= self.var_min_samples
+
+    def parametric_var(self) -> float:
+        """VaR paramétrico (normal) del portfolio en unidades de cuenta"""
+        return self._z * math.sqrt(max(self._portfolio_variance, 0.0))
+
+    def historical_var(self) -> float:
+        """VaR histórico sobre la ventana de retornos (cacheado hasta el próximo cambio)"""
+        if self._historical_var is None:
+            samples = self.returns.samples()
+            if len(samples) == 0:
+                self._historical_var = 0.0
+            else:
+                # Retornos log -> simples para el P&L
+                pnl = np.expm1(samples) @ self._exposure_vec
+                loss = -np.percentile(pnl, (1 - self.var_confidence) * 100)
+                self._historical_var = max(float(loss), 0.0) * math.sqrt(self.var_horizon)
+        return self._historical_var
+
+    # ------------------------------------------------------------------
+    # Check pre-trade
+    # ------------------------------------------------------------------
+
+    def check_order(self, symbol: str, side: str, qty: float, price: float,
+                    equity: float, leverage: float = 1.0) -> Tuple[bool, str]:
+        """
+        Validar una orden contra los límites de portfolio en O(1)
+
+        Returns:
+            Tuple[bool, str]: (is_valid, reason)
+        """
+        if equity <= 0:
+            return False, "Non-positive equity"
+
+        delta = self._side_sign(side) * qty * price
+        exposure = self.exposures.get(symbol)
+        if exposure is not None:
+            old = exposure.notional
+            sector = exposure.sector
+            leverage = exposure.leverage if exposure.qty else leverage
+        else:
+            old = 0.0
+            sector = self.sectors.get(symbol, self.default_sector)
+        new = old + delta
+        abs_change = abs(new) - abs(old)
+
+        symbol_exposure = abs(new) / equity
+        if symbol_exposure > self.limits.max_symbol_exposure:
+            return False, f"Symbol exposure {symbol_exposure:.2%} exceeds limit {self.limits.max_symbol_exposure:.2%}"
+
+        sector_exposure = (self.sector_gross.get(sector, 0.0) + abs_change) / equity
+        if sector_exposure > self.limits.max_sector_exposure:
+            return False, f"Sector '{sector}' exposure {sector_exposure:.2%} exceeds limit {self.limits.max_sector_exposure:.2%}"
+
+        gross_leverage = (self.gross_exposure + abs_change) / equity
+        if gross_leverage > self.limits.max_gross_leverage:
+            return False, f"Gross leverage {gross_leverage:.2f}x exceeds limit {self.limits.max_gross_leverage:.2f}x"
+
+        net_leverage = abs(self.net_exposure + delta) / equity
+        if net_leverage > self.limits.max_net_leverage:
+            return False, f"Net leverage {net_leverage:.2f}x exceeds limit {self.limits.max_net_leverage:.2f}x"
+
+        margin_usage = (self.margin_used + abs_change / (leverage or 1.0)) / equity
+        if margin_usage > self.limits.max_margin_usage:
+            return False, f"Margin usage {margin_usage:.2%} exceeds limit {self.limits.max_margin_usage:.2%}"
+
+        if exposure is not None and self.var_ready():
+            k = exposure.index
+            variance = (self._portfolio_variance + 2 * delta * self._cov_exposure[k]
+                        + delta * delta * self._cov[k, k])
+            var = self._z * math.sqrt(max(variance, 0.0)) / equity
+            if var > self.limits.max_var:
+                return False, f"Portfolio VaR {var:.2%} exceeds limit {self.limits.max_var:.2%}"
+
+        return True, "Portfolio limits respected"
+
+    def get_status(self, equity: float = None) -> Dict[str, Any]:
+        """Obtener snapshot del riesgo de portfolio"""
+        status = {
+            'gross_exposure': self.gross_exposure,
+            'net_exposure': self.net_exposure,
+            'margin_used': self.margin_used,
+            'parametric_var': self.parametric_var(),
+            'historical_var': self.historical_var(),
+            'var_confidence': self.var_confidence,
+            'var_samples': self.returns.count,
+            'sectors': {
+                sector: {'gross': self.sector_gross[sector], 'net': self.sector_net[sector]}
+                for sector in self.sector_gross
+            },
+            'symbols': {
+                symbol: {
+                    'qty': exposure.qty,
+                    'mark_price': exposure.mark_price,
+                    'notional': exposure.notional,
+                    'sector': exposure.sector,
+                    'leverage': exposure.leverage
+                }
+                for symbol, exposure in self.exposures.items() if exposure.qty
+            }
+        }
+        if equity:
+            status['gross_leverage'] = self.gross_exposure / equity
+            status['net_leverage'] = self.net_exposure / equity
+            status['margin_usage'] = self.margin_used / equity
+        return status
+
+    @staticmethod
+    def _side_sign(side: str) -> float:
+        return 1.0 if side.upper() in ('BUY', 'LONG') else -1.0
+
+
+def benchmark_portfolio_risk(num_signals: int = 10000, num_symbols: int = 20) -> Dict[str, float]:
+    """Benchmark de checks pre-trade por segundo con señales simuladas"""
+    print(f"🧪 Benchmarking PortfolioRiskEngine ({num_signals} signals, {num_symbols} symbols)...")
+
+    rng = np.random.default_rng(42)
+    symbols = [f"SYM{i}USDT" for i in range(num_symbols)]
+    engine = PortfolioRiskEngine({'return_interval': 1.0, 'limits': {'max_gross_leverage': 10.0}})
+    prices = rng.uniform(10, 1000, num_symbols)
+    equity = 100000.0
+
+    # Calentar la covarianza y abrir posiciones
+    for step in range(engine.var_min_samples + 10):
+        prices *= np.exp(rng.normal(0, 0.01, num_symbols))
+        for i, symbol in enumerate(symbols):
+            engine.on_mark_price(symbol, float(prices[i]), timestamp=float(step))
+    for i, symbol in enumerate(symbols):
+        engine.on_fill(symbol, 'Buy' if i % 2 else 'Sell', 1000.0 / prices[i], float(prices[i]))
+
+    sides = rng.choice(['Buy', 'Sell'], num_signals)
+    picks = rng.integers(0, num_symbols, num_signals)
+    qtys = rng.uniform(0.1, 2.0, num_signals)
+
+    start = time.perf_counter()
+    accepted = 0
+    for side, i, qty in zip(sides, picks, qtys):
+        ok, _ = engine.check_order(symbols[i], side, float(qty), float(prices[i]), equity)
+        accepted += ok
+    elapsed = time.perf_counter() - start
+
+    results = {
+        'checks_per_second': num_signals / elapsed,
+        'avg_check_us': elapsed / num_signals * 1e6,
+        'accepted': accepted,
+        'parametric_var': engine.parametric_var(),
+        'historical_var': engine.historical_var()
+    }
+    print(f"📈 {results['checks_per_second']:,.0f} checks/s ({results['avg_check_us']:.2f} µs/check), "
+          f"{accepted}/{num_signals} accepted")
+    print(f"📊 VaR {engine.var_confidence:.0%}: parametric ${results['parametric_var']:.2f}, "
+          f"historical ${results['historical_var']:.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_portfolio_risk()
@@ -3,15 +3,112 @@ Prometheus Server - Servidor HTTP para métricas Prometheus
 """
 
 import asyncio
+import gzip
+import json
 import logging
 from aiohttp import web
 from aiohttp.web import Request, Response
 import time
-from typing import Dict, Any
-from metrics_collector import global_metrics_collector
+from typing import Dict, Any, List, Optional, Tuple
+from metrics_collector import (
+    global_metrics_collector, MetricsRegistry, render_header, render_series, snapshot_series
+)
 
 logger = logging.getLogger(__name__)
 
+TEXT_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+class _FamilyCache:
+    """Series renderizadas de una familia, con la versión de cada serie al renderizarla"""
+    
+    def __init__(self):
+        self.series: Dict[Tuple[str, ...], Tuple[int, Any]] = {}
+        self.block = None
+        self.version = None
+
+class ExpositionCache:
+    """Caché de la exposición: solo se re-renderizan las series cuya versión cambió"""
+    
+    def __init__(self, registry: MetricsRegistry, gzip_level: int = 6):
+        self.registry = registry
+        self.gzip_level = gzip_level
+        self._families: Dict[Tuple[str, str], _FamilyCache] = {}
+        self._bodies: Dict[str, bytes] = {}
+        self._gzipped: Dict[str, bytes] = {}
+        self.stats = {"scrapes": 0, "series_rendered": 0}
+    
+    def _refresh(self, fmt: str, render) -> Tuple[List[Any], bool]:
+        """Actualizar las series cambiadas; devuelve los bloques por familia y si algo cambió"""
+        blocks, changed = [], False
+        for family in list(self.registry.families.values()):
+            entry = self._families.get((fmt, family.name))
+            if entry is None:
+                entry = self._families[(fmt, family.name)] = _FamilyCache()
+            
+            if entry.version == family.version:
+                blocks.append(entry.block)  # Ninguna serie de la familia cambió
+                continue
+            entry.version = family.version
+            
+            family_changed = entry.block is None
+            for values, child in list(family.children.items()):
+                cached = entry.series.get(values)
+                version = child.version  # Leer antes de renderizar: un cambio posterior se verá en el próximo scrape
+                if cached is None or cached[0] != version:
+                    entry.series[values] = (version, render(family, dict(zip(family.labelnames, values)), child))
+                    self.stats["series_rendered"] += 1
+                    family_changed = True
+            
+            if family_changed:
+                entry.block = self._build_block(fmt, family, [rendered for _, rendered in entry.series.values()])
+                changed = True
+            blocks.append(entry.block)
+        return blocks, changed
+    
+    @staticmethod
+    def _build_block(fmt: str, family, series: List[Any]):
+        if fmt == "json":
+            return family.name, {
+                "type": family.metric_type.value,
+                "help": family.help_text,
+                "series": series
+            }
+        return "\n".join(render_header(family, fmt == "openmetrics") + series)
+    
+    def render(self, fmt: str = "text") -> bytes:
+        """Exposición en texto Prometheus (fmt='text') u OpenMetrics (fmt='openmetrics')"""
+        self.stats["scrapes"] += 1
+        openmetrics = fmt == "openmetrics"
+        blocks, changed = self._refresh(
+            fmt, lambda family, labels, child: "\n".join(render_series(family, labels, child, openmetrics))
+        )
+        if changed or fmt not in self._bodies:
+            text = "\n".join(blocks) + ("\n# EOF\n" if openmetrics else "\n")
+            self._bodies[fmt] = text.encode("utf-8")
+            self._gzipped.pop(fmt, None)
+        return self._bodies[fmt]
+    
+    def render_gzip(self, fmt: str = "text") -> bytes:
+        """Exposición comprimida; se recomprime solo si el cuerpo cambió"""
+        body = self.render(fmt)
+        if fmt not in self._gzipped:
+            self._gzipped[fmt] = gzip.compress(body, compresslevel=self.gzip_level)
+        return self._gzipped[fmt]
+    
+    def snapshot(self) -> bytes:
+        """Snapshot JSON de todas las series para dashboards internos"""
+        self.stats["scrapes"] += 1
+        blocks, changed = self._refresh(
+            "json", lambda family, labels, child: {"labels": labels, **snapshot_series(family, child)}
+        )
+        if changed or "json" not in self._bodies:
+            self._bodies["json"] = json.dumps({
+                "timestamp": time.time(),
+                "metrics": dict(blocks)
+            }).encode("utf-8")
+        return self._bodies["json"]
+
 class PrometheusServer:
     """Servidor HTTP para métricas Prometheus"""
     
@@ -20,20 +117,27 @@ class PrometheusServer:
         self.port = port
         self.app = web.Application()
         self.app.router.add_get("/metrics", self.metrics_handler)
+        self.app.router.add_get("/metrics/json", self.metrics_json_handler)
         self.app.router.add_get("/health", self.health_handler)
         self.app.router.add_get("/", self.root_handler)
         self.logger = logging.getLogger("PrometheusServer")
+        self.exposition = ExpositionCache(global_metrics_collector.registry)
     
     async def metrics_handler(self, request: Request) -> Response:
         """Handler para endpoint /metrics"""
         try:
-            # Obtener métricas en formato Prometheus
-            metrics_data = global_metrics_collector.export_prometheus_format()
+            # Negociar formato (OpenMetrics si se pide) y compresión
+            openmetrics = "application/openmetrics-text" in request.headers.get("Accept", "")
+            fmt = "openmetrics" if openmetrics else "text"
+            headers = {"Content-Type": OPENMETRICS_CONTENT_TYPE if openmetrics else TEXT_CONTENT_TYPE}
             
-            return Response(
-                text=metrics_data,
-                content_type="text/plain; version=0.0.4; charset=utf-8"
-            )
+            if "gzip" in request.headers.get("Accept-Encoding", ""):
+                body = self.exposition.render_gzip(fmt)
+                headers["Content-Encoding"] = "gzip"
+            else:
+                body = self.exposition.render(fmt)
+            
+            return Response(body=body, headers=headers)
         except Exception as e:
             self.logger.error(f"Error generating metrics: {e}")
             return Response(
@@ -42,6 +146,14 @@ class PrometheusServer:
                 status=500
             )
     
+    async def metrics_json_handler(self, request: Request) -> Response:
+        """Handler para endpoint /metrics/json (snapshot para dashboards)"""
+        try:
+            return Response(body=self.exposition.snapshot(), headers={"Content-Type": "application/json"})
+        except Exception as e:
+            self.logger.error(f"Error generating metrics snapshot: {e}")
+            return web.json_response({"status": "error", "error": str(e)}, status=500)
+    
     async def health_handler(self, request: Request) -> Response:
         """Handler para endpoint /health"""
         try:
@@ -71,7 +183,7 @@ class PrometheusServer:
     async def root_handler(self, request: Request) -> Response:
         """Handler para endpoint raíz"""
         return Response(
-            text="Trading Bot Metrics Server\n\nEndpoints:\n- /metrics - Prometheus metrics\n- /health - Health check\n",
+            text="Trading Bot Metrics Server\n\nEndpoints:\n- /metrics - Prometheus metrics\n- /metrics/json - JSON snapshot\n- /health - Health check\n",
             content_type="text/plain"
         )
     
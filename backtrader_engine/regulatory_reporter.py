@@ -4,17 +4,17 @@ Regulatory Reporter - Sistema de reportes regulatorios
 
 import asyncio
 import logging
-import json
-import csv
-import xml.etree.ElementTree as ET
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Callable, Tuple
 from datetime import datetime, timezone, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 import hashlib
 import hmac
 
+from trade_ledger import global_trade_ledger, TradeLedger
+from report_writers import SignedOutput, ReportWriter, XMLReportWriter, CSVReportWriter, JSONReportWriter
+
 logger = logging.getLogger(__name__)
 
 class RegulatoryFramework(Enum):
@@ -58,13 +58,28 @@ class RegulatoryReport:
     signature: str
     file_path: Optional[str] = None
 
+# Serializador en streaming por formato
+REPORT_WRITERS = {
+    ReportFormat.XML: XMLReportWriter,
+    ReportFormat.CSV: CSVReportWriter,
+    ReportFormat.JSON: JSONReportWriter
+}
+
+# Filas escritas una a una: (clave en data, elemento contenedor, elemento por fila)
+REPORT_ROWS = {
+    ReportType.TRADE_REPORT: ("trades", "Trades", "Trade"),
+    ReportType.TRANSACTION_REPORT: ("transactions", "Transactions", "Transaction")
+}
+
 class RegulatoryReporter:
     """Sistema de reportes regulatorios"""
     
-    def __init__(self):
+    def __init__(self, trade_ledger: Optional[TradeLedger] = None):
         self.logger = logging.getLogger("RegulatoryReporter")
+        self.trade_ledger = trade_ledger or global_trade_ledger
         self.reports_dir = Path("reports/regulatory")
         self.reports_dir.mkdir(parents=True, exist_ok=True)
+        self.compress_reports = False  # gzip de los archivos de reporte
         
         # Configuración de reportes
         self.report_config = {
@@ -133,26 +148,7 @@ class RegulatoryReporter:
         trade_data = await self._get_trade_data(start_time, end_time)
         
         # Generar reporte
-        report = RegulatoryReport(
-            report_id=f"trade_report_{framework.value}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            framework=framework,
-            report_type=ReportType.TRADE_REPORT,
-            format=format,
-            generated_at=datetime.now(timezone.utc),
-            period_start=start_time,
-            period_end=end_time,
-            data=trade_data,
-            metadata={
-                "total_trades": len(trade_data.get("trades", [])),
-                "total_volume": sum(t.get("quantity", 0) * t.get("price", 0) for t in trade_data.get("trades", [])),
-                "currency": "USD",
-                "venue": "BYBIT"
-            },
-            signature=""
-        )
-        
-        # Generar firma
-        report.signature = self._generate_report_signature(report)
+        report = self._build_trade_report(framework, start_time, end_time, format, trade_data)
         
         # Guardar reporte
         await self._save_report(report)
@@ -172,26 +168,7 @@ class RegulatoryReporter:
         transaction_data = await self._get_transaction_data(start_time, end_time)
         
         # Generar reporte
-        report = RegulatoryReport(
-            report_id=f"transaction_report_{framework.value}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            framework=framework,
-            report_type=ReportType.TRANSACTION_REPORT,
-            format=format,
-            generated_at=datetime.now(timezone.utc),
-            period_start=start_time,
-            period_end=end_time,
-            data=transaction_data,
-            metadata={
-                "total_transactions": len(transaction_data.get("transactions", [])),
-                "total_value": sum(t.get("value", 0) for t in transaction_data.get("transactions", [])),
-                "currency": "USD",
-                "venue": "BYBIT"
-            },
-            signature=""
-        )
-        
-        # Generar firma
-        report.signature = self._generate_report_signature(report)
+        report = self._build_transaction_report(framework, start_time, end_time, format, transaction_data)
         
         # Guardar reporte
         await self._save_report(report)
@@ -199,6 +176,37 @@ class RegulatoryReporter:
         self.logger.info(f"Transaction report generated: {report.report_id}")
         return report
     
+    async def generate_ledger_reports(self,
+                                      framework: RegulatoryFramework,
+                                      start_time: datetime,
+                                      end_time: datetime,
+                                      formats: Optional[List[ReportFormat]] = None) -> List[RegulatoryReport]:
+        """Generar los reportes de trades y de transacciones con un único recorrido del ledger"""
+        formats = formats or [self.report_config["mifid_ii"]["trade_reporting"]["format"]]
+        self.logger.info(f"Generating ledger reports for {framework.value}")
+        
+        trade_data = await self._get_trade_data(start_time, end_time)
+        transaction_data = await self._get_transaction_data(start_time, end_time)
+        
+        reports, targets = [], []
+        for format in formats:
+            trade_report = self._build_trade_report(framework, start_time, end_time, format, trade_data)
+            transaction_report = self._build_transaction_report(framework, start_time, end_time, format, transaction_data)
+            reports.extend([trade_report, transaction_report])
+            targets.extend([(trade_report, self._trade_row), (transaction_report, self._transaction_row)])
+        
+        try:
+            # Cada fila del ledger se lee una vez y alimenta a todos los serializadores
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._write_reports, targets, self.trade_ledger.iter_trades(start_time, end_time)
+            )
+            for report in reports:
+                self.logger.info(f"Report saved: {report.file_path}")
+        except Exception as e:
+            self.logger.error(f"Error saving ledger reports: {e}")
+        
+        return reports
+    
     async def generate_position_report(self, 
                                      framework: RegulatoryFramework,
                                      as_of_date: datetime,
@@ -315,36 +323,94 @@ class RegulatoryReporter:
         self.logger.info(f"Compliance report generated: {report.report_id}")
         return report
     
+    def _build_trade_report(self, framework: RegulatoryFramework, start_time: datetime, end_time: datetime,
+                            format: ReportFormat, trade_data: Dict[str, Any]) -> RegulatoryReport:
+        """Construir reporte de trades con su firma de cabecera"""
+        report = RegulatoryReport(
+            report_id=f"trade_report_{framework.value}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            framework=framework,
+            report_type=ReportType.TRADE_REPORT,
+            format=format,
+            generated_at=datetime.now(timezone.utc),
+            period_start=start_time,
+            period_end=end_time,
+            data=trade_data,
+            metadata={
+                "total_trades": trade_data.get("summary", {}).get("total_trades", 0),
+                "total_volume": trade_data.get("summary", {}).get("total_volume", 0),
+                "currency": "USD",
+                "venue": "BYBIT"
+            },
+            signature=""
+        )
+        report.signature = self._generate_report_signature(report)
+        return report
+    
+    def _build_transaction_report(self, framework: RegulatoryFramework, start_time: datetime, end_time: datetime,
+                                  format: ReportFormat, transaction_data: Dict[str, Any]) -> RegulatoryReport:
+        """Construir reporte de transacciones con su firma de cabecera"""
+        report = RegulatoryReport(
+            report_id=f"transaction_report_{framework.value}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            framework=framework,
+            report_type=ReportType.TRANSACTION_REPORT,
+            format=format,
+            generated_at=datetime.now(timezone.utc),
+            period_start=start_time,
+            period_end=end_time,
+            data=transaction_data,
+            metadata={
+                "total_transactions": transaction_data.get("summary", {}).get("total_transactions", 0),
+                "total_value": transaction_data.get("summary", {}).get("total_value", 0),
+                "currency": "USD",
+                "venue": "BYBIT"
+            },
+            signature=""
+        )
+        report.signature = self._generate_report_signature(report)
+        return report
+    
+    def _trade_row(self, trade: Dict[str, Any]) -> Dict[str, Any]:
+        """Fila del ledger -> campos MiFID II de trade reporting"""
+        return {
+            "trade_id": trade["trade_id"],
+            "timestamp": datetime.fromtimestamp(trade["ts"], timezone.utc).isoformat(),
+            "symbol": trade["symbol"],
+            "side": trade["side"].upper(),
+            "quantity": trade["qty"],
+            "price": trade["price"],
+            "currency": trade["currency"],
+            "venue": trade["venue"],
+            "client_id": trade["client_id"],
+            "order_id": trade["order_id"]
+        }
+    
+    def _transaction_row(self, trade: Dict[str, Any]) -> Dict[str, Any]:
+        """Fila del ledger -> campos MiFID II de transaction reporting (un fill = una transacción)"""
+        return {
+            "transaction_id": trade["trade_id"],
+            "timestamp": datetime.fromtimestamp(trade["ts"], timezone.utc).isoformat(),
+            "instrument": trade["symbol"],
+            "quantity": trade["qty"],
+            "price": trade["price"],
+            "currency": trade["currency"],
+            "venue": trade["venue"],
+            "client_id": trade["client_id"],
+            "counterparty": trade["venue"]
+        }
+    
     async def _get_trade_data(self, start_time: datetime, end_time: datetime) -> Dict[str, Any]:
-        """Obtener datos de trades"""
+        """Obtener datos de trades del ledger (las filas se leen en streaming al serializar)"""
         try:
-            # En una implementación real, esto vendría de la base de datos
-            # Por ahora, generamos datos de ejemplo
-            trades = []
-            
-            # Simular datos de trades
-            for i in range(10):
-                trade = {
-                    "trade_id": f"TRADE_{i+1:06d}",
-                    "timestamp": (start_time + timedelta(hours=i)).isoformat(),
-                    "symbol": "BTCUSDT",
-                    "side": "BUY" if i % 2 == 0 else "SELL",
-                    "quantity": 0.001 * (i + 1),
-                    "price": 50000 + (i * 100),
-                    "currency": "USD",
-                    "venue": "BYBIT",
-                    "client_id": "CLIENT_001",
-                    "order_id": f"ORDER_{i+1:06d}"
-                }
-                trades.append(trade)
-            
+            summary = await asyncio.get_running_loop().run_in_executor(
+                None, self.trade_ledger.trade_summary, start_time, end_time
+            )
             return {
-                "trades": trades,
+                "trades": self.trade_ledger.iter_trades(start_time, end_time).map(self._trade_row),
                 "summary": {
-                    "total_trades": len(trades),
-                    "total_volume": sum(t["quantity"] * t["price"] for t in trades),
-                    "buy_trades": len([t for t in trades if t["side"] == "BUY"]),
-                    "sell_trades": len([t for t in trades if t["side"] == "SELL"])
+                    "total_trades": summary["total_trades"],
+                    "total_volume": summary["total_volume"],
+                    "buy_trades": summary["buy_trades"],
+                    "sell_trades": summary["sell_trades"]
                 }
             }
         except Exception as e:
@@ -352,30 +418,16 @@ class RegulatoryReporter:
             return {"trades": [], "summary": {}}
     
     async def _get_transaction_data(self, start_time: datetime, end_time: datetime) -> Dict[str, Any]:
-        """Obtener datos de transacciones"""
+        """Obtener datos de transacciones del ledger"""
         try:
-            # Simular datos de transacciones
-            transactions = []
-            
-            for i in range(5):
-                transaction = {
-                    "transaction_id": f"TXN_{i+1:06d}",
-                    "timestamp": (start_time + timedelta(hours=i*2)).isoformat(),
-                    "instrument": "BTCUSDT",
-                    "quantity": 0.01 * (i + 1),
-                    "price": 50000 + (i * 200),
-                    "currency": "USD",
-                    "venue": "BYBIT",
-                    "client_id": "CLIENT_001",
-                    "counterparty": "BYBIT"
-                }
-                transactions.append(transaction)
-            
+            summary = await asyncio.get_running_loop().run_in_executor(
+                None, self.trade_ledger.trade_summary, start_time, end_time
+            )
             return {
-                "transactions": transactions,
+                "transactions": self.trade_ledger.iter_trades(start_time, end_time).map(self._transaction_row),
                 "summary": {
-                    "total_transactions": len(transactions),
-                    "total_value": sum(t["quantity"] * t["price"] for t in transactions)
+                    "total_transactions": summary["total_trades"],
+                    "total_value": summary["total_volume"]
                 }
             }
         except Exception as e:
@@ -383,29 +435,11 @@ class RegulatoryReporter:
             return {"transactions": [], "summary": {}}
     
     async def _get_position_data(self, as_of_date: datetime) -> Dict[str, Any]:
-        """Obtener datos de posiciones"""
+        """Obtener posiciones netas a la fecha a partir de los fills del ledger"""
         try:
-            # Simular datos de posiciones
-            positions = [
-                {
-                    "symbol": "BTCUSDT",
-                    "side": "LONG",
-                    "quantity": 0.1,
-                    "entry_price": 50000,
-                    "current_price": 51000,
-                    "unrealized_pnl": 100,
-                    "value": 5100
-                },
-                {
-                    "symbol": "ETHUSDT",
-                    "side": "SHORT",
-                    "quantity": -0.5,
-                    "entry_price": 3000,
-                    "current_price": 2950,
-                    "unrealized_pnl": 25,
-                    "value": 1475
-                }
-            ]
+            positions = await asyncio.get_running_loop().run_in_executor(
+                None, self.trade_ledger.positions, as_of_date
+            )
             
             return {
                 "positions": positions,
@@ -482,9 +516,13 @@ class RegulatoryReporter:
             self.logger.error(f"Error getting compliance data: {e}")
             return {"score": 0, "total_checks": 0, "passed_checks": 0, "failed_checks": 0, "checks": []}
     
+    def _signature_message(self, report: RegulatoryReport) -> str:
+        """Cabecera firmada del reporte"""
+        return f"{report.report_id}:{report.framework.value}:{report.report_type.value}:{report.generated_at.isoformat()}"
+    
     def _generate_report_signature(self, report: RegulatoryReport) -> str:
         """Generar firma del reporte"""
-        message = f"{report.report_id}:{report.framework.value}:{report.report_type.value}:{report.generated_at.isoformat()}"
+        message = self._signature_message(report)
         signature = hmac.new(
             self.signature_config["key"].encode(),
             message.encode(),
@@ -493,103 +531,70 @@ class RegulatoryReporter:
         return signature
     
     async def _save_report(self, report: RegulatoryReport):
-        """Guardar reporte"""
+        """Guardar reporte (serialización en streaming en un hilo del executor)"""
         try:
-            # Crear directorio del framework
-            framework_dir = self.reports_dir / report.framework.value
-            framework_dir.mkdir(exist_ok=True)
-            
-            # Generar nombre de archivo
-            timestamp = report.generated_at.strftime("%Y%m%d_%H%M%S")
-            filename = f"{report.report_id}_{timestamp}.{report.format.value}"
-            file_path = framework_dir / filename
-            
-            # Guardar según el formato
-            if report.format == ReportFormat.JSON:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    json.dump(asdict(report), f, indent=2, default=str)
-            elif report.format == ReportFormat.XML:
-                await self._save_xml_report(report, file_path)
-            elif report.format == ReportFormat.CSV:
-                await self._save_csv_report(report, file_path)
-            else:
+            if report.format not in REPORT_WRITERS:
                 self.logger.error(f"Unsupported report format: {report.format}")
                 return
             
-            # Actualizar ruta del archivo
-            report.file_path = str(file_path)
+            rows = REPORT_ROWS.get(report.report_type)
+            target = [(report, None)]
+            source = report.data.get(rows[0], []) if rows else []
+            await asyncio.get_running_loop().run_in_executor(None, self._write_reports, target, source)
             
-            self.logger.info(f"Report saved: {file_path}")
+            self.logger.info(f"Report saved: {report.file_path}")
         except Exception as e:
             self.logger.error(f"Error saving report: {e}")
     
-    async def _save_xml_report(self, report: RegulatoryReport, file_path: Path):
-        """Guardar reporte en formato XML"""
+    def _open_writer(self, report: RegulatoryReport) -> Tuple[ReportWriter, Path]:
+        """Abrir el archivo del reporte con su serializador; la firma se calcula sobre los bytes escritos"""
+        # Crear directorio del framework
+        framework_dir = self.reports_dir / report.framework.value
+        framework_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Generar nombre de archivo
+        timestamp = report.generated_at.strftime("%Y%m%d_%H%M%S")
+        filename = f"{report.report_id}_{timestamp}.{report.format.value}"
+        if self.compress_reports:
+            filename += ".gz"
+        file_path = framework_dir / filename
+        
+        output = SignedOutput(
+            str(file_path),
+            key=self.signature_config["key"].encode(),
+            prefix=self._signature_message(report).encode(),
+            compress=self.compress_reports
+        )
+        writer = REPORT_WRITERS[report.format](report, output, REPORT_ROWS.get(report.report_type))
+        return writer, file_path
+    
+    def _write_reports(self, targets: List[Tuple[RegulatoryReport, Optional[Callable]]], rows):
+        """Escribir varios reportes a partir de un único recorrido de ``rows``
+        
+        Cada destino es (reporte, transformación de la fila o None si ya viene transformada).
+        """
+        writers = []
         try:
-            root = ET.Element("RegulatoryReport")
-            root.set("report_id", report.report_id)
-            root.set("framework", report.framework.value)
-            root.set("report_type", report.report_type.value)
-            root.set("generated_at", report.generated_at.isoformat())
-            root.set("signature", report.signature)
-            
-            # Metadatos
-            metadata = ET.SubElement(root, "Metadata")
-            for key, value in report.metadata.items():
-                meta_elem = ET.SubElement(metadata, key)
-                meta_elem.text = str(value)
+            for report, transform in targets:
+                writer, file_path = self._open_writer(report)
+                writers.append((writer, transform, file_path))
+                writer.begin()
             
-            # Datos
-            data = ET.SubElement(root, "Data")
-            if report.report_type == ReportType.TRADE_REPORT:
-                trades = ET.SubElement(data, "Trades")
-                for trade in report.data.get("trades", []):
-                    trade_elem = ET.SubElement(trades, "Trade")
-                    for key, value in trade.items():
-                        trade_elem.set(key, str(value))
-            elif report.report_type == ReportType.TRANSACTION_REPORT:
-                transactions = ET.SubElement(data, "Transactions")
-                for transaction in report.data.get("transactions", []):
-                    txn_elem = ET.SubElement(transactions, "Transaction")
-                    for key, value in transaction.items():
-                        txn_elem.set(key, str(value))
+            if any(writer.rows for writer, _, _ in writers):
+                for row in rows:
+                    for writer, transform, _ in writers:
+                        if writer.rows:
+                            writer.write_row(transform(row) if transform else row)
             
-            # Escribir XML
-            tree = ET.ElementTree(root)
-            tree.write(file_path, encoding="utf-8", xml_declaration=True)
-        except Exception as e:
-            self.logger.error(f"Error saving XML report: {e}")
-    
-    async def _save_csv_report(self, report: RegulatoryReport, file_path: Path):
-        """Guardar reporte en formato CSV"""
-        try:
-            with open(file_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                
-                # Escribir metadatos
-                writer.writerow(["Metadata"])
-                for key, value in report.metadata.items():
-                    writer.writerow([key, value])
-                
-                writer.writerow([])  # Línea vacía
-                
-                # Escribir datos
-                if report.report_type == ReportType.TRADE_REPORT:
-                    trades = report.data.get("trades", [])
-                    if trades:
-                        writer.writerow(["Trades"])
-                        writer.writerow(trades[0].keys())  # Headers
-                        for trade in trades:
-                            writer.writerow(trade.values())
-                elif report.report_type == ReportType.TRANSACTION_REPORT:
-                    transactions = report.data.get("transactions", [])
-                    if transactions:
-                        writer.writerow(["Transactions"])
-                        writer.writerow(transactions[0].keys())  # Headers
-                        for transaction in transactions:
-                            writer.writerow(transaction.values())
-        except Exception as e:
-            self.logger.error(f"Error saving CSV report: {e}")
+            for writer, _, file_path in writers:
+                writer.report.signature = writer.close()
+                writer.report.file_path = str(file_path)
+        except BaseException:
+            # No dejar reportes a medio escribir
+            for writer, _, file_path in writers:
+                writer.output.close()
+                file_path.unlink(missing_ok=True)
+            raise
     
     def get_report_statistics(self) -> Dict[str, Any]:
         """Obtener estadísticas de reportes"""
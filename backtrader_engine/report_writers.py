@@ -0,0 +1,193 @@
+"""
+Report Writers - Serializadores en streaming para reportes regulatorios
+Escriben fila a fila desde un iterador, firman (HMAC-SHA256) los bytes según salen y opcionalmente
+comprimen con gzip; la memoria no depende del tamaño del reporte
+"""
+
+import csv
+import gzip
+import hashlib
+import hmac
+import io
+import json
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+FLUSH_BYTES = 64 * 1024
+
+class SignedOutput:
+    """Salida binaria que firma los bytes sin comprimir a medida que se escriben"""
+
+    def __init__(self, path: str, key: bytes, prefix: bytes, compress: bool = False):
+        self._file = open(path, "wb")
+        self._stream = gzip.GzipFile(fileobj=self._file, mode="wb", mtime=0) if compress else self._file
+        self._mac = hmac.new(key, prefix, hashlib.sha256)
+        self.bytes_written = 0
+
+    def write(self, data: bytes):
+        """Escribir bytes firmados"""
+        self._mac.update(data)
+        self._stream.write(data)
+        self.bytes_written += len(data)
+
+    def write_unsigned(self, data: bytes):
+        """Escribir el bloque final con la firma (no forma parte de lo firmado)"""
+        self._stream.write(data)
+
+    def signature(self) -> str:
+        """Firma de todo lo escrito hasta ahora"""
+        return self._mac.hexdigest()
+
+    def close(self):
+        if self._stream is not self._file:
+            self._stream.close()
+        self._file.close()
+
+class ReportWriter(ABC):
+    """Base: begin() -> write_row() por cada fila -> close() devuelve la firma"""
+
+    def __init__(self, report, output: SignedOutput, rows: Optional[Tuple[str, str, str]] = None):
+        self.report = report
+        self.output = output
+        self.rows = rows  # (clave en data, elemento contenedor, elemento por fila)
+        self.row_count = 0
+        self._buffer = []
+        self._buffered = 0
+
+    def _emit(self, text: str):
+        """Acumular texto y volcarlo en bloques grandes"""
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= FLUSH_BYTES:
+            self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            self.output.write("".join(self._buffer).encode("utf-8"))
+            self._buffer = []
+            self._buffered = 0
+
+    def _finish(self, trailer: str) -> str:
+        """Volcar lo pendiente, firmar y escribir el bloque final con la firma"""
+        self._flush()
+        signature = self.output.signature()
+        self.output.write_unsigned(trailer.format(signature=signature).encode("utf-8"))
+        self.output.close()
+        return signature
+
+    @abstractmethod
+    def begin(self):
+        """Escribir la cabecera del reporte"""
+
+    @abstractmethod
+    def write_row(self, row: Dict[str, Any]):
+        """Escribir una fila"""
+
+    @abstractmethod
+    def close(self) -> str:
+        """Cerrar el reporte y devolver su firma"""
+
+class XMLReportWriter(ReportWriter):
+    """XML escrito a mano elemento a elemento (sin ElementTree en memoria)"""
+
+    def begin(self):
+        report = self.report
+        self._emit("<?xml version='1.0' encoding='utf-8'?>\n")
+        self._emit(
+            f"<RegulatoryReport report_id={quoteattr(report.report_id)} "
+            f"framework={quoteattr(report.framework.value)} "
+            f"report_type={quoteattr(report.report_type.value)} "
+            f"generated_at={quoteattr(report.generated_at.isoformat())}>\n"
+        )
+
+        # Metadatos
+        self._emit("<Metadata>")
+        for key, value in report.metadata.items():
+            self._emit(f"<{key}>{escape(str(value))}</{key}>")
+        self._emit("</Metadata>\n<Data>\n")
+
+        if self.rows:
+            self._emit(f"<{self.rows[1]}>\n")
+
+    def write_row(self, row: Dict[str, Any]):
+        attributes = " ".join(f"{key}={quoteattr(str(value))}" for key, value in row.items())
+        self._emit(f"<{self.rows[2]} {attributes} />\n")
+        self.row_count += 1
+
+    def close(self) -> str:
+        if self.rows:
+            self._emit(f"</{self.rows[1]}>\n")
+        self._emit("</Data>\n")
+        return self._finish('<Signature algorithm="HMAC-SHA256">{signature}</Signature>\n</RegulatoryReport>\n')
+
+class CSVReportWriter(ReportWriter):
+    """CSV: metadatos, filas y una última fila con la firma"""
+
+    def __init__(self, report, output: SignedOutput, rows: Optional[Tuple[str, str, str]] = None):
+        super().__init__(report, output, rows)
+        self._text = io.StringIO()
+        self._csv = csv.writer(self._text)
+
+    def _writerow(self, values):
+        self._csv.writerow(values)
+        if self._text.tell() >= FLUSH_BYTES:
+            self._flush()
+
+    def _flush(self):
+        if self._text.tell():
+            self._buffer.append(self._text.getvalue())
+            self._text.seek(0)
+            self._text.truncate()
+        super()._flush()
+
+    def begin(self):
+        # Escribir metadatos
+        self._writerow(["Metadata"])
+        for key, value in self.report.metadata.items():
+            self._writerow([key, value])
+        self._writerow([])  # Línea vacía
+
+    def write_row(self, row: Dict[str, Any]):
+        if self.row_count == 0:
+            self._writerow([self.rows[1]])
+            self._writerow(row.keys())  # Headers
+        self._writerow(row.values())
+        self.row_count += 1
+
+    def close(self) -> str:
+        self._writerow([])
+        return self._finish("Signature,{signature}\r\n")
+
+class JSONReportWriter(ReportWriter):
+    """JSON con las filas escritas una a una dentro de data; la firma es la última clave"""
+
+    @staticmethod
+    def _dumps(value: Any) -> str:
+        return json.dumps(value, default=str)
+
+    def begin(self):
+        report = self.report
+        self._emit("{\n")
+        for name in ("report_id", "framework", "report_type", "format",
+                     "generated_at", "period_start", "period_end"):
+            self._emit(f'  "{name}": {self._dumps(getattr(report, name))},\n')
+        self._emit('  "data": {')
+        if self.rows:
+            self._emit(f'\n    "{self.rows[0]}": [')
+
+    def write_row(self, row: Dict[str, Any]):
+        self._emit(("\n      " if self.row_count == 0 else ",\n      ") + self._dumps(row))
+        self.row_count += 1
+
+    def close(self) -> str:
+        report = self.report
+        rest = [(key, value) for key, value in report.data.items() if not self.rows or key != self.rows[0]]
+        if self.rows:
+            self._emit("\n    ]" + ("," if rest else ""))
+        for i, (key, value) in enumerate(rest):
+            self._emit(f"\n    {self._dumps(key)}: {self._dumps(value)}" + ("," if i < len(rest) - 1 else ""))
+        self._emit("\n  },\n")
+        self._emit(f'  "metadata": {self._dumps(report.metadata)},\n')
+        self._emit('  "file_path": null,\n')
+        return self._finish('  "signature": "{signature}"\n}}\n')
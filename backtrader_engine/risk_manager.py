@@ -10,6 +10,9 @@ from datetime import datetime, timezone
 import json
 from pathlib import Path
 
+from portfolio_risk import PortfolioRiskEngine
+from event_log import global_event_log
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -55,6 +58,9 @@ class RiskManager:
         # Condiciones de mercado
         self.market_conditions: Dict[str, MarketConditions] = {}
         
+        # Riesgo de portfolio (exposición, margen, VaR) mantenido incrementalmente
+        self.portfolio_risk = PortfolioRiskEngine(config.get('portfolio_risk', {}))
+        
         logger.info("RiskManager initialized")
     
     def validate_signal(self, signal_data: Dict[str, Any], 
@@ -67,6 +73,16 @@ class RiskManager:
         Returns:
             Tuple[bool, str]: (is_valid, reason)
         """
+        is_valid, reason = self._evaluate_signal(signal_data, current_balance, current_positions, market_data)
+        if not is_valid:
+            global_event_log.record_rejection(signal_data, reason)
+        return is_valid, reason
+    
+    def _evaluate_signal(self, signal_data: Dict[str, Any], 
+                        current_balance: float, 
+                        current_positions: Dict[str, Any],
+                        market_data: Dict[str, Any]) -> Tuple[bool, str]:
+        """Aplicar las validaciones en orden; devuelve el primer motivo de rechazo"""
         try:
             symbol = signal_data.get('symbol', '')
             signal_type = signal_data.get('signal_type', '')
@@ -105,6 +121,14 @@ class RiskManager:
             if not self._validate_drawdown(current_balance):
                 return False, "Maximum drawdown exceeded"
             
+            # 7. Validar límites de portfolio (O(1) sobre agregados incrementales)
+            proposed_qty = current_balance * self.risk_limits.max_position_size / price if price > 0 else 0
+            portfolio_valid, portfolio_reason = self.portfolio_risk.check_order(
+                symbol, signal_type, proposed_qty, price, current_balance
+            )
+            if not portfolio_valid:
+                return False, f"Portfolio: {portfolio_reason}"
+            
             logger.info(f"Signal validated: {symbol} {signal_type} @ {price}")
             return True, "Signal validated successfully"
             
@@ -312,6 +336,18 @@ class RiskManager:
             self.max_balance = current_balance
             return True
     
+    def on_fill(self, symbol: str, side: str, qty: float, price: float, leverage: float = 1.0):
+        """Registrar un fill en el estado de riesgo de portfolio"""
+        self.portfolio_risk.on_fill(symbol, side, qty, price, leverage)
+    
+    def on_mark_price(self, symbol: str, price: float):
+        """Registrar un nuevo mark price en el estado de riesgo de portfolio"""
+        self.portfolio_risk.on_mark_price(symbol, price)
+    
+    def sync_positions(self, positions: Dict[str, Any]):
+        """Reconstruir el estado de riesgo de portfolio a partir de posiciones restauradas"""
+        self.portfolio_risk.sync_positions(positions)
+    
     def update_trade_stats(self, pnl: float):
         """Actualizar estadísticas de trading"""
         self.daily_stats['trades_count'] += 1
@@ -344,7 +380,8 @@ class RiskManager:
                     'is_suitable': conditions.is_suitable_for_trading
                 }
                 for symbol, conditions in self.market_conditions.items()
-            }
+            },
+            'portfolio': self.portfolio_risk.get_status()
         }
     
     def save_backup(self, file_path: str):
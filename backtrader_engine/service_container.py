@@ -0,0 +1,129 @@
+"""
+Service Container - Construcción diferida de subsistemas y perfilado del arranque
+Los subsistemas que no están en el camino crítico del trading (backups, compliance, documentación,
+reportes, métricas...) se registran por nombre y solo se importan y construyen en el primer acceso;
+el profiler mide import e init de cada componente y el tiempo hasta la primera señal
+"""
+
+import importlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple, Union, Callable
+
+logger = logging.getLogger(__name__)
+
+class StartupProfiler:
+    """Tiempos de import/init por componente desde el inicio del proceso"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.timings: List[Tuple[str, str, float]] = []  # (componente, fase, segundos)
+        self.marks: Dict[str, float] = {}  # hito -> segundos desde el inicio
+
+    @contextmanager
+    def measure(self, component: str, phase: str):
+        """Medir una fase (import/init) de un componente"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append((component, phase, time.perf_counter() - started))
+
+    def mark(self, milestone: str) -> float:
+        """Registrar un hito (solo la primera vez) y devolver los segundos desde el inicio"""
+        if milestone not in self.marks:
+            self.marks[milestone] = time.perf_counter() - self.start
+        return self.marks[milestone]
+
+    def report(self) -> str:
+        """Resumen legible ordenado por coste"""
+        totals: Dict[str, Dict[str, float]] = {}
+        for component, phase, seconds in self.timings:
+            phases = totals.setdefault(component, {})
+            phases[phase] = phases.get(phase, 0.0) + seconds
+
+        lines = ["Startup profile:"]
+        for component, phases in sorted(totals.items(), key=lambda item: -sum(item[1].values())):
+            detail = ", ".join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in phases.items())
+            lines.append(f"  {component:<28} {sum(phases.values()) * 1000:8.1f}ms ({detail})")
+        for milestone, seconds in sorted(self.marks.items(), key=lambda item: item[1]):
+            lines.append(f"  -> {milestone}: {seconds:.3f}s")
+        return "\n".join(lines)
+
+class ServiceContainer:
+    """Registro de servicios con import y construcción en el primer acceso"""
+
+    def __init__(self, profiler: Optional[StartupProfiler] = None):
+        self.profiler = profiler or startup_profiler
+        self._factories: Dict[str, Tuple[Union[str, Callable], tuple, dict]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, target: Union[str, Callable], *args, **kwargs):
+        """
+        Registrar un servicio.
+
+        ``target`` es un callable o una referencia ``"modulo:atributo"`` que se importa en el
+        primer acceso; el atributo se usa tal cual (instancia global) salvo que se pasen
+        argumentos, en cuyo caso se llama con ellos.
+        """
+        with self._lock:
+            self._factories[name] = (target, args, kwargs)
+            self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """Instancia del servicio, construyéndola si es el primer acceso"""
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name not in self._instances:
+                if name not in self._factories:
+                    raise KeyError(f"Unknown service: {name}")
+                self._instances[name] = self._build(name)
+            return self._instances[name]
+
+    def _build(self, name: str) -> Any:
+        target, args, kwargs = self._factories[name]
+        if isinstance(target, str):
+            module_name, _, attribute = target.partition(":")
+            with self.profiler.measure(name, "import"):
+                target = getattr(importlib.import_module(module_name), attribute)
+            if not (args or kwargs):
+                return target
+
+        with self.profiler.measure(name, "init"):
+            return target(*args, **kwargs)
+
+    def peek(self, name: str) -> Optional[Any]:
+        """Instancia ya construida o None (no fuerza la construcción)"""
+        return self._instances.get(name)
+
+    def preload(self, names: Optional[List[str]] = None):
+        """Construir servicios por adelantado (p.ej. fuera del camino crítico)"""
+        for name in names or list(self._factories):
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"Error preloading service {name}: {e}")
+
+class Service:
+    """Atributo de clase que resuelve el servicio del contenedor ``services`` de la instancia"""
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+
+    def __set_name__(self, owner, name):
+        self.name = self.name or name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance.services.get(self.name)
+
+# Profiler global: se crea al importar el módulo, lo antes posible en el arranque
+startup_profiler = StartupProfiler()
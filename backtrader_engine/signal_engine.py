@@ -9,6 +9,8 @@ from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 import json
 
+from event_log import global_event_log
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -210,6 +212,7 @@ class SignalEngine:
                     if self.validator.validate_signal(signal):
                         logger.info(f"✅ Strategy: {strategy_name} - Signal VALIDATED and added")
                         signals.append(signal)
+                        global_event_log.record_signal(signal)
                         self._notify_callbacks(signal)
                     else:
                         logger.info(f"❌ Strategy: {strategy_name} - Signal REJECTED by validator")
@@ -47,10 +47,20 @@ class BotState:
             self.pending_orders = {}
 
 class StateManager:
-    """Gestor de persistencia de estado del bot"""
+    """
+    Gestor de persistencia de estado del bot
     
-    def __init__(self, state_file: str = "bot_state.json", backup_dir: str = "state_backups"):
+    Cada mutación se añade como un registro compacto a un write-ahead journal
+    (``<state_file>.journal``). Periódicamente se escribe un snapshot completo
+    de forma atómica (temp + fsync + rename) y se trunca el journal. En recovery
+    se carga el snapshot y se re-aplican los registros posteriores del journal.
+    """
+    
+    def __init__(self, state_file: str = "bot_state.json", backup_dir: str = "state_backups",
+                 fsync_journal: bool = False, compact_every: int = 1000,
+                 backup_interval: int = 3600):
         self.state_file = Path(state_file)
+        self.journal_file = Path(f"{state_file}.journal")
         self.backup_dir = Path(backup_dir)
         self.lock = threading.Lock()
         
@@ -62,21 +72,37 @@ class StateManager:
         self.last_save_time = 0
         self.auto_save_interval = 30  # segundos
         
+        # Journal
+        self.fsync_journal = fsync_journal  # fsync en cada registro (más lento, sin pérdida ante caída del SO)
+        self.compact_every = compact_every  # Registros antes de forzar un snapshot
+        self.backup_interval = backup_interval  # Segundos mínimos entre backups de snapshots
+        self.last_backup_time = 0
+        self._journal = None
+        self._seq = self._last_persisted_seq()
+        self._snapshot_seq = self._seq
+        
         logger.info(f"StateManager initialized - State file: {self.state_file}")
     
     def load_state(self) -> Optional[BotState]:
-        """Cargar estado desde archivo"""
+        """Cargar snapshot y re-aplicar el journal posterior"""
         try:
-            if not self.state_file.exists():
+            state, snapshot_seq = self._read_snapshot()
+            if state is None:
                 logger.info("No existing state file found, starting fresh")
-                return BotState()
+                state = BotState()
             
-            with open(self.state_file, 'r') as f:
-                data = json.load(f)
+            replayed = 0
+            for record in self._read_journal():
+                if record['seq'] > snapshot_seq:
+                    self._apply(state, record)
+                    snapshot_seq = record['seq']
+                    replayed += 1
             
-            # Convertir dict a BotState
-            state = BotState(**data)
-            logger.info(f"State loaded successfully - Balance: ${state.balance:.2f}, Trades: {state.total_trades}")
+            with self.lock:
+                self._seq = max(self._seq, snapshot_seq)
+            
+            logger.info(f"State loaded successfully - Balance: ${state.balance:.2f}, Trades: {state.total_trades}, "
+                        f"journal records replayed: {replayed}")
             return state
             
         except Exception as e:
@@ -84,11 +110,15 @@ class StateManager:
             return BotState()
     
     def save_state(self, state: BotState = None, force: bool = False) -> bool:
-        """Guardar estado a archivo"""
+        """Escribir snapshot atómico y compactar el journal"""
         try:
             with self.lock:
                 current_time = time.time()
                 
+                # Sin cambios desde el último snapshot: nada que compactar
+                if not force and self._seq == self._snapshot_seq:
+                    return True
+                
                 # Auto-save solo si ha pasado el intervalo
                 if not force and (current_time - self.last_save_time) < self.auto_save_interval:
                     return True
@@ -96,13 +126,19 @@ class StateManager:
                 state_to_save = state or self.current_state
                 state_to_save.last_update = datetime.now(timezone.utc).isoformat()
                 
-                # Crear backup antes de sobrescribir
-                if self.state_file.exists():
-                    self._create_backup()
+                data = asdict(state_to_save)
+                data['journal_seq'] = self._seq
+                self._write_atomic(self.state_file, json.dumps(data, indent=2))
                 
-                # Guardar estado
-                with open(self.state_file, 'w') as f:
-                    json.dump(asdict(state_to_save), f, indent=2)
+                # El snapshot ya cubre el journal: truncarlo
+                self._close_journal()
+                self.journal_file.write_text('')
+                self._snapshot_seq = self._seq
+                
+                # Crear backup del snapshot como mucho cada backup_interval
+                if current_time - self.last_backup_time >= self.backup_interval:
+                    self._create_backup()
+                    self.last_backup_time = current_time
                 
                 self.last_save_time = current_time
                 logger.debug(f"State saved - Balance: ${state_to_save.balance:.2f}")
@@ -112,6 +148,117 @@ class StateManager:
             logger.error(f"Error saving state: {e}")
             return False
     
+    def _record(self, op: str, **fields):
+        """Aplicar una mutación al estado actual y añadirla al journal"""
+        try:
+            with self.lock:
+                self._seq += 1
+                record = {'seq': self._seq, 'op': op, **fields}
+                self._apply(self.current_state, record)
+                
+                journal = self._open_journal()
+                journal.write(json.dumps(record, separators=(',', ':')) + '\n')
+                journal.flush()
+                if self.fsync_journal:
+                    os.fsync(journal.fileno())
+                
+                pending = self._seq - self._snapshot_seq
+            
+            if pending >= self.compact_every:
+                self.save_state(force=True)
+                
+        except Exception as e:
+            logger.error(f"Error journaling state change '{op}': {e}")
+    
+    @staticmethod
+    def _apply(state: BotState, record: Dict[str, Any]):
+        """Aplicar un registro del journal a un estado"""
+        op = record['op']
+        if op == 'balance':
+            state.balance = record['balance']
+        elif op == 'trade':
+            pnl = record['pnl']
+            state.total_trades += 1
+            state.total_pnl += pnl
+            if pnl > 0:
+                state.winning_trades += 1
+            else:
+                state.losing_trades += 1
+        elif op == 'position':
+            state.positions[record['symbol']] = record['data']
+        elif op == 'position_removed':
+            state.positions.pop(record['symbol'], None)
+        elif op == 'order':
+            state.pending_orders[record['order_id']] = record['data']
+        elif op == 'order_removed':
+            state.pending_orders.pop(record['order_id'], None)
+        elif op == 'signal':
+            state.signals_generated += 1
+            state.last_signal_time = record['time']
+        elif op == 'websocket':
+            state.websocket_connected = record['connected']
+            state.last_heartbeat = record['time']
+        else:
+            logger.warning(f"Unknown journal record: {op}")
+    
+    def _open_journal(self):
+        """Abrir el journal en modo append (lazy)"""
+        if self._journal is None:
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self.journal_file, 'a', encoding='utf-8')
+        return self._journal
+    
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+    
+    def _read_snapshot(self):
+        """Leer snapshot: (estado, seq del journal cubierto)"""
+        if not self.state_file.exists():
+            return None, 0
+        
+        with open(self.state_file, 'r') as f:
+            data = json.load(f)
+        
+        snapshot_seq = data.pop('journal_seq', 0)
+        return BotState(**data), snapshot_seq
+    
+    def _read_journal(self):
+        """Leer registros del journal, ignorando una posible última línea truncada"""
+        if not self.journal_file.exists():
+            return
+        
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Stopping journal replay at corrupt line {line_number}")
+                    return
+    
+    def _last_persisted_seq(self) -> int:
+        """Último número de secuencia persistido (snapshot o journal)"""
+        try:
+            _, seq = self._read_snapshot()
+            for record in self._read_journal():
+                seq = max(seq, record['seq'])
+            return seq
+        except Exception as e:
+            logger.warning(f"Could not read persisted journal sequence: {e}")
+            return 0
+    
+    @staticmethod
+    def _write_atomic(path: Path, content: str):
+        """Escribir archivo de forma atómica: temp + fsync + rename"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
     def _create_backup(self):
         """Crear backup del estado actual"""
         try:
@@ -141,54 +288,37 @@ class StateManager:
     
     def update_balance(self, new_balance: float):
         """Actualizar balance"""
-        self.current_state.balance = new_balance
-        self.save_state()
+        self._record('balance', balance=new_balance)
     
     def add_trade(self, pnl: float):
         """Agregar trade al historial"""
-        self.current_state.total_trades += 1
-        self.current_state.total_pnl += pnl
-        
-        if pnl > 0:
-            self.current_state.winning_trades += 1
-        else:
-            self.current_state.losing_trades += 1
-        
-        self.save_state()
+        self._record('trade', pnl=pnl)
     
     def update_position(self, symbol: str, position_data: Dict[str, Any]):
         """Actualizar posición"""
-        self.current_state.positions[symbol] = position_data
-        self.save_state()
+        self._record('position', symbol=symbol, data=position_data)
     
     def remove_position(self, symbol: str):
         """Remover posición"""
         if symbol in self.current_state.positions:
-            del self.current_state.positions[symbol]
-            self.save_state()
+            self._record('position_removed', symbol=symbol)
     
     def add_pending_order(self, order_id: str, order_data: Dict[str, Any]):
         """Agregar orden pendiente"""
-        self.current_state.pending_orders[order_id] = order_data
-        self.save_state()
+        self._record('order', order_id=order_id, data=order_data)
     
     def remove_pending_order(self, order_id: str):
         """Remover orden pendiente"""
         if order_id in self.current_state.pending_orders:
-            del self.current_state.pending_orders[order_id]
-            self.save_state()
+            self._record('order_removed', order_id=order_id)
     
     def update_signal_count(self):
         """Actualizar contador de señales"""
-        self.current_state.signals_generated += 1
-        self.current_state.last_signal_time = datetime.now(timezone.utc).isoformat()
-        self.save_state()
+        self._record('signal', time=datetime.now(timezone.utc).isoformat())
     
     def set_websocket_status(self, connected: bool):
         """Actualizar estado de WebSocket"""
-        self.current_state.websocket_connected = connected
-        self.current_state.last_heartbeat = datetime.now(timezone.utc).isoformat()
-        self.save_state()
+        self._record('websocket', connected=connected, time=datetime.now(timezone.utc).isoformat())
     
     def get_state_summary(self) -> Dict[str, Any]:
         """Obtener resumen del estado"""
@@ -220,6 +350,8 @@ class StateManager:
         """Guardado de emergencia (llamar antes de crash)"""
         try:
             self.save_state(force=True)
+            with self.lock:
+                self._close_journal()
             logger.info("Emergency state save completed")
         except Exception as e:
             logger.error(f"Emergency save failed: {e}")
@@ -0,0 +1,275 @@
+"""
+Task Supervisor - Planificador de trabajos periódicos y supervisor de tareas asyncio
+Los trabajos periódicos se ejecutan con jitter y sin solapamiento (un tick se salta si la ejecución
+anterior sigue en curso); los marcados como bloqueantes se ejecutan en un pool de hilos o procesos
+para no detener el event loop. Las tareas de larga duración se reinician con backoff exponencial
+si fallan, y se exportan el lag del event loop y la duración de cada trabajo como métricas
+"""
+
+import asyncio
+import inspect
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+# Modos de ejecución de trabajos bloqueantes
+BLOCKING_THREAD = "thread"
+BLOCKING_PROCESS = "process"
+
+@dataclass
+class PeriodicJob:
+    """Trabajo ejecutado cada ``interval`` segundos"""
+    name: str
+    func: Callable
+    interval: float
+    jitter: float = 0.1  # Fracción del intervalo
+    blocking: Optional[str] = None  # None (coroutine o función rápida), "thread" o "process"
+    initial_delay: Optional[float] = None  # Por defecto, un intervalo
+    timeout: Optional[float] = None
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    consecutive_failures: int = 0
+    last_duration: float = 0.0
+    last_error: Optional[str] = None
+    current: Optional[asyncio.Task] = field(default=None, repr=False)
+
+@dataclass
+class SupervisedTask:
+    """Tarea de larga duración que se reinicia si termina con error"""
+    name: str
+    factory: Callable[[], Any]  # Devuelve la coroutine a ejecutar
+    restarts: int = 0
+    last_error: Optional[str] = None
+
+class TaskSupervisor:
+    """Planificador de trabajos periódicos y supervisor de tareas"""
+
+    def __init__(self, metrics_collector=None, max_workers: int = 4,
+                 restart_base_delay: float = 1.0, restart_max_delay: float = 300.0,
+                 lag_interval: float = 1.0, lag_warning: float = 0.5):
+        self.metrics_collector = metrics_collector
+        self.max_workers = max_workers
+        self.restart_base_delay = restart_base_delay
+        self.restart_max_delay = restart_max_delay
+        self.lag_interval = lag_interval
+        self.lag_warning = lag_warning
+
+        self.jobs: Dict[str, PeriodicJob] = {}
+        self.tasks: Dict[str, SupervisedTask] = {}
+        self.loop_lag = 0.0
+        self.running = False
+        self.logger = logging.getLogger("TaskSupervisor")
+
+        self._runners: Dict[str, asyncio.Task] = {}
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._stopped: Optional[asyncio.Event] = None
+
+    def add_job(self, name: str, func: Callable, interval: float, jitter: float = 0.1,
+                blocking: Optional[str] = None, initial_delay: Optional[float] = None,
+                timeout: Optional[float] = None) -> PeriodicJob:
+        """Registrar un trabajo periódico (si el supervisor ya está en marcha, se arranca)"""
+        if blocking not in (None, BLOCKING_THREAD, BLOCKING_PROCESS):
+            raise ValueError(f"Unknown blocking mode: {blocking}")
+        job = PeriodicJob(name, func, interval, jitter, blocking, initial_delay, timeout)
+        self.jobs[name] = job
+        if self.running:
+            self._runners[name] = asyncio.create_task(self._job_runner(job), name=f"job:{name}")
+        return job
+
+    def add_task(self, name: str, factory: Callable[[], Any]) -> SupervisedTask:
+        """Registrar una tarea de larga duración (``factory`` devuelve una coroutine nueva en cada arranque)"""
+        task = SupervisedTask(name, factory)
+        self.tasks[name] = task
+        if self.running:
+            self._runners[name] = asyncio.create_task(self._task_runner(task), name=f"task:{name}")
+        return task
+
+    def start(self):
+        """Arrancar todos los trabajos, tareas y el monitor de lag (desde el event loop)"""
+        if self.running:
+            return
+        self.running = True
+        self._stopped = asyncio.Event()
+        for job in self.jobs.values():
+            self._runners[job.name] = asyncio.create_task(self._job_runner(job), name=f"job:{job.name}")
+        for task in self.tasks.values():
+            self._runners[task.name] = asyncio.create_task(self._task_runner(task), name=f"task:{task.name}")
+        self._runners["_loop_lag"] = asyncio.create_task(self._lag_monitor(), name="loop_lag")
+        self.logger.info(f"Task supervisor started: {len(self.jobs)} jobs, {len(self.tasks)} tasks")
+
+    async def stop(self):
+        """Cancelar trabajos y tareas y cerrar los pools"""
+        if not self.running:
+            return
+        self.running = False
+        runners = list(self._runners.values())
+        runners += [job.current for job in self.jobs.values() if job.current and not job.current.done()]
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+        self._runners.clear()
+
+        for pool in (self._thread_pool, self._process_pool):
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._thread_pool = self._process_pool = None
+        self._stopped.set()
+        self.logger.info("Task supervisor stopped")
+
+    async def join(self):
+        """Esperar hasta que se llame a stop()"""
+        if self._stopped:
+            await self._stopped.wait()
+
+    def _delay(self, job: PeriodicJob, base: float) -> float:
+        if not job.jitter:
+            return base
+        return max(0.0, base + random.uniform(-job.jitter, job.jitter) * job.interval)
+
+    def _next_delay(self, job: PeriodicJob) -> float:
+        """Intervalo del trabajo, con backoff exponencial tras fallos consecutivos"""
+        if not job.consecutive_failures:
+            return job.interval
+        backoff = job.interval * 2 ** min(job.consecutive_failures, 10)
+        return min(backoff, max(job.interval, self.restart_max_delay))
+
+    async def _job_runner(self, job: PeriodicJob):
+        """Tick del trabajo: lanzar una ejecución salvo que la anterior siga en curso"""
+        delay = job.interval if job.initial_delay is None else job.initial_delay
+        while self.running:
+            await asyncio.sleep(self._delay(job, delay))
+            delay = job.interval
+
+            if job.current and not job.current.done():
+                job.skipped += 1
+                self._count("job_runs_total", {"job": job.name, "status": "skipped"})
+                self.logger.warning(f"Job {job.name} still running, skipping this tick")
+                continue
+
+            # Tras fallos consecutivos, espaciar la siguiente ejecución
+            backoff = self._next_delay(job) - job.interval
+            if backoff > 0:
+                await asyncio.sleep(backoff)
+
+            job.current = asyncio.create_task(self._execute(job), name=f"run:{job.name}")
+
+    async def _execute(self, job: PeriodicJob):
+        """Ejecutar el trabajo una vez registrando duración y resultado"""
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            call = self._call(job)
+            await (asyncio.wait_for(call, job.timeout) if job.timeout else call)
+            job.consecutive_failures = 0
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except asyncio.TimeoutError:
+            status = "timeout"
+            self._job_failed(job, f"timed out after {job.timeout}s")
+        except Exception as e:
+            status = "error"
+            self._job_failed(job, str(e))
+        finally:
+            job.runs += 1
+            job.last_duration = time.perf_counter() - started
+            self._observe("job_duration_seconds", job.last_duration, {"job": job.name})
+            self._count("job_runs_total", {"job": job.name, "status": status})
+
+    def _call(self, job: PeriodicJob):
+        """Awaitable de la ejecución según el modo del trabajo"""
+        loop = asyncio.get_running_loop()
+        if job.blocking == BLOCKING_THREAD:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+            return loop.run_in_executor(self._thread_pool, job.func)
+        if job.blocking == BLOCKING_PROCESS:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return loop.run_in_executor(self._process_pool, job.func)
+        if inspect.iscoroutinefunction(job.func):
+            return job.func()
+
+        async def run_inline():
+            return job.func()
+        return run_inline()
+
+    def _job_failed(self, job: PeriodicJob, error: str):
+        job.failures += 1
+        job.consecutive_failures += 1
+        job.last_error = error
+        self.logger.error(f"Job {job.name} failed ({job.consecutive_failures} in a row): {error}")
+
+    async def _task_runner(self, task: SupervisedTask):
+        """Ejecutar la tarea y reiniciarla con backoff si termina con error"""
+        failures = 0
+        while self.running:
+            started = time.monotonic()
+            try:
+                await task.factory()
+                self.logger.info(f"Task {task.name} finished")
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Una tarea que estuvo sana un buen rato vuelve a empezar el backoff
+                if time.monotonic() - started > self.restart_max_delay:
+                    failures = 0
+                failures += 1
+                task.restarts += 1
+                task.last_error = str(e)
+                delay = min(self.restart_base_delay * 2 ** (failures - 1), self.restart_max_delay)
+                self.logger.error(f"Task {task.name} failed: {e}; restarting in {delay:.1f}s")
+                self._count("task_restarts_total", {"task": task.name})
+                await asyncio.sleep(delay)
+
+    async def _lag_monitor(self):
+        """Medir cuánto se retrasa un sleep respecto a lo pedido (event loop bloqueado)"""
+        loop = asyncio.get_running_loop()
+        while self.running:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            self.loop_lag = max(0.0, loop.time() - expected)
+            if self.metrics_collector:
+                self.metrics_collector.set_gauge("event_loop_lag_seconds", self.loop_lag)
+            if self.loop_lag > self.lag_warning:
+                self.logger.warning(f"Event loop lag: {self.loop_lag:.3f}s")
+
+    def _count(self, name: str, labels: Dict[str, str]):
+        if self.metrics_collector:
+            self.metrics_collector.increment_counter(name, labels=labels)
+
+    def _observe(self, name: str, value: float, labels: Dict[str, str]):
+        if self.metrics_collector:
+            self.metrics_collector.observe_histogram(name, value, labels=labels)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Estado de trabajos y tareas"""
+        return {
+            "running": self.running,
+            "event_loop_lag": self.loop_lag,
+            "jobs": {
+                name: {
+                    "interval": job.interval,
+                    "blocking": job.blocking,
+                    "runs": job.runs,
+                    "failures": job.failures,
+                    "skipped": job.skipped,
+                    "last_duration": job.last_duration,
+                    "last_error": job.last_error,
+                    "in_progress": bool(job.current and not job.current.done())
+                }
+                for name, job in self.jobs.items()
+            },
+            "tasks": {
+                name: {"restarts": task.restarts, "last_error": task.last_error}
+                for name, task in self.tasks.items()
+            }
+        }
@@ -0,0 +1,72 @@
+import unittest
+import sys
+import asyncio
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from alerting_system import AlertingSystem, CounterWindow
+from metrics_collector import MetricsCollector
+
+HEALTHY = {"bot_status": {"value": 1}, "websocket_connected": {"value": 1}}
+
+class TestAlertingSystem(unittest.TestCase):
+    def setUp(self):
+        self.alerting = AlertingSystem()
+
+    def _active(self):
+        return sorted(alert.annotations["rule_name"] for alert in self.alerting.get_active_alerts())
+
+    def test_only_dependent_rules_are_evaluated(self):
+        calls = []
+        rule = self.alerting.rules[0]  # bot_not_running
+        condition = rule.condition
+        rule.condition = lambda metrics: calls.append(1) or condition(metrics)
+
+        async def run():
+            await self.alerting.check_alerts(HEALTHY)
+            await self.alerting.check_alerts(dict(HEALTHY, bot_memory_usage_bytes={"value": 1}))
+            first = len(calls)
+            await self.alerting.check_alerts(dict(HEALTHY, bot_status={"value": 0}))
+            return first, len(calls)
+
+        first, total = asyncio.run(run())
+        self.assertEqual(first, 1)
+        self.assertEqual(total, 2)
+        self.assertEqual(self._active(), ["bot_not_running"])
+
+    def test_collector_updates_fire_within_a_tick(self):
+        collector = MetricsCollector()
+
+        async def run():
+            self.alerting.attach(collector)
+            await self.alerting.check_alerts(HEALTHY)
+            collector.set_gauge("websocket_connected", 0)
+            for _ in range(100):
+                collector.increment_counter("api_requests_total")
+            for _ in range(20):
+                collector.increment_counter("api_requests_failed")
+            await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        self.assertEqual(self._active(), ["high_api_errors", "websocket_disconnected"])
+
+        # Una métrica de la que no depende ninguna regla no paga la agregación
+        aggregated = []
+        original = collector._aggregate_metric
+        collector._aggregate_metric = lambda family: aggregated.append(family.name) or original(family)
+        collector.record_api_request("bybit", True, 0.1)
+        self.assertNotIn("api_response_time_seconds", aggregated)
+        self.assertIn("api_requests_total", aggregated)
+
+    def test_counter_window_delta(self):
+        window = CounterWindow(10)
+        window.add(5, now=0)
+        window.add(8, now=5)
+        window.add(20, now=12)
+        self.assertEqual(window.delta(now=12), 15)
+        self.assertEqual(window.delta(5, now=12), 12)
+        window.add(2, now=13)  # Reinicio del contador
+        self.assertEqual(window.delta(now=13), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import sys
+import tempfile
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from audit_trail import AuditTrail, AuditEvent, AuditEventType, AuditSeverity
+
+class TestAuditTrailSegments(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.audit_file = str(Path(self.tmp.name) / "audit_trail.jsonl")
+        self.trail = AuditTrail(self.audit_file)
+        self.trail.audit_config["max_file_size"] = 4096
+        self.trail.audit_config["index_interval"] = 8
+
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.events = [
+            AuditEvent(f"audit_{i}", base + timedelta(hours=i),
+                       AuditEventType.SECURITY_EVENT if i % 10 == 0 else AuditEventType.TRADING_ACTION,
+                       AuditSeverity.LOW, "bot", None, "order", f"BTCUSDT/{i}", {"i": i},
+                       None, None, "sig")
+            for i in range(500)
+        ]
+        for start in range(0, len(self.events), 50):
+            self.trail._flush_batch(self.events[start:start + 50])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_segments_are_rotated_and_sealed(self):
+        self.assertGreater(len(self.trail.segments), 1)
+        self.assertTrue(all(s.compressed for s in self.trail.segments if s is not self.trail.active_segment))
+        self.assertEqual(sum(s.count for s in self.trail.segments), len(self.events))
+
+    def test_range_and_type_queries_survive_restart(self):
+        start = self.events[100].timestamp
+        end = self.events[130].timestamp
+        trail = AuditTrail(self.audit_file)
+
+        events = trail.query_events(start, end)
+        self.assertEqual([e.event_id for e in events], [f"audit_{i}" for i in range(130, 99, -1)])
+
+        security = trail.query_events(event_type=AuditEventType.SECURITY_EVENT, limit=5)
+        self.assertEqual([e.event_id for e in security], [f"audit_{i}" for i in (490, 480, 470, 460, 450)])
+
+    def test_retention_drops_whole_segments(self):
+        cutoff = self.events[250].timestamp
+        self.trail.audit_config["retention_days"] = (datetime.now(timezone.utc) - cutoff).days
+        self.trail.cleanup_old_events()
+
+        remaining = self.trail.query_events(limit=1000)
+        self.assertLess(len(remaining), len(self.events))
+        self.assertEqual(remaining[0].event_id, "audit_499")
+
+    def test_worker_group_commits_chained_signatures(self):
+        trail = AuditTrail(str(Path(self.tmp.name) / "worker.jsonl"))
+        trail.audit_config["flush_interval"] = 0.05
+        trail.start()
+        for i in range(250):
+            trail.log_event(AuditEventType.TRADING_ACTION, "order", "ETHUSDT", {"i": i})
+        trail.stop()
+
+        self.assertEqual(sum(s.count for s in trail.segments), 250)
+        self.assertTrue(trail.verify_chain())
+
+        # Alterar un evento rompe la cadena
+        path = trail._segment_path(trail.active_segment)
+        lines = path.read_text(encoding="utf-8").splitlines()
+        lines[10] = lines[10].replace('"i": 10', '"i": 11')
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        self.assertFalse(AuditTrail(str(Path(self.tmp.name) / "worker.jsonl")).verify_chain())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import sys
+import os
+import asyncio
+import tempfile
+import tarfile
+import io
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from backup_manager import BackupManager, BackupType, BackupStatus
+from backup_store import iter_chunk_files, load_manifest, restore_file
+
+class TestBackupManagerStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+
+        Path("logs").mkdir()
+        Path("configs").mkdir()
+        Path("logs/bot_state.json").write_text('{"balance": 1000}')
+        Path("logs/trades.log").write_bytes(os.urandom(3 * 1024 * 1024))
+        for i in range(20):
+            Path(f"configs/config_{i}.json").write_text(f'{{"value": {i}}}')
+
+        self.manager = BackupManager(backup_dir="backups", max_backups=2, max_workers=2)
+        self.manager.backup_paths = {"logs": "logs/", "configs": "configs/", "state": "logs/bot_state.json"}
+
+    def tearDown(self):
+        self.manager.close()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_unchanged_files_are_skipped_and_chunks_deduplicated(self):
+        first = asyncio.run(self.manager.create_backup(BackupType.FULL))
+        with open("logs/trades.log", "ab") as f:
+            f.write(b"new trade\n")
+        second = asyncio.run(self.manager.create_backup(BackupType.FULL))
+
+        first_info = self.manager.get_backup_info(first)
+        second_info = self.manager.get_backup_info(second)
+        self.assertEqual(first_info.metadata["stored_files"], 22)
+        self.assertEqual(second_info.metadata["reused_files"], 21)
+        self.assertEqual(second_info.metadata["stored_files"], 1)
+        # Solo el último chunk del log cambió
+        self.assertLess(second_info.metadata["new_bytes"], 1024)
+
+    def test_restore_rebuilds_files_and_old_chunks_are_collected(self):
+        original = Path("logs/trades.log").read_bytes()
+        backup_id = asyncio.run(self.manager.create_backup(BackupType.FULL))
+
+        restored = asyncio.run(self.manager.restore_backup(backup_id, Path("restore")))
+        self.assertTrue(restored)
+        self.assertEqual(Path("restore/logs/trades.log").read_bytes(), original)
+        self.assertEqual(Path("restore/configs/config_3.json").read_text(), '{"value": 3}')
+
+        # Reemplazar el log y rotar backups: los chunks del log antiguo dejan de estar referenciados
+        Path("logs/trades.log").write_bytes(os.urandom(1024))
+        for _ in range(2):
+            asyncio.run(self.manager.create_backup(BackupType.FULL))
+        chunk_names = {p.name.split(".")[0] for p in iter_chunk_files(self.manager.chunks_dir)}
+        self.assertEqual(len(self.manager.backups), 2)
+        self.assertEqual(len(chunk_names), 22)
+
+    def test_partial_restore_and_verify_only(self):
+        backup_id = asyncio.run(self.manager.create_backup(BackupType.FULL))
+        Path("logs/bot_state.json").write_text("corrupted")
+        Path("configs/config_0.json").write_text("changed")
+
+        restored = asyncio.run(self.manager.restore_backup(
+            backup_id, paths=["logs/bot_state.json"], safety_backup=False
+        ))
+        self.assertTrue(restored)
+        self.assertEqual(Path("logs/bot_state.json").read_text(), '{"balance": 1000}')
+        self.assertEqual(Path("configs/config_0.json").read_text(), "changed")
+
+        self.assertEqual(asyncio.run(self.manager.verify_backups()), {backup_id: True})
+
+        # Dañar un chunk: la verificación marca el backup como corrupto
+        chunk_file = next(iter_chunk_files(self.manager.chunks_dir))
+        chunk_file.write_bytes(b"garbage")
+        self.assertEqual(asyncio.run(self.manager.verify_backups()), {backup_id: False})
+        self.assertEqual(self.manager.get_backup_info(backup_id).status, BackupStatus.CORRUPTED)
+
+    def test_manifest_paths_cannot_escape_target_dir(self):
+        backup_id = asyncio.run(self.manager.create_backup(BackupType.FULL))
+        manifest = load_manifest(self.manager.get_backup_info(backup_id).file_path)
+        entry = next(e for e in manifest["files"] if e["path"] == "logs/bot_state.json")
+        Path("restore").mkdir()
+        outside = os.path.abspath("outside.json")
+
+        for path in ("../outside.json", "logs/../../outside.json", outside):
+            with self.assertRaises(ValueError):
+                restore_file(dict(entry, path=path), str(self.manager.chunks_dir), "restore", manifest["compression"])
+        self.assertFalse(os.path.exists(outside))
+
+        restore_file(entry, str(self.manager.chunks_dir), "restore", manifest["compression"])
+        self.assertEqual(Path("restore/logs/bot_state.json").read_text(), '{"balance": 1000}')
+
+    def test_legacy_tar_members_cannot_escape_target_dir(self):
+        backup_file = Path("backups/legacy_backup.tar.gz")
+        with tarfile.open(backup_file, "w:gz") as tar:
+            for name in ("configs/ok.json", "../escaped.json"):
+                info = tarfile.TarInfo(name)
+                info.size = 2
+                tar.addfile(info, io.BytesIO(b"{}"))
+
+        target = Path("restore")
+        target.mkdir()
+        with self.assertRaises(tarfile.FilterError):
+            self.manager._extract_backup(backup_file, target)
+        self.assertTrue((target / "configs/ok.json").exists())
+        self.assertFalse(Path("escaped.json").exists())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import sys
+import asyncio
+import time
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from compliance_manager import (
+    ComplianceManager, ComplianceRule, ComplianceCheck, ComplianceCategory, ComplianceStatus
+)
+
+class TestComplianceManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = ComplianceManager()
+        self.manager.rules = {}  # Solo las reglas del test
+        self.loads = 0
+        self.calls = 0
+        self.value = 1
+        self.manager.register_input("value", self._load_value)
+
+    def _load_value(self):
+        self.loads += 1
+        return self.value
+
+    def _add_rule(self, rule_id, checks):
+        self.manager._add_rule(ComplianceRule(
+            rule_id, rule_id, ComplianceCategory.OPERATIONAL, "", "low", [], checks, "", datetime.now(timezone.utc)
+        ))
+
+    async def _slow_check(self, rule, context) -> ComplianceCheck:
+        self.calls += 1
+        await asyncio.sleep(0.2)
+        return ComplianceCheck(rule.id, ComplianceStatus.COMPLIANT, f"value={context.get('value')}", {}, datetime.now(timezone.utc))
+
+    async def _hanging_check(self, rule) -> ComplianceCheck:
+        await asyncio.sleep(10)
+
+    def test_checks_run_concurrently_with_shared_inputs_and_timeouts(self):
+        self.manager.register_check("slow_a", self._slow_check, inputs=("value",))
+        self.manager.register_check("slow_b", self._slow_check, inputs=("value",))
+        self.manager.register_check("hanging", self._hanging_check, timeout=0.1)
+        self._add_rule("OPS_T1", ["slow_a", "slow_b", "hanging", "missing"])
+
+        start = time.perf_counter()
+        checks = asyncio.run(self.manager.run_compliance_check())
+
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual([c.status for c in checks], [
+            ComplianceStatus.COMPLIANT, ComplianceStatus.COMPLIANT, ComplianceStatus.UNKNOWN, ComplianceStatus.UNKNOWN
+        ])
+        self.assertEqual(self.loads, 1)
+
+    def test_results_are_reused_until_inputs_change(self):
+        self.manager.register_check("slow_a", self._slow_check, inputs=("value",))
+        self._add_rule("OPS_T1", ["slow_a"])
+
+        async def run():
+            await self.manager.run_compliance_check()
+            await self.manager.run_compliance_check()
+            self.value = 2
+            return await self.manager.run_compliance_check()
+
+        checks = asyncio.run(run())
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(checks[0].message, "value=2")
+
+        asyncio.run(self.manager.run_compliance_check(force=True))
+        self.assertEqual(self.calls, 3)
+
+    def test_failed_results_are_not_reused(self):
+        async def flaky_check(rule, context):
+            self.calls += 1
+            status = ComplianceStatus.CRITICAL if self.calls == 1 else ComplianceStatus.COMPLIANT
+            return ComplianceCheck(rule.id, status, "", {}, datetime.now(timezone.utc))
+
+        self.manager.register_check("flaky", flaky_check, inputs=("value",))
+        self._add_rule("OPS_T1", ["flaky"])
+
+        async def run():
+            first = await self.manager.run_compliance_check()
+            second = await self.manager.run_compliance_check()
+            await self.manager.run_compliance_check()
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(first[0].status, ComplianceStatus.CRITICAL)
+        self.assertEqual(second[0].status, ComplianceStatus.COMPLIANT)
+        self.assertEqual(self.calls, 2)
+
+    def test_trade_data_capture_requires_state_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.manager.state_file = str(Path(tmp) / "bot_state.json")
+            self._add_rule("OPS_T1", ["verify_trade_data_capture"])
+
+            missing = asyncio.run(self.manager.run_compliance_check())
+            Path(self.manager.state_file).write_text('{"balance": 10000}')
+            present = asyncio.run(self.manager.run_compliance_check())
+
+        self.assertEqual(missing[0].status, ComplianceStatus.NON_COMPLIANT)
+        self.assertEqual(present[0].status, ComplianceStatus.COMPLIANT)
+
+if __name__ == '__main__':
+    unittest.main()
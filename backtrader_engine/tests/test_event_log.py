@@ -0,0 +1,74 @@
+import unittest
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from event_log import EventLog, EventLogReader, EventKind, EVENT_DTYPE, decode
+import analyze_24h_logs
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / "events.bin"
+        self.event_log = EventLog(str(self.path))
+        self.event_log.start()
+
+    def tearDown(self):
+        self.event_log.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def _record_session(self):
+        self.event_log.record_signal({'symbol': 'BTCUSDT', 'signal_type': 'BUY', 'strategy': 'rsi_ema',
+                                      'price': 50000.0, 'confidence': 0.75, 'timestamp': 1700000000.0})
+        self.event_log.record_rejection({'symbol': 'ETHUSDT', 'signal_type': 'SELL', 'strategy': 'bollinger',
+                                         'price': 3000.0, 'confidence': 0.4}, "Confidence 40.00% below minimum 60.00%")
+        self.event_log.record_fill({'trade_id': 'trade_1', 'order_id': 'paper_1', 'symbol': 'BTCUSDT', 'side': 'Buy',
+                                    'qty': 0.02, 'price': 50010.0, 'commission': 0.6, 'timestamp': 1700000001.0})
+        self.event_log.record_balance(9999.4)
+
+    def test_nothing_is_recorded_before_start(self):
+        idle = EventLog(str(Path(self.temp_dir) / "idle" / "events.bin"))
+        idle.record_balance(100.0)
+        idle.flush()
+        self.assertFalse(idle.running)
+        self.assertFalse((Path(self.temp_dir) / "idle").exists())
+
+    def test_written_events_are_read_as_typed_columns(self):
+        self._record_session()
+        self.event_log.flush()
+
+        reader = EventLogReader(self.path)
+        events = reader.events()
+        self.assertIsInstance(events, np.memmap)
+        self.assertEqual(len(events), 4)
+        self.assertEqual(reader.counts()['signal'], 1)
+
+        fills = reader.select(EventKind.FILL, symbol='BTCUSDT')
+        self.assertEqual(decode(fills['ref']), ['trade_1'])
+        self.assertEqual(fills['side'].tolist(), [1])
+        self.assertAlmostEqual(float(fills['value'][0]), 0.6)
+
+        # Un registro a medio escribir no se expone a los lectores
+        with open(self.path, 'ab') as f:
+            f.write(b'\x00' * (EVENT_DTYPE.itemsize // 2))
+        self.assertEqual(len(EventLogReader(self.path).events()), 4)
+
+    def test_analyzer_reads_event_log(self):
+        self._record_session()
+        self.event_log.stop()
+
+        analyzer = analyze_24h_logs.TestAnalyzer(self.temp_dir)
+        analyzer.load_logs()
+
+        self.assertEqual(analyzer.data['signals']['type'], ['BUY'])
+        self.assertEqual(analyzer.data['symbols']['BTCUSDT'], {'buy': 1, 'sell': 0})
+        self.assertEqual(analyzer.data['risk_rejections']['reason'], ["Confidence 40.00% below minimum 60.00%"])
+        self.assertEqual(len(analyzer.data['trades']['details']), 1)
+        self.assertEqual(analyzer.data['strategies']['rsi_ema']['confidence'], [0.75])
+
+if __name__ == '__main__':
+    unittest.main()
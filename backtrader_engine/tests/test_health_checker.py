@@ -0,0 +1,82 @@
+import unittest
+import sys
+import asyncio
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from health_checker import HealthChecker, HealthCheck, HealthStatus
+from health_endpoint import HealthEndpoint
+
+class TestHealthChecker(unittest.TestCase):
+    def setUp(self):
+        self.checker = HealthChecker()
+        self.checker.checks = []  # Solo los checks del test
+        self.calls = 0
+
+    async def _slow_check(self) -> HealthCheck:
+        self.calls += 1
+        await asyncio.sleep(0.2)
+        return HealthCheck("slow", HealthStatus.HEALTHY, "ok", datetime.now(timezone.utc))
+
+    async def _hanging_check(self) -> HealthCheck:
+        await asyncio.sleep(10)
+
+    def test_checks_run_concurrently_with_timeouts(self):
+        self.checker.register_check(self._slow_check)
+        self.checker.register_check(self._hanging_check, timeout=0.1)
+
+        start = time.perf_counter()
+        results = asyncio.run(self.checker.run_all_checks())
+
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(results["slow"].status, HealthStatus.HEALTHY)
+        self.assertEqual(results["_hanging_check"].status, HealthStatus.UNKNOWN)
+
+    def test_results_are_cached_until_ttl(self):
+        self.checker.register_check(self._slow_check, ttl=60)
+
+        async def run():
+            await self.checker.run_all_checks()
+            await asyncio.gather(self.checker.run_all_checks(), self.checker.run_all_checks())
+            await asyncio.gather(self.checker.run_all_checks(force=True), self.checker.run_all_checks(force=True))
+
+        asyncio.run(run())
+        self.assertEqual(self.calls, 2)
+
+    def test_endpoint_serves_cached_results_while_refreshing(self):
+        endpoint = HealthEndpoint()
+        endpoint.health_checker = self.checker
+        self.checker.register_check(self._slow_check, ttl=0.3)
+
+        async def run():
+            await endpoint.get_quick_health()  # Sin resultados: se ejecutan en línea
+            await asyncio.sleep(0.35)
+            start = time.perf_counter()
+            health = await endpoint.get_health_status()  # Vencido: se sirve la caché sin esperar
+            elapsed = time.perf_counter() - start
+            calls = self.calls
+            endpoint.start(refresh_interval=0.05)
+            await asyncio.sleep(0.3)
+            await endpoint.stop()
+            return health, elapsed, calls
+
+        health, elapsed, calls = asyncio.run(run())
+        self.assertLess(elapsed, 0.1)
+        self.assertEqual(calls, 1)
+        self.assertGreaterEqual(self.calls, 2)  # El refresco re-ejecutó el check vencido
+        self.assertEqual(health["checks"]["slow"]["status"], "healthy")
+
+    def test_endpoint_refresh_thread_serves_first_results(self):
+        endpoint = HealthEndpoint()
+        endpoint.health_checker = self.checker
+        self.checker.register_check(self._slow_check, ttl=60)
+
+        endpoint.start_in_thread(refresh_interval=60)
+        health = asyncio.run(endpoint.get_quick_health())
+        self.assertEqual(health["total_checks"], 1)
+        self.assertEqual(self.calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from metrics_collector import MetricsCollector
+from latency_tracer import LatencyTracer
+
+class TestLatencyTracer(unittest.TestCase):
+    def setUp(self):
+        self.collector = MetricsCollector()
+        self.tracer = LatencyTracer(sample_rate=1.0, metrics_collector=self.collector)
+
+    def test_stages_are_exported_as_histograms(self):
+        trace = self.tracer.start(time.perf_counter_ns())
+        for stage in ("decode", "dispatch", "indicators", "signal_generation", "risk_validation", "order_creation"):
+            trace.mark(stage)
+        self.tracer.finish(trace, "order")
+        self.tracer.finish(trace, "no_signal")  # Una traza solo se cierra una vez
+
+        text = self.collector.export_prometheus_format()
+        self.assertIn('pipeline_stage_latency_seconds_count{stage="risk_validation"} 1.0', text)
+        self.assertIn('tick_to_order_latency_seconds_count{outcome="order"} 1.0', text)
+        self.assertNotIn('outcome="no_signal"', text)
+
+    def test_sampling_can_be_disabled(self):
+        self.tracer.set_sample_rate(0.0)
+        self.assertIsNone(self.tracer.start())
+
+if __name__ == '__main__':
+    unittest.main()
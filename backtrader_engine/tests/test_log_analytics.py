@@ -0,0 +1,92 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import log_analytics
+from log_analytics import LogAnalytics, split_ranges
+import analyze_24h_logs
+
+LINES = [
+    "[2024-01-01 10:00:00] MomentumStrategy BUY signal symbol: BTCUSDT confidence: 0.75",
+    "[2024-01-01 10:00:01] INFO heartbeat",
+    "[2024-01-01 10:00:02] MeanReversionStrategy SELL signal symbol: ETHUSDT confidence: 0.60",
+    "[2024-01-01 10:00:03] Risk Manager rejected order: max exposure",
+    "[2024-01-01 10:00:04] Order executed BTCUSDT qty 0.1",
+    "[2024-01-01 10:00:05] ERROR connection lost",
+    "[2024-01-01 10:00:06] BUY signal symbol: ETHUSDT confidence: 1.2.3",
+]
+
+class TestLogAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / "bot.log"
+        self.log_path.write_text("\n".join(LINES) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_report_tables_and_incremental_reload(self):
+        analyzer = analyze_24h_logs.TestAnalyzer(self.temp_dir)
+        analyzer.load_logs()
+
+        self.assertEqual(analyzer.data['signals']['type'], ['BUY', 'SELL'])
+        self.assertEqual(analyzer.data['signals']['confidence'], [0.75, 0.60])
+        self.assertEqual(analyzer.data['symbols']['BTCUSDT'], {'buy': 1, 'sell': 0})
+        self.assertEqual(analyzer.data['strategies']['MomentumStrategy']['signals'], 1)
+        self.assertEqual(len(analyzer.data['risk_rejections']['reason']), 1)
+        self.assertEqual(analyzer.data['trades']['timestamp'], ['2024-01-01 10:00:04'])
+        self.assertEqual(analyzer.data['errors']['message'], [LINES[5]])
+        self.assertIn("Total Signals Generated: 2", analyzer.generate_report())
+
+        # Se añade una línea completa y otra a medio escribir: solo se procesan los bytes nuevos
+        offset = self.log_path.stat().st_size
+        with open(self.log_path, 'a') as f:
+            f.write("[2024-01-01 10:00:07] ERROR timeout\n[2024-01-01 10:00:08] ERROR part")
+        parsed = []
+        original = log_analytics.parse_range
+        log_analytics.parse_range = lambda path, start, end: parsed.append((start, end)) or original(path, start, end)
+        try:
+            tables = LogAnalytics(self.temp_dir).load()
+        finally:
+            log_analytics.parse_range = original
+
+        self.assertEqual(parsed[0][0], offset)
+        self.assertEqual(len(tables['errors']['message']), 3)
+        self.assertEqual(len(tables['signals']['type']), 2)
+
+        # La línea incompleta no entra en la caché
+        with open(self.log_path, 'a') as f:
+            f.write("ial\n")
+        tables = LogAnalytics(self.temp_dir).load()
+        self.assertEqual(tables['errors']['message'][-1], "[2024-01-01 10:00:08] ERROR partial")
+        self.assertEqual(len(tables['errors']['message']), 3)
+
+    def test_ranges_align_to_lines_and_preserve_order(self):
+        size = self.log_path.stat().st_size
+        ranges = split_ranges(str(self.log_path), 0, size, range_bytes=50)
+        self.assertGreater(len(ranges), 1)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], size)
+        data = self.log_path.read_bytes()
+        for start, end in ranges:
+            self.assertTrue(start == 0 or data[start - 1:start] == b'\n')
+
+        # Forzar el pool de procesos con rangos pequeños
+        old_parallel = log_analytics.PARALLEL_BYTES
+        log_analytics.PARALLEL_BYTES = 0
+        log_analytics.split_ranges = lambda path, start, end: split_ranges(path, start, end, range_bytes=50)
+        try:
+            parallel = LogAnalytics(self.temp_dir, max_workers=2).load()
+        finally:
+            log_analytics.split_ranges = split_ranges
+            log_analytics.PARALLEL_BYTES = old_parallel
+        os.remove(Path(self.temp_dir) / ".log_analytics_cache.json")
+        serial = LogAnalytics(self.temp_dir, max_workers=1).load()
+        self.assertEqual(parallel, serial)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import threading
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from metrics_collector import MetricsCollector
+from prometheus_server import ExpositionCache
+
+class TestMetricsCollector(unittest.TestCase):
+    def setUp(self):
+        self.collector = MetricsCollector()
+
+    def test_every_label_set_is_exported(self):
+        self.collector.record_error("network")
+        self.collector.record_error("network")
+        self.collector.record_error("database")
+
+        text = self.collector.export_prometheus_format()
+        self.assertIn('errors_total{type="network"} 2.0', text)
+        self.assertIn('errors_total{type="database"} 1.0', text)
+        self.assertEqual(self.collector.get_all_metrics()["errors_total"].value, 3.0)
+
+    def test_bound_counter_is_exact_across_threads(self):
+        counter = self.collector.counter("trading_signals_total", {"strategy": "vstru"})
+
+        def worker():
+            for _ in range(10000):
+                counter.inc()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.collector.get_metric("trading_signals_total").value, 40000)
+
+    def test_histogram_buckets(self):
+        for value in (0.003, 0.02, 0.02, 3.0):
+            self.collector.record_api_request("bybit", True, value)
+
+        text = self.collector.export_prometheus_format()
+        self.assertIn('api_response_time_seconds_bucket{endpoint="bybit",le="0.005"} 1.0', text)
+        self.assertIn('api_response_time_seconds_bucket{endpoint="bybit",le="0.025"} 3.0', text)
+        self.assertIn('api_response_time_seconds_bucket{endpoint="bybit",le="+Inf"} 4.0', text)
+        self.assertIn('api_response_time_seconds_count{endpoint="bybit"} 4.0', text)
+
+    def test_exposition_cache_tracks_changes(self):
+        cache = ExpositionCache(self.collector.registry)
+        first = cache.render()
+        self.assertEqual(first.decode(), self.collector.export_prometheus_format())
+        self.assertIs(cache.render(), first)
+
+        rendered = cache.stats["series_rendered"]
+        self.collector.record_error("network")
+        self.collector.update_balance(12000.0)
+        self.assertEqual(cache.render().decode(), self.collector.export_prometheus_format())
+        self.assertEqual(cache.stats["series_rendered"] - rendered, 2)
+
+    def test_versions_are_unique_and_types_are_checked(self):
+        counter = self.collector.counter("trading_signals_total", {"strategy": "vstru"})
+        family = self.collector.registry.get("trading_signals_total")
+        start = next(family._versions)
+
+        def worker():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Cada actualización recibe su propia versión: ningún incremento se pierde para la caché
+        self.assertEqual(next(family._versions), start + 4001)
+        self.assertNotEqual(family.version, 0)
+
+        with self.assertRaises(ValueError):
+            self.collector.histogram("trading_signals_total")
+        with self.assertRaises(ValueError):
+            self.collector.set_gauge("trading_signals_total", 5)
+
+if __name__ == '__main__':
+    unittest.main()
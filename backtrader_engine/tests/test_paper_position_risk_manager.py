@@ -3,7 +3,7 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path.cwd()))
 
-from exchanges.bybit_paper_trader import PaperPosition, PaperOrder
+from exchanges.bybit_paper_trader import BybitPaperTrader, PaperPosition, PaperOrder
 from risk_manager import RiskManager, RiskLimits
 
 class TestPaperPosition(unittest.TestCase):
@@ -135,6 +135,20 @@ class TestRiskManager(unittest.TestCase):
         
         self.assertIsInstance(is_valid, bool)
         self.assertIsInstance(reason, str)
+    
+    def test_restored_positions_seed_portfolio_risk(self):
+        trader = BybitPaperTrader(None, None)
+        trader.restore_positions({
+            'BTCUSDT': {'symbol': 'BTCUSDT', 'side': 'Buy', 'size': 0.1, 'entry_price': 50000.0},
+            'ETHUSDT': {'symbol': 'ETHUSDT', 'side': 'Sell', 'size': 1.0, 'entry_price': 3000.0},
+            'SOLUSDT': {'symbol': 'SOLUSDT', 'side': 'Buy', 'size': 0.0, 'entry_price': 150.0}
+        })
+        
+        self.assertEqual(set(trader.positions), {'BTCUSDT', 'ETHUSDT'})
+        portfolio = trader.risk_manager.portfolio_risk
+        self.assertAlmostEqual(portfolio.gross_exposure, 8000.0)
+        self.assertAlmostEqual(portfolio.net_exposure, 2000.0)
+        self.assertAlmostEqual(portfolio.margin_used, 8000.0)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from portfolio_risk import PortfolioRiskEngine
+
+class TestPortfolioRiskEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = PortfolioRiskEngine({
+            'sectors': {'BTCUSDT': 'majors', 'ETHUSDT': 'majors', 'SOLUSDT': 'layer1'},
+            'return_interval': 1.0,
+            'var_min_samples': 5
+        })
+
+    def test_exposure_aggregates_follow_fills_and_marks(self):
+        self.engine.on_fill('BTCUSDT', 'Buy', 0.1, 50000.0)
+        self.engine.on_fill('ETHUSDT', 'Sell', 1.0, 3000.0)
+
+        self.assertAlmostEqual(self.engine.gross_exposure, 8000.0)
+        self.assertAlmostEqual(self.engine.net_exposure, 2000.0)
+        self.assertAlmostEqual(self.engine.sector_gross['majors'], 8000.0)
+
+        self.engine.on_mark_price('BTCUSDT', 51000.0)
+        self.assertAlmostEqual(self.engine.gross_exposure, 8100.0)
+        self.assertAlmostEqual(self.engine.net_exposure, 2100.0)
+
+        # Cerrar la posición deja la exposición del símbolo a cero
+        self.engine.on_fill('ETHUSDT', 'Buy', 1.0, 3000.0)
+        self.assertAlmostEqual(self.engine.gross_exposure, 5100.0)
+        self.assertAlmostEqual(self.engine.margin_used, 5100.0)
+
+    def test_check_order_limits(self):
+        is_valid, _ = self.engine.check_order('BTCUSDT', 'BUY', 0.05, 50000.0, equity=10000.0)
+        self.assertTrue(is_valid)
+
+        is_valid, reason = self.engine.check_order('BTCUSDT', 'BUY', 0.2, 50000.0, equity=10000.0)
+        self.assertFalse(is_valid)
+        self.assertIn('Symbol exposure', reason)
+
+    def test_parametric_var_matches_full_recomputation(self):
+        prices = {'BTCUSDT': 50000.0, 'ETHUSDT': 3000.0, 'SOLUSDT': 150.0}
+        moves = [0.01, -0.02, 0.015, -0.005, 0.02, -0.01, 0.03, -0.025]
+        for step, move in enumerate(moves):
+            for i, symbol in enumerate(prices):
+                prices[symbol] *= 1 + move * (i + 1) / 2
+                self.engine.on_mark_price(symbol, prices[symbol], timestamp=float(step))
+
+        self.engine.on_fill('BTCUSDT', 'Buy', 0.1, prices['BTCUSDT'])
+        self.engine.on_fill('SOLUSDT', 'Sell', 10.0, prices['SOLUSDT'])
+        self.assertTrue(self.engine.var_ready())
+
+        cov = self.engine.returns.covariance()
+        exposures = self.engine._exposure_vec
+        expected = self.engine._z * float(exposures @ cov @ exposures) ** 0.5
+        self.assertAlmostEqual(self.engine.parametric_var(), expected, places=6)
+        self.assertGreaterEqual(self.engine.historical_var(), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
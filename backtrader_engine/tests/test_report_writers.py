@@ -0,0 +1,91 @@
+import unittest
+import sys
+import asyncio
+import gzip
+import hashlib
+import hmac
+import json
+import tempfile
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from trade_ledger import TradeLedger
+from regulatory_reporter import RegulatoryReporter, RegulatoryFramework, ReportFormat, ReportType
+from report_writers import ReportWriter
+
+BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+class TestReportWriters(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ledger = TradeLedger(str(Path(self.tmp.name) / "ledger.db"))
+        for i in range(30):
+            self.ledger.record_trade({
+                "trade_id": f"trade_{i}", "order_id": f"order_{i}", "symbol": "BTCUSDT",
+                "side": "Buy" if i % 2 else "Sell", "qty": 0.5, "price": 100.0 + i,
+                "timestamp": (BASE + timedelta(minutes=i)).timestamp()
+            })
+        self.ledger.flush()
+        self.reporter = RegulatoryReporter(self.ledger)
+        self.reporter.reports_dir = Path(self.tmp.name) / "reports"
+
+    def tearDown(self):
+        self.ledger.stop()
+        self.tmp.cleanup()
+
+    def _expected_signature(self, report, signed: bytes) -> str:
+        key = self.reporter.signature_config["key"].encode()
+        return hmac.new(key, self.reporter._signature_message(report).encode() + signed, hashlib.sha256).hexdigest()
+
+    def test_gzip_xml_signature_covers_streamed_bytes(self):
+        self.reporter.compress_reports = True
+        report = asyncio.run(self.reporter.generate_trade_report(
+            RegulatoryFramework.MIFID_II, BASE, BASE + timedelta(hours=1), ReportFormat.XML
+        ))
+
+        self.assertTrue(report.file_path.endswith(".xml.gz"))
+        with gzip.open(report.file_path, "rb") as f:
+            content = f.read()
+        signed, _, _ = content.rpartition(b"<Signature")
+        self.assertEqual(report.signature, self._expected_signature(report, signed))
+
+        root = ET.fromstring(content)
+        self.assertEqual(root.find("Signature").text, report.signature)
+        self.assertEqual(len(root.find("Data/Trades")), 30)
+
+    def test_one_scan_writes_trade_and_transaction_reports(self):
+        reports = asyncio.run(self.reporter.generate_ledger_reports(
+            RegulatoryFramework.MIFID_II, BASE, BASE + timedelta(minutes=9),
+            formats=[ReportFormat.JSON, ReportFormat.CSV]
+        ))
+
+        self.assertEqual(len(reports), 4)
+        json_reports = {r.report_type: r for r in reports if r.format == ReportFormat.JSON}
+        with open(json_reports[ReportType.TRADE_REPORT].file_path) as f:
+            trades = json.load(f)
+        with open(json_reports[ReportType.TRANSACTION_REPORT].file_path) as f:
+            transactions = json.load(f)
+
+        self.assertEqual([t["trade_id"] for t in trades["data"]["trades"]], [f"trade_{i}" for i in range(10)])
+        self.assertEqual(len(transactions["data"]["transactions"]), 10)
+        self.assertEqual(transactions["data"]["summary"]["total_transactions"], 10)
+        self.assertEqual(trades["signature"], json_reports[ReportType.TRADE_REPORT].signature)
+
+        for report in reports:
+            content = Path(report.file_path).read_bytes()
+            marker = b'  "signature"' if report.format == ReportFormat.JSON else b"Signature,"
+            signed = content[:content.rindex(marker)]
+            self.assertEqual(report.signature, self._expected_signature(report, signed))
+
+    def test_incomplete_writer_fails_on_instantiation(self):
+        class HeaderOnlyWriter(ReportWriter):
+            def begin(self):
+                pass
+
+        with self.assertRaises(TypeError):
+            HeaderOnlyWriter(None, None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from service_container import ServiceContainer, Service, StartupProfiler
+
+class Bot:
+    reporter = Service()
+    codec = Service('json_codec')
+
+    def __init__(self, profiler):
+        self.services = ServiceContainer(profiler)
+        self.builds = 0
+        self.services.register('reporter', self._build_reporter)
+        self.services.register('json_codec', 'json:JSONDecoder', strict=False)
+
+    def _build_reporter(self):
+        self.builds += 1
+        return object()
+
+class TestServiceContainer(unittest.TestCase):
+    def test_services_are_built_once_on_first_access(self):
+        profiler = StartupProfiler()
+        bot = Bot(profiler)
+        self.assertIsNone(bot.services.peek('reporter'))
+        self.assertEqual(profiler.timings, [])
+
+        self.assertIs(bot.reporter, bot.reporter)
+        self.assertEqual(bot.builds, 1)
+        self.assertFalse(bot.codec.strict)
+        self.assertEqual([(name, phase) for name, phase, _ in profiler.timings],
+                         [('reporter', 'init'), ('json_codec', 'import'), ('json_codec', 'init')])
+
+        with self.assertRaises(KeyError):
+            bot.services.get('missing')
+
+    def test_profiler_report_lists_components_and_milestones(self):
+        profiler = StartupProfiler()
+        with profiler.measure('trading_core', 'import'):
+            pass
+        first = profiler.mark('first_signal')
+        self.assertEqual(profiler.mark('first_signal'), first)
+
+        report = profiler.report()
+        self.assertIn('trading_core', report)
+        self.assertIn('-> first_signal', report)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import sys
+import time
+import multiprocessing as mp
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from exchanges.sharded_paper_trader import (
+    ShardedPaperTrader, ShardWorker, ShardSpec, ShmRing, partition_symbols,
+    price_message, signal_message, MSG_PRICE
+)
+from signal_engine import TradingSignal
+
+def produce_prices(ring_name, capacity, count):
+    """Producer in a separate process: blocks (spins) while the ring is full"""
+    ring = ShmRing(capacity, name=ring_name)
+    for i in range(count):
+        while not ring.put(price_message('ETHUSDT', float(i), 1.0, 0.0)):
+            time.sleep(0.0001)
+    ring.close()
+
+class TestShardedPaperTrader(unittest.TestCase):
+    def test_partition_and_ring_across_processes(self):
+        shards = partition_symbols(['A', 'B', 'C', 'D', 'E'], 2)
+        self.assertEqual(shards, [['A', 'C', 'E'], ['B', 'D']])
+        self.assertEqual(partition_symbols(['A'], 4), [['A']])
+
+        ring = ShmRing(4)
+        try:
+            for i in range(4):
+                self.assertTrue(ring.put(price_message('ETHUSDT', float(i), 0.0, 0.0)))
+            self.assertFalse(ring.put(price_message('ETHUSDT', 4.0, 0.0, 0.0)))
+            self.assertEqual(ring.get_batch(3)['price'].tolist(), [0.0, 1.0, 2.0])
+            ring.put(price_message('ETHUSDT', 4.0, 0.0, 0.0))
+            ring.put(price_message('ETHUSDT', 5.0, 0.0, 0.0))
+            self.assertEqual(ring.get_batch()['price'].tolist(), [3.0, 4.0, 5.0])
+            self.assertEqual(len(ring), 0)
+        finally:
+            ring.close()
+
+        # A worker process wrapping many times around a small ring: nothing lost or reordered
+        ring = ShmRing(64)
+        process = mp.get_context('spawn').Process(target=produce_prices, args=(ring.name, 64, 5000))
+        process.start()
+        received = []
+        deadline = time.time() + 60
+        while len(received) < 5000 and time.time() < deadline:
+            batch = ring.get_batch()
+            self.assertTrue((batch['kind'] == MSG_PRICE).all())
+            received.extend(batch['price'].tolist())
+        process.join(10)
+        ring.close()
+        self.assertEqual(received, [float(i) for i in range(5000)])
+
+    def test_coordinator_applies_worker_messages(self):
+        trader = ShardedPaperTrader(None, None, shards=2)
+        ring = ShmRing(8)
+        trader.rings = [ring]
+        worker = ShardWorker(ShardSpec(0, ['ETHUSDT'], ring.name, 8, signal_throttle=0))
+        received = []
+        trader.add_signal_callback(received.append)
+        try:
+            for price in (3000.0, 3001.0, 3002.0):
+                worker.process_tick('ETHUSDT', price, 10.0)
+            signal = TradingSignal('ETHUSDT', 'BUY', 0.8, time.time(), 'MomentumStrategy', 3002.0,
+                                   {'atr': 20.0, 'volume_ratio': 1.5, 'adx': 30.0, 'rsi': 55.0})
+            worker.publish(signal_message(signal))
+
+            self.assertEqual(trader.drain_shards(), 4)
+            self.assertEqual(trader.current_prices['ETHUSDT'], 3002.0)
+            self.assertEqual(trader.positions['ETHUSDT'].side, 'Buy')
+            self.assertEqual(len(trader.trades), 1)
+            self.assertLess(trader.balance, 10000.0)
+            self.assertEqual(received[0].strategy, 'MomentumStrategy')
+            self.assertEqual(received[0].indicators['atr'], 20.0)
+
+            # Ring full: prices are dropped, signals wait in the worker's backlog
+            for i in range(10):
+                worker.process_tick('ETHUSDT', 3100.0 + i, 10.0)
+            worker.publish(signal_message(signal))
+            self.assertEqual(worker.dropped_prices, 2)
+            self.assertEqual(len(worker.backlog), 1)
+            trader.drain_shards()
+            worker.flush_backlog()
+            self.assertFalse(worker.backlog)
+            self.assertEqual(trader.drain_shards(), 1)
+            self.assertEqual(trader.current_prices['ETHUSDT'], 3107.0)
+        finally:
+            worker.ring.close()
+            ring.close()
+
+    def test_connection_state_is_reported_per_shard(self):
+        trader = ShardedPaperTrader(None, None, shards=2)
+        rings = [ShmRing(8), ShmRing(8)]
+        trader.rings = rings
+        trader.shard_connected = [False, False]
+        workers = [ShardWorker(ShardSpec(i, ['ETHUSDT'], ring.name, 8)) for i, ring in enumerate(rings)]
+        try:
+            self.assertFalse(trader.connected)
+            workers[0].websocket.public_connected = True
+            for worker in workers:
+                worker.report_status()
+                worker.report_status()  # Sin cambios: no se repite el mensaje
+            self.assertEqual(trader.drain_shards(), 2)
+            self.assertEqual(trader.shard_connected, [True, False])
+            self.assertFalse(trader.connected)
+
+            workers[1].websocket.public_connected = True
+            workers[1].report_status()
+            trader.drain_shards()
+            self.assertTrue(trader.connected)
+
+            workers[0].websocket.public_connected = False
+            workers[0].report_status()
+            trader.drain_shards()
+            self.assertFalse(trader.connected)
+        finally:
+            for worker in workers:
+                worker.ring.close()
+            for ring in rings:
+                ring.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from state_manager import StateManager
+
+class TestStateManagerJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_file = str(Path(self.tmp_dir.name) / "bot_state.json")
+        self.backup_dir = str(Path(self.tmp_dir.name) / "state_backups")
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def _manager(self):
+        return StateManager(self.state_file, self.backup_dir)
+    
+    def test_journal_replay_after_crash(self):
+        manager = self._manager()
+        manager.update_balance(10500.0)
+        manager.add_trade(500.0)
+        manager.update_position('ETHUSDT', {'side': 'Buy', 'size': 0.5})
+        # Sin snapshot: simular caída antes del auto-save
+        
+        recovered = self._manager().load_state()
+        self.assertEqual(recovered.balance, 10500.0)
+        self.assertEqual(recovered.total_trades, 1)
+        self.assertEqual(recovered.winning_trades, 1)
+        self.assertIn('ETHUSDT', recovered.positions)
+    
+    def test_snapshot_compacts_journal(self):
+        manager = self._manager()
+        manager.update_balance(9000.0)
+        manager.save_state(force=True)
+        self.assertEqual(manager.journal_file.read_text(), '')
+        
+        manager.update_balance(9100.0)
+        manager.remove_position('ETHUSDT')  # No existe: no genera registro
+        
+        recovered = self._manager().load_state()
+        self.assertEqual(recovered.balance, 9100.0)
+    
+    def test_truncated_journal_line_is_ignored(self):
+        manager = self._manager()
+        manager.update_balance(11000.0)
+        with open(manager.journal_file, 'a') as f:
+            f.write('{"seq": 99, "op": "bal')
+        
+        recovered = self._manager().load_state()
+        self.assertEqual(recovered.balance, 11000.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import sys
+import asyncio
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from task_supervisor import TaskSupervisor, BLOCKING_THREAD
+from metrics_collector import MetricsCollector
+
+class TestTaskSupervisor(unittest.TestCase):
+    def test_blocking_jobs_run_off_loop_without_overlap(self):
+        metrics = MetricsCollector()
+        supervisor = TaskSupervisor(metrics, lag_interval=0.05)
+        calls = []
+
+        def slow_blocking_job():
+            calls.append(time.perf_counter())
+            time.sleep(0.25)
+
+        async def run():
+            job = supervisor.add_job("slow", slow_blocking_job, interval=0.1, jitter=0, blocking=BLOCKING_THREAD)
+            supervisor.start()
+            await asyncio.sleep(0.6)
+            await supervisor.stop()
+            return job
+
+        job = asyncio.run(run())
+
+        self.assertGreaterEqual(job.skipped, 1)
+        self.assertTrue(all(b - a >= 0.25 for a, b in zip(calls, calls[1:])))
+        self.assertLess(supervisor.loop_lag, 0.1)
+        self.assertIsNotNone(metrics.registry.families.get("job_duration_seconds"))
+        self.assertIsNotNone(metrics.registry.families.get("event_loop_lag_seconds"))
+
+    def test_failed_tasks_restart_and_failed_jobs_back_off(self):
+        supervisor = TaskSupervisor(restart_base_delay=0.01)
+        attempts = []
+
+        async def flaky_task():
+            attempts.append(time.perf_counter())
+            if len(attempts) < 3:
+                raise RuntimeError("boom")
+
+        async def failing_job():
+            raise ValueError("bad")
+
+        async def run():
+            task = supervisor.add_task("flaky", flaky_task)
+            job = supervisor.add_job("failing", failing_job, interval=0.05, jitter=0, initial_delay=0)
+            supervisor.start()
+            await asyncio.sleep(0.5)
+            await supervisor.stop()
+            return task, job
+
+        task, job = asyncio.run(run())
+
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(task.restarts, 2)
+        # 0.05s de intervalo con backoff 2x, 4x, 8x...: muchas menos ejecuciones que 10
+        self.assertGreaterEqual(job.failures, 2)
+        self.assertLess(job.runs, 6)
+        self.assertEqual(job.last_error, "bad")
+        self.assertEqual(supervisor.get_status()["tasks"]["flaky"]["restarts"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
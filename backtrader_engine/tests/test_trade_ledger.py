@@ -0,0 +1,83 @@
+import unittest
+import sys
+import asyncio
+import csv
+import tempfile
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from trade_ledger import TradeLedger
+from regulatory_reporter import RegulatoryReporter, RegulatoryFramework, ReportFormat
+
+BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+class TestTradeLedger(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ledger = TradeLedger(str(Path(self.tmp.name) / "ledger.db"))
+        # 3 días de fills cada hora alternando símbolo y lado
+        for i in range(72):
+            self.ledger.record_trade({
+                "trade_id": f"trade_{i}", "order_id": f"order_{i}",
+                "symbol": "BTCUSDT" if i % 2 == 0 else "ETHUSDT",
+                "side": "Buy" if i % 3 else "Sell", "qty": 1.0, "price": 100.0 + i,
+                "timestamp": (BASE + timedelta(hours=i)).timestamp(), "commission": 0.1
+            }, strategy="vstru" if i < 36 else "liquidation")
+        self.ledger.flush()
+
+    def tearDown(self):
+        self.ledger.stop()
+        self.tmp.cleanup()
+
+    def test_range_scans_use_timestamp_symbol_and_strategy(self):
+        day = list(self.ledger.iter_trades(BASE + timedelta(days=1), BASE + timedelta(days=2) - timedelta(seconds=1)))
+        self.assertEqual([t["trade_id"] for t in day], [f"trade_{i}" for i in range(24, 48)])
+
+        btc = list(self.ledger.iter_trades(symbol="BTCUSDT", strategy="liquidation", batch_size=5))
+        self.assertEqual(len(btc), 18)
+        self.assertTrue(all(t["symbol"] == "BTCUSDT" and t["strategy"] == "liquidation" for t in btc))
+
+        summary = self.ledger.trade_summary(BASE, BASE + timedelta(hours=5))
+        self.assertEqual(summary["total_trades"], 6)
+        self.assertEqual(summary["sell_trades"], 2)
+        self.assertAlmostEqual(summary["total_volume"], sum(100.0 + i for i in range(6)))
+
+    def test_position_entry_price_restarts_after_going_flat(self):
+        ledger = TradeLedger(str(Path(self.tmp.name) / "positions.db"))
+        fills = [("Buy", 1.0, 100.0), ("Sell", 1.0, 200.0), ("Buy", 1.0, 300.0), ("Buy", 1.0, 400.0),
+                 ("Sell", 3.0, 500.0)]
+        for i, (side, qty, price) in enumerate(fills):
+            ledger.record_trade({
+                "trade_id": f"t{i}", "order_id": f"o{i}", "symbol": "BTCUSDT", "side": side,
+                "qty": qty, "price": price, "timestamp": (BASE + timedelta(hours=i)).timestamp()
+            })
+        ledger.flush()
+        try:
+            long = ledger.positions(as_of=BASE + timedelta(hours=3))[0]
+            self.assertEqual((long["side"], long["quantity"], long["entry_price"]), ("LONG", 2.0, 350.0))
+            self.assertAlmostEqual(long["unrealized_pnl"], 100.0)
+
+            # La venta de 3 cierra el largo de 2 y deja un corto de 1 a 500
+            short = ledger.positions()[0]
+            self.assertEqual((short["side"], short["quantity"], short["entry_price"]), ("SHORT", -1.0, 500.0))
+        finally:
+            ledger.stop()
+
+    def test_trade_report_streams_from_ledger(self):
+        reporter = RegulatoryReporter(self.ledger)
+        reporter.reports_dir = Path(self.tmp.name) / "reports"
+        reporter.reports_dir.mkdir()
+        report = asyncio.run(reporter.generate_trade_report(
+            RegulatoryFramework.MIFID_II, BASE, BASE + timedelta(hours=23), ReportFormat.CSV
+        ))
+
+        self.assertEqual(report.metadata["total_trades"], 24)
+        with open(report.file_path, newline="") as f:
+            rows = list(csv.reader(f))
+        header = rows.index(["Trades"]) + 1
+        self.assertEqual(rows[header][:3], ["trade_id", "timestamp", "symbol"])
+        self.assertEqual(rows.index([], header) - header - 1, 24)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,361 @@
+"""
+Trade Ledger - Registro append-only de órdenes y fills en SQLite (modo WAL)
+Las escrituras se encolan desde los callbacks del paper trader y un hilo las agrupa en transacciones;
+los reportes leen con escaneos por rango en streaming sobre índices de timestamp, símbolo y estrategia
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator, Tuple, Union, Callable
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    trade_id TEXT PRIMARY KEY,
+    order_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    qty REAL NOT NULL,
+    price REAL NOT NULL,
+    commission REAL NOT NULL DEFAULT 0,
+    strategy TEXT NOT NULL DEFAULT '',
+    venue TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    client_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_ts ON trades (ts);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol_ts ON trades (symbol, ts);
+CREATE INDEX IF NOT EXISTS idx_trades_strategy_ts ON trades (strategy, ts);
+
+CREATE TABLE IF NOT EXISTS order_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    order_type TEXT NOT NULL,
+    qty REAL NOT NULL,
+    price REAL,
+    status TEXT NOT NULL,
+    filled_qty REAL NOT NULL DEFAULT 0,
+    avg_price REAL,
+    strategy TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_order_events_ts ON order_events (ts);
+CREATE INDEX IF NOT EXISTS idx_order_events_order ON order_events (order_id);
+"""
+
+TRADE_COLUMNS = (
+    "trade_id", "order_id", "ts", "symbol", "side", "qty", "price",
+    "commission", "strategy", "venue", "currency", "client_id"
+)
+ORDER_COLUMNS = (
+    "order_id", "ts", "symbol", "side", "order_type", "qty", "price",
+    "status", "filled_qty", "avg_price", "strategy"
+)
+
+_INSERT_TRADE = (
+    f"INSERT OR IGNORE INTO trades ({', '.join(TRADE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(TRADE_COLUMNS))})"
+)
+_INSERT_ORDER = (
+    f"INSERT INTO order_events ({', '.join(ORDER_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(ORDER_COLUMNS))})"
+)
+
+def _to_epoch(value: Union[datetime, float, None]) -> Optional[float]:
+    """Convertir datetime (naive = hora local, como datetime.timestamp) a epoch"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return value.timestamp()
+
+class LedgerQuery:
+    """Escaneo por rango re-iterable: cada iteración lee la base en streaming por lotes"""
+
+    def __init__(self, ledger: "TradeLedger", sql: str, params: Tuple, batch_size: int = 1000,
+                 transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        self.ledger = ledger
+        self.sql = sql
+        self.params = params
+        self.batch_size = batch_size
+        self.transform = transform
+
+    def map(self, transform: Callable[[Dict[str, Any]], Dict[str, Any]]) -> "LedgerQuery":
+        """Misma consulta con cada fila transformada"""
+        return LedgerQuery(self.ledger, self.sql, self.params, self.batch_size, transform)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        conn = self.ledger._reader()
+        try:
+            cursor = conn.execute(self.sql, self.params)
+            columns = [d[0] for d in cursor.description]
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    record = dict(zip(columns, row))
+                    yield self.transform(record) if self.transform else record
+        finally:
+            conn.close()
+
+class TradeLedger:
+    """Ledger append-only de trades y eventos de órdenes"""
+
+    def __init__(self, db_path: str = "logs/trade_ledger.db",
+                 venue: str = "BYBIT", currency: str = "USD", client_id: str = "CLIENT_001",
+                 batch_size: int = 500):
+        self.db_path = Path(db_path)
+        self.venue = venue
+        self.currency = currency
+        self.client_id = client_id
+        self.batch_size = batch_size
+        self.logger = logging.getLogger("TradeLedger")
+
+        # Conexión del escritor: solo la usa el hilo worker (o flush síncrono con el worker parado).
+        # Se abre en el primer uso: importar el módulo no crea la base en el directorio actual
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+
+        self.write_queue: queue.Queue = queue.Queue()
+        self.running = False
+        self.worker_thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """Abrir conexión en modo WAL (lectores concurrentes con un escritor)"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=check_same_thread)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _writer_connection(self) -> sqlite3.Connection:
+        """Conexión del escritor, creando la base y el esquema en el primer uso"""
+        with self._write_lock:
+            if self._writer is None:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                writer = self._connect(check_same_thread=False)
+                writer.executescript(SCHEMA)
+                self._writer = writer
+            return self._writer
+
+    def _reader(self) -> sqlite3.Connection:
+        """Conexión de solo lectura para un escaneo"""
+        self._writer_connection()  # El esquema debe existir antes de leer
+        conn = self._connect()
+        conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def start(self):
+        """Iniciar el hilo escritor"""
+        with self._start_lock:
+            if not self.running:
+                self.running = True
+                self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
+                self.worker_thread.start()
+                self.logger.info(f"Trade ledger started: {self.db_path}")
+
+    def stop(self):
+        """Detener el hilo escritor tras vaciar la cola"""
+        if self.running:
+            self.running = False
+            self.write_queue.put(None)
+            if self.worker_thread:
+                self.worker_thread.join(timeout=5)
+            self._drain()
+            self.logger.info("Trade ledger stopped")
+
+    def flush(self):
+        """Esperar a que todo lo encolado esté escrito"""
+        if self.running:
+            done = threading.Event()
+            self.write_queue.put(done)
+            done.wait(timeout=10)
+        else:
+            self._drain()
+
+    def _worker_loop(self):
+        """Bloquear en la cola y escribir lotes en una sola transacción"""
+        while True:
+            item = self.write_queue.get()
+            batch, markers = [], []
+            while item is not None:
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.write_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self._write_batch(batch)
+            for marker in markers:
+                marker.set()
+
+            if item is None and not self.running:
+                break
+
+    def _drain(self):
+        """Escribir lo que quede en la cola (worker parado)"""
+        batch = []
+        while True:
+            try:
+                item = self.write_queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is not None:
+                batch.append(item)
+        self._write_batch(batch)
+
+    def _write_batch(self, batch: List[Tuple[str, Tuple]]):
+        """Insertar un lote de filas en una transacción"""
+        if not batch:
+            return
+        trades = [row for kind, row in batch if kind == "trade"]
+        orders = [row for kind, row in batch if kind == "order"]
+        try:
+            writer = self._writer_connection()
+            with self._write_lock, writer:
+                if trades:
+                    writer.executemany(_INSERT_TRADE, trades)
+                if orders:
+                    writer.executemany(_INSERT_ORDER, orders)
+        except (sqlite3.Error, OSError) as e:
+            self.logger.error(f"Error writing {len(batch)} ledger rows: {e}")
+
+    def record_trade(self, trade, strategy: Optional[str] = None):
+        """Encolar un fill (PaperTrade o dict con los mismos campos)"""
+        get = trade.get if isinstance(trade, dict) else lambda key, default=None: getattr(trade, key, default)
+        row = (
+            get("trade_id"), get("order_id"), get("timestamp"), get("symbol"), get("side"),
+            get("qty"), get("price"), get("commission", 0.0) or 0.0,
+            strategy or get("strategy", "") or "", self.venue, self.currency, self.client_id
+        )
+        self._enqueue("trade", row)
+
+    def record_order(self, order, strategy: Optional[str] = None):
+        """Encolar un evento de orden (cada cambio de estado es una fila nueva)"""
+        get = order.get if isinstance(order, dict) else lambda key, default=None: getattr(order, key, default)
+        timestamp = get("filled_time") or get("created_time")
+        row = (
+            get("order_id"), timestamp, get("symbol"), get("side"), get("order_type"),
+            get("qty"), get("price"), get("status"), get("filled_qty", 0.0) or 0.0,
+            get("avg_price"), strategy or get("strategy", "") or ""
+        )
+        self._enqueue("order", row)
+
+    def _enqueue(self, kind: str, row: Tuple):
+        """Encolar fila sin bloquear al llamador"""
+        if not self.running:
+            self.start()
+        self.write_queue.put((kind, row))
+
+    def _range_filter(self, start_time, end_time, symbol: Optional[str],
+                      strategy: Optional[str]) -> Tuple[str, List[Any]]:
+        """Cláusula WHERE para escaneos por rango"""
+        clauses, params = [], []
+        if start_time is not None:
+            clauses.append("ts >= ?")
+            params.append(_to_epoch(start_time))
+        if end_time is not None:
+            clauses.append("ts <= ?")
+            params.append(_to_epoch(end_time))
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if strategy:
+            clauses.append("strategy = ?")
+            params.append(strategy)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def iter_trades(self, start_time=None, end_time=None, symbol: Optional[str] = None,
+                    strategy: Optional[str] = None, batch_size: int = 1000) -> LedgerQuery:
+        """Trades del rango en orden de timestamp, leídos en streaming"""
+        where, params = self._range_filter(start_time, end_time, symbol, strategy)
+        sql = f"SELECT {', '.join(TRADE_COLUMNS)} FROM trades{where} ORDER BY ts"
+        return LedgerQuery(self, sql, tuple(params), batch_size)
+
+    def iter_order_events(self, start_time=None, end_time=None, symbol: Optional[str] = None,
+                          strategy: Optional[str] = None, batch_size: int = 1000) -> LedgerQuery:
+        """Eventos de órdenes del rango en orden de timestamp"""
+        where, params = self._range_filter(start_time, end_time, symbol, strategy)
+        sql = f"SELECT {', '.join(ORDER_COLUMNS)} FROM order_events{where} ORDER BY ts, seq"
+        return LedgerQuery(self, sql, tuple(params), batch_size)
+
+    def trade_summary(self, start_time=None, end_time=None, symbol: Optional[str] = None,
+                      strategy: Optional[str] = None) -> Dict[str, Any]:
+        """Agregados del rango calculados en SQLite (sin cargar filas)"""
+        where, params = self._range_filter(start_time, end_time, symbol, strategy)
+        sql = (
+            "SELECT COUNT(*), COALESCE(SUM(qty * price), 0), COALESCE(SUM(commission), 0), "
+            "COALESCE(SUM(CASE WHEN UPPER(side) = 'BUY' THEN 1 ELSE 0 END), 0), "
+            "COALESCE(SUM(CASE WHEN UPPER(side) = 'SELL' THEN 1 ELSE 0 END), 0) "
+            f"FROM trades{where}"
+        )
+        conn = self._reader()
+        try:
+            count, volume, commission, buys, sells = conn.execute(sql, params).fetchone()
+        finally:
+            conn.close()
+        return {
+            "total_trades": count,
+            "total_volume": volume,
+            "total_commission": commission,
+            "buy_trades": buys,
+            "sell_trades": sells
+        }
+
+    def positions(self, as_of=None) -> List[Dict[str, Any]]:
+        """
+        Posiciones netas por símbolo a partir de los fills hasta ``as_of``
+
+        El precio de entrada es el coste medio de los fills desde la última vez que la posición
+        quedó plana: los ciclos ya cerrados no cuentan.
+        """
+        where, params = self._range_filter(None, as_of, None, None)
+        sql = f"SELECT symbol, side, qty, price FROM trades{where} ORDER BY symbol, ts, rowid"
+
+        # símbolo -> [cantidad neta, precio de entrada, último precio]
+        books: Dict[str, List[float]] = {}
+        for fill in LedgerQuery(self, sql, tuple(params)):
+            book = books.setdefault(fill["symbol"], [0.0, 0.0, 0.0])
+            net, entry = book[0], book[1]
+            qty = fill["qty"] if fill["side"].upper() == "BUY" else -fill["qty"]
+            price = fill["price"]
+            if abs(net) < 1e-12 or net * qty > 0:
+                # Abre o amplía: media ponderada con el coste anterior
+                entry = (entry * abs(net) + price * abs(qty)) / (abs(net) + abs(qty))
+            elif abs(qty) > abs(net):
+                # Cierra y abre en sentido contrario: el resto entra a este precio
+                entry = price
+            net += qty
+            book[:] = [net, entry if abs(net) >= 1e-12 else 0.0, price]
+
+        positions = []
+        for symbol, (net_qty, entry_price, last_price) in books.items():
+            if abs(net_qty) < 1e-12:
+                continue
+            positions.append({
+                "symbol": symbol,
+                "side": "LONG" if net_qty > 0 else "SHORT",
+                "quantity": net_qty,
+                "entry_price": entry_price,
+                "current_price": last_price,
+                "unrealized_pnl": (last_price - entry_price) * net_qty,
+                "value": abs(net_qty) * last_price
+            })
+        return positions
+
+# Instancia global del ledger (no toca disco hasta la primera escritura o lectura)
+global_trade_ledger = TradeLedger()
@@ -34,6 +34,11 @@ class Config:
     KALMAN_R = float(os.getenv('KALMAN_R', '0.1'))
     RF_N_ESTIMATORS = int(os.getenv('RF_N_ESTIMATORS', '100'))
     RF_MAX_DEPTH = int(os.getenv('RF_MAX_DEPTH', '10'))
+    RF_WARM_START_TREES = int(os.getenv('RF_WARM_START_TREES', '20'))  # Trees added per incremental fit
+    RF_MAX_TREES = int(os.getenv('RF_MAX_TREES', '300'))  # Oldest trees are dropped beyond this
+    MODEL_RELOAD_INTERVAL = int(os.getenv('MODEL_RELOAD_INTERVAL', '60'))  # seconds
+    MODEL_KEEP_VERSIONS = int(os.getenv('MODEL_KEEP_VERSIONS', '5'))
+    FEATURE_CACHE_MAX_MB = int(os.getenv('FEATURE_CACHE_MAX_MB', '512'))  # Prepared feature matrices on disk
     
     # Risk Management
     MAX_POSITION_SIZE = float(os.getenv('MAX_POSITION_SIZE', '0.1'))
@@ -44,6 +49,7 @@ class Config:
     # Data Configuration
     DATA_LIMIT = int(os.getenv('DATA_LIMIT', '1000'))
     UPDATE_INTERVAL = int(os.getenv('UPDATE_INTERVAL', '900'))  # seconds
+    CANDLE_CACHE_DIR = os.getenv('CANDLE_CACHE_DIR', 'data/cache')
     
     # Strategy Configuration
     KALMAN_THRESHOLD = float(os.getenv('KALMAN_THRESHOLD', '0.5'))
@@ -82,6 +88,8 @@ class Config:
             'kalman_r': cls.KALMAN_R,
             'rf_n_estimators': cls.RF_N_ESTIMATORS,
             'rf_max_depth': cls.RF_MAX_DEPTH,
+            'rf_warm_start_trees': cls.RF_WARM_START_TREES,
+            'rf_max_trees': cls.RF_MAX_TREES,
         }
     
     @classmethod
@@ -4,6 +4,7 @@ import numpy as np
 import os
 from datetime import datetime, timedelta
 import time
+from log_tail import get_log_tail, tail_lines
 
 # Configurar página PRIMERO
 st.set_page_config(page_title="Liquidation Hunter Dashboard", layout="wide")
@@ -28,15 +29,12 @@ def check_bot_status():
         if not os.path.exists('logs/bot.log'):
             return "❌ Sin logs"
         
-        with open('logs/bot.log', 'r') as f:
-            lines = f.readlines()
+        # Buscar las últimas 10 líneas para determinar estado
+        recent_lines = tail_lines('logs/bot.log', 10)
         
-        if not lines:
+        if not recent_lines:
             return "❌ Log vacío"
         
-        # Buscar las últimas 10 líneas para determinar estado
-        recent_lines = lines[-10:]
-        
         # Verificar si hay actividad reciente (últimos 5 minutos)
         current_time = datetime.now()
         recent_activity = False
@@ -123,15 +121,10 @@ def get_basic_metrics():
         if not os.path.exists('logs/bot.log'):
             return {'cycles': 0, 'signals': 0, 'trades': 0, 'errors': 0}
         
-        with open('logs/bot.log', 'r') as f:
-            lines = f.readlines()
+        counts = get_log_tail('logs/bot.log').refresh()
         
-        cycles = len([l for l in lines if 'Starting trading cycle' in l])
-        signals = len([l for l in lines if 'Generated signal' in l])
-        trades = len([l for l in lines if 'Trade executed successfully' in l])
-        errors = len([l for l in lines if 'ERROR' in l])
-        
-        return {'cycles': cycles, 'signals': signals, 'trades': trades, 'errors': errors}
+        return {'cycles': counts['cycles'], 'signals': counts['signals'],
+                'trades': counts['trades'], 'errors': counts['errors']}
     except:
         return {'cycles': 0, 'signals': 0, 'trades': 0, 'errors': 0}
 
@@ -155,11 +148,7 @@ def get_bot_data():
 def get_recent_logs(n=10):
     """Obtener los últimos n logs"""
     try:
-        if os.path.exists('logs/bot.log'):
-            with open('logs/bot.log', 'r') as f:
-                lines = f.readlines()
-                return lines[-n:] if len(lines) >= n else lines
-        return []
+        return tail_lines('logs/bot.log', n)
     except:
         return []
 
@@ -173,18 +162,18 @@ def analyze_logs():
                 'uptime': 0, 'ml_accuracy': 0.0
             }
         
-        with open('logs/bot.log', 'r') as f:
-            lines = f.readlines()
-        
-        cycles = len([l for l in lines if 'Starting trading cycle' in l])
-        signals = len([l for l in lines if 'Generated signal' in l])
-        trades = len([l for l in lines if 'Trade executed successfully' in l])
-        errors = len([l for l in lines if 'ERROR' in l])
-        warnings = len([l for l in lines if 'WARNING' in l])
-        info = len([l for l in lines if 'INFO' in l])
+        # Contadores incrementales: solo se leen los bytes nuevos del log
+        log_tail = get_log_tail('logs/bot.log')
+        counts = log_tail.refresh()
+        cycles = counts['cycles']
+        signals = counts['signals']
+        trades = counts['trades']
+        errors = counts['errors']
+        warnings = counts['warnings']
+        info = counts['info']
         
         # Simular uptime (en horas)
-        uptime = len(lines) * 0.1  # Aproximación
+        uptime = log_tail.lines * 0.1  # Aproximación
         
         # Simular ML accuracy
         ml_accuracy = 0.75 + (np.random.random() * 0.2)  # Entre 75% y 95%
@@ -3,6 +3,7 @@ import pandas as pd
 import os
 from datetime import datetime
 import time
+from log_tail import get_log_tail, tail_lines
 
 st.set_page_config(page_title="Liquidation Hunter Dashboard", layout="wide")
 
@@ -14,16 +15,15 @@ def check_bot_status():
     """Verificar si el bot está ejecutándose"""
     try:
         if os.path.exists('logs/bot.log'):
-            with open('logs/bot.log', 'r') as f:
-                lines = f.readlines()
-                if lines:
-                    last_line = lines[-1].strip()
-                    if "Starting trading bot" in last_line or "Starting trading cycle" in last_line:
-                        return "🟢 Ejecutándose"
-                    elif "shutting down" in last_line:
-                        return "🔴 Detenido"
-                    else:
-                        return "🟡 Procesando"
+            lines = tail_lines('logs/bot.log', 1)
+            if lines:
+                last_line = lines[-1].strip()
+                if "Starting trading bot" in last_line or "Starting trading cycle" in last_line:
+                    return "🟢 Ejecutándose"
+                elif "shutting down" in last_line:
+                    return "🔴 Detenido"
+                else:
+                    return "🟡 Procesando"
         return "❌ Sin logs"
     except:
         return "❌ Error"
@@ -82,15 +82,10 @@ def get_basic_metrics():
         if not os.path.exists('logs/bot.log'):
             return {'cycles': 0, 'signals': 0, 'trades': 0, 'errors': 0}
         
-        with open('logs/bot.log', 'r') as f:
-            lines = f.readlines()
+        counts = get_log_tail('logs/bot.log').refresh()
         
-        cycles = len([l for l in lines if 'Starting trading cycle' in l])
-        signals = len([l for l in lines if 'Generated signal' in l])
-        trades = len([l for l in lines if 'Trade executed successfully' in l])
-        errors = len([l for l in lines if 'ERROR' in l])
-        
-        return {'cycles': cycles, 'signals': signals, 'trades': trades, 'errors': errors}
+        return {'cycles': counts['cycles'], 'signals': counts['signals'],
+                'trades': counts['trades'], 'errors': counts['errors']}
     except:
         return {'cycles': 0, 'signals': 0, 'trades': 0, 'errors': 0}
 
@@ -114,11 +109,7 @@ def get_bot_data():
 def get_recent_logs(n=10):
     """Obtener los últimos n logs"""
     try:
-        if os.path.exists('logs/bot.log'):
-            with open('logs/bot.log', 'r') as f:
-                lines = f.readlines()
-                return lines[-n:] if len(lines) >= n else lines
-        return []
+        return tail_lines('logs/bot.log', n)
     except:
         return []
 
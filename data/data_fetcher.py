@@ -5,11 +5,17 @@ Data fetcher for market data from exchanges.
 import ccxt
 import pandas as pd
 import numpy as np
+import os
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import logging
 from config import Config
 
+# Rows of history needed to recompute derived columns for new candles (longest window: sma_50)
+INDICATOR_WARMUP = 50
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
 
 class DataFetcher:
     """Fetches market data from exchanges."""
@@ -17,8 +23,12 @@ class DataFetcher:
     def __init__(self):
         """Initialize the data fetcher."""
         self.config = Config()
-        self.exchange = self._initialize_exchange()
         self.log = logging.getLogger(__name__)
+        self.exchange = self._initialize_exchange()
+        
+        # Local candle cache per (symbol, timeframe), persisted for warm restarts
+        self.cache_dir = self.config.CANDLE_CACHE_DIR
+        self.cache: Dict[Tuple[str, str], pd.DataFrame] = {}
     
     def _initialize_exchange(self):
         """Initialize exchange connection."""
@@ -35,13 +45,15 @@ class DataFetcher:
             self.log.error(f"Failed to initialize exchange: {e}")
             raise
     
-    def _fetch_ohlcv_with_retry(self, max_retries: int = 3) -> Optional[list]:
+    def _fetch_ohlcv_with_retry(self, symbol: str = None, timeframe: str = None,
+                                since: Optional[int] = None, max_retries: int = 3) -> Optional[list]:
         """Fetch OHLCV data with retry logic."""
         for attempt in range(max_retries):
             try:
                 ohlcv = self.exchange.fetch_ohlcv(
-                    self.config.SYMBOL,
-                    self.config.TIMEFRAME,
+                    symbol or self.config.SYMBOL,
+                    timeframe or self.config.TIMEFRAME,
+                    since=since,
                     limit=self.config.DATA_LIMIT
                 )
                 return ohlcv
@@ -72,34 +84,113 @@ class DataFetcher:
         
         return True
     
-    def fetch_data(self) -> Optional[pd.DataFrame]:
-        """Fetch and process market data."""
+    def fetch_data(self, symbol: str = None, timeframe: str = None) -> Optional[pd.DataFrame]:
+        """Fetch and process market data, downloading only candles missing from the cache."""
+        symbol = symbol or self.config.SYMBOL
+        timeframe = timeframe or self.config.TIMEFRAME
+        key = (symbol, timeframe)
+        
         try:
-            ohlcv = self._fetch_ohlcv_with_retry()
+            cached = self.cache.get(key)
+            if cached is None:
+                cached = self._load_cache(symbol, timeframe)
+            
+            since = self._incremental_since(cached, timeframe)
+            ohlcv = self._fetch_ohlcv_with_retry(symbol, timeframe, since=since)
             if ohlcv is None:
                 return None
             
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
+            new = pd.DataFrame(ohlcv, columns=['timestamp'] + OHLCV_COLUMNS)
+            new['timestamp'] = pd.to_datetime(new['timestamp'], unit='ms')
+            new.set_index('timestamp', inplace=True)
             
-            if not self._validate_data_quality(df):
+            if not new.empty and not self._validate_data_quality(new):
                 self.log.warning("Data quality validation failed")
                 return None
             
-            # Add technical indicators
-            df = self._add_technical_indicators(df)
+            df = self._merge_candles(cached if since is not None else None, new)
+            if df is None or df.empty:
+                self.log.warning("Data quality validation failed")
+                return None
             
-            # Add liquidation data (simulated)
-            df = self._add_liquidation_data(df)
+            self.cache[key] = df
+            self._save_cache(symbol, timeframe, df)
             
-            self.log.info(f"Fetched {len(df)} data points for {self.config.SYMBOL}")
-            return df
+            self.log.info(f"Fetched {len(new)} new candles, {len(df)} data points for {symbol}")
+            return df.copy()
             
         except Exception as e:
             self.log.error(f"Error fetching data: {e}")
             return None
     
+    def _incremental_since(self, cached: Optional[pd.DataFrame], timeframe: str) -> Optional[int]:
+        """Return the ms timestamp to fetch from, or None when a full download is needed."""
+        if cached is None or cached.empty:
+            return None
+        
+        last = cached.index[-1]
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        now_ms = self.exchange.milliseconds()
+        last_ms = int(last.value // 1_000_000)
+        
+        # Gap larger than one fetch window: incremental fetch could not close it
+        if now_ms - last_ms > timeframe_ms * (self.config.DATA_LIMIT - 1):
+            return None
+        
+        # Re-fetch the last stored candle, which may still have been forming
+        return last_ms
+    
+    def _merge_candles(self, cached: Optional[pd.DataFrame], new: pd.DataFrame) -> pd.DataFrame:
+        """Merge new candles into the cache and compute derived columns for the new tail only."""
+        if cached is None or cached.empty:
+            df = new[~new.index.duplicated(keep='last')].sort_index()
+            df = self._add_technical_indicators(df)
+            return self._add_liquidation_data(df.iloc[-self.config.DATA_LIMIT:])
+        
+        if new.empty:
+            return cached
+        
+        # Replace the (possibly partial) overlapping candles and append the rest
+        first_new = new.index.min()
+        base = cached[cached.index < first_new]
+        tail = new[~new.index.duplicated(keep='last')].sort_index()
+        
+        # Recompute indicators over the tail plus enough history to warm up the rolling windows
+        context = pd.concat([base[OHLCV_COLUMNS].iloc[-INDICATOR_WARMUP:], tail])
+        context = self._add_technical_indicators(context)
+        derived_tail = context.iloc[-len(tail):]
+        
+        # Simulated liquidations are drawn per window position, so they cover the whole window
+        df = pd.concat([base, derived_tail])
+        return self._add_liquidation_data(df.iloc[-self.config.DATA_LIMIT:])
+    
+    def _cache_path(self, symbol: str, timeframe: str) -> str:
+        """Return the cache file path for a symbol/timeframe."""
+        return os.path.join(self.cache_dir, f"{symbol.replace('/', '')}_{timeframe}.pkl")
+    
+    def _load_cache(self, symbol: str, timeframe: str) -> Optional[pd.DataFrame]:
+        """Load persisted candles for a symbol/timeframe."""
+        path = self._cache_path(symbol, timeframe)
+        try:
+            if os.path.exists(path):
+                df = pd.read_pickle(path)
+                self.log.info(f"Loaded {len(df)} cached candles from {path}")
+                return df
+        except Exception as e:
+            self.log.warning(f"Could not load candle cache {path}: {e}")
+        return None
+    
+    def _save_cache(self, symbol: str, timeframe: str, df: pd.DataFrame):
+        """Persist candles atomically."""
+        path = self._cache_path(symbol, timeframe)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            df.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self.log.warning(f"Could not save candle cache {path}: {e}")
+    
     def _add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add technical indicators to the dataframe."""
         # Simple Moving Averages
@@ -121,6 +212,7 @@ class DataFetcher:
     def _add_liquidation_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add liquidation data (simulated for now)."""
         # Simulate liquidation data
+        df = df.copy()
         np.random.seed(42)  # For reproducible results
         df['liquidations_long'] = np.random.poisson(5, len(df))
         df['liquidations_short'] = np.random.poisson(5, len(df))
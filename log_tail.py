@@ -0,0 +1,155 @@
+"""
+Log Tail - Lectura incremental de logs para los dashboards
+Las últimas N líneas se leen buscando desde el final del archivo y los contadores
+(ciclos, señales, trades, errores...) se actualizan solo con los bytes nuevos; el offset
+y los contadores se persisten para que un reinicio del dashboard no relea el log entero
+"""
+
+import json
+import operator
+import os
+import threading
+from itertools import repeat
+from typing import Dict, List, Optional
+
+# Contador -> texto que debe contener la línea
+DEFAULT_COUNTERS = {
+    'cycles': 'Starting trading cycle',
+    'signals': 'Generated signal',
+    'trades': 'Trade executed successfully',
+    'errors': 'ERROR',
+    'warnings': 'WARNING',
+    'info': 'INFO'
+}
+
+READ_BLOCK = 1024 * 1024
+
+def tail_lines(path: str, n: int = 10, encoding: str = 'utf-8', block_size: int = 8192) -> List[str]:
+    """Últimas n líneas de un archivo leyendo bloques desde el final (como readlines()[-n:])"""
+    if n <= 0 or not os.path.exists(path):
+        return []
+
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b''
+        # n líneas completas necesitan n saltos de línea más el que cierra la línea anterior
+        while position > 0 and data.count(b'\n') <= n:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+
+    lines = data.splitlines(keepends=True)
+    if position > 0:
+        lines = lines[1:]  # La primera línea del bloque puede estar cortada
+    return [line.decode(encoding, errors='replace') for line in lines[-n:]]
+
+class LogTailService:
+    """Contadores de un log mantenidos de forma incremental a partir de un offset persistido"""
+
+    def __init__(self, path: str, counters: Optional[Dict[str, str]] = None, state_file: Optional[str] = None):
+        self.path = path
+        self.counters = dict(counters or DEFAULT_COUNTERS)
+        self.state_file = state_file or f"{path}.tail.json"
+        self.lock = threading.Lock()
+
+        self.offset = 0
+        self.inode = None
+        self.lines = 0
+        self.counts = {name: 0 for name in self.counters}
+        self._load_state()
+
+    def _load_state(self):
+        """Recuperar offset y contadores (se descartan si cambiaron los patrones)"""
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            if state.get('counters') != self.counters:
+                return
+            self.offset = state['offset']
+            self.inode = state['inode']
+            self.lines = state['lines']
+            self.counts.update(state['counts'])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save_state(self):
+        state = {
+            'offset': self.offset,
+            'inode': self.inode,
+            'lines': self.lines,
+            'counts': self.counts,
+            'counters': self.counters
+        }
+        tmp_path = f"{self.state_file}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_file)
+        except OSError:
+            pass  # Sin persistencia se sigue funcionando en memoria
+
+    def _reset(self, inode):
+        self.offset = 0
+        self.inode = inode
+        self.lines = 0
+        self.counts = {name: 0 for name in self.counters}
+
+    def refresh(self) -> Dict[str, int]:
+        """Procesar los bytes añadidos desde la última lectura y devolver los contadores"""
+        with self.lock:
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                self._reset(None)
+                return dict(self.counts)
+
+            # Log rotado o truncado: volver a empezar
+            if stat.st_ino != self.inode or stat.st_size < self.offset:
+                self._reset(stat.st_ino)
+
+            if stat.st_size > self.offset:
+                patterns = [(name, pattern.encode('utf-8')) for name, pattern in self.counters.items()]
+                with open(self.path, 'rb') as f:
+                    f.seek(self.offset)
+                    pending = b''
+                    while True:
+                        block = f.read(READ_BLOCK)
+                        if not block:
+                            break
+                        block = pending + block
+                        end = block.rfind(b'\n') + 1
+                        # Solo líneas completas; la última puede estar escribiéndose
+                        pending = block[end:]
+                        self._count(block[:end], patterns)
+                        self.offset += end
+                self._save_state()
+
+            return dict(self.counts)
+
+    def _count(self, data: bytes, patterns):
+        if not data:
+            return
+        lines = data.split(b'\n')
+        lines.pop()  # Resto vacío tras el último salto de línea
+        self.lines += len(lines)
+        for name, pattern in patterns:
+            if pattern in data:
+                self.counts[name] += sum(map(operator.contains, lines, repeat(pattern)))
+
+    def tail(self, n: int = 10) -> List[str]:
+        """Últimas n líneas del log"""
+        return tail_lines(self.path, n)
+
+# Servicios por ruta: Streamlit re-ejecuta el script en cada refresco pero conserva los módulos
+_services: Dict[str, LogTailService] = {}
+_services_lock = threading.Lock()
+
+def get_log_tail(path: str) -> LogTailService:
+    """Servicio compartido para un log"""
+    with _services_lock:
+        service = _services.get(path)
+        if service is None:
+            service = _services[path] = LogTailService(path)
+        return service
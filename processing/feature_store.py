@@ -0,0 +1,224 @@
+"""
+Feature store for the ML model.
+
+Feature definitions live here and are shared by training (full history) and
+prediction (incremental), so the two cannot drift apart.
+"""
+
+import numpy as np
+import pandas as pd
+import os
+from typing import Optional, Tuple
+import logging
+
+
+# Rows of history needed to compute one feature row (longest window: Bollinger 20 + pct_change)
+FEATURE_LOOKBACK = 21
+
+
+def calculate_rsi(prices: pd.Series, window: int = 14) -> pd.Series:
+    """Calculate RSI indicator."""
+    delta = prices.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    rs = gain / loss
+    rsi = 100 - (100 / (1 + rs))
+    return rsi
+
+
+def calculate_bollinger_bands(prices: pd.Series, window: int = 20, std_dev: int = 2) -> Tuple[pd.Series, pd.Series]:
+    """Calculate Bollinger Bands."""
+    sma = prices.rolling(window=window).mean()
+    std = prices.rolling(window=window).std()
+    upper = sma + (std * std_dev)
+    lower = sma - (std * std_dev)
+    return upper, lower
+
+
+def compute_features(data: pd.DataFrame, dropna: bool = True) -> pd.DataFrame:
+    """Compute ML features for every row of ``data``."""
+    df = data.copy()
+
+    # Price-based features
+    df['price_change_1'] = df['close'].pct_change(1)
+    df['price_change_5'] = df['close'].pct_change(5)
+    df['price_change_10'] = df['close'].pct_change(10)
+
+    # Technical indicators
+    df['rsi'] = calculate_rsi(df['close'])
+    df['bb_upper'], df['bb_lower'] = calculate_bollinger_bands(df['close'])
+    df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
+
+    # Volume features
+    df['volume_change'] = df['volume'].pct_change()
+    df['volume_price_trend'] = df['volume'] * df['price_change_1']
+
+    # Kalman filter features
+    if 'kalman_deviation' in df.columns:
+        df['kalman_signal_strength'] = abs(df['kalman_deviation'])
+        df['kalman_trend'] = df['kalman_price'].diff()
+
+    # Liquidation features
+    if 'liquidations_volume' in df.columns:
+        df['liquidation_ratio'] = df['liquidations_short'] / (df['liquidations_long'] + 1)
+        df['liquidation_volume_ratio'] = df['liquidations_volume'] / (df['volume'] + 1)
+
+        # Replace infinite values with 0
+        df['liquidation_ratio'] = df['liquidation_ratio'].replace([np.inf, -np.inf], 0)
+        df['liquidation_volume_ratio'] = df['liquidation_volume_ratio'].replace([np.inf, -np.inf], 0)
+
+    # Remove NaN values and infinite values
+    df = df.replace([np.inf, -np.inf], np.nan)
+    if dropna:
+        df = df.dropna()
+
+    return df
+
+
+class FeatureStore:
+    """Rolling feature state that yields the latest feature vector incrementally."""
+
+    def __init__(self, cache_path: str = 'models/feature_matrix.pkl',
+                 max_rows: int = 100000, save_every: int = 50):
+        """Initialize the feature store."""
+        self.log = logging.getLogger(__name__)
+        self.cache_path = cache_path
+        self.max_rows = max_rows
+        self.save_every = save_every
+
+        self.buffer: Optional[pd.DataFrame] = None  # Last FEATURE_LOOKBACK input rows
+        self.matrix: Optional[pd.DataFrame] = None  # Valid feature rows, for retraining
+        self._pending = []  # Feature rows not yet merged into the matrix
+        self.last_timestamp = None
+        self._unsaved_rows = 0
+
+        self._load()
+
+    def update(self, data: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Ingest bars newer than the last stored one and return the latest valid feature row of ``data``.
+
+        The last bar of ``data`` is usually the candle that is still forming: its features
+        are recomputed on every call and only stored once a later bar closes it. Frames
+        that do not extend the stored state are computed in full with ``compute_features``.
+        """
+        if data is None or data.empty:
+            return self.latest()
+
+        if not self._extends_state(data):
+            return self._rebuild(data)
+
+        start = data.index.searchsorted(self.last_timestamp, side='right')
+        new_bars = data.iloc[start:]
+
+        # Only the lookback window plus the new bars are needed for the new feature rows
+        context = pd.concat([self.buffer, new_bars])
+        features = compute_features(context, dropna=False).iloc[-len(new_bars):]
+        self._commit(context.iloc[:-1], features.iloc[:-1])
+
+        return self._latest_valid(features)
+
+    def _extends_state(self, data: pd.DataFrame) -> bool:
+        """Whether ``data`` continues the stored bars: same last stored bar, newer bars after it."""
+        if self.last_timestamp is None or self.buffer is None:
+            return False
+
+        index = data.index
+        if not self._is_time_indexed(index) or index[-1] <= self.last_timestamp or self.last_timestamp not in index:
+            return False
+        return data.at[self.last_timestamp, 'close'] == self.buffer['close'].iloc[-1]
+
+    def _rebuild(self, data: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Compute features for all of ``data``, re-seeding the rolling state when ``data`` is newer."""
+        features = compute_features(data, dropna=False)
+
+        # Stored rows are keyed by bar timestamp, so only time-indexed frames can re-seed them
+        closed = data.iloc[:-1]
+        if len(closed) and self._is_time_indexed(data.index):
+            if self.last_timestamp is None or closed.index[-1] > self.last_timestamp:
+                rows = features.iloc[:-1]
+                if self.last_timestamp is not None:
+                    rows = rows[closed.index > self.last_timestamp]
+                self._commit(closed, rows)
+
+        return self._latest_valid(features)
+
+    @staticmethod
+    def _is_time_indexed(index: pd.Index) -> bool:
+        """Whether ``index`` holds unique, increasing bar timestamps."""
+        return isinstance(index, pd.DatetimeIndex) and index.is_monotonic_increasing and index.is_unique
+
+    def _commit(self, closed: pd.DataFrame, features: pd.DataFrame):
+        """Store the feature rows of closed bars and keep their lookback window."""
+        if closed.empty:
+            return
+        self.buffer = closed.iloc[-FEATURE_LOOKBACK:]
+        self.last_timestamp = closed.index[-1]
+        self._append(features.dropna())
+
+    def _latest_valid(self, features: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Return the last valid row of ``features``, or the latest stored one."""
+        valid = features.dropna()
+        return valid.iloc[-1:] if not valid.empty else self.latest()
+
+    def latest(self) -> Optional[pd.DataFrame]:
+        """Return the most recent valid feature row."""
+        if self._pending:
+            return self._pending[-1].iloc[-1:]
+        if self.matrix is None or self.matrix.empty:
+            return None
+        return self.matrix.iloc[-1:]
+
+    def training_matrix(self) -> Optional[pd.DataFrame]:
+        """Return the cached feature matrix for retraining."""
+        self._consolidate()
+        return self.matrix
+
+    def reset(self):
+        """Reset the rolling state (the cached matrix is kept)."""
+        self.buffer = None
+        self.last_timestamp = None
+
+    def _append(self, rows: pd.DataFrame):
+        """Queue new feature rows; they are merged into the matrix lazily."""
+        if rows.empty:
+            return
+
+        self._pending.append(rows)
+        self._unsaved_rows += len(rows)
+        if self._unsaved_rows >= self.save_every:
+            self.save()
+
+    def _consolidate(self):
+        """Merge pending feature rows into the cached matrix."""
+        if not self._pending:
+            return
+
+        frames = ([self.matrix] if self.matrix is not None else []) + self._pending
+        matrix = pd.concat(frames)
+        matrix = matrix[~matrix.index.duplicated(keep='last')].sort_index()
+        self.matrix = matrix.iloc[-self.max_rows:]
+        self._pending = []
+
+    def save(self):
+        """Persist the feature matrix atomically."""
+        self._consolidate()
+        if self.matrix is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            self.matrix.to_pickle(tmp_path)
+            os.replace(tmp_path, self.cache_path)
+            self._unsaved_rows = 0
+        except Exception as e:
+            self.log.warning(f"Could not save feature matrix: {e}")
+
+    def _load(self):
+        """Load the persisted feature matrix if available."""
+        try:
+            if os.path.exists(self.cache_path):
+                self.matrix = pd.read_pickle(self.cache_path)
+                self.log.info(f"Loaded {len(self.matrix)} cached feature rows from {self.cache_path}")
+        except Exception as e:
+            self.log.warning(f"Could not load feature matrix: {e}")
@@ -4,95 +4,297 @@ Kalman filter implementation for price smoothing and signal generation.
 
 import numpy as np
 import pandas as pd
-from typing import Optional, Tuple
+from scipy.signal import lfilter
+from typing import Dict, Optional, Tuple
 import logging
 from config import Config
 
 
+def steady_state_gain(q: float, r: float) -> Tuple[float, float]:
+    """Return the steady-state Kalman gain and error covariance for a random walk."""
+    p_pred = (q + np.sqrt(q * q + 4.0 * q * r)) / 2.0
+    gain = p_pred / (p_pred + r)
+    return gain, (1.0 - gain) * p_pred
+
+
+def kalman_batch(prices: np.ndarray, q: float, r: float,
+                 x0: np.ndarray, p0: np.ndarray,
+                 tol: float = 1e-12) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run independent scalar Kalman filters over a 2-D price array.
+
+    Each row of ``prices`` is one series. The error covariance recursion does not
+    depend on the observations, so the transient steps are computed element-wise
+    across all rows and, once every row reaches the steady-state gain, the rest of
+    the recursion is a first-order IIR filter evaluated by ``lfilter`` in C.
+
+    Args:
+        prices: Observations, shape (n_series, n_bars).
+        q: Process noise.
+        r: Measurement noise.
+        x0: Prior state estimate per series, shape (n_series,).
+        p0: Prior error covariance per series, shape (n_series,).
+        tol: Covariance tolerance used to detect convergence.
+
+    Returns:
+        Tuple of (filtered estimates, last state, last covariance).
+    """
+    prices = np.asarray(prices, dtype=float)
+    x = np.array(x0, dtype=float, copy=True)
+    p = np.array(p0, dtype=float, copy=True)
+    n_bars = prices.shape[1]
+    out = np.empty_like(prices)
+
+    k_inf, p_inf = steady_state_gain(q, r)
+
+    # Transient: covariance still converging for at least one series
+    t = 0
+    while t < n_bars and np.any(np.abs(p - p_inf) > tol):
+        p_pred = p + q
+        gain = p_pred / (p_pred + r)
+        x = x + gain * (prices[:, t] - x)
+        p = (1.0 - gain) * p_pred
+        out[:, t] = x
+        t += 1
+
+    # Steady state: x_t = K * z_t + (1 - K) * x_{t-1}
+    if t < n_bars:
+        zi = ((1.0 - k_inf) * x)[:, None]
+        out[:, t:], _ = lfilter([k_inf], [1.0, -(1.0 - k_inf)], prices[:, t:], axis=1, zi=zi)
+        x = out[:, -1].copy()
+        p = np.full_like(p, p_inf)
+
+    return out, x, p
+
+
+def kalman_advance(prices: np.ndarray, q: float, r: float,
+                   x0: np.ndarray, p0: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run ``kalman_batch`` and also return the state before the last bar.
+
+    The last bar of a live window is usually the candle that is still forming; keeping
+    the state before it lets the filter roll back and re-apply that bar once its final
+    close is known.
+
+    Returns:
+        Tuple of (filtered estimates, state and covariance before the last bar,
+        last state, last covariance).
+    """
+    head, x_prev, p_prev = kalman_batch(prices[:, :-1], q, r, x0, p0)
+    tail, x, p = kalman_batch(prices[:, -1:], q, r, x_prev, p_prev)
+    return np.hstack([head, tail]), x_prev, p_prev, x, p
+
+
 class KalmanFilter:
     """Kalman filter for price smoothing and signal generation."""
-    
+
     def __init__(self):
         """Initialize the Kalman filter."""
         self.config = Config()
         self.log = logging.getLogger(__name__)
-        
+
         # Kalman filter parameters
         self.Q = self.config.KALMAN_Q  # Process noise
         self.R = self.config.KALMAN_R  # Measurement noise
-        
+
         # State variables
         self.x = 0.0  # State estimate
         self.P = 1.0  # Error covariance
         self.initialized = False
-    
+
+        # Incremental state: last filtered bar, the state before it (to re-apply it if it
+        # was still forming) and the Kalman columns of the last window
+        self.last_timestamp = None
+        self.prev_state: Optional[Tuple[float, float]] = None
+        self.history: Optional[pd.DataFrame] = None
+
     def apply_filter(self, data: pd.DataFrame) -> Optional[pd.DataFrame]:
-        """Apply Kalman filter to price data."""
+        """Apply Kalman filter to price data, filtering only bars not seen before."""
         try:
             if data is None or data.empty:
                 return None
-            
-            df = data.copy()
-            
-            # Initialize filter with first price
-            if not self.initialized:
-                self.x = df['close'].iloc[0]
-                self.initialized = True
-            
-            # Apply Kalman filter
-            kalman_prices = []
-            kalman_deviations = []
-            kalman_signals = []
-            
-            for price in df['close']:
-                # Prediction step
-                x_pred = self.x
-                P_pred = self.P + self.Q
-                
-                # Update step
-                K = P_pred / (P_pred + self.R)  # Kalman gain
-                self.x = x_pred + K * (price - x_pred)
-                self.P = (1 - K) * P_pred
-                
-                # Calculate deviation and signal
-                deviation = abs(price - self.x)
-                signal = 1 if deviation > self.config.DEVIATION_THRESHOLD else 0
-                
-                kalman_prices.append(self.x)
-                kalman_deviations.append(deviation)
-                kalman_signals.append(signal)
-            
-            # Add Kalman filter results to dataframe
-            df['kalman_price'] = kalman_prices
-            df['kalman_deviation'] = kalman_deviations
-            df['kalman_signal'] = kalman_signals
-            
-            self.log.info(f"Applied Kalman filter to {len(df)} data points")
+
+            new_bars = self._pending_bars(data)
+            if new_bars is None:
+                # First call or a frame that does not continue the stored state: filter all of it
+                self.reset()
+                columns = self._filter(data['close'].to_numpy())
+                if self._is_time_indexed(data.index):
+                    self._append_history(columns, data.index, keep=len(data))
+                df = data.assign(**columns)
+                filtered = len(data)
+            else:
+                # Reuse the stored Kalman columns for bars already filtered in earlier cycles
+                if len(new_bars):
+                    self._append_history(self._filter(new_bars['close'].to_numpy()), new_bars.index)
+                window = self.history.reindex(data.index)
+                df = data.assign(**{col: window[col] for col in window.columns})
+                filtered = len(new_bars)
+
+            self.log.info(f"Applied Kalman filter to {filtered} new of {len(df)} data points")
             return df
-            
+
         except Exception as e:
             self.log.error(f"Error applying Kalman filter: {e}")
             return None
-    
+
+    def update(self, new_bars: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Filter only bars newer than the last seen timestamp (and a re-fetched last bar) and return them."""
+        try:
+            if new_bars is None or new_bars.empty:
+                return None
+
+            pending = self._pending_bars(new_bars)
+            if pending is None:
+                self.reset()
+                pending = new_bars
+            if pending.empty:
+                return pending.assign(kalman_price=[], kalman_deviation=[], kalman_signal=[])
+
+            columns = self._filter(pending['close'].to_numpy())
+            if self._is_time_indexed(pending.index):
+                self._append_history(columns, pending.index)
+            return pending.assign(**columns)
+
+        except Exception as e:
+            self.log.error(f"Error updating Kalman filter: {e}")
+            return None
+
+    @staticmethod
+    def _is_time_indexed(index: pd.Index) -> bool:
+        """Incremental filtering needs unique, increasing timestamps to know which bars are new."""
+        return isinstance(index, pd.DatetimeIndex) and index.is_monotonic_increasing and index.is_unique
+
+    def _pending_bars(self, data: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """
+        Bars of ``data`` that still have to be filtered.
+
+        Those are the bars after ``last_timestamp`` plus the last filtered bar itself when
+        ``data`` contains it again: it may have been filtered while the candle was still
+        forming, so the state is rolled back to before it and the bar is re-applied.
+        Returns None when ``data`` is not a continuation of the stored state (no stored
+        state, no DatetimeIndex, an older window or bars the filter never saw).
+        """
+        if self.last_timestamp is None or self.history is None or not self._is_time_indexed(data.index):
+            return None
+
+        index = data.index
+        if index[-1] < self.last_timestamp or index[0] < self.history.index[0]:
+            return None
+        if not index[index < self.last_timestamp].isin(self.history.index).all():
+            return None
+
+        if self.last_timestamp in index:
+            last_timestamp = self.last_timestamp
+            self._rollback_last()
+            return data[index >= last_timestamp]
+        return data[index > self.last_timestamp]
+
+    def _rollback_last(self):
+        """Undo the last filtered bar: restore the state before it and drop its history row."""
+        self.x, self.P = self.prev_state
+        self.prev_state = None
+        self.history = self.history.iloc[:-1]
+        if self.history.empty:
+            self.history = None
+            self.last_timestamp = None
+            self.initialized = False
+        else:
+            self.last_timestamp = self.history.index[-1]
+
+    def _append_history(self, columns: Dict[str, np.ndarray], index: pd.Index, keep: int = None):
+        """Store Kalman columns for new bars, keeping at most one data window."""
+        new_history = pd.DataFrame(columns, index=index)
+        history = new_history if self.history is None else pd.concat([self.history, new_history])
+        self.history = history.iloc[-max(keep or 0, self.config.DATA_LIMIT):]
+        self.last_timestamp = index[-1]
+
+    def _filter(self, closes: np.ndarray) -> Dict[str, np.ndarray]:
+        """Advance the filter state over ``closes`` and return the Kalman columns."""
+        if not self.initialized:
+            self.x = float(closes[0])
+            self.initialized = True
+
+        estimates, x_prev, p_prev, x, p = kalman_advance(closes[None, :], self.Q, self.R,
+                                                         np.array([self.x]), np.array([self.P]))
+        self.prev_state = (float(x_prev[0]), float(p_prev[0]))
+        self.x, self.P = float(x[0]), float(p[0])
+
+        return self._signal_columns(closes, estimates[0], self.config.DEVIATION_THRESHOLD)
+
+    @staticmethod
+    def _signal_columns(closes: np.ndarray, estimates: np.ndarray, threshold: float) -> Dict[str, np.ndarray]:
+        """Compute deviation and signal columns from filtered estimates."""
+        deviation = np.abs(closes - estimates)
+        return {
+            'kalman_price': estimates,
+            'kalman_deviation': deviation,
+            'kalman_signal': (deviation > threshold).astype(int)
+        }
+
     def reset(self):
         """Reset the filter state."""
         self.x = 0.0
         self.P = 1.0
         self.initialized = False
-    
+        self.last_timestamp = None
+        self.prev_state = None
+        self.history = None
+
     def validate(self) -> bool:
         """Validate Kalman filter configuration."""
         try:
-            # Test with sample data
+            # Test with sample data on a scratch filter so live state is untouched
             test_data = pd.DataFrame({
                 'close': [100, 101, 102, 101, 100]
             })
-            result = self.apply_filter(test_data)
+            result = KalmanFilter().apply_filter(test_data)
             return result is not None
         except Exception as e:
             self.log.error(f"Kalman filter validation failed: {e}")
             return False
 
 
+class KalmanFilterBank:
+    """Independent per-symbol Kalman filters advanced together as one array operation."""
+
+    def __init__(self, symbols):
+        """Initialize one filter per symbol."""
+        self.filters: Dict[str, KalmanFilter] = {symbol: KalmanFilter() for symbol in symbols}
+        self.log = logging.getLogger(__name__)
+
+    def update(self, bars_by_symbol: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """Filter new bars for every symbol, batching symbols with the same number of new bars."""
+        pending: Dict[int, list] = {}
+        for symbol, bars in bars_by_symbol.items():
+            kf = self.filters.setdefault(symbol, KalmanFilter())
+            unseen = kf._pending_bars(bars)
+            if unseen is None:
+                kf.reset()
+            else:
+                bars = unseen
+            if bars.empty:
+                continue
+            if not kf.initialized:
+                kf.x = float(bars['close'].iloc[0])
+                kf.initialized = True
+            pending.setdefault(len(bars), []).append((symbol, bars))
+
+        results = {}
+        for group in pending.values():
+            kfs = [self.filters[symbol] for symbol, _ in group]
+            closes = np.vstack([bars['close'].to_numpy(dtype=float) for _, bars in group])
+            estimates, x_prev, p_prev, x, p = kalman_advance(closes, kfs[0].Q, kfs[0].R,
+                                                             np.array([kf.x for kf in kfs]),
+                                                             np.array([kf.P for kf in kfs]))
 
+            for i, (symbol, bars) in enumerate(group):
+                kf = kfs[i]
+                kf.prev_state = (float(x_prev[i]), float(p_prev[i]))
+                kf.x, kf.P = float(x[i]), float(p[i])
+                columns = kf._signal_columns(closes[i], estimates[i], kf.config.DEVIATION_THRESHOLD)
+                if kf._is_time_indexed(bars.index):
+                    kf._append_history(columns, bars.index)
+                results[symbol] = bars.assign(**columns)
 
+        return results
@@ -10,9 +10,16 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
 import os
-from typing import Tuple, Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any
 import logging
 from config import Config
+from processing.feature_store import FeatureStore, compute_features
+from processing.model_registry import ModelRegistry
+
+
+# Fewer new labelled rows than this are kept for a later warm start
+MIN_WARM_START_ROWS = 20
 
 
 class MLModel:
@@ -24,64 +31,55 @@ class MLModel:
         self.log = logging.getLogger(__name__)
         self.model = None
         self.feature_columns = []
-        self.model_path = 'models/rf_model.pkl'
+        self.model_path = 'models/rf_model.pkl'  # Legacy single-file artifact
+        self.model_version = None
+        self.trained_until = None  # Last labelled feature timestamp used by training
+        
+        # Versioned, memory-mapped artifacts for fast start and hot-swap
+        self.registry = ModelRegistry(keep_versions=self.config.MODEL_KEEP_VERSIONS)
+        self._last_reload_check = time.time()
+        
+        # Rolling feature state shared with training definitions
+        self.feature_store = FeatureStore()
+        
+        # Prepared feature matrices are cached on disk, keyed by the input data (size-bounded)
+        self._memory = joblib.Memory(location='models/cache', verbose=0)
+        self._cache_bytes_limit = self.config.FEATURE_CACHE_MAX_MB * 1024 * 1024
+        self._cached_compute_features = self._memory.cache(compute_features)
         
         # Load existing model if available
         self._load_model()
     
     def prepare_features(self, data: pd.DataFrame) -> pd.DataFrame:
         """Prepare features for ML model."""
-        df = data.copy()
-        
-        # Price-based features
-        df['price_change_1'] = df['close'].pct_change(1)
-        df['price_change_5'] = df['close'].pct_change(5)
-        df['price_change_10'] = df['close'].pct_change(10)
-        
-        # Technical indicators
-        df['rsi'] = self._calculate_rsi(df['close'])
-        df['bb_upper'], df['bb_lower'] = self._calculate_bollinger_bands(df['close'])
-        df['bb_position'] = (df['close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
-        
-        # Volume features
-        df['volume_change'] = df['volume'].pct_change()
-        df['volume_price_trend'] = df['volume'] * df['price_change_1']
-        
-        # Kalman filter features
-        if 'kalman_deviation' in df.columns:
-            df['kalman_signal_strength'] = abs(df['kalman_deviation'])
-            df['kalman_trend'] = df['kalman_price'].diff()
-        
-        # Liquidation features
-        if 'liquidations_volume' in df.columns:
-            df['liquidation_ratio'] = df['liquidations_short'] / (df['liquidations_long'] + 1)
-            df['liquidation_volume_ratio'] = df['liquidations_volume'] / (df['volume'] + 1)
-            
-            # Replace infinite values with 0
-            df['liquidation_ratio'] = df['liquidation_ratio'].replace([np.inf, -np.inf], 0)
-            df['liquidation_volume_ratio'] = df['liquidation_volume_ratio'].replace([np.inf, -np.inf], 0)
-        
-        # Remove NaN values and infinite values
-        df = df.replace([np.inf, -np.inf], np.nan)
-        df = df.dropna()
-        
-        return df
+        features = self._cached_compute_features(data)
+        self._memory.reduce_size(bytes_limit=self._cache_bytes_limit)
+        return features
     
     def create_target(self, data: pd.DataFrame, lookahead: int = 5) -> pd.Series:
         """Create target variable for classification."""
         future_prices = data['close'].shift(-lookahead)
         current_prices = data['close']
         
-        # Target: 1 if price goes up, 0 if price goes down
-        target = (future_prices > current_prices).astype(int)
+        # Target: 1 if price goes up, 0 if price goes down; unknown (NaN) for the last rows
+        target = (future_prices > current_prices).astype(int).where(future_prices.notna())
         
         return target
     
-    def train(self, data: pd.DataFrame) -> Dict[str, Any]:
-        """Train the Random Forest model."""
+    def train(self, data: pd.DataFrame = None, incremental: bool = False) -> Dict[str, Any]:
+        """
+        Train the Random Forest model.
+        
+        Uses the cached feature matrix if no data is given. With ``incremental``,
+        an existing model grows ``RF_WARM_START_TREES`` new trees fitted on rows
+        newer than the last training run instead of being rebuilt from scratch.
+        """
         try:
             # Prepare features
-            features_df = self.prepare_features(data)
+            features_df = self.prepare_features(data) if data is not None else self.feature_store.training_matrix()
+            if features_df is None or features_df.empty:
+                self.log.error("No valid data for training")
+                return {'success': False, 'error': 'No valid data'}
             
             # Create target
             target = self.create_target(features_df)
@@ -90,6 +88,12 @@ class MLModel:
             exclude_cols = ['timestamp', 'target', 'close', 'open', 'high', 'low']
             feature_cols = [col for col in features_df.columns if col not in exclude_cols]
             
+            warm_start = (incremental and self.model is not None and
+                          self.trained_until is not None and feature_cols == self.feature_columns)
+            if warm_start:
+                new_rows = features_df.index > self.trained_until
+                features_df, target = features_df[new_rows], target[new_rows]
+            
             X = features_df[feature_cols]
             y = target
             
@@ -100,42 +104,67 @@ class MLModel:
             
             # Replace any remaining infinite values with NaN and drop them
             X = X.replace([np.inf, -np.inf], np.nan).dropna()
-            y = y[X.index]
+            y = y[X.index].astype(int)
             
             if len(X) == 0:
                 self.log.error("No valid data for training")
                 return {'success': False, 'error': 'No valid data'}
             
+            # The stratified split needs every class at least twice; a warm start also needs enough new rows
+            class_counts = y.value_counts()
+            if len(class_counts) < 2 or class_counts.min() < 2 or (warm_start and len(X) < MIN_WARM_START_ROWS):
+                self.log.warning(f"Not enough labelled rows to train: {len(X)} rows, classes {class_counts.to_dict()}")
+                return {'success': False, 'error': 'Not enough labelled rows'}
+            
             # Split data
             X_train, X_test, y_train, y_test = train_test_split(
                 X, y, test_size=0.2, random_state=42, stratify=y
             )
             
-            # Train model
-            self.model = RandomForestClassifier(
-                n_estimators=self.config.RF_N_ESTIMATORS,
-                max_depth=self.config.RF_MAX_DEPTH,
-                random_state=42,
-                n_jobs=-1
-            )
+            # Train model using all cores
+            if warm_start:
+                model = self.model
+                model.set_params(
+                    warm_start=True,
+                    n_estimators=len(model.estimators_) + self.config.RF_WARM_START_TREES,
+                    n_jobs=-1
+                )
+            else:
+                model = RandomForestClassifier(
+                    n_estimators=self.config.RF_N_ESTIMATORS,
+                    max_depth=self.config.RF_MAX_DEPTH,
+                    random_state=42,
+                    n_jobs=-1
+                )
+            
+            model.fit(X_train, y_train)
             
-            self.model.fit(X_train, y_train)
+            # Cap the forest size by dropping the oldest trees
+            if len(model.estimators_) > self.config.RF_MAX_TREES:
+                model.estimators_ = model.estimators_[-self.config.RF_MAX_TREES:]
+                model.n_estimators = len(model.estimators_)
             
             # Evaluate model
-            y_pred = self.model.predict(X_test)
+            y_pred = model.predict(X_test)
             accuracy = accuracy_score(y_test, y_pred)
             
             # Set feature columns before saving
+            self.model = model
             self.feature_columns = feature_cols
+            self.trained_until = X.index[-1]  # Last row with a known target
             
             # Save model
             self._save_model()
             
-            self.log.info(f"Model trained successfully. Accuracy: {accuracy:.3f}")
+            self.log.info(f"Model trained successfully ({'warm start' if warm_start else 'full'}, "
+                          f"{len(model.estimators_)} trees). Accuracy: {accuracy:.3f}")
             
             return {
                 'success': True,
                 'accuracy': accuracy,
+                'incremental': warm_start,
+                'n_estimators': len(model.estimators_),
+                'version': self.model_version,
                 'feature_importance': dict(zip(feature_cols, self.model.feature_importances_))
             }
             
@@ -149,34 +178,22 @@ class MLModel:
             self.log.warning("Model not trained. Cannot make predictions.")
             return None
         
+        self._reload_if_updated()
+        
         try:
-            # Prepare features
-            features_df = self.prepare_features(data)
-            
-            # Get latest valid data point (without NaN or infinite values)
-            latest = features_df.iloc[-1:]
-            
-            # Check if latest data has NaN or infinite values in feature columns
-            feature_data = latest[self.feature_columns]
-            has_invalid = (feature_data.isnull().any().any() or 
-                          feature_data.isin([np.inf, -np.inf]).any().any())
-            
-            if has_invalid:
-                # Try to get the most recent valid data point
-                valid_data = features_df[self.feature_columns].dropna()
-                # Remove infinite values
-                valid_data = valid_data.replace([np.inf, -np.inf], np.nan).dropna()
-                
-                if len(valid_data) == 0:
-                    self.log.warning("No valid data points for prediction")
-                    return None
-                latest = valid_data.iloc[-1:].copy()
+            # Latest feature row of the given frame; closed bars already stored are not recomputed
+            latest = self.feature_store.update(data)
+            if latest is None:
+                self.log.warning("No valid data points for prediction")
+                return None
             
-            # Select features and ensure no infinite values
-            X = latest[self.feature_columns].copy()
+            missing = [col for col in self.feature_columns if col not in latest.columns]
+            if missing:
+                self.log.warning(f"Missing feature columns for prediction: {missing}")
+                return None
             
-            # Final cleanup: replace any remaining infinite values with 0
-            X = X.replace([np.inf, -np.inf], 0)
+            # Select features and ensure no infinite values
+            X = latest[self.feature_columns].replace([np.inf, -np.inf], 0)
             
             # Make prediction
             prediction = self.model.predict(X)[0]
@@ -192,46 +209,48 @@ class MLModel:
             self.log.error(f"Error making prediction: {e}")
             return None
     
-    def _calculate_rsi(self, prices: pd.Series, window: int = 14) -> pd.Series:
-        """Calculate RSI indicator."""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-    
-    def _calculate_bollinger_bands(self, prices: pd.Series, window: int = 20, std_dev: int = 2) -> Tuple[pd.Series, pd.Series]:
-        """Calculate Bollinger Bands."""
-        sma = prices.rolling(window=window).mean()
-        std = prices.rolling(window=window).std()
-        upper = sma + (std * std_dev)
-        lower = sma - (std * std_dev)
-        return upper, lower
-    
     def _save_model(self):
-        """Save the trained model."""
+        """Save the trained model as a new version."""
         try:
-            os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-            joblib.dump({
+            self.model_version = self.registry.save({
                 'model': self.model,
-                'feature_columns': self.feature_columns
-            }, self.model_path)
-            self.log.info(f"Model saved to {self.model_path}")
+                'feature_columns': self.feature_columns,
+                'trained_until': self.trained_until
+            })
         except Exception as e:
             self.log.error(f"Error saving model: {e}")
     
     def _load_model(self):
-        """Load existing model if available."""
+        """Load the latest model version (memory-mapped), falling back to the legacy file."""
         try:
-            if os.path.exists(self.model_path):
+            loaded = self.registry.load_latest()
+            if loaded is not None:
+                self.model_version, model_data = loaded
+                self.log.info(f"Model version {self.model_version} loaded")
+            elif os.path.exists(self.model_path):
                 model_data = joblib.load(self.model_path)
-                self.model = model_data['model']
-                self.feature_columns = model_data['feature_columns']
                 self.log.info(f"Model loaded from {self.model_path}")
+            else:
+                return
+            
+            # Swap model and metadata together
+            self.model, self.feature_columns, self.trained_until = (
+                model_data['model'], model_data['feature_columns'], model_data.get('trained_until')
+            )
         except Exception as e:
             self.log.warning(f"Could not load existing model: {e}")
     
+    def _reload_if_updated(self):
+        """Hot-swap to a newer model version published by another process."""
+        now = time.time()
+        if now - self._last_reload_check < self.config.MODEL_RELOAD_INTERVAL:
+            return
+        self._last_reload_check = now
+        
+        if self.registry.has_update():
+            self.log.info("New model version available, reloading")
+            self._load_model()
+    
     def validate(self) -> bool:
         """Validate ML model configuration."""
         try:
@@ -0,0 +1,88 @@
+"""
+Versioned model artifact storage.
+
+Artifacts are written uncompressed with joblib so the tree arrays can be
+memory-mapped on load, which keeps bot startup and model hot-swaps fast.
+"""
+
+import joblib
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+
+class ModelRegistry:
+    """Stores versioned model artifacts and tracks the latest one."""
+
+    def __init__(self, base_dir: str = 'models/versions', keep_versions: int = 5):
+        """Initialize the model registry."""
+        self.log = logging.getLogger(__name__)
+        self.base_dir = base_dir
+        self.keep_versions = keep_versions
+        self.manifest_path = os.path.join(base_dir, 'latest.json')
+        self._manifest_mtime = None
+
+    def save(self, artifact: Dict[str, Any]) -> str:
+        """Save a new artifact version and point the manifest at it."""
+        os.makedirs(self.base_dir, exist_ok=True)
+
+        # Versions sort by creation time; never reuse one saved in the same millisecond
+        while True:
+            now = time.time()
+            version = time.strftime('%Y%m%d_%H%M%S', time.localtime(now)) + f"_{int(now * 1000) % 1000:03d}"
+            path = os.path.join(self.base_dir, f"rf_model_{version}.joblib")
+            if not os.path.exists(path):
+                break
+            time.sleep(0.001)
+
+        # Uncompressed so numpy arrays can be memory-mapped on load
+        joblib.dump(artifact, path)
+
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': version, 'path': path, 'created': time.time()}, f)
+        os.replace(tmp_path, self.manifest_path)
+        self._manifest_mtime = os.path.getmtime(self.manifest_path)
+
+        self._prune()
+        self.log.info(f"Model version {version} saved to {path}")
+        return version
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Return the manifest of the latest version, if any."""
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def load_latest(self, mmap_mode: Optional[str] = 'r') -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Load the latest artifact, memory-mapping its arrays."""
+        manifest = self.latest()
+        if manifest is None or not os.path.exists(manifest['path']):
+            return None
+
+        artifact = joblib.load(manifest['path'], mmap_mode=mmap_mode)
+        self._manifest_mtime = os.path.getmtime(self.manifest_path)
+        return manifest['version'], artifact
+
+    def has_update(self) -> bool:
+        """Check whether a newer version was published since the last load."""
+        try:
+            return os.path.getmtime(self.manifest_path) != self._manifest_mtime
+        except OSError:
+            return False
+
+    def _prune(self):
+        """Remove the oldest versions beyond ``keep_versions``."""
+        versions = sorted(
+            name for name in os.listdir(self.base_dir)
+            if name.startswith('rf_model_') and name.endswith('.joblib')
+        )
+        for name in versions[:-self.keep_versions]:
+            try:
+                os.remove(os.path.join(self.base_dir, name))
+            except OSError as e:
+                self.log.warning(f"Could not remove old model version {name}: {e}")
@@ -10,6 +10,7 @@ import asyncio
 import sys
 from pathlib import Path
 from investment_manager import investment_manager
+from log_tail import tail_lines
 
 # Add backtrader_engine to path for health checks
 sys.path.append(str(Path(__file__).parent / "backtrader_engine"))
@@ -141,8 +142,21 @@ def is_bot_running():
         return False, None
 
 def get_metrics():
-    """Obtiene métricas del bot desde Prometheus"""
+    """Obtiene métricas del bot desde el snapshot JSON (o el texto Prometheus como respaldo)"""
     try:
+        response = requests.get("http://127.0.0.1:8080/metrics/json", timeout=5)
+        if response.status_code == 200:
+            metrics = {}
+            for name, family in response.json().get("metrics", {}).items():
+                if not name.startswith('paper_'):
+                    continue
+                for series in family.get("series", []):
+                    if "value" not in series:
+                        continue
+                    labels = ",".join(f'{k}="{v}"' for k, v in series["labels"].items())
+                    metrics[f"{name}{{{labels}}}" if labels else name] = str(series["value"])
+            return metrics
+        
         response = requests.get("http://127.0.0.1:8080/metrics", timeout=5)
         if response.status_code == 200:
             metrics = {}
@@ -159,12 +173,7 @@ def get_metrics():
 def read_logs():
     """Lee las últimas 5 líneas del log"""
     try:
-        log_file = "backtrader_engine/logs/paper_trading.log"
-        if os.path.exists(log_file):
-            with open(log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                return lines[-5:] if len(lines) > 5 else lines
-        return []
+        return tail_lines("backtrader_engine/logs/paper_trading.log", 5)
     except Exception as e:
         return []
 
@@ -537,10 +546,8 @@ with main_col_right:
     with log_tabs[0]:
         backend_log_file = "/home/alex/proyectos/investment-dashboard/logs/backend.log"
         if os.path.exists(backend_log_file):
-            with open(backend_log_file, 'r') as f:
-                lines = f.readlines()
-                log_text = "".join(lines[-15:])  # Últimas 15 líneas
-                st.code(log_text, language="log", line_numbers=False)
+            log_text = "".join(tail_lines(backend_log_file, 15))  # Últimas 15 líneas
+            st.code(log_text, language="log", line_numbers=False)
         else:
             st.info("No logs available for Investment Backend")
     
@@ -548,10 +555,8 @@ with main_col_right:
     with log_tabs[1]:
         frontend_log_file = "/home/alex/proyectos/investment-dashboard/logs/frontend.log"
         if os.path.exists(frontend_log_file):
-            with open(frontend_log_file, 'r') as f:
-                lines = f.readlines()
-                log_text = "".join(lines[-15:])  # Últimas 15 líneas
-                st.code(log_text, language="log", line_numbers=False)
+            log_text = "".join(tail_lines(frontend_log_file, 15))  # Últimas 15 líneas
+            st.code(log_text, language="log", line_numbers=False)
         else:
             st.info("No logs available for Investment Frontend")
     
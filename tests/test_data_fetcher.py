@@ -0,0 +1,80 @@
+"""
+Unit tests for the data fetcher.
+"""
+
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from data.data_fetcher import DataFetcher, INDICATOR_WARMUP
+
+TIMEFRAME_MS = 15 * 60 * 1000
+
+
+class FakeExchange:
+    """Serves a fixed candle history up to ``now``, with the last candle still forming."""
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.now = 0
+
+    def parse_timeframe(self, timeframe):
+        return TIMEFRAME_MS // 1000
+
+    def milliseconds(self):
+        return int(self.candles[self.now - 1][0])
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        rows = [list(candle) for candle in self.candles[:self.now]]
+        rows[-1][4] *= 1.01  # Close of the forming candle differs from its final close
+        if since is not None:
+            rows = [row for row in rows if row[0] >= since]
+            return rows[:limit]
+        return rows[-limit:]
+
+
+class TestDataFetcher(unittest.TestCase):
+    """Test cases for DataFetcher class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.default_rng(7)
+        closes = 100 + np.cumsum(rng.normal(0, 1, 300))
+        self.candles = np.column_stack([
+            1_700_000_000_000 + np.arange(300) * TIMEFRAME_MS,
+            closes, closes + 1, closes - 1, closes, rng.uniform(10, 20, 300),
+        ])
+
+    def _fetcher(self, cache_dir):
+        with patch.object(DataFetcher, '_initialize_exchange', return_value=FakeExchange(self.candles)):
+            fetcher = DataFetcher()
+        fetcher.cache_dir = cache_dir
+        fetcher.config.DATA_LIMIT = 200
+        return fetcher
+
+    def test_incremental_fetch_matches_full_fetch(self):
+        """Test that merged candles and tail indicators equal a fresh download."""
+        with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as fresh_dir:
+            fetcher = self._fetcher(cache_dir)
+            fetcher.exchange.now = 250
+            fetcher.fetch_data('BTC/USDT', '15m')
+            fetcher.exchange.now = 260
+            incremental = fetcher.fetch_data('BTC/USDT', '15m')
+
+            full_fetcher = self._fetcher(fresh_dir)
+            full_fetcher.exchange.now = 260
+            full = full_fetcher.fetch_data('BTC/USDT', '15m')
+
+        self.assertEqual(len(incremental), 200)
+        self.assertFalse(incremental.index.duplicated().any())
+        self.assertEqual(incremental.loc[incremental.index[-11], 'close'], self.candles[249][4])
+
+        # The full download starts its rolling windows cold; compare once they are warm
+        pd.testing.assert_frame_equal(incremental.iloc[INDICATOR_WARMUP:], full.iloc[INDICATOR_WARMUP:])
+        pd.testing.assert_frame_equal(incremental[['liquidations_long', 'liquidations_short']],
+                                      full[['liquidations_long', 'liquidations_short']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Unit tests for the feature store.
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from processing.feature_store import FeatureStore, compute_features
+
+
+class TestFeatureStore(unittest.TestCase):
+    """Test cases for FeatureStore class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.default_rng(3)
+        closes = 100 + np.cumsum(rng.normal(0, 1, 300))
+        index = pd.date_range('2024-01-01', periods=300, freq='15min')
+        self.data = pd.DataFrame({
+            'open': closes, 'high': closes + 1, 'low': closes - 1,
+            'close': closes, 'volume': rng.uniform(10, 20, 300),
+        }, index=index)
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = FeatureStore(cache_path=os.path.join(self.tmp_dir.name, 'feature_matrix.pkl'))
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.tmp_dir.cleanup()
+
+    def _forming(self, window):
+        """Return ``window`` with its last candle still forming."""
+        window = window.copy()
+        window.iloc[-1, window.columns.get_loc('close')] *= 1.01
+        return window
+
+    def test_incremental_features_match_full_history(self):
+        """Test that incremental rows equal compute_features on the full history."""
+        for end in range(100, 301, 7):
+            window = self._forming(self.data.iloc[max(0, end - 200):end])
+            latest = self.store.update(window)
+            pd.testing.assert_frame_equal(latest, compute_features(window).iloc[-1:])
+
+        # Only closed candles are stored, with their final close
+        expected = compute_features(self.data.iloc[:end - 1])
+        matrix = self.store.training_matrix()
+        pd.testing.assert_frame_equal(matrix, expected.loc[matrix.index[0]:])
+        self.assertEqual(matrix.index[-1], self.data.index[end - 2])
+
+    def test_non_extending_frames_are_computed_in_full(self):
+        """Test that older windows and frames without timestamps are not served from the state."""
+        self.store.update(self.data)
+
+        older = self.data.iloc[:100]
+        pd.testing.assert_frame_equal(self.store.update(older), compute_features(older).iloc[-1:])
+
+        unindexed = self.data.reset_index(drop=True).iloc[:150]
+        pd.testing.assert_frame_equal(self.store.update(unindexed), compute_features(unindexed).iloc[-1:])
+        self.assertEqual(self.store.last_timestamp, self.data.index[-2])
+
+
+if __name__ == '__main__':
+    unittest.main()
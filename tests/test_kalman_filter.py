@@ -0,0 +1,100 @@
+"""
+Unit tests for the Kalman filter.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from processing.kalman_filter import KalmanFilter, KalmanFilterBank
+
+
+def reference_filter(closes, q, r):
+    """Original per-bar Kalman recursion."""
+    x, p, out = closes[0], 1.0, []
+    for price in closes:
+        p_pred = p + q
+        k = p_pred / (p_pred + r)
+        x = x + k * (price - x)
+        p = (1 - k) * p_pred
+        out.append(x)
+    return np.array(out)
+
+
+class TestKalmanFilter(unittest.TestCase):
+    """Test cases for KalmanFilter class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.default_rng(42)
+        closes = 100 + np.cumsum(rng.normal(0, 1, 300))
+        index = pd.date_range('2024-01-01', periods=300, freq='15min')
+        self.data = pd.DataFrame({'close': closes}, index=index)
+        self.kalman = KalmanFilter()
+        self.expected = reference_filter(closes, self.kalman.Q, self.kalman.R)
+
+    def test_batch_matches_reference(self):
+        """Test vectorized filter against the per-bar recursion."""
+        result = self.kalman.apply_filter(self.data)
+        np.testing.assert_allclose(result['kalman_price'], self.expected, rtol=1e-10)
+
+    def test_sliding_window_does_not_refilter(self):
+        """Test that overlapping windows only filter new bars."""
+        self.kalman.apply_filter(self.data.iloc[:200])
+        result = self.kalman.apply_filter(self.data.iloc[50:250])
+
+        self.assertEqual(self.kalman.last_timestamp, self.data.index[249])
+        self.assertFalse(result[['kalman_price', 'kalman_signal']].isna().any().any())
+        np.testing.assert_allclose(result['kalman_price'], self.expected[50:250], rtol=1e-10)
+
+    def test_update_returns_only_new_bars(self):
+        """Test incremental update path."""
+        self.kalman.update(self.data.iloc[:100])
+        result = self.kalman.update(self.data.iloc[:150])
+
+        # The last bar of the first call is re-applied in case it was still forming
+        self.assertEqual(len(result), 51)
+        np.testing.assert_allclose(result['kalman_price'], self.expected[99:150], rtol=1e-10)
+
+    def test_range_index_filters_full_frame(self):
+        """Test that frames without timestamps are filtered in full on every call."""
+        data = self.data.reset_index(drop=True)
+        self.kalman.apply_filter(data)
+        result = self.kalman.apply_filter(data.iloc[:200])
+
+        self.assertIsNone(self.kalman.last_timestamp)
+        np.testing.assert_allclose(result['kalman_price'], self.expected[:200], rtol=1e-10)
+
+    def test_refetched_last_bar_is_reapplied(self):
+        """Test that a forming last candle is rolled back once its final close arrives."""
+        forming = self.data.iloc[:200].copy()
+        forming.iloc[-1, 0] += 5.0
+        self.kalman.apply_filter(forming)
+        result = self.kalman.apply_filter(self.data.iloc[50:250])
+
+        np.testing.assert_allclose(result['kalman_price'], self.expected[50:250], rtol=1e-10)
+        np.testing.assert_allclose(self.kalman.history['kalman_price'], self.expected[:250], rtol=1e-10)
+
+    def test_older_window_is_refiltered(self):
+        """Test that a window that does not extend the stored state is filtered from scratch."""
+        self.kalman.apply_filter(self.data)
+        result = self.kalman.apply_filter(self.data.iloc[:100])
+
+        np.testing.assert_allclose(result['kalman_price'], self.expected[:100], rtol=1e-10)
+        self.assertEqual(self.kalman.last_timestamp, self.data.index[99])
+
+    def test_filter_bank_batches_symbols(self):
+        """Test multi-symbol batching."""
+        bank = KalmanFilterBank(['BTCUSDT', 'ETHUSDT'])
+        results = bank.update({'BTCUSDT': self.data, 'ETHUSDT': self.data * 2})
+
+        np.testing.assert_allclose(results['BTCUSDT']['kalman_price'], self.expected, rtol=1e-10)
+        np.testing.assert_allclose(results['ETHUSDT']['kalman_price'], self.expected * 2, rtol=1e-10)
+
+        # A corrected last candle replaces the one filtered before
+        bank.update({'BTCUSDT': self.data.iloc[-1:].assign(close=self.data['close'].iloc[-1] + 3)})
+        results = bank.update({'BTCUSDT': self.data.iloc[-2:]})
+        np.testing.assert_allclose(results['BTCUSDT']['kalman_price'], self.expected[-1:], rtol=1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main()
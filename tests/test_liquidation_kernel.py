@@ -0,0 +1,104 @@
+"""
+Unit tests for the LiquidationHunterFreq indicator kernel.
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / 'user_data' / 'strategies'))
+from liquidation_kernel import IndicatorKernel, INDICATOR_COLUMNS
+
+
+def reference_ema(values, period):
+    """TA-Lib EMA: SMA seed, then the per-bar recursion."""
+    out = [np.nan] * len(values)
+    k = 2.0 / (period + 1)
+    prev = sum(values[:period]) / period
+    out[period - 1] = prev
+    for i in range(period, len(values)):
+        prev = prev + k * (values[i] - prev)
+        out[i] = prev
+    return np.array(out)
+
+
+def reference_rsi(close, period):
+    """TA-Lib RSI: Wilder smoothing seeded with the mean of the first ``period`` moves."""
+    out = [np.nan] * len(close)
+    diff = np.diff(close)
+    gain = np.maximum(diff[:period], 0).mean()
+    loss = np.maximum(-diff[:period], 0).mean()
+    out[period] = 100 * gain / (gain + loss)
+    for i in range(period, len(diff)):
+        gain = (gain * (period - 1) + max(diff[i], 0)) / period
+        loss = (loss * (period - 1) + max(-diff[i], 0)) / period
+        out[i + 1] = 100 * gain / (gain + loss)
+    return np.array(out)
+
+
+def reference_indicators(dataframe):
+    """Original pandas populate_indicators (RSI/EMA computed as TA-Lib does)."""
+    close = dataframe['close'].to_numpy()
+    dataframe['rsi'] = reference_rsi(close, 14)
+    dataframe['ema_fast'] = reference_ema(close, 8)
+    dataframe['ema_slow'] = reference_ema(close, 21)
+    dataframe['kalman_signal'] = dataframe['close'] - dataframe['ema_fast']
+    dataframe['kalman_deviation'] = dataframe['close'].rolling(window=9).std().fillna(0.0)
+    dataframe['ml_prediction'] = 0
+    dataframe['ml_confidence'] = 0.0
+    long_condition = (dataframe['rsi'] < 40) | (dataframe['ema_fast'] > dataframe['ema_slow'])
+    short_condition = (dataframe['rsi'] > 60) | (dataframe['ema_fast'] < dataframe['ema_slow'])
+    dataframe.loc[long_condition, 'ml_prediction'] = 1
+    dataframe.loc[short_condition, 'ml_prediction'] = 0
+    dataframe.loc[dataframe['rsi'] < 40, 'ml_confidence'] = 0.8
+    dataframe.loc[dataframe['rsi'] > 60, 'ml_confidence'] = 0.8
+    dataframe.loc[(dataframe['rsi'] >= 40) & (dataframe['rsi'] <= 60), 'ml_confidence'] = 0.6
+    dataframe['strong_kalman'] = abs(dataframe['kalman_signal']) > 0.3
+    dataframe['high_deviation'] = dataframe['kalman_deviation'] > 1.5
+    dataframe['high_confidence'] = dataframe['ml_confidence'] > 0.55
+    return dataframe
+
+
+class TestIndicatorKernel(unittest.TestCase):
+    """Test cases for IndicatorKernel."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.default_rng(7)
+        self.close = 100 + np.cumsum(rng.normal(0, 1, 600))
+        self.dates = pd.date_range('2024-01-01', periods=600, freq='1h', tz='UTC')
+        self.kernel = IndicatorKernel()
+
+    def assert_columns_equal(self, columns, expected):
+        for name in INDICATOR_COLUMNS:
+            np.testing.assert_allclose(np.asarray(columns[name], dtype=float),
+                                       np.asarray(expected[name], dtype=float), rtol=1e-9, atol=1e-9, err_msg=name)
+
+    def test_matches_original_pandas_indicators(self):
+        """Kernel output equals the original populate_indicators."""
+        expected = reference_indicators(pd.DataFrame({'close': self.close}))
+        columns, _ = self.kernel.compute(self.close)
+        self.assert_columns_equal(columns, expected)
+        self.assertEqual(columns['ml_prediction'].dtype, expected['ml_prediction'].dtype)
+
+    def test_incremental_update_matches_full_computation(self):
+        """Appending candles (and dropping old ones) reuses the cached rows."""
+        dates = self.dates.values
+        self.kernel.update('BTC/USDT', dates[:500], self.close[:500])
+        columns = self.kernel.update('BTC/USDT', dates[3:503], self.close[3:503])
+
+        full, _ = self.kernel.compute(self.close[:503])
+        self.assert_columns_equal(columns, {name: values[3:] for name, values in full.items()})
+
+        # A rewritten candle forces a full recomputation of the frame
+        close = self.close[3:504].copy()
+        close[-2] += 1.0
+        columns = self.kernel.update('BTC/USDT', dates[3:504], close)
+        self.assert_columns_equal(columns, self.kernel.compute(close)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Unit tests for the incremental log tail service.
+"""
+
+import os
+import tempfile
+import unittest
+
+from log_tail import LogTailService, tail_lines
+
+
+class TestLogTail(unittest.TestCase):
+    """Test cases for tail_lines and LogTailService."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'bot.log')
+        self.write([f"2025-10-04 13:09:{i % 60:02d},000 - INFO - Starting trading cycle {i}\n" for i in range(2000)])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, lines, mode='a'):
+        with open(self.path, mode) as f:
+            f.writelines(lines)
+
+    def test_tail_matches_readlines(self):
+        """tail_lines returns the same lines as readlines()[-n:]"""
+        self.write(["2025-10-04 13:10:00,000 - ERROR - partial line without newline"])
+        with open(self.path) as f:
+            lines = f.readlines()
+        for n in (1, 5, 300, 5000):
+            self.assertEqual(tail_lines(self.path, n, block_size=512), lines[-n:])
+
+    def test_counters_update_incrementally_and_persist(self):
+        """Counters only read new complete lines and survive a restart"""
+        service = LogTailService(self.path)
+        self.assertEqual(service.refresh()['cycles'], 2000)
+
+        self.write(["x - ERROR - Trade executed successfully\n", "x - INFO - Generated signal BUY\n", "x - WARN"])
+        counts = service.refresh()
+        self.assertEqual((counts['errors'], counts['trades'], counts['signals'], counts['warnings']), (1, 1, 1, 0))
+
+        self.write(["ING - incomplete line finished\n"])
+        restarted = LogTailService(self.path)
+        self.assertEqual(restarted.offset, service.offset)
+        self.assertEqual(restarted.refresh()['warnings'], 1)
+        self.assertEqual(restarted.lines, 2003)
+
+        # Rotación: el log se trunca y se vuelve a contar desde el principio
+        self.write(["x - ERROR - after rotation\n"], mode='w')
+        counts = restarted.refresh()
+        self.assertEqual((counts['cycles'], counts['errors'], restarted.lines), (0, 1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
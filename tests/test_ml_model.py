@@ -0,0 +1,95 @@
+"""
+Unit tests for the ML model and its versioned artifacts.
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from processing.ml_model import MLModel
+from processing.model_registry import ModelRegistry
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Test cases for ModelRegistry class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(base_dir=os.path.join(self.tmp.name, 'versions'), keep_versions=2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_versions_are_ordered_and_pruned(self):
+        """Test that every save gets a new, later version and old ones are removed."""
+        versions = [self.registry.save({'weights': np.full(10, i)}) for i in range(4)]
+
+        self.assertEqual(len(set(versions)), 4)
+        self.assertEqual(versions, sorted(versions))
+        self.assertEqual(self.registry.latest()['version'], versions[-1])
+        self.assertEqual(len(os.listdir(self.registry.base_dir)), 3)  # Two versions plus the manifest
+
+    def test_load_latest_memory_maps_arrays(self):
+        """Test that the latest artifact is loaded with its arrays memory-mapped."""
+        self.registry.save({'weights': np.arange(1000.0)})
+        version, artifact = self.registry.load_latest()
+
+        self.assertEqual(version, self.registry.latest()['version'])
+        self.assertIsInstance(artifact['weights'], np.memmap)
+        np.testing.assert_array_equal(artifact['weights'], np.arange(1000.0))
+        self.assertFalse(self.registry.has_update())
+
+
+class TestMLModel(unittest.TestCase):
+    """Test cases for MLModel training."""
+
+    def setUp(self):
+        """Set up test fixtures in a scratch working directory (artifacts live under models/)."""
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+        rng = np.random.default_rng(11)
+        closes = 100 + np.cumsum(rng.normal(0, 1, 700))
+        index = pd.date_range('2024-01-01', periods=700, freq='15min')
+        self.data = pd.DataFrame({
+            'open': closes, 'high': closes + 1, 'low': closes - 1,
+            'close': closes, 'volume': rng.uniform(10, 20, 700),
+        }, index=index)
+
+        self.model = MLModel()
+        self.model.config.RF_N_ESTIMATORS = 10
+        self.model.config.RF_WARM_START_TREES = 5
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_warm_start_grows_forest_on_labelled_rows(self):
+        """Test warm start, the labelled training horizon and the guard for few new rows."""
+        result = self.model.train(self.data.iloc[:500])
+        self.assertTrue(result['success'])
+        self.assertEqual(self.model.trained_until, self.data.index[494])  # Last 5 rows have no target yet
+
+        result = self.model.train(self.data.iloc[:510], incremental=True)
+        self.assertFalse(result['success'])
+        self.assertEqual(len(self.model.model.estimators_), 10)
+        self.assertEqual(self.model.trained_until, self.data.index[494])
+
+        result = self.model.train(self.data, incremental=True)
+        self.assertTrue(result['success'])
+        self.assertTrue(result['incremental'])
+        self.assertEqual(result['n_estimators'], 15)
+        self.assertEqual(self.model.trained_until, self.data.index[694])
+
+        # A fresh instance picks up the latest version
+        reloaded = MLModel()
+        self.assertEqual(reloaded.model_version, self.model.model_version)
+        self.assertEqual(len(reloaded.model.estimators_), 15)
+        self.assertIsNotNone(reloaded.predict(self.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,10 +8,15 @@ import numpy as np
 from datetime import datetime, timedelta
 from data.data_fetcher import DataFetcher
 from processing.ml_model import MLModel
+from processing.model_registry import ModelRegistry
 from processing.kalman_filter import KalmanFilter
 from sklearn.model_selection import cross_val_score
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 import logging
+import os
+import shutil
+import sys
+import tempfile
 import time
 
 # Configurar logging
@@ -155,7 +160,7 @@ def train_model_manually():
                     
                     if len(X) > 50:  # Datos suficientes para CV
                         # Validación cruzada
-                        cv_scores = cross_val_score(ml_model.model, X, y, cv=5, scoring='accuracy')
+                        cv_scores = cross_val_score(ml_model.model, X, y, cv=5, scoring='accuracy', n_jobs=-1)
                         print(f"📊 Validación cruzada (5-fold): {cv_scores.mean():.3f} ± {cv_scores.std() * 2:.3f}")
                         
                         # Métricas adicionales
@@ -184,8 +189,54 @@ def train_model_manually():
         print("❌ Error entrenando el modelo")
         return False
 
+def benchmark_training(sizes=(1000, 5000, 20000, 50000)):
+    """Mide tiempos de entrenamiento completo, incremental y de carga según el tamaño de datos"""
+    
+    print("🧪 Benchmark de entrenamiento y carga del modelo...")
+    rng = np.random.default_rng(42)
+    results = []
+    tmp_dir = tempfile.mkdtemp(prefix='rf_benchmark_')
+    
+    for size in sizes:
+        index = pd.date_range('2024-01-01', periods=size, freq='15min')
+        close = 100 + np.cumsum(rng.normal(0, 1, size))
+        data = pd.DataFrame({
+            'open': close + rng.normal(0, 0.1, size),
+            'high': close + 1,
+            'low': close - 1,
+            'close': close,
+            'volume': rng.uniform(1000, 2000, size)
+        }, index=index)
+        
+        ml_model = MLModel()
+        ml_model.registry = ModelRegistry(base_dir=os.path.join(tmp_dir, str(size)))
+        
+        # Entrenamiento completo sobre el 90% y crecimiento warm-start con el resto
+        split = int(size * 0.9)
+        start = time.perf_counter()
+        ml_model.train(data.iloc[:split])
+        full_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        ml_model.train(data, incremental=True)
+        incremental_time = time.perf_counter() - start
+        
+        # Carga memory-mapped de la última versión
+        start = time.perf_counter()
+        ml_model.registry.load_latest()
+        load_time = time.perf_counter() - start
+        
+        results.append((size, full_time, incremental_time, load_time))
+        print(f"📊 {size:>7} filas | completo {full_time:6.2f}s | incremental {incremental_time:6.2f}s | carga {load_time * 1000:7.1f}ms")
+    
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    return results
+
 if __name__ == "__main__":
-    train_model_manually()
+    if '--benchmark' in sys.argv:
+        benchmark_training()
+    else:
+        train_model_manually()
 
 
 
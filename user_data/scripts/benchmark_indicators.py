@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de populate_indicators de LiquidationHunterFreq.
+Compara la versión pandas original con el kernel NumPy (cálculo completo e incremental)
+sobre N pares × M velas sintéticas.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).parent.parent / "strategies"))
+from liquidation_kernel import IndicatorKernel, INDICATOR_COLUMNS, ema, wilder_rsi
+
+try:
+    import talib.abstract as ta
+except ImportError:  # Sin TA-Lib: RSI/EMA del kernel (solo se mide el resto de la versión original)
+    ta = None
+
+def make_pairs(pairs, candles, seed=42):
+    """Velas sintéticas (random walk) por par"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2024-01-01", periods=candles + 1, freq="1h", tz="UTC")
+    frames = {}
+    for i in range(pairs):
+        close = 100 + np.cumsum(rng.normal(0, 1, candles + 1))
+        frames[f"PAIR{i}/USDT"] = pd.DataFrame({
+            "date": dates, "open": close, "high": close + 1, "low": close - 1,
+            "close": close, "volume": rng.uniform(1, 100, candles + 1)
+        })
+    return frames
+
+def original_indicators(dataframe):
+    """populate_indicators antes del kernel (.loc y rolling de pandas)"""
+    if ta is not None:
+        dataframe['rsi'] = ta.RSI(dataframe, timeperiod=14)
+        dataframe['ema_fast'] = ta.EMA(dataframe, timeperiod=8)
+        dataframe['ema_slow'] = ta.EMA(dataframe, timeperiod=21)
+    else:
+        close = dataframe['close'].to_numpy()
+        dataframe['rsi'] = wilder_rsi(close, 14)[0]
+        dataframe['ema_fast'] = ema(close, 8)
+        dataframe['ema_slow'] = ema(close, 21)
+
+    dataframe['kalman_signal'] = dataframe['close'] - dataframe['ema_fast']
+    dataframe['kalman_deviation'] = dataframe['close'].rolling(window=9).std().fillna(0.0)
+    dataframe['ml_prediction'] = 0
+    dataframe['ml_confidence'] = 0.0
+    long_condition = (dataframe['rsi'] < 40) | (dataframe['ema_fast'] > dataframe['ema_slow'])
+    short_condition = (dataframe['rsi'] > 60) | (dataframe['ema_fast'] < dataframe['ema_slow'])
+    dataframe.loc[long_condition, 'ml_prediction'] = 1
+    dataframe.loc[short_condition, 'ml_prediction'] = 0
+    dataframe.loc[dataframe['rsi'] < 40, 'ml_confidence'] = 0.8
+    dataframe.loc[dataframe['rsi'] > 60, 'ml_confidence'] = 0.8
+    dataframe.loc[(dataframe['rsi'] >= 40) & (dataframe['rsi'] <= 60), 'ml_confidence'] = 0.6
+    dataframe['strong_kalman'] = abs(dataframe['kalman_signal']) > 0.3
+    dataframe['high_deviation'] = dataframe['kalman_deviation'] > 1.5
+    dataframe['high_confidence'] = dataframe['ml_confidence'] > 0.55
+    return dataframe
+
+def kernel_indicators(kernel, dataframe, pair):
+    """populate_indicators con el kernel"""
+    columns = kernel.update(pair, dataframe['date'].values, dataframe['close'].to_numpy())
+    return pd.concat([dataframe, pd.DataFrame(columns, index=dataframe.index)], axis=1)
+
+def timed(label, func, frames):
+    start = time.perf_counter()
+    results = {pair: func(frame.copy(), pair) for pair, frame in frames.items()}
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.3f}s  ({elapsed / len(frames) * 1000:.2f} ms/par)")
+    return results, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de indicadores de LiquidationHunterFreq")
+    parser.add_argument("--pairs", type=int, default=100)
+    parser.add_argument("--candles", type=int, default=10000)
+    args = parser.parse_args()
+
+    frames = make_pairs(args.pairs, args.candles)
+    history = {pair: frame.iloc[:-1].reset_index(drop=True) for pair, frame in frames.items()}
+    # Refresco de velas: sale la más antigua y entra una nueva (ventana fija como en freqtrade)
+    refreshed = {pair: frame.iloc[1:].reset_index(drop=True) for pair, frame in frames.items()}
+
+    print(f"{args.pairs} pares × {args.candles} velas (RSI/EMA {'TA-Lib' if ta is not None else 'kernel'})")
+    original, t_original = timed("pandas original", lambda df, pair: original_indicators(df), history)
+
+    kernel = IndicatorKernel()
+    full, t_full = timed("kernel completo", lambda df, pair: kernel_indicators(kernel, df, pair), history)
+    _, t_incremental = timed("kernel incremental (+1 vela)", lambda df, pair: kernel_indicators(kernel, df, pair), refreshed)
+    _, t_original_refresh = timed("pandas original (+1 vela)", lambda df, pair: original_indicators(df), refreshed)
+
+    # Verificar que ambas versiones producen lo mismo
+    for pair, frame in original.items():
+        for name in INDICATOR_COLUMNS:
+            np.testing.assert_allclose(full[pair][name].to_numpy(dtype=float), frame[name].to_numpy(dtype=float),
+                                       rtol=1e-7, atol=1e-7, err_msg=f"{pair} {name}")
+
+    print(f"speedup completo: {t_original / t_full:.1f}x, incremental: {t_original_refresh / t_incremental:.1f}x")
+
+if __name__ == "__main__":
+    main()
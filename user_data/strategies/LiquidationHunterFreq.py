@@ -4,14 +4,20 @@ Adapted from LiquidationHunterAICoded for QuantConnect
 Uses strategy_parameters from config for simplicity and scalability
 """
 
+import sys
+from pathlib import Path
+
 import pandas as pd
 import numpy as np
 from pandas import DataFrame
 from typing import Optional, Dict, Any, Union
 from freqtrade.strategy import IStrategy, merge_informative_pair
-import talib.abstract as ta
 from freqtrade.persistence import Trade
 
+# Freqtrade loads strategies by file path: make the sibling kernel module importable
+sys.path.append(str(Path(__file__).parent))
+from liquidation_kernel import IndicatorKernel, INDICATOR_COLUMNS
+
 
 class LiquidationHunterFreq(IStrategy):
     """
@@ -38,7 +44,7 @@ class LiquidationHunterFreq(IStrategy):
     trailing_only_offset_is_reached = False
 
     timeframe = '1h'  # Will be overridden by config
-    process_only_new_candles = False
+    process_only_new_candles = True  # Indicators are only extended with the appended candles
     use_exit_signal = True
     exit_profit_only = False
     ignore_roi_if_entry_signal = False
@@ -60,6 +66,16 @@ class LiquidationHunterFreq(IStrategy):
         self.ema_fast_period = strategy_params.get("ema_fast_period", 8)
         self.ema_slow_period = strategy_params.get("ema_slow_period", 21)
         
+        # Indicator kernel shared by all pairs (keeps the last result per pair)
+        self.indicator_kernel = IndicatorKernel(
+            rsi_period=self.rsi_period,
+            ema_fast_period=self.ema_fast_period,
+            ema_slow_period=self.ema_slow_period,
+            kalman_threshold=self.kalman_threshold,
+            deviation_threshold=self.deviation_threshold,
+            ml_confidence_threshold=self.ml_confidence_threshold
+        )
+        
         # Logs para confirmar estrategia cargada correctamente
         print(f"[STRATEGY LOADED] {self.__class__.__name__}")
         print(f"[STRATEGY CONFIG] stoploss from config: {config.get('stoploss', 'NOT FOUND')}")
@@ -78,48 +94,17 @@ class LiquidationHunterFreq(IStrategy):
 
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
-        Populate indicators for the strategy
+        Populate indicators for the strategy (only candles appended since the last call are computed)
         """
-        # Technical indicators
-        dataframe['rsi'] = ta.RSI(dataframe, timeperiod=self.rsi_period)
-        dataframe['ema_fast'] = ta.EMA(dataframe, timeperiod=self.ema_fast_period)
-        dataframe['ema_slow'] = ta.EMA(dataframe, timeperiod=self.ema_slow_period)
-
-        # Kalman-like signals
-        dataframe['kalman_signal'] = dataframe['close'] - dataframe['ema_fast']
-        dataframe['kalman_deviation'] = dataframe['close'].rolling(window=9).std().fillna(0.0)
-
-        # ML-like prediction signals
-        dataframe['ml_prediction'] = 0
-        dataframe['ml_confidence'] = 0.0
-
-        # Long conditions (relaxed RSI thresholds)
-        long_condition = (
-            (dataframe['rsi'] < 40) |  # Relaxed from 30
-            (dataframe['ema_fast'] > dataframe['ema_slow'])
-        )
-
-        # Short conditions (relaxed RSI thresholds)
-        short_condition = (
-            (dataframe['rsi'] > 60) |  # Relaxed from 70
-            (dataframe['ema_fast'] < dataframe['ema_slow'])
+        # .values: datetime64 array (to_numpy() gives Timestamp objects for tz-aware dates)
+        columns = self.indicator_kernel.update(
+            metadata['pair'], dataframe['date'].values, dataframe['close'].to_numpy()
         )
-
-        # Set ML predictions
-        dataframe.loc[long_condition, 'ml_prediction'] = 1
-        dataframe.loc[short_condition, 'ml_prediction'] = 0
-
-        # Set ML confidence based on RSI levels
-        dataframe.loc[dataframe['rsi'] < 40, 'ml_confidence'] = 0.8
-        dataframe.loc[dataframe['rsi'] > 60, 'ml_confidence'] = 0.8
-        dataframe.loc[(dataframe['rsi'] >= 40) & (dataframe['rsi'] <= 60), 'ml_confidence'] = 0.6
-
-        # Strategy conditions
-        dataframe['strong_kalman'] = abs(dataframe['kalman_signal']) > self.kalman_threshold
-        dataframe['high_deviation'] = dataframe['kalman_deviation'] > self.deviation_threshold
-        dataframe['high_confidence'] = dataframe['ml_confidence'] > self.ml_confidence_threshold
-
-        return dataframe
+        # One concat instead of ten column inserts (the inserts cost more than the kernel itself)
+        existing = [name for name in INDICATOR_COLUMNS if name in dataframe.columns]
+        if existing:
+            dataframe = dataframe.drop(columns=existing)
+        return pd.concat([dataframe, DataFrame(columns, index=dataframe.index)], axis=1)
 
     def populate_entry_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """
@@ -0,0 +1,225 @@
+"""
+NumPy indicator kernel for the LiquidationHunterFreq strategy.
+
+One kernel instance is shared by every pair. ``compute`` evaluates the full
+indicator set for a close series; ``update`` keeps the last result per pair and,
+when freqtrade only appended candles (``process_only_new_candles``), extends it
+from the carried EMA/RSI state instead of recomputing the whole frame.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+INDICATOR_COLUMNS = (
+    'rsi', 'ema_fast', 'ema_slow', 'kalman_signal', 'kalman_deviation',
+    'ml_prediction', 'ml_confidence', 'strong_kalman', 'high_deviation', 'high_confidence',
+)
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """EMA seeded with the SMA of the first ``period`` values (same output as TA-Lib)."""
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    k = 2.0 / (period + 1)
+    seed = values[:period].mean()
+    out[period - 1] = seed
+    if len(values) > period:
+        out[period:], _ = lfilter([k], [1.0, k - 1.0], values[period:], zi=[(1.0 - k) * seed])
+    return out
+
+
+def wilder_rsi(close: np.ndarray, period: int) -> Tuple[np.ndarray, float, float]:
+    """
+    RSI with Wilder smoothing (same output as TA-Lib).
+
+    Returns:
+        Tuple of (rsi, last average gain, last average loss).
+    """
+    out = np.full(len(close), np.nan)
+    if len(close) <= period:
+        return out, np.nan, np.nan
+
+    diff = np.diff(close)
+    gains = np.maximum(diff, 0.0)
+    losses = np.maximum(-diff, 0.0)
+    a = 1.0 / period
+
+    avg_gain = np.empty(len(diff) - period + 1)
+    avg_loss = np.empty_like(avg_gain)
+    avg_gain[0] = gains[:period].mean()
+    avg_loss[0] = losses[:period].mean()
+    if len(avg_gain) > 1:
+        avg_gain[1:], _ = lfilter([a], [1.0, a - 1.0], gains[period:], zi=[(1.0 - a) * avg_gain[0]])
+        avg_loss[1:], _ = lfilter([a], [1.0, a - 1.0], losses[period:], zi=[(1.0 - a) * avg_loss[0]])
+
+    out[period:] = _rsi_from_averages(avg_gain, avg_loss)
+    return out, avg_gain[-1], avg_loss[-1]
+
+
+def _rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    total = avg_gain + avg_loss
+    return np.divide(100.0 * avg_gain, total, out=np.zeros_like(total), where=total != 0)
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """Sample rolling standard deviation, 0.0 until the window is full (pandas ``rolling().std().fillna(0)``)."""
+    out = np.zeros(len(values))
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).std(axis=1, ddof=1)
+    return out
+
+
+def predict(rsi: np.ndarray, ema_fast: np.ndarray, ema_slow: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ML-like prediction and confidence; NaN inputs compare False like the original ``.loc`` masks."""
+    with np.errstate(invalid='ignore'):
+        oversold = rsi < 40
+        overbought = rsi > 60
+        neutral = (rsi >= 40) & (rsi <= 60)
+        long_condition = oversold | (ema_fast > ema_slow)
+        short_condition = overbought | (ema_fast < ema_slow)
+
+    # Short conditions take precedence, as when they were assigned last
+    prediction = np.select([short_condition, long_condition], [0, 1], default=0)
+    confidence = np.select([oversold | overbought, neutral], [0.8, 0.6], default=0.0)
+    return prediction, confidence
+
+
+@dataclass
+class KernelState:
+    """Recursive state after the last computed candle."""
+    ema_fast: float
+    ema_slow: float
+    avg_gain: float
+    avg_loss: float
+
+    def is_valid(self) -> bool:
+        return not np.isnan([self.ema_fast, self.ema_slow, self.avg_gain, self.avg_loss]).any()
+
+
+class IndicatorKernel:
+    """Indicator computation shared across pairs, with an incremental per-pair cache."""
+
+    def __init__(self, rsi_period: int = 14, ema_fast_period: int = 8, ema_slow_period: int = 21,
+                 std_window: int = 9, kalman_threshold: float = 0.3, deviation_threshold: float = 1.5,
+                 ml_confidence_threshold: float = 0.55):
+        self.rsi_period = rsi_period
+        self.ema_fast_period = ema_fast_period
+        self.ema_slow_period = ema_slow_period
+        self.std_window = std_window
+        self.kalman_threshold = kalman_threshold
+        self.deviation_threshold = deviation_threshold
+        self.ml_confidence_threshold = ml_confidence_threshold
+
+        # pair -> (dates, close, columns, state)
+        self._cache: Dict[str, Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray], KernelState]] = {}
+
+    def compute(self, close: np.ndarray) -> Tuple[Dict[str, np.ndarray], KernelState]:
+        """Compute every indicator column for a full close series."""
+        close = np.asarray(close, dtype=float)
+        rsi, avg_gain, avg_loss = wilder_rsi(close, self.rsi_period)
+        ema_fast = ema(close, self.ema_fast_period)
+        ema_slow = ema(close, self.ema_slow_period)
+        columns = self._columns(close, rsi, ema_fast, ema_slow, rolling_std(close, self.std_window))
+        state = KernelState(ema_fast[-1] if len(close) else np.nan, ema_slow[-1] if len(close) else np.nan,
+                            avg_gain, avg_loss)
+        return columns, state
+
+    def extend(self, close: np.ndarray, known: int, state: KernelState) -> Tuple[Dict[str, np.ndarray], KernelState]:
+        """Compute the columns of ``close[known:]`` from the state left by ``close[:known]``."""
+        tail = close[known:]
+
+        k_fast = 2.0 / (self.ema_fast_period + 1)
+        k_slow = 2.0 / (self.ema_slow_period + 1)
+        ema_fast, _ = lfilter([k_fast], [1.0, k_fast - 1.0], tail, zi=[(1.0 - k_fast) * state.ema_fast])
+        ema_slow, _ = lfilter([k_slow], [1.0, k_slow - 1.0], tail, zi=[(1.0 - k_slow) * state.ema_slow])
+
+        diff = np.diff(close[known - 1:])
+        a = 1.0 / self.rsi_period
+        avg_gain, _ = lfilter([a], [1.0, a - 1.0], np.maximum(diff, 0.0), zi=[(1.0 - a) * state.avg_gain])
+        avg_loss, _ = lfilter([a], [1.0, a - 1.0], np.maximum(-diff, 0.0), zi=[(1.0 - a) * state.avg_loss])
+        rsi = _rsi_from_averages(avg_gain, avg_loss)
+
+        deviation = sliding_window_view(close[known - self.std_window + 1:], self.std_window).std(axis=1, ddof=1)
+        columns = self._columns(tail, rsi, ema_fast, ema_slow, deviation)
+        return columns, KernelState(ema_fast[-1], ema_slow[-1], avg_gain[-1], avg_loss[-1])
+
+    def _columns(self, close: np.ndarray, rsi: np.ndarray, ema_fast: np.ndarray, ema_slow: np.ndarray,
+                 deviation: np.ndarray) -> Dict[str, np.ndarray]:
+        prediction, confidence = predict(rsi, ema_fast, ema_slow)
+        kalman_signal = close - ema_fast
+        with np.errstate(invalid='ignore'):
+            strong_kalman = np.abs(kalman_signal) > self.kalman_threshold
+        return {
+            'rsi': rsi,
+            'ema_fast': ema_fast,
+            'ema_slow': ema_slow,
+            'kalman_signal': kalman_signal,
+            'kalman_deviation': deviation,
+            'ml_prediction': prediction,
+            'ml_confidence': confidence,
+            'strong_kalman': strong_kalman,
+            'high_deviation': deviation > self.deviation_threshold,
+            'high_confidence': confidence > self.ml_confidence_threshold,
+        }
+
+    def _known_rows(self, pair: str, dates: np.ndarray, close: np.ndarray) -> Optional[Tuple[int, int]]:
+        """
+        Rows of the new frame already computed for ``pair``.
+
+        Returns:
+            Tuple of (offset into the cached rows, number of known rows), or None
+            when the frame is not the cached one plus appended candles.
+        """
+        cached = self._cache.get(pair)
+        if cached is None or not len(dates):
+            return None
+        cached_dates, cached_close, _, state = cached
+
+        offset = int(np.searchsorted(cached_dates, dates[0]))
+        known = len(cached_dates) - offset
+        if (offset >= len(cached_dates) or known > len(dates) or known < self.std_window
+                or not state.is_valid()
+                or not np.array_equal(cached_dates[offset:], dates[:known])
+                or not np.array_equal(cached_close[offset:], close[:known])):
+            return None
+        return offset, known
+
+    def update(self, pair: str, dates: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Indicator columns for ``pair``, recomputing only candles appended since the last call.
+
+        Falls back to a full computation when history was rewritten, candles are
+        missing or there is no cached result yet. The returned arrays are shared
+        with the cache and must not be modified in place.
+        """
+        close = np.asarray(close, dtype=float)
+        known_rows = self._known_rows(pair, dates, close)
+
+        if known_rows is None:
+            columns, state = self.compute(close)
+        else:
+            offset, known = known_rows
+            _, _, cached_columns, state = self._cache[pair]
+            if known == len(close):
+                columns = {name: values[offset:] for name, values in cached_columns.items()}
+            else:
+                tail_columns, state = self.extend(close, known, state)
+                columns = {
+                    name: np.concatenate((cached_columns[name][offset:], tail_columns[name]))
+                    for name in INDICATOR_COLUMNS
+                }
+
+        self._cache[pair] = (dates, close, columns, state)
+        return columns
+
+    def clear(self, pair: Optional[str] = None):
+        """Drop the cached result of one pair (or all of them)."""
+        if pair is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(pair, None)